@@ -35,7 +35,8 @@ class BucketListingRef(object):
   It is populated by the calling iterator, which may only request certain
   fields to reduce the number of server requests.
 
-  For filesystem URLs, root_object is not populated.
+  For filesystem URLs, root_object is only populated with the file size, if
+  requested. File references may carry the file's stat result instead.
   """
 
   class _BucketListingRefType(object):
@@ -102,15 +103,17 @@ class BucketListingPrefix(BucketListingRef):
 class BucketListingObject(BucketListingRef):
   """BucketListingRef subclass for objects."""
 
-  def __init__(self, storage_url, root_object=None):
+  def __init__(self, storage_url, root_object=None, stat_result=None):
     """Creates a BucketListingRef of type object.
 
     Args:
       storage_url: StorageUrl containing an object.
       root_object: Underlying object metadata, if available.
+      stat_result: os.stat_result of a file, if it was stat'ed while listing.
     """
     super(BucketListingObject, self).__init__()
     self._ref_type = self._BucketListingRefType.OBJECT
     self._url_string = storage_url.url_string
     self.storage_url = storage_url
     self.root_object = root_object
+    self.stat_result = stat_result
@@ -430,6 +430,43 @@ class CloudApi(object):
     """
     raise NotImplementedError('PatchObjectMetadata must be overloaded')
 
+  def PatchObjectsMetadata(self, objects_to_patch, provider=None):
+    """Updates the metadata of multiple objects with patch semantics.
+
+    Implementations may combine the patches into fewer HTTP requests; this
+    default implementation patches the objects one at a time.
+
+    Args:
+      objects_to_patch: List of (bucket_name, object_name, metadata,
+                        generation, preconditions) tuples, with arguments as
+                        for PatchObjectMetadata.
+      provider: Cloud storage provider to connect to.  If not present,
+                class-wide default is used.
+
+    Raises:
+      ArgumentException for errors during input validation.
+
+    Returns:
+      List containing, for each object in objects_to_patch, None if the
+      object was updated or the exception (usually a ServiceException) that
+      prevented its update.
+    """
+    results = []
+    for (bucket_name, object_name, metadata, generation,
+         preconditions) in objects_to_patch:
+      try:
+        self.PatchObjectMetadata(bucket_name,
+                                 object_name,
+                                 metadata,
+                                 generation=generation,
+                                 preconditions=preconditions,
+                                 provider=provider,
+                                 fields=['id'])
+        results.append(None)
+      except Exception as e:  # pylint: disable=broad-except
+        results.append(e)
+    return results
+
   class DownloadStrategy(object):
     """Enum class for specifying download strategy."""
     ONE_SHOT = 'oneshot'
@@ -727,6 +764,41 @@ class CloudApi(object):
     """
     raise NotImplementedError('DeleteObject must be overloaded')
 
+  def DeleteObjects(self, objects_to_delete, preconditions=None,
+                    provider=None):
+    """Deletes multiple objects.
+
+    Implementations may combine the deletes into fewer HTTP requests; this
+    default implementation deletes the objects one at a time.
+
+    Args:
+      objects_to_delete: List of (bucket_name, object_name, generation)
+                         tuples. A generation of None deletes the live object.
+      preconditions: Preconditions for each delete request.
+      provider: Cloud storage provider to connect to.  If not present,
+                class-wide default is used.
+
+    Raises:
+      ArgumentException for errors during input validation.
+
+    Returns:
+      List containing, for each object in objects_to_delete, None if the
+      object was deleted or the exception (usually a ServiceException) that
+      prevented its deletion.
+    """
+    results = []
+    for bucket_name, object_name, generation in objects_to_delete:
+      try:
+        self.DeleteObject(bucket_name,
+                          object_name,
+                          preconditions=preconditions,
+                          generation=generation,
+                          provider=provider)
+        results.append(None)
+      except Exception as e:  # pylint: disable=broad-except
+        results.append(e)
+    return results
+
   def WatchBucket(self,
                   bucket_name,
                   address,
@@ -334,6 +334,9 @@ class CloudApiDelegator(CloudApi):
         preconditions=preconditions,
         fields=fields)
 
+  def PatchObjectsMetadata(self, objects_to_patch, provider=None):
+    return self._GetApi(provider).PatchObjectsMetadata(objects_to_patch)
+
   def GetObjectMedia(self,
                      bucket_name,
                      object_name,
@@ -481,6 +484,11 @@ class CloudApiDelegator(CloudApi):
                                                preconditions=preconditions,
                                                generation=generation)
 
+  def DeleteObjects(self, objects_to_delete, preconditions=None,
+                    provider=None):
+    return self._GetApi(provider).DeleteObjects(objects_to_delete,
+                                                preconditions=preconditions)
+
   def WatchBucket(self,
                   bucket_name,
                   address,
@@ -53,6 +53,7 @@ from gslib.exception import CommandException
 from gslib.help_provider import HelpProvider
 from gslib.metrics import CaptureThreadStatException
 from gslib.metrics import LogPerformanceSummaryParams
+from gslib.name_expansion import BatchNameExpansionIterator
 from gslib.name_expansion import CopyObjectInfo
 from gslib.name_expansion import CopyObjectsIterator
 from gslib.name_expansion import NameExpansionIterator
@@ -60,6 +61,7 @@ from gslib.name_expansion import NameExpansionResult
 from gslib.name_expansion import SeekAheadNameExpansionIterator
 from gslib.plurality_checkable_iterator import PluralityCheckableIterator
 from gslib.seek_ahead_thread import SeekAheadThread
+from gslib.seek_ahead_thread import SharedListingIterator
 from gslib.sig_handling import ChildProcessSignalHandler
 from gslib.sig_handling import GetCaughtSignals
 from gslib.sig_handling import KillProcess
@@ -80,16 +82,22 @@ from gslib.ui_controller import UIController
 from gslib.ui_controller import UIThread
 from gslib.utils.boto_util import GetFriendlyConfigFilePaths
 from gslib.utils.boto_util import GetMaxConcurrentCompressedUploads
+from gslib.utils.connection_pool_util import GetNumConnectionsOpened
+from gslib.utils.connection_pool_util import ResetHttpConnectionPool
 from gslib.utils.constants import NO_MAX
+from gslib.utils.metadata_cache_util import GetNumMetadataRequestsSaved
 from gslib.utils.constants import UTF8
 import gslib.utils.parallelism_framework_util
 from gslib.utils.parallelism_framework_util import AtomicDict
 from gslib.utils.parallelism_framework_util import CheckMultiprocessingAvailableAndInit
+from gslib.utils.parallelism_framework_util import CoalescingStatusQueue
 from gslib.utils.parallelism_framework_util import multiprocessing_context
 from gslib.utils.parallelism_framework_util import ProcessAndThreadSafeInt
 from gslib.utils.parallelism_framework_util import PutToQueueWithTimeout
 from gslib.utils.parallelism_framework_util import SEEK_AHEAD_JOIN_TIMEOUT
 from gslib.utils.parallelism_framework_util import ShouldProhibitMultiprocessing
+from gslib.utils.parallelism_framework_util import TaskArgsBatch
+from gslib.utils.parallelism_framework_util import TaskArgsBatchingIterator
 from gslib.utils.parallelism_framework_util import UI_THREAD_JOIN_TIMEOUT
 from gslib.utils.parallelism_framework_util import ZERO_TASKS_TO_DO_ARGUMENT
 from gslib.utils.rsync_util import RsyncDiffToApply
@@ -679,6 +687,10 @@ class Command(HelpProvider, GcloudStorageCommandMixin):
                                         trace_token=self.trace_token,
                                         perf_trace_token=self.perf_trace_token,
                                         user_project=self.user_project)
+    # Commands that repeatedly fetch the same bucket or object metadata can set
+    # this to a MetadataCache to share fetched metadata among their tasks. See
+    # GetCloudApiInstance.
+    self.metadata_cache = None
     # Cross-platform path to run gsutil binary.
     self.gsutil_cmd = ''
     # If running on Windows, invoke python interpreter explicitly.
@@ -856,7 +868,8 @@ class Command(HelpProvider, GcloudStorageCommandMixin):
                    acl_func,
                    acl_excep_handler,
                    url_strs,
-                   object_fields=None):
+                   object_fields=None,
+                   batch_size=1):
     """Sets the standard or default object ACL depending on self.command_name.
 
     Args:
@@ -865,6 +878,8 @@ class Command(HelpProvider, GcloudStorageCommandMixin):
       url_strs: URL strings on which to set ACL.
       object_fields: If present, list of object metadata fields to retrieve;
           if None, default name expansion iterator fields will be used.
+      batch_size: If greater than 1, acl_func is passed TaskArgsBatches of up
+          to this many objects, unless the first failure stops the command.
 
     Raises:
       CommandException if an ACL could not be set.
@@ -916,6 +931,11 @@ class Command(HelpProvider, GcloudStorageCommandMixin):
           continue_on_error=self.continue_on_error or self.parallel_operations,
           bucket_listing_fields=object_fields)
 
+      if batch_size > 1 and (self.continue_on_error or
+                             self.parallel_operations):
+        name_expansion_iterator = BatchNameExpansionIterator(
+            name_expansion_iterator, batch_size)
+
       seek_ahead_iterator = SeekAheadNameExpansionIterator(
           self.command_name,
           self.debug,
@@ -1300,6 +1320,7 @@ class Command(HelpProvider, GcloudStorageCommandMixin):
 
     StorageUri.provider_pool = {}
     StorageUri.connection = None
+    ResetHttpConnectionPool()
 
   def _GetProcessAndThreadCount(self,
                                 process_count,
@@ -1555,8 +1576,16 @@ class Command(HelpProvider, GcloudStorageCommandMixin):
       if is_main_thread:
         _AggregateThreadStats()
     else:
+      num_connections_opened = GetNumConnectionsOpened()
+      num_metadata_requests_saved = GetNumMetadataRequestsSaved()
       self._SequentialApply(func, args_iterator, exception_handler, caller_id,
                             arg_checker, should_return_results, fail_on_error)
+      if is_main_thread:
+        LogPerformanceSummaryParams(
+            num_connections_opened=(GetNumConnectionsOpened() -
+                                    num_connections_opened),
+            num_metadata_requests_saved=(GetNumMetadataRequestsSaved() -
+                                         num_metadata_requests_saved))
 
     if shared_attrs:
       for name in shared_attrs:
@@ -1611,7 +1640,7 @@ class Command(HelpProvider, GcloudStorageCommandMixin):
       except StopIteration as e:
         break
       except Exception as e:  # pylint: disable=broad-except
-        _IncrementFailureCount()
+        IncrementFailureCount()
         if fail_on_error:
           raise
         else:
@@ -1890,6 +1919,8 @@ class Command(HelpProvider, GcloudStorageCommandMixin):
 
   def _ProcessSourceUrlTypes(self, args_iterator):
     """Logs the URL type information to analytics collection."""
+    if isinstance(args_iterator, TaskArgsBatchingIterator):
+      args_iterator = args_iterator.args_iterator
     if not isinstance(args_iterator, CopyObjectsIterator):
       return
     LogPerformanceSummaryParams(is_daisy_chain=args_iterator.is_daisy_chain,
@@ -2102,6 +2133,7 @@ class ProducerThread(threading.Thread):
 
   def run(self):
     num_tasks = 0
+    num_ops = 0
     cur_task = None
     last_task = None
     task_estimation_threshold = None
@@ -2109,8 +2141,17 @@ class ProducerThread(threading.Thread):
     seek_ahead_thread_cancel_event = None
     seek_ahead_thread_considered = False
     args = None
+    shared_listing = None
+    seek_ahead_iterator = self.seek_ahead_iterator
     try:
       total_size = 0
+      if isinstance(seek_ahead_iterator, SeekAheadNameExpansionIterator):
+        # Estimate the total work from this thread's own listing rather than
+        # listing everything a second time.
+        shared_listing = SharedListingIterator(
+            self.args_iterator, seek_ahead_iterator.GetSeekAheadResult)
+        self.args_iterator = shared_listing
+        seek_ahead_iterator = shared_listing.IterSeekAheadResults()
       self.args_iterator = iter(self.args_iterator)
       while True:
         try:
@@ -2118,7 +2159,7 @@ class ProducerThread(threading.Thread):
         except StopIteration as e:
           break
         except Exception as e:  # pylint: disable=broad-except
-          _IncrementFailureCount()
+          IncrementFailureCount()
           if self.fail_on_error:
             self.iterator_exception = e
             raise
@@ -2135,23 +2176,26 @@ class ProducerThread(threading.Thread):
         if self.arg_checker(self.cls, args):
           num_tasks += 1
           if self.status_queue:
-            if not num_tasks % 100:
-              # Time to update the total number of tasks.
-              if (isinstance(args, NameExpansionResult) or
-                  isinstance(args, CopyObjectInfo) or
-                  isinstance(args, RsyncDiffToApply)):
-                PutToQueueWithTimeout(
-                    self.status_queue,
-                    ProducerThreadMessage(num_tasks, total_size, time.time()))
-            if (isinstance(args, NameExpansionResult) or
-                isinstance(args, CopyObjectInfo)):
-              if args.expanded_result:
-                json_expanded_result = json.loads(args.expanded_result)
-                if 'size' in json_expanded_result:
-                  total_size += int(json_expanded_result['size'])
-            elif isinstance(args, RsyncDiffToApply):
-              if args.copy_size:
-                total_size += int(args.copy_size)
+            # A batch of arguments counts as one operation per argument.
+            for op_args in _GetOperationArgs(args):
+              num_ops += 1
+              if not num_ops % 100:
+                # Time to update the total number of operations.
+                if (isinstance(op_args, NameExpansionResult) or
+                    isinstance(op_args, CopyObjectInfo) or
+                    isinstance(op_args, RsyncDiffToApply)):
+                  PutToQueueWithTimeout(
+                      self.status_queue,
+                      ProducerThreadMessage(num_ops, total_size, time.time()))
+              if (isinstance(op_args, NameExpansionResult) or
+                  isinstance(op_args, CopyObjectInfo)):
+                if op_args.expanded_result:
+                  json_expanded_result = json.loads(op_args.expanded_result)
+                  if 'size' in json_expanded_result:
+                    total_size += int(json_expanded_result['size'])
+              elif isinstance(op_args, RsyncDiffToApply):
+                if op_args.copy_size:
+                  total_size += int(op_args.copy_size)
 
           if not seek_ahead_thread_considered:
             if task_estimation_threshold is None:
@@ -2160,10 +2204,10 @@ class ProducerThread(threading.Thread):
               # Disable the seek-ahead thread (never start it).
               seek_ahead_thread_considered = True
             elif num_tasks >= task_estimation_threshold:
-              if self.seek_ahead_iterator:
+              if seek_ahead_iterator:
                 seek_ahead_thread_cancel_event = threading.Event()
                 seek_ahead_thread = _StartSeekAheadThread(
-                    self.seek_ahead_iterator, seek_ahead_thread_cancel_event)
+                    seek_ahead_iterator, seek_ahead_thread_cancel_event)
                 # For integration testing only, force estimation to complete
                 # prior to producing further results.
                 if boto.config.get('GSUtil', 'task_estimation_force', None):
@@ -2201,6 +2245,8 @@ class ProducerThread(threading.Thread):
       # to delay command completion on an estimate that has become meaningless.
       if seek_ahead_thread is not None:
         seek_ahead_thread_cancel_event.set()
+        if shared_listing is not None:
+          shared_listing.Close()
         # It's possible that the seek-ahead-thread may attempt to put to the
         # status queue after it has been torn down, for example if the system
         # is overloaded. Because the put uses a timeout, it should never block
@@ -2208,12 +2254,14 @@ class ProducerThread(threading.Thread):
         seek_ahead_thread.join(timeout=SEEK_AHEAD_JOIN_TIMEOUT)
       # Send a final ProducerThread message that definitively states
       # the amount of actual work performed.
+      if isinstance(args, TaskArgsBatch) and len(args):
+        args = args.args_list[-1]
       if (self.status_queue and
           (isinstance(args, NameExpansionResult) or isinstance(
               args, CopyObjectInfo) or isinstance(args, RsyncDiffToApply))):
         PutToQueueWithTimeout(
             self.status_queue,
-            ProducerThreadMessage(num_tasks,
+            ProducerThreadMessage(num_ops,
                                   total_size,
                                   time.time(),
                                   finished=True))
@@ -2224,6 +2272,13 @@ class ProducerThread(threading.Thread):
                     caller_id_finished_count.get(self.caller_id))
 
 
+def _GetOperationArgs(args):
+  """Returns the arguments of the operations performed by a task."""
+  if isinstance(args, TaskArgsBatch):
+    return args.args_list
+  return [args]
+
+
 class WorkerPool(object):
   """Pool of worker threads to which tasks can be added."""
 
@@ -2256,6 +2311,10 @@ class WorkerPool(object):
     self.user_project = user_project
 
     self.task_queue = task_queue or _NewThreadsafeQueue()
+    # All threads in the pool publish their status updates through a single
+    # coalescing wrapper to limit traffic to the global status queue.
+    if status_queue is not None:
+      status_queue = CoalescingStatusQueue(status_queue)
     self.threads = []
     for _ in range(thread_count):
       worker_thread = WorkerThread(
@@ -2337,6 +2396,11 @@ class WorkerThread(threading.Thread):
     self.perf_trace_token = perf_trace_token
     self.trace_token = trace_token
     self.user_project = user_project
+    self.status_queue = status_queue
+    # Number of connections opened and metadata requests saved by this thread
+    # that have already been recorded in its _ThreadStat.
+    self.num_connections_recorded = 0
+    self.num_metadata_requests_saved_recorded = 0
 
     # Note that thread_gsutil_api is not initialized in the sequential
     # case; task functions should use utils.cloud_api_helper.GetCloudApiInstance
@@ -2364,6 +2428,14 @@ class WorkerThread(threading.Thread):
     # to this thread, making this thread the only reader/writer for this key.
     thread_stat = thread_stats[(self.pid, self.ident)]
     thread_stat.StartBlockedTime()
+    num_connections_opened = GetNumConnectionsOpened()
+    thread_stat.num_connections_opened += (num_connections_opened -
+                                           self.num_connections_recorded)
+    self.num_connections_recorded = num_connections_opened
+    num_metadata_requests_saved = GetNumMetadataRequestsSaved()
+    thread_stat.num_metadata_requests_saved += (
+        num_metadata_requests_saved - self.num_metadata_requests_saved_recorded)
+    self.num_metadata_requests_saved_recorded = num_metadata_requests_saved
     thread_stats[(self.pid, self.ident)] = thread_stat
 
   @CaptureThreadStatException
@@ -2388,7 +2460,7 @@ class WorkerThread(threading.Thread):
         global_return_values_map.Increment(caller_id, [results],
                                            default_value=[])
     except Exception as e:  # pylint: disable=broad-except
-      _IncrementFailureCount()
+      IncrementFailureCount()
       if task.fail_on_error:
         raise  # Only happens for single thread and process case.
       else:
@@ -2404,6 +2476,11 @@ class WorkerThread(threading.Thread):
       if self.worker_semaphore:
         self.worker_semaphore.release()
       self.shared_vars_updater.Update(caller_id, cls)
+      if isinstance(self.status_queue, CoalescingStatusQueue):
+        # Progress must be published before the task is marked as done, since
+        # the caller may then report the file as finished. Coalesced metadata
+        # counts are held back while more work is queued for this pool.
+        self.status_queue.Flush(include_metadata=self.task_queue.empty())
 
       # Even if we encounter an exception, we still need to claim that that
       # the function finished executing. Otherwise, we won't know when to
@@ -2445,6 +2522,10 @@ class _ThreadStat(object):
     self.start_block_time = time.time()
     # Between now and thread initialization, we were not blocked.
     self.total_execution_time = 0
+    # Number of new HTTP connections opened by the thread.
+    self.num_connections_opened = 0
+    # Number of metadata requests served from a command's metadata cache.
+    self.num_metadata_requests_saved = 0
 
   def StartBlockedTime(self):
     self.start_block_time = time.time()
@@ -2478,13 +2559,19 @@ def _AggregateThreadStats():
   the MetricsCollector.
   """
   cur_time = time.time()
-  total_idle_time = total_execution_time = 0
+  total_idle_time = total_execution_time = num_connections_opened = 0
+  num_metadata_requests_saved = 0
   for thread_stat in thread_stats.values():
     thread_stat.AggregateStat(cur_time)
     total_idle_time += thread_stat.total_idle_time
     total_execution_time += thread_stat.total_execution_time
-  LogPerformanceSummaryParams(thread_idle_time=total_idle_time,
-                              thread_execution_time=total_execution_time)
+    num_connections_opened += thread_stat.num_connections_opened
+    num_metadata_requests_saved += thread_stat.num_metadata_requests_saved
+  LogPerformanceSummaryParams(
+      thread_idle_time=total_idle_time,
+      thread_execution_time=total_execution_time,
+      num_connections_opened=num_connections_opened,
+      num_metadata_requests_saved=num_metadata_requests_saved)
 
 
 class _SharedVariablesUpdater(object):
@@ -2582,7 +2669,7 @@ def _IncrementCurrentMaxRecursiveLevel():
   current_max_recursive_level.Increment()
 
 
-def _IncrementFailureCount():
+def IncrementFailureCount():
   global failure_count
   failure_count.Increment()
 
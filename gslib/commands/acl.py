@@ -30,6 +30,7 @@ from gslib.cloud_api import PreconditionException
 from gslib.cloud_api import Preconditions
 from gslib.cloud_api import ServiceException
 from gslib.command import Command
+from gslib.command import IncrementFailureCount
 from gslib.command import SetAclExceptionHandler
 from gslib.command import SetAclFuncWrapper
 from gslib.command_argument import CommandArgument
@@ -41,7 +42,9 @@ from gslib.storage_url import UrlsAreForSingleProvider
 from gslib.storage_url import RaiseErrorIfUrlsAreMixOfBucketsAndObjects
 from gslib.third_party.storage_apitools import storage_v1_messages as apitools_messages
 from gslib.utils import acl_helper
+from gslib.utils.boto_util import GetPatchBatchSize
 from gslib.utils.constants import NO_MAX
+from gslib.utils.parallelism_framework_util import TaskArgsBatch
 from gslib.utils.retry_util import Retry
 from gslib.utils.shim_util import GcloudStorageFlag
 from gslib.utils.shim_util import GcloudStorageMap
@@ -293,7 +296,10 @@ def _ApplyExceptionHandler(cls, exception):
 
 
 def _ApplyAclChangesWrapper(cls, url_or_expansion_result, thread_state=None):
-  cls.ApplyAclChanges(url_or_expansion_result, thread_state=thread_state)
+  if isinstance(url_or_expansion_result, TaskArgsBatch):
+    cls.ApplyAclChangesBatch(url_or_expansion_result, thread_state=thread_state)
+  else:
+    cls.ApplyAclChanges(url_or_expansion_result, thread_state=thread_state)
 
 
 class AclCommand(Command):
@@ -481,14 +487,18 @@ class AclCommand(Command):
     self.ApplyAclFunc(_ApplyAclChangesWrapper,
                       _ApplyExceptionHandler,
                       self.args,
-                      object_fields=['acl', 'generation', 'metageneration'])
+                      object_fields=['acl', 'generation', 'metageneration'],
+                      batch_size=GetPatchBatchSize())
     if not self.everything_set_okay:
       raise CommandException('ACLs for some objects could not be set.')
 
   def _RaiseForAccessDenied(self, url):
+    raise self._GetAccessDeniedException(url)
+
+  def _GetAccessDeniedException(self, url):
     self._WarnServiceAccounts()
-    raise CommandException('Failed to set acl for %s. Please ensure you have '
-                           'OWNER-role access to this resource.' % url)
+    return CommandException('Failed to set acl for %s. Please ensure you have '
+                            'OWNER-role access to this resource.' % url)
 
   @Retry(ServiceException, tries=3, timeout_secs=1)
   def ApplyAclChanges(self, name_expansion_result, thread_state=None):
@@ -560,6 +570,73 @@ class AclCommand(Command):
       # For buckets, raise PreconditionException and continue to next retry.
       raise e
 
+  def ApplyAclChangesBatch(self, name_expansion_results, thread_state=None):
+    """Applies the changes in self.changes to a batch of objects.
+
+    The objects are updated with a single batch request, using the ACLs,
+    generations and metagenerations from the listing. Failed updates are
+    handled as in ApplyAclChanges and reported for each object.
+
+    Args:
+      name_expansion_results: TaskArgsBatch of NameExpansionResults describing
+          the target objects.
+      thread_state: If present, gsutil Cloud API instance to apply the changes.
+    """
+    if thread_state:
+      gsutil_api = thread_state
+    else:
+      gsutil_api = self.gsutil_api
+
+    urls = []
+    objects_to_patch = []
+    for name_expansion_result in name_expansion_results:
+      url = name_expansion_result.expanded_storage_url
+      gcs_object = encoding.JsonToMessage(apitools_messages.Object,
+                                          name_expansion_result.expanded_result)
+      current_acl = gcs_object.acl
+      if not current_acl:
+        self._HandleBatchedAclChangeFailure(
+            self._GetAccessDeniedException(url))
+        continue
+      if self._ApplyAclChangesAndReturnChangeCount(url, current_acl) == 0:
+        self.logger.info('No changes to %s', url)
+        continue
+      urls.append(url)
+      objects_to_patch.append(
+          (url.bucket_name, url.object_name,
+           apitools_messages.Object(acl=current_acl), url.generation,
+           Preconditions(gen_match=gcs_object.generation,
+                         meta_gen_match=gcs_object.metageneration)))
+    if not objects_to_patch:
+      return
+
+    # All objects in a batch share a provider.
+    results = gsutil_api.PatchObjectsMetadata(objects_to_patch,
+                                              provider=url.scheme)
+    for url, e in zip(urls, results):
+      try:
+        if isinstance(e, PreconditionException):
+          # As in ApplyAclChanges, re-read the object's ACL and try again.
+          self._RefetchObjectMetadataAndApplyAclChanges(url, gsutil_api)
+        elif e is not None:
+          raise e
+        self.logger.info('Updated ACL on %s', url)
+      except BadRequestException as e:
+        self._HandleBatchedAclChangeFailure(
+            CommandException('Received bad request from server: %s' % str(e)))
+      except AccessDeniedException:
+        self._HandleBatchedAclChangeFailure(
+            self._GetAccessDeniedException(url))
+      except PreconditionException as e:
+        self._HandleBatchedAclChangeFailure(CommandException(str(e)))
+      except Exception as e:  # pylint: disable=broad-except
+        self._HandleBatchedAclChangeFailure(e)
+
+  def _HandleBatchedAclChangeFailure(self, e):
+    # Account for the failure as if the object had been its own task.
+    IncrementFailureCount()
+    _ApplyExceptionHandler(self, e)
+
   @Retry(PreconditionException, tries=3, timeout_secs=1)
   def _RefetchObjectMetadataAndApplyAclChanges(self, url, gsutil_api):
     """Reattempts object ACL changes after a PreconditionException."""
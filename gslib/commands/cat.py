@@ -59,6 +59,14 @@ _DETAILED_HELP_TEXT = ("""
   their own validation of the output of gsutil cat or use gsutil cp
   or rsync (both of which perform integrity checking automatically).
 
+  When run with the top-level gsutil -m option, the cat command fetches
+  upcoming objects, and byte ranges of large objects, concurrently while
+  still writing them to stdout in order. This speeds up catting many small
+  objects or a single large one. The amount of memory used for this is
+  bounded by the "stream_prefetch_buffer_size" boto config option, and the
+  number of concurrent requests by "stream_prefetch_threads". Objects stored
+  with Content-Encoding:gzip are always streamed over a single connection.
+
 
 <B>OPTIONS</B>
   -h          Prints short header for each object. For example:
@@ -19,23 +19,49 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import unicode_literals
 
+from collections import namedtuple
+
 from boto import config
 
 from gslib.bucket_listing_ref import BucketListingObject
+from gslib.cloud_api import NotFoundException
 from gslib.command import Command
+from gslib.command import DummyArgChecker
 from gslib.command_argument import CommandArgument
 from gslib.cs_api_map import ApiSelector
 from gslib.exception import CommandException
+from gslib.parallel_tracker_file import GenerateComponentObjectPrefix
 from gslib.storage_url import ContainsWildcard
 from gslib.storage_url import StorageUrlFromString
 from gslib.third_party.storage_apitools import storage_v1_messages as apitools_messages
+from gslib.utils.cloud_api_helper import GetCloudApiInstance
+from gslib.utils.constants import NO_MAX
 from gslib.utils.encryption_helper import GetEncryptionKeyWrapper
 from gslib.utils.shim_util import GcloudStorageFlag
 from gslib.utils.shim_util import GcloudStorageMap
 from gslib.utils.translation_helper import PreconditionsFromHeaders
+from gslib.utils.unit_util import DivideAndCeil
 
 MAX_COMPOSE_ARITY = 32
 
+# Intermediate objects of a composition tree are named with a random prefix
+# followed by this namespace, and are deleted once the destination object has
+# been composed.
+COMPOSE_TEMP_NAMESPACE = (
+    '/gsutil/tmp/compose/for_details_see/gsutil_help_compose/')
+
+# This tuple is used only to encapsulate the arguments needed for
+# command.Apply() when composing an intermediate object of a composition tree.
+# Source objects are given as (object_name, generation) tuples because
+# apitools objects are not picklable.
+# index: Index of the intermediate object within its tree level.
+# components: List of (object_name, generation) tuples of the source objects.
+# dst_url: CloudUrl of the intermediate object.
+# content_type: Content type of the intermediate object.
+ComposeIntermediateObjectArgs = namedtuple(
+    'ComposeIntermediateObjectArgs',
+    'index components dst_url content_type')
+
 _SYNOPSIS = """
   gsutil compose gs://bucket/source_obj1 [gs://bucket/source_obj2 ...] gs://bucket/composite_obj
 """
@@ -54,8 +80,72 @@ _DETAILED_HELP_TEXT = ("""
   topic <https://cloud.google.com/storage/docs/composite-objects>`_.
 
   There is a limit (currently %d) to the number of components that can
-  be composed in a single operation.
-""" % (MAX_COMPOSE_ARITY))
+  be composed in a single operation. When given more components than that,
+  gsutil composes them as a tree: consecutive groups of up to %d components
+  are composed in parallel into temporary objects, which are in turn composed
+  until few enough remain to compose the destination object. The temporary
+  objects are named with a random prefix followed by
+  "%s" and are deleted once the destination object has been composed.
+""" % (MAX_COMPOSE_ARITY, MAX_COMPOSE_ARITY, COMPOSE_TEMP_NAMESPACE))
+
+
+def _ComposeExceptionHandler(cls, e):
+  """Simple exception handler to allow post-completion status."""
+  cls.logger.error(str(e))
+  cls.op_failure_count += 1
+
+
+def _ComposeIntermediateObjectFn(cls, args, thread_state=None):
+  """Worker function for composing an intermediate object.
+
+  Args:
+    cls: Command instance.
+    args: ComposeIntermediateObjectArgs describing the object to compose.
+    thread_state: gsutil Cloud API instance to use for the operation.
+
+  Returns:
+    (index, generation) of the composed intermediate object.
+  """
+  gsutil_api = GetCloudApiInstance(cls, thread_state=thread_state)
+  components = []
+  for object_name, generation in args.components:
+    components.append(
+        apitools_messages.ComposeRequest.SourceObjectsValueListEntry(
+            name=object_name, generation=generation))
+  dst_obj_metadata = apitools_messages.Object(name=args.dst_url.object_name,
+                                              bucket=args.dst_url.bucket_name,
+                                              contentType=args.content_type)
+  composed_object = gsutil_api.ComposeObject(
+      components,
+      dst_obj_metadata,
+      provider=args.dst_url.scheme,
+      encryption_tuple=GetEncryptionKeyWrapper(config),
+      fields=['generation'])
+  return (args.index, composed_object.generation)
+
+
+def SplitIntoComposeGroups(components):
+  """Splits components into consecutive groups for one composition round.
+
+  Args:
+    components: List of components.
+
+  Returns:
+    List of the fewest possible lists of at most MAX_COMPOSE_ARITY consecutive
+    components, with sizes differing by at most one so that the composition
+    tree stays balanced.
+  """
+  num_groups = DivideAndCeil(len(components), MAX_COMPOSE_ARITY)
+  groups = []
+  start = 0
+  for i in range(num_groups):
+    # The first len(components) % num_groups groups get an extra component.
+    end = start + len(components) // num_groups
+    if i < len(components) % num_groups:
+      end += 1
+    groups.append(components[start:end])
+    start = end
+  return groups
 
 
 class ComposeCommand(Command):
@@ -67,7 +157,7 @@ class ComposeCommand(Command):
       command_name_aliases=['concat'],
       usage_synopsis=_SYNOPSIS,
       min_args=1,
-      max_args=MAX_COMPOSE_ARITY + 1,
+      max_args=NO_MAX,
       supported_sub_args='',
       # Not files, just object names without gs:// prefix.
       file_url_ok=False,
@@ -135,11 +225,6 @@ class ComposeCommand(Command):
         if src_url.HasGeneration():
           src_obj_metadata.generation = int(src_url.generation)
         components.append(src_obj_metadata)
-        # Avoid expanding too many components, and sanity check each name
-        # expansion result.
-        if len(components) > MAX_COMPOSE_ARITY:
-          raise CommandException('"compose" called with too many component '
-                                 'objects. Limit is %d.' % MAX_COMPOSE_ARITY)
 
     if not components:
       raise CommandException('"compose" requires at least 1 component object.')
@@ -156,9 +241,95 @@ class ComposeCommand(Command):
 
     self.logger.info('Composing %s from %d component object(s).', target_url,
                      len(components))
-    self.gsutil_api.ComposeObject(
-        components,
-        dst_obj_metadata,
-        preconditions=preconditions,
-        provider=target_url.scheme,
-        encryption_tuple=GetEncryptionKeyWrapper(config))
+    intermediate_objects = []
+    try:
+      if len(components) > MAX_COMPOSE_ARITY:
+        components = self._ComposeIntermediateObjects(
+            components, target_url, dst_obj_metadata.contentType,
+            intermediate_objects)
+      self.gsutil_api.ComposeObject(
+          components,
+          dst_obj_metadata,
+          preconditions=preconditions,
+          provider=target_url.scheme,
+          encryption_tuple=GetEncryptionKeyWrapper(config))
+    finally:
+      self._DeleteIntermediateObjects(intermediate_objects, target_url.scheme)
+
+  def _ComposeIntermediateObjects(self, components, target_url, content_type,
+                                  intermediate_objects):
+    """Composes components into at most MAX_COMPOSE_ARITY objects.
+
+    Each level of the composition tree is composed with a parallel Apply call.
+
+    Args:
+      components: List of ComposeRequest.SourceObjectsValueListEntry for the
+          source objects, in order.
+      target_url: CloudUrl of the destination object.
+      content_type: Content type for the intermediate objects.
+      intermediate_objects: List to which (bucket_name, object_name,
+          generation) tuples of the intermediate objects are appended as they
+          are created, for cleaning them up.
+
+    Raises:
+      CommandException if an intermediate object could not be composed.
+
+    Returns:
+      List of ComposeRequest.SourceObjectsValueListEntry for the top level of
+      intermediate objects, in order.
+    """
+    random_prefix = GenerateComponentObjectPrefix()
+    level = 0
+    while len(components) > MAX_COMPOSE_ARITY:
+      level += 1
+      groups = SplitIntoComposeGroups(components)
+      self.logger.info('Composing %d intermediate object(s).', len(groups))
+      compose_args = []
+      for index, group in enumerate(groups):
+        dst_url = StorageUrlFromString('%s%s%s%d_%d' % (
+            target_url.bucket_url_string, random_prefix,
+            COMPOSE_TEMP_NAMESPACE, level, index))
+        compose_args.append(
+            ComposeIntermediateObjectArgs(
+                index, [(component.name, component.generation)
+                        for component in group], dst_url, content_type))
+
+      self.op_failure_count = 0
+      results = self.Apply(
+          _ComposeIntermediateObjectFn,
+          compose_args,
+          _ComposeExceptionHandler, ('op_failure_count',),
+          arg_checker=DummyArgChecker,
+          parallel_operations_override=self.ParallelOverrideReason.SPEED,
+          should_return_results=True)
+      components = [None] * len(compose_args)
+      for index, generation in results:
+        dst_url = compose_args[index].dst_url
+        intermediate_objects.append(
+            (dst_url.bucket_name, dst_url.object_name, generation))
+        components[index] = (
+            apitools_messages.ComposeRequest.SourceObjectsValueListEntry(
+                name=dst_url.object_name, generation=generation))
+      if self.op_failure_count or None in components:
+        raise CommandException('Failed to compose %d intermediate object(s).' %
+                               components.count(None))
+    return components
+
+  def _DeleteIntermediateObjects(self, intermediate_objects, provider):
+    """Deletes the intermediate objects of a composition tree in batches.
+
+    Args:
+      intermediate_objects: List of (bucket_name, object_name, generation)
+          tuples of the objects to delete.
+      provider: Cloud storage provider of the objects.
+    """
+    if not intermediate_objects:
+      return
+    results = self.gsutil_api.DeleteObjects(intermediate_objects,
+                                            provider=provider)
+    for (bucket_name, object_name, _), e in zip(intermediate_objects, results):
+      # The object may already be gone if a retry was issued at a lower layer
+      # but the original request succeeded.
+      if e is not None and not isinstance(e, NotFoundException):
+        self.logger.warn('Failed to delete intermediate object %s://%s/%s: %s',
+                         provider, bucket_name, object_name, e)
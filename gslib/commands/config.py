@@ -195,6 +195,31 @@ DEFAULT_SLICED_OBJECT_DOWNLOAD_THRESHOLD = '150M'
 DEFAULT_SLICED_OBJECT_DOWNLOAD_COMPONENT_SIZE = '200M'
 DEFAULT_SLICED_OBJECT_DOWNLOAD_MAX_COMPONENTS = 4
 
+# 'file_listing_threads' specifies how many threads scan subdirectories and
+# stat files concurrently when recursively listing a local directory, e.g. for
+# "gsutil cp -r" or "gsutil rsync -r" from a local directory. Listings of
+# network file systems are bound by the latency of these calls.
+#file_listing_threads = %(file_listing_threads)d
+
+# 'stream_prefetch_threads' and 'stream_prefetch_buffer_size' control how
+# "gsutil -m cat" and streaming downloads with "gsutil cp" (with -m, or for
+# objects of at least 'sliced_object_download_threshold' bytes) prefetch
+# upcoming objects, and byte ranges of large objects, while writing them to
+# stdout in order. At most 'stream_prefetch_buffer_size' bytes (a
+# human-readable value, e.g. "64M") are held in memory, spread over
+# 'stream_prefetch_threads' concurrent requests.
+#stream_prefetch_threads = %(stream_prefetch_threads)d
+#stream_prefetch_buffer_size = %(stream_prefetch_buffer_size)s
+
+# 'upload_read_ahead_buffer_size' specifies how much data (a human-readable
+# value, e.g. "8M") uploads of local files read ahead of what has been sent, in
+# a separate thread per upload. This keeps the connection busy when reading from
+# slow or high-latency file systems, e.g. NFS. Each concurrent upload holds its
+# own buffer, so with "gsutil -m" this can use up to the buffer size times the
+# number of threads and processes in memory. The default of 0 reads files only
+# as their data is sent.
+#upload_read_ahead_buffer_size = %(upload_read_ahead_buffer_size)s
+
 # Compressed transport encoded uploads buffer chunks of compressed data. When
 # running many uploads in parallel, compression may consume more memory than
 # available. This restricts the number of compressed transport encoded uploads
@@ -296,6 +321,22 @@ CONFIG_INPUTLESS_GSUTIL_SECTION_CONTENT = """
 # resumable transfer tracker files, and the last software update check.
 # By default these files are stored in ~/.gsutil
 #state_dir = <file_path>
+
+# 'use_tracker_database' specifies whether resumable transfer state should be
+# kept in a single SQLite database in the tracker file directory instead of in
+# a separate tracker file per upload, download, download component and
+# rewrite. This avoids creating and deleting many small files when copying
+# large numbers of objects. Existing tracker files are moved into the database
+# when the transfers they describe are resumed.
+#use_tracker_database = False
+
+# 'use_job_checkpoints' specifies whether cp and mv commands that write a
+# manifest with the -L option should record the items they list in a
+# checkpoint in the state directory. Running the same command again after an
+# interruption then copies the remaining items from the checkpoint, without
+# listing the source URLs again if they were completely listed before.
+#use_job_checkpoints = False
+
 # gsutil periodically checks whether a new version of the gsutil software is
 # available. 'software_update_check_period' specifies the number of days
 # between such checks. The default is 30. Setting the value to 0 disables
@@ -318,6 +359,36 @@ CONFIG_INPUTLESS_GSUTIL_SECTION_CONTENT = """
 #parallel_process_count = %(parallel_process_count)d
 #parallel_thread_count = %(parallel_thread_count)d
 
+# 'http_connection_pool_size' specifies the maximum number of idle keep-alive
+# HTTP connections each gsutil process keeps for reuse by later requests to the
+# JSON API, including uploads and downloads. A value of 0 disables connection
+# reuse across transfers. 'http_connection_pool_idle_timeout' specifies the
+# number of seconds after which an idle pooled connection is closed instead of
+# being reused.
+#http_connection_pool_size = %(http_connection_pool_size)d
+#http_connection_pool_idle_timeout = %(http_connection_pool_idle_timeout)d
+
+# 'delete_batch_size' specifies the maximum number of object deletions that
+# "gsutil rm" (when run with -m or -f) and "gsutil rsync -d" send in a single
+# JSON API batch request.
+# The maximum (and default) value is %(delete_batch_size)d. A value of 1 sends
+# every deletion as a separate request.
+#delete_batch_size = %(delete_batch_size)d
+
+# 'patch_batch_size' specifies the maximum number of object metadata updates
+# that "gsutil setmeta", "gsutil acl ch" and "gsutil retention temp|event"
+# (when run with -m, or with -f for "acl ch") and "gsutil rsync" (for objects
+# whose mtime or POSIX attributes changed) send in a single JSON API batch
+# request.
+# The maximum (and default) value is %(patch_batch_size)d. A value of 1 sends
+# every update as a separate request.
+#patch_batch_size = %(patch_batch_size)d
+
+# 'rsync_reconcile_interval' specifies how many seconds "gsutil rsync
+# --subscription" applies only the changes announced by Pub/Sub notifications
+# before synchronizing the source and destination with a full listing again.
+#rsync_reconcile_interval = %(rsync_reconcile_interval)d
+
 # 'parallel_composite_upload_threshold' specifies the maximum size of a file to
 # upload in a single stream. Files larger than this threshold will be
 # partitioned into component parts and uploaded in parallel and then composed
@@ -394,12 +465,25 @@ CONFIG_INPUTLESS_GSUTIL_SECTION_CONTENT = """
 # listing calls; to disable it entirely, set this value to 0.
 #task_estimation_threshold=%(task_estimation_threshold)s
 
+# 'use_file_hash_cache' specifies whether CRC32C and MD5 checksums of local
+# files should be saved after gsutil computes or validates them (e.g. when
+# downloading, uploading or hashing a file), so that commands like 'rsync -c'
+# and 'hash' can reuse them while the file's size, modification time, change
+# time and inode number are unchanged. Checksums are saved in a database in the
+# state_dir. A file modified in place without changing its size can still go
+# unnoticed if it is modified within the timestamp resolution of its file
+# system after its checksums were saved, or if its file system doesn't
+# maintain change times, so don't enable this option for such files.
+#use_file_hash_cache = False
+
 # 'use_magicfile' specifies if the 'file --mime <filename>' command should be
 # used to guess content types instead of the default filename extension-based
 # mechanism. Available on UNIX and macOS (and possibly on Windows, if you're
 # running Cygwin or some other package that provides implementations of
 # UNIX-like commands). When available and enabled use_magicfile should be more
-# robust because it analyzes file contents in addition to extensions.
+# robust because it analyzes file contents in addition to extensions. If the
+# libmagic library that the 'file' command is built on can be loaded, gsutil
+# calls it directly rather than running 'file' for every file.
 #use_magicfile = False
 
 # Service account emails for testing the hmac command. If these fields are not
@@ -518,6 +602,18 @@ content_language = en
     'max_upload_compression_buffer_size':
         (DEFAULT_MAX_UPLOAD_COMPRESSION_BUFFER_SIZE),
     'gzip_compression_level': DEFAULT_GZIP_COMPRESSION_LEVEL,
+    'http_connection_pool_size': constants.DEFAULT_HTTP_CONNECTION_POOL_SIZE,
+    'http_connection_pool_idle_timeout':
+        (constants.DEFAULT_HTTP_CONNECTION_POOL_IDLE_TIMEOUT_SEC),
+    'delete_batch_size': constants.DEFAULT_DELETE_BATCH_SIZE,
+    'file_listing_threads': constants.DEFAULT_FILE_LISTING_THREADS,
+    'patch_batch_size': constants.DEFAULT_PATCH_BATCH_SIZE,
+    'rsync_reconcile_interval': constants.DEFAULT_RSYNC_RECONCILE_INTERVAL_SEC,
+    'stream_prefetch_buffer_size':
+        constants.DEFAULT_STREAM_PREFETCH_BUFFER_SIZE,
+    'stream_prefetch_threads': constants.DEFAULT_STREAM_PREFETCH_THREADS,
+    'upload_read_ahead_buffer_size':
+        constants.DEFAULT_UPLOAD_READ_AHEAD_BUFFER_SIZE,
 }
 
 CONFIG_OAUTH2_CONFIG_CONTENT = """
@@ -559,6 +655,13 @@ CONFIG_OAUTH2_CONFIG_CONTENT = """
 # The default value is 6.
 #oauth2_refresh_retries = <integer value>
 
+# 'token_refresh_margin' specifies how many seconds before an access token
+# expires gsutil starts refreshing it in the background, so that requests do
+# not have to wait for a new token in the middle of a transfer. Processes that
+# share a credential also share the refreshed token. The default is 300.
+# A value of 0 disables background refreshes.
+#token_refresh_margin = <integer value>
+
 # The following options specify the OAuth2 client identity and secret that is
 # used when requesting and using OAuth2 tokens. If not specified, a default
 # OAuth2 client for the gsutil tool is used; for uses of the boto library (with
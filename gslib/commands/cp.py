@@ -30,6 +30,7 @@ import traceback
 from apitools.base.py import encoding
 from gslib import gcs_json_api
 from gslib.command import Command
+from gslib.command import IncrementFailureCount
 from gslib.command_argument import CommandArgument
 from gslib.cs_api_map import ApiSelector
 from gslib.exception import CommandException
@@ -50,11 +51,18 @@ from gslib.utils.cloud_api_helper import GetCloudApiInstance
 from gslib.utils.constants import DEBUGLEVEL_DUMP_REQUESTS
 from gslib.utils.constants import NO_MAX
 from gslib.utils.copy_helper import CreateCopyHelperOpts
+from gslib.utils.copy_helper import GetSlicedStreamingDownloadThreshold
 from gslib.utils.copy_helper import GetSourceFieldsNeededForCopy
 from gslib.utils.copy_helper import GZIP_ALL_FILES
 from gslib.utils.copy_helper import ItemExistsError
 from gslib.utils.copy_helper import Manifest
 from gslib.utils.copy_helper import SkipUnsupportedObjectError
+from gslib.utils.job_checkpoint_util import GetJobCheckpointFilename
+from gslib.utils.job_checkpoint_util import JobCheckpoint
+from gslib.utils.job_checkpoint_util import UseJobCheckpoints
+from gslib.utils.metadata_cache_util import MetadataCache
+from gslib.utils.parallelism_framework_util import TaskArgsBatch
+from gslib.utils.parallelism_framework_util import TaskArgsBatchingIterator
 from gslib.utils.posix_util import ConvertModeToBase8
 from gslib.utils.posix_util import DeserializeFileAttributesFromObjectMetadata
 from gslib.utils.posix_util import InitializePreservePosixData
@@ -257,7 +265,10 @@ _COPY_IN_CLOUD_TEXT = """
 
     gsutil cp -A gs://bucket1/obj gs://bucket2
 
-  The top-level gsutil ``-m`` flag is  not allowed when using the ``cp -A`` flag.
+  When the top-level gsutil ``-m`` flag is used with ``cp -A``, different
+  objects are copied in parallel, but the versions of each object are still
+  copied one at a time, oldest first, so that the live version of each source
+  object is also the live version of its copy.
 """
 
 _CHECKSUM_VALIDATION_TEXT = """
@@ -307,6 +318,13 @@ _STREAMING_TRANSFERS_TEXT = """
   in memory part-way back into the file and can thus sometimes resume in the event
   of network or service problems.
 
+  Streaming downloads of objects at least as large as the
+  "sliced_object_download_threshold" boto config value (or of any object,
+  when using the top-level gsutil -m option) fetch byte ranges of the object
+  concurrently while writing it to the stream in order. At most
+  "stream_prefetch_buffer_size" bytes are buffered in memory for this, and
+  the CRC32C of the data written is validated against the object's.
+
   gsutil does not support resuming streaming uploads using the XML API or
   resuming streaming downloads for either JSON or XML. If you have a large amount
   of data to transfer in these cases, we recommend that you write the data to a
@@ -489,6 +507,23 @@ _OPTIONS_TEXT = """
                  status indicates there was at least one failure during the copy
                  operation.
 
+                 gsutil also keeps an index of the items that the log file
+                 marks as copied or skipped in its state directory, so that
+                 resuming with a large log file doesn't require reading the
+                 whole file again. The log file remains the complete record:
+                 the index is updated from it if they differ.
+
+                 If the "use_job_checkpoints" option in the [GSUtil] section
+                 of your boto config file is set, gsutil also records the
+                 items that it lists for the copy in a checkpoint in its state
+                 directory. Running the same command again with the same log
+                 file then resumes from the checkpoint, without listing the
+                 source URLs again if they were all listed before the copy was
+                 interrupted. The checkpoint is removed once the copy
+                 completes without failures. Don't use this option if the
+                 source URLs may have changed between runs, since items added
+                 after the listing completed are not copied.
+
                  NOTE: If you are synchronizing the contents of a
                  directory and a bucket, or the contents of two buckets, see
                  "gsutil help rsync".
@@ -597,6 +632,25 @@ _OPTIONS_TEXT = """
                  as binary data, using this option may result in files taking up
                  more space in the cloud than they would if left uncompressed.
 
+  --replicate-to=URL
+                 Also copies each object written to the destination URL to the
+                 given cloud URL, naming it relative to that URL the same way it
+                 is named relative to the destination URL. This option can be
+                 specified multiple times, for example to replicate uploads to
+                 buckets in several regions:
+
+                   gsutil cp -r dir gs://bucket-us --replicate-to=gs://bucket-eu
+
+                 Replicas are copied from the newly written destination object
+                 rather than from the source, so local files and streams are
+                 read only once, and replicas in the same cloud provider as the
+                 destination are copied in the cloud. The destination URL must
+                 be a cloud URL. Failures to copy replicas are reported
+                 separately and make the command fail, but don't mark the
+                 object as failed in the manifest of the -L option. The mv
+                 command doesn't remove sources that weren't copied to all
+                 replica URLs.
+
   --stet         If the STET binary can be found in boto or PATH, cp will
                  use the split-trust encryption tool for end-to-end encryption.
 """
@@ -671,9 +725,39 @@ def ShimTranslatePredefinedAclSubOptForCopy(sub_opts):
 
 
 def _CopyFuncWrapper(cls, args, thread_state=None):
-  cls.CopyFunc(args,
-               thread_state=thread_state,
-               preserve_posix=cls.preserve_posix_attrs)
+  if isinstance(args, TaskArgsBatch):
+    cls.CopyVersionsFunc(args, thread_state=thread_state)
+  else:
+    cls.CopyFunc(args,
+                 thread_state=thread_state,
+                 preserve_posix=cls.preserve_posix_attrs)
+
+
+def _GetSourceObjectKey(copy_object_info):
+  """Returns the key grouping the versions of a cloud source object.
+
+  Args:
+    copy_object_info: CopyObjectInfo for a single copy.
+
+  Returns:
+    The version-less URL string of the source object, or None for file
+    sources, which are never versioned.
+  """
+  exp_src_url = copy_object_info.expanded_storage_url
+  if not exp_src_url.IsCloudUrl():
+    return None
+  return exp_src_url.versionless_url_string
+
+
+def _GetCopyObjectInfoKey(copy_object_info):
+  """Returns the key of a copy in the manifest and job checkpoint."""
+  return copy_object_info.expanded_storage_url.url_string
+
+
+def _GetGenerationOrder(copy_object_info):
+  """Returns a sort key ordering the versions of a GCS object oldest first."""
+  generation = copy_object_info.expanded_storage_url.generation
+  return int(generation) if generation else 0
 
 
 def _CopyExceptionHandler(cls, e):
@@ -725,7 +809,7 @@ class CpCommand(Command):
       gs_default_api=ApiSelector.JSON,
       # Unfortunately, "private" args are the only way to support non-single
       # character flags.
-      supported_private_args=['stet', 'testcallbackfile='],
+      supported_private_args=['replicate-to=', 'stet', 'testcallbackfile='],
       argparse_arguments=[
           CommandArgument.MakeZeroOrMoreCloudOrFileURLsArgument(),
       ],
@@ -752,6 +836,31 @@ class CpCommand(Command):
     )
     return super().get_gcloud_storage_args(gcloud_storage_map)
 
+  def CopyVersionsFunc(self, copy_object_infos, thread_state=None):
+    """Copies the versions of a source object in ascending generation order.
+
+    A failed copy doesn't prevent the later versions from being copied.
+
+    Args:
+      copy_object_infos: TaskArgsBatch of CopyObjectInfos for the versions of
+          a single source object.
+      thread_state: gsutil Cloud API instance to use for the operations.
+    """
+    copy_object_infos = list(copy_object_infos)
+    if copy_object_infos[0].expanded_storage_url.scheme == 'gs':
+      # Other providers' version IDs aren't ordered, so their versions are
+      # copied in listing order, as when copying sequentially.
+      copy_object_infos.sort(key=_GetGenerationOrder)
+    for copy_object_info in copy_object_infos:
+      try:
+        self.CopyFunc(copy_object_info,
+                      thread_state=thread_state,
+                      preserve_posix=self.preserve_posix_attrs)
+      except Exception as e:  # pylint: disable=broad-except
+        # Account for the failure as if the copy had been its own task.
+        IncrementFailureCount()
+        _CopyExceptionHandler(self, e)
+
   # pylint: disable=too-many-statements
   def CopyFunc(self, copy_object_info, thread_state=None, preserve_posix=False):
     """Worker function for performing the actual copy (and rm, for mv)."""
@@ -796,6 +905,8 @@ class CpCommand(Command):
 
     if copy_helper_opts.use_manifest and self.manifest.WasSuccessful(
         exp_src_url.url_string):
+      if self.manifest.job_checkpoint:
+        self.manifest.job_checkpoint.MarkDone([exp_src_url.url_string])
       return
 
     if copy_helper_opts.perform_mv and copy_object_info.names_container:
@@ -970,7 +1081,25 @@ class CpCommand(Command):
           self.manifest.SetResult(exp_src_url.url_string, 0, 'error', str(e))
         raise
     else:
-      if copy_helper_opts.perform_mv:
+      # Replicas are reported on their own, since the object itself was
+      # copied successfully.
+      replicated = True
+      for replica_url in self.replica_urls:
+        replica_dst_url = copy_helper.ConstructReplicaDstUrl(
+            copy_object_info.exp_dst_url, dst_url, replica_url)
+        try:
+          bytes_transferred += self._ReplicateObject(result_url,
+                                                     replica_dst_url,
+                                                     gsutil_api)
+        except Exception as e:  # pylint: disable=broad-except
+          replicated = False
+          self.op_failure_count += 1
+          self.logger.error('Error replicating %s to %s: %s', dst_url,
+                            replica_dst_url, RemoveCRLFFromString(str(e)))
+      if copy_helper_opts.perform_mv and not replicated:
+        self.logger.warn('Not removing %s because it was not copied to all '
+                         'replica URLs.', exp_src_url)
+      elif copy_helper_opts.perform_mv:
         self.logger.info('Removing %s...', exp_src_url)
         if exp_src_url.IsCloudUrl():
           gsutil_api.DeleteObject(exp_src_url.bucket_name,
@@ -985,9 +1114,50 @@ class CpCommand(Command):
       # transferred from StatusMessages posted by operations within PerformCopy.
       self.total_bytes_transferred += bytes_transferred
 
-  def _ConstructNameExpansionIteratorDstTupleIterator(self, src_url_strs_iter,
-                                                      dst_url_strs):
+  def _ReplicateObject(self, src_url, replica_dst_url, gsutil_api):
+    """Copies a newly written destination object to a replica URL.
+
+    Args:
+      src_url: Version-specific StorageUrl of the written destination object.
+      replica_dst_url: StorageUrl to copy the object to.
+      gsutil_api: gsutil Cloud API instance to use for the copy.
+
+    Returns:
+      Number of bytes transferred.
+    """
     copy_helper_opts = copy_helper.GetCopyHelperOpts()
+    src_obj_metadata = gsutil_api.GetObjectMetadata(
+        src_url.bucket_name,
+        src_url.object_name,
+        generation=src_url.generation,
+        provider=src_url.scheme,
+        fields=GetSourceFieldsNeededForCopy(True,
+                                            self.skip_unsupported_objects,
+                                            copy_helper_opts.preserve_acl))
+    try:
+      _, bytes_transferred, result_url, _ = copy_helper.PerformCopy(
+          self.logger,
+          src_url,
+          replica_dst_url,
+          gsutil_api,
+          self,
+          _CopyExceptionHandler,
+          src_obj_metadata=src_obj_metadata,
+          allow_splitting=True,
+          headers=self.headers)
+    except ItemExistsError:
+      self.logger.info('Skipping existing item: %s', replica_dst_url)
+      return 0
+    if copy_helper_opts.print_ver:
+      self.logger.info('Created: %s', result_url)
+    return bytes_transferred
+
+  def _ConstructNameExpansionIteratorDstTupleIterator(self,
+                                                      src_url_strs_iter,
+                                                      dst_url_strs,
+                                                      gsutil_api=None):
+    copy_helper_opts = copy_helper.GetCopyHelperOpts()
+    gsutil_api = gsutil_api or self.gsutil_api
     for src_url_str, dst_url_str in zip(src_url_strs_iter, dst_url_strs):
       # Getting the destination information for each (sources, destination)
       # tuple. This assumes that the same destination is never provided in
@@ -1015,7 +1185,7 @@ class CpCommand(Command):
       # directories to the destination directory.
       exp_dst_url, have_existing_dst_container = (
           copy_helper.ExpandUrlToSingleBlr(dst_url_str,
-                                           self.gsutil_api,
+                                           gsutil_api,
                                            self.project_id,
                                            logger=self.logger))
       name_expansion_iterator_dst_tuple = NameExpansionIteratorDestinationTuple(
@@ -1023,7 +1193,7 @@ class CpCommand(Command):
               self.command_name,
               self.debug,
               self.logger,
-              self.gsutil_api,
+              gsutil_api,
               src_url_str,
               self.recursion_requested or copy_helper_opts.perform_mv,
               project_id=self.project_id,
@@ -1053,16 +1223,25 @@ class CpCommand(Command):
     copy_helper_opts = self._ParseOpts()
 
     self.total_bytes_transferred = 0
+    # Copy tasks repeatedly look up the same bucket metadata (e.g. when
+    # restarting resumable uploads), so share it among them.
+    self.metadata_cache = MetadataCache()
 
     dst_url = StorageUrlFromString(self.args[-1])
+    if self.replica_urls and not dst_url.IsCloudUrl():
+      raise CommandException(
+          'The --replicate-to option requires a cloud destination URL.')
     if dst_url.IsFileUrl() and (dst_url.object_name == '-' or dst_url.IsFifo()):
       if self.preserve_posix_attrs:
         raise CommandException('Cannot preserve POSIX attributes with a '
                                'stream or a named pipe.')
       cat_out_fd = (GetStreamFromFileUrl(dst_url, mode='wb')
                     if dst_url.IsFifo() else None)
-      return cat_helper.CatHelper(self).CatUrlStrings(self.args[:-1],
-                                                      cat_out_fd=cat_out_fd)
+      return cat_helper.CatHelper(self).CatUrlStrings(
+          self.args[:-1],
+          cat_out_fd=cat_out_fd,
+          prefetch_threshold=GetSlicedStreamingDownloadThreshold(),
+          validate_hashes=True)
 
     if copy_helper_opts.read_args_from_stdin:
       if len(self.args) != 1:
@@ -1081,13 +1260,33 @@ class CpCommand(Command):
     self.has_file_dst = False
     self.has_cloud_dst = False
     self.provider_types = set()
-    # Because cp may have multiple source URLs and multiple destinations, we
-    # wrap the name expansion iterator in order to collect analytics.
-    name_expansion_iterator = CopyObjectsIterator(
-        self._ConstructNameExpansionIteratorDstTupleIterator(
-            src_url_strs, dst_url_strs),
-        copy_helper_opts.daisy_chain,
-    )
+    job_checkpoint = self._GetJobCheckpoint(copy_helper_opts)
+    if job_checkpoint:
+      # The sources are listed by the checkpoint's own thread, which needs a
+      # separate API instance for thread-safety.
+      name_expansion_iterator = job_checkpoint.IterTasks(
+          lambda: CopyObjectsIterator(
+              self._ConstructNameExpansionIteratorDstTupleIterator(
+                  src_url_strs,
+                  dst_url_strs,
+                  gsutil_api=self.GetSeekAheadGsutilApi()),
+              copy_helper_opts.daisy_chain))
+      self.manifest.job_checkpoint = job_checkpoint
+    else:
+      # Because cp may have multiple source URLs and multiple destinations, we
+      # wrap the name expansion iterator in order to collect analytics.
+      name_expansion_iterator = CopyObjectsIterator(
+          self._ConstructNameExpansionIteratorDstTupleIterator(
+              src_url_strs, dst_url_strs),
+          copy_helper_opts.daisy_chain,
+      )
+    if self.all_versions and self.parallel_operations:
+      # Listings return the versions of an object consecutively, oldest first.
+      # Copy them in order within a single task, so that the source's live
+      # version is written last, while different objects are copied in
+      # parallel.
+      name_expansion_iterator = TaskArgsBatchingIterator(
+          name_expansion_iterator, None, _GetSourceObjectKey)
 
     process_count, thread_count = self._GetProcessAndThreadCount(
         process_count=None,
@@ -1137,6 +1336,8 @@ class CpCommand(Command):
                seek_ahead_iterator=seek_ahead_iterator)
     self.logger.debug('total_bytes_transferred: %d',
                       self.total_bytes_transferred)
+    if job_checkpoint and not self.op_failure_count:
+      job_checkpoint.Delete()
 
     end_time = time.time()
     self.total_elapsed_time = end_time - start_time
@@ -1169,6 +1370,33 @@ class CpCommand(Command):
 
     return 0
 
+  def _GetJobCheckpoint(self, copy_helper_opts):
+    """Returns the JobCheckpoint for this command, if checkpoints are enabled.
+
+    Args:
+      copy_helper_opts: CopyHelperOpts for this command.
+
+    Returns:
+      An open JobCheckpoint, or None if the job isn't checkpointed.
+    """
+    # Stdin args can't be replayed, and the checkpoint marks tasks done as
+    # their manifest rows are written.
+    if (not copy_helper_opts.use_manifest or
+        copy_helper_opts.read_args_from_stdin or not UseJobCheckpoints()):
+      return None
+    # A restarted job must have the same options and relative source URLs.
+    checkpoint_path = GetJobCheckpointFilename([
+        self.command_name, self.sub_opts, self.args,
+        os.getcwd(),
+        os.path.realpath(self.manifest.manifest_path)
+    ])
+    job_checkpoint = JobCheckpoint(checkpoint_path,
+                                   self.manifest.manifest_path,
+                                   _GetCopyObjectInfoKey)
+    if not job_checkpoint.Open():
+      return None
+    return job_checkpoint
+
   def _ParseOpts(self):
     # TODO: Arrange variables initialized here in alphabetical order.
     perform_mv = False
@@ -1208,6 +1436,7 @@ class CpCommand(Command):
     test_callback_file = None
     dest_storage_class = None
     self.use_stet = False
+    self.replica_urls = []
 
     # self.recursion_requested initialized in command.py (so can be checked
     # in parent class for all commands).
@@ -1267,6 +1496,14 @@ class CpCommand(Command):
         elif o == '-Z':
           gzip_local = True
           gzip_arg_all = GZIP_ALL_FILES
+        elif o == '--replicate-to':
+          replica_url = StorageUrlFromString(a)
+          if (not replica_url.IsCloudUrl() or replica_url.IsProvider() or
+              replica_url.HasGeneration() or ContainsWildcard(a)):
+            raise CommandException(
+                'The --replicate-to option requires a bucket, bucket '
+                'subdirectory or object URL (got %s).' % a)
+          self.replica_urls.append(replica_url)
         elif o == '--stet':
           self.use_stet = True
 
@@ -1274,11 +1511,6 @@ class CpCommand(Command):
       raise CommandException(
           'Specifying both the -p and -a options together is invalid.')
 
-    if self.all_versions and self.parallel_operations:
-      raise CommandException(
-          'The gsutil -m option is not supported with the cp -A flag, to '
-          'ensure that object version ordering is preserved. Please re-run '
-          'the command without the -m option.')
     if gzip_encoded and gzip_local:
       raise CommandException(
           'Specifying both the -j/-J and -z/-Z options together is invalid.')
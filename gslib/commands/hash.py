@@ -23,7 +23,6 @@ import logging
 import os
 import time
 
-import crcmod
 import six
 
 from gslib.command import Command
@@ -37,6 +36,8 @@ from gslib.thread_message import FileMessage
 from gslib.thread_message import FinalMessage
 from gslib.utils import boto_util
 from gslib.utils import constants
+from gslib.utils.file_hash_cache_util import CalculateFileHashes
+from gslib.utils.file_hash_cache_util import GetCachedFileHashes
 from gslib.utils import hashing_helper
 from gslib.utils import parallelism_framework_util
 from gslib.utils.shim_util import GcloudStorageFlag
@@ -146,16 +147,13 @@ class HashCommand(Command):
       Tuple of
       calc_crc32c: Boolean, if True, command should calculate a CRC32c checksum.
       calc_md5: Boolean, if True, command should calculate an MD5 hash.
-      format_func: Function used for formatting the hash in the desired format.
-      cloud_format_func: Function used for formatting the hash in the desired
-                         format.
+      format_func: Function used for formatting a base64 encoded hash in the
+                   desired format.
       output_format: String describing the hash output format.
     """
     calc_crc32c = False
     calc_md5 = False
-    format_func = (
-        lambda digest: hashing_helper.Base64EncodeHash(digest.hexdigest()))
-    cloud_format_func = lambda digest: digest
+    format_func = lambda digest: digest
     found_hash_option = False
     output_format = 'base64'
 
@@ -166,8 +164,7 @@ class HashCommand(Command):
           found_hash_option = True
         elif o == '-h':
           output_format = 'hex'
-          format_func = lambda digest: digest.hexdigest()
-          cloud_format_func = lambda digest: (
+          format_func = lambda digest: (
               hashing_helper.Base64ToHexHash(digest).decode('ascii')
           )  # yapf: disable
         elif o == '-m':
@@ -181,29 +178,20 @@ class HashCommand(Command):
     if calc_crc32c and not boto_util.UsingCrcmodExtension():
       logger.warn(hashing_helper.SLOW_CRCMOD_WARNING)
 
-    return calc_crc32c, calc_md5, format_func, cloud_format_func, output_format
+    return calc_crc32c, calc_md5, format_func, output_format
 
-  def _GetHashClassesFromArgs(self, calc_crc32c, calc_md5):
-    """Constructs the dictionary of hashes to compute based on the arguments.
-
-    Args:
-      calc_crc32c: If True, CRC32c should be included.
-      calc_md5: If True, MD5 should be included.
-
-    Returns:
-      Dictionary of {string: hash digester}, where string the name of the
-          digester algorithm.
-    """
-    hash_dict = {}
+  def _GetHashAlgsFromArgs(self, calc_crc32c, calc_md5):
+    """Returns the names of the hash algorithms selected by the arguments."""
+    algs = []
     if calc_crc32c:
-      hash_dict['crc32c'] = crcmod.predefined.Crc('crc-32c')
+      algs.append('crc32c')
     if calc_md5:
-      hash_dict['md5'] = hashing_helper.GetMd5()
-    return hash_dict
+      algs.append('md5')
+    return algs
 
   def RunCommand(self):
     """Command entry point for the hash command."""
-    (calc_crc32c, calc_md5, format_func, cloud_format_func,
+    (calc_crc32c, calc_md5, format_func,
      output_format) = (self._ParseOpts(self.sub_opts, self.logger))
 
     matched_one = False
@@ -219,30 +207,32 @@ class HashCommand(Command):
         url = StorageUrlFromString(url_str)
         file_name = file_ref.storage_url.object_name
         if StorageUrlFromString(url_str).IsFileUrl():
-          file_size = os.path.getsize(file_name)
-          self.gsutil_api.status_queue.put(
-              FileMessage(url,
-                          None,
-                          time.time(),
-                          size=file_size,
-                          finished=False,
-                          message_type=FileMessage.FILE_HASH))
-          callback_processor = ProgressCallbackWithTimeout(
-              file_size,
-              FileProgressCallbackHandler(self.gsutil_api.status_queue,
-                                          src_url=StorageUrlFromString(url_str),
-                                          operation_name='Hashing').call)
-          hash_dict = self._GetHashClassesFromArgs(calc_crc32c, calc_md5)
-          with open(file_name, 'rb') as fp:
-            hashing_helper.CalculateHashesFromContents(
-                fp, hash_dict, callback_processor=callback_processor)
-          self.gsutil_api.status_queue.put(
-              FileMessage(url,
-                          None,
-                          time.time(),
-                          size=file_size,
-                          finished=True,
-                          message_type=FileMessage.FILE_HASH))
+          algs = self._GetHashAlgsFromArgs(calc_crc32c, calc_md5)
+          hash_dict = GetCachedFileHashes(file_name, algs)
+          if hash_dict is None:
+            file_size = os.path.getsize(file_name)
+            self.gsutil_api.status_queue.put(
+                FileMessage(url,
+                            None,
+                            time.time(),
+                            size=file_size,
+                            finished=False,
+                            message_type=FileMessage.FILE_HASH))
+            callback_processor = ProgressCallbackWithTimeout(
+                file_size,
+                FileProgressCallbackHandler(
+                    self.gsutil_api.status_queue,
+                    src_url=StorageUrlFromString(url_str),
+                    operation_name='Hashing').call)
+            hash_dict = CalculateFileHashes(
+                file_name, algs, callback_processor=callback_processor)
+            self.gsutil_api.status_queue.put(
+                FileMessage(url,
+                            None,
+                            time.time(),
+                            size=file_size,
+                            finished=True,
+                            message_type=FileMessage.FILE_HASH))
         else:
           hash_dict = {}
           obj_metadata = file_ref.root_object
@@ -258,9 +248,11 @@ class HashCommand(Command):
             hash_dict['crc32c'] = obj_metadata.crc32c
         print('Hashes [%s] for %s:' % (output_format, file_name))
         for name, digest in six.iteritems(hash_dict):
-          print('\tHash (%s):\t\t%s' % (name,
-                                        (format_func(digest) if url.IsFileUrl()
-                                         else cloud_format_func(digest))))
+          formatted_digest = format_func(digest)
+          if url.IsFileUrl() and name == 'crc32c' and output_format == 'hex':
+            # Match crcmod's formatting of local CRC32C digests.
+            formatted_digest = formatted_digest.upper()
+          print('\tHash (%s):\t\t%s' % (name, formatted_digest))
 
     if not matched_one:
       raise CommandException('No files matched')
@@ -23,19 +23,23 @@ from gslib import metrics
 from gslib.cloud_api import AccessDeniedException
 from gslib.cloud_api import Preconditions
 from gslib.command import Command
+from gslib.command import IncrementFailureCount
 from gslib.command_argument import CommandArgument
 from gslib.cs_api_map import ApiSelector
 from gslib.exception import CommandException
 from gslib.exception import NO_URLS_MATCHED_TARGET
 from gslib.help_provider import CreateHelpText
+from gslib.name_expansion import BatchNameExpansionIterator
 from gslib.name_expansion import NameExpansionIterator
 from gslib.name_expansion import SeekAheadNameExpansionIterator
 from gslib.storage_url import StorageUrlFromString
 from gslib.third_party.storage_apitools import storage_v1_messages as apitools_messages
 from gslib.thread_message import MetadataMessage
+from gslib.utils.boto_util import GetPatchBatchSize
 from gslib.utils.cloud_api_helper import GetCloudApiInstance
 from gslib.utils.constants import NO_MAX
 from gslib.utils.parallelism_framework_util import PutToQueueWithTimeout
+from gslib.utils.parallelism_framework_util import TaskArgsBatch
 from gslib.utils.retention_util import ConfirmLockRequest
 from gslib.utils.retention_util import ReleaseEventHoldFuncWrapper
 from gslib.utils.retention_util import ReleaseTempHoldFuncWrapper
@@ -513,14 +517,56 @@ class RetentionCommand(Command):
       patch_obj_metadata: Metadata changes that should be applied to the
                           existing object.
       log_template: The log template that should be printed for each object.
-      name_expansion_result: NameExpansionResult describing target object.
+      name_expansion_result: NameExpansionResult describing target object, or
+                             TaskArgsBatch of NameExpansionResults to update
+                             with a single batch request.
       thread_state: gsutil Cloud API instance to use for the operation.
     """
     gsutil_api = GetCloudApiInstance(self, thread_state=thread_state)
 
+    if isinstance(name_expansion_result, TaskArgsBatch):
+      self._ObjectsUpdateMetadata(patch_obj_metadata, log_template,
+                                  name_expansion_result, gsutil_api)
+      return
+
     exp_src_url = name_expansion_result.expanded_storage_url
     self.logger.info(log_template, exp_src_url)
 
+    gsutil_api.PatchObjectMetadata(
+        exp_src_url.bucket_name,
+        exp_src_url.object_name,
+        patch_obj_metadata,
+        generation=exp_src_url.generation,
+        preconditions=self._GetObjectPreconditions(name_expansion_result),
+        provider=exp_src_url.scheme,
+        fields=['id'])
+    PutToQueueWithTimeout(gsutil_api.status_queue,
+                          MetadataMessage(message_time=time.time()))
+
+  def _ObjectsUpdateMetadata(self, patch_obj_metadata, log_template,
+                             name_expansion_results, gsutil_api):
+    """Updates metadata on a batch of objects, handling each failure."""
+    objects_to_patch = []
+    for name_expansion_result in name_expansion_results:
+      exp_src_url = name_expansion_result.expanded_storage_url
+      self.logger.info(log_template, exp_src_url)
+      objects_to_patch.append(
+          (exp_src_url.bucket_name, exp_src_url.object_name,
+           patch_obj_metadata, exp_src_url.generation,
+           self._GetObjectPreconditions(name_expansion_result)))
+    # All objects in a batch share a provider.
+    results = gsutil_api.PatchObjectsMetadata(objects_to_patch,
+                                              provider=exp_src_url.scheme)
+    for e in results:
+      if e is not None:
+        # Account for the failure as if the update had been its own task.
+        IncrementFailureCount()
+        UpdateObjectMetadataExceptionHandler(self, e)
+      PutToQueueWithTimeout(gsutil_api.status_queue,
+                            MetadataMessage(message_time=time.time()))
+
+  def _GetObjectPreconditions(self, name_expansion_result):
+    """Returns preconditions matching the object's listed metadata."""
     cloud_obj_metadata = encoding.JsonToMessage(
         apitools_messages.Object, name_expansion_result.expanded_result)
 
@@ -531,16 +577,7 @@ class RetentionCommand(Command):
       preconditions.gen_match = cloud_obj_metadata.generation
     if preconditions.meta_gen_match is None:
       preconditions.meta_gen_match = cloud_obj_metadata.metageneration
-
-    gsutil_api.PatchObjectMetadata(exp_src_url.bucket_name,
-                                   exp_src_url.object_name,
-                                   patch_obj_metadata,
-                                   generation=exp_src_url.generation,
-                                   preconditions=preconditions,
-                                   provider=exp_src_url.scheme,
-                                   fields=['id'])
-    PutToQueueWithTimeout(gsutil_api.status_queue,
-                          MetadataMessage(message_time=time.time()))
+    return preconditions
 
   def _GetObjectNameExpansionIterator(self, url_args):
     return NameExpansionIterator(
@@ -726,6 +763,11 @@ class RetentionCommand(Command):
             url_args[0]))
 
     name_expansion_iterator = self._GetObjectNameExpansionIterator(url_args)
+    if self.parallel_operations and GetPatchBatchSize() > 1:
+      # Without -m the command must stop at the first failed update, so
+      # objects are updated one at a time.
+      name_expansion_iterator = BatchNameExpansionIterator(
+          name_expansion_iterator, GetPatchBatchSize())
     seek_ahead_iterator = self._GetSeekAheadNameExpansionIterator(url_args)
 
     # Used to track if any objects' metadata failed to be set.
@@ -27,18 +27,22 @@ from gslib.cloud_api import NotFoundException
 from gslib.cloud_api import ServiceException
 from gslib.command import Command
 from gslib.command import DecrementFailureCount
+from gslib.command import IncrementFailureCount
 from gslib.command_argument import CommandArgument
 from gslib.cs_api_map import ApiSelector
 from gslib.exception import CommandException
 from gslib.exception import NO_URLS_MATCHED_PREFIX
 from gslib.exception import NO_URLS_MATCHED_TARGET
+from gslib.name_expansion import BatchNameExpansionIterator
 from gslib.name_expansion import NameExpansionIterator
 from gslib.name_expansion import SeekAheadNameExpansionIterator
 from gslib.storage_url import StorageUrlFromString
 from gslib.thread_message import MetadataMessage
 from gslib.utils import constants
 from gslib.utils import parallelism_framework_util
+from gslib.utils.boto_util import GetDeleteBatchSize
 from gslib.utils.cloud_api_helper import GetCloudApiInstance
+from gslib.utils.parallelism_framework_util import TaskArgsBatch
 from gslib.utils.retry_util import Retry
 from gslib.utils.shim_util import GcloudStorageFlag
 from gslib.utils.shim_util import GcloudStorageMap
@@ -171,7 +175,10 @@ def _RemoveFoldersExceptionHandler(cls, e):
 
 
 def _RemoveFuncWrapper(cls, name_expansion_result, thread_state=None):
-  cls.RemoveFunc(name_expansion_result, thread_state=thread_state)
+  if isinstance(name_expansion_result, TaskArgsBatch):
+    cls.RemoveBatchFunc(name_expansion_result, thread_state=thread_state)
+  else:
+    cls.RemoveFunc(name_expansion_result, thread_state=thread_state)
 
 
 def _ExceptionMatchesBucketToDelete(bucket_strings_to_delete, e):
@@ -298,6 +305,12 @@ class RmCommand(Command):
           all_versions=self.all_versions,
           continue_on_error=self.continue_on_error or self.parallel_operations)
 
+      if self.continue_on_error and GetDeleteBatchSize() > 1:
+        # Delete objects in batches. Without -f (or -m) the command must stop
+        # at the first failed delete, so objects are deleted one at a time.
+        name_expansion_iterator = BatchNameExpansionIterator(
+            name_expansion_iterator, GetDeleteBatchSize())
+
       seek_ahead_iterator = None
       # Cannot seek ahead with stdin args, since we can only iterate them
       # once without buffering in memory.
@@ -414,3 +427,35 @@ class RmCommand(Command):
       DecrementFailureCount()
     _PutToQueueWithTimeout(gsutil_api.status_queue,
                            MetadataMessage(message_time=time.time()))
+
+  def RemoveBatchFunc(self, name_expansion_results, thread_state=None):
+    """Deletes a batch of objects, handling failures of each delete.
+
+    Args:
+      name_expansion_results: TaskArgsBatch of NameExpansionResults to delete.
+      thread_state: gsutil Cloud API instance to use for the operation.
+    """
+    gsutil_api = GetCloudApiInstance(self, thread_state=thread_state)
+
+    exp_src_urls = [
+        name_expansion_result.expanded_storage_url
+        for name_expansion_result in name_expansion_results
+    ]
+    for exp_src_url in exp_src_urls:
+      self.logger.info('Removing %s...', exp_src_url)
+    results = gsutil_api.DeleteObjects(
+        [(exp_src_url.bucket_name, exp_src_url.object_name,
+          exp_src_url.generation) for exp_src_url in exp_src_urls],
+        preconditions=self.preconditions,
+        provider=exp_src_urls[0].scheme)
+    for exp_src_url, e in zip(exp_src_urls, results):
+      if isinstance(e, NotFoundException):
+        # See RemoveFunc.
+        self.logger.info('Cannot find %s', exp_src_url)
+        DecrementFailureCount()
+      elif e is not None:
+        # Account for the failure as if the delete had been its own task.
+        IncrementFailureCount()
+        _RemoveExceptionHandler(self, e)
+      _PutToQueueWithTimeout(gsutil_api.status_queue,
+                             MetadataMessage(message_time=time.time()))
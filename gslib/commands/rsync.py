@@ -21,6 +21,7 @@ from __future__ import unicode_literals
 
 import collections
 import errno
+import hashlib
 import heapq
 import io
 from itertools import islice
@@ -42,12 +43,15 @@ from gslib.cloud_api import NotFoundException
 from gslib.cloud_api import ServiceException
 from gslib.command import Command
 from gslib.command import DummyArgChecker
+from gslib.command import IncrementFailureCount
 from gslib.commands.cp import ShimTranslatePredefinedAclSubOptForCopy
 from gslib.command_argument import CommandArgument
 from gslib.cs_api_map import ApiSelector
 from gslib.exception import CommandException
 from gslib.metrics import LogPerformanceSummaryParams
 from gslib.plurality_checkable_iterator import PluralityCheckableIterator
+from gslib.project_id import PopulateProjectId
+from gslib.pubsub_api import PubsubApi
 from gslib.seek_ahead_thread import SeekAheadResult
 from gslib.sig_handling import GetCaughtSignals
 from gslib.sig_handling import RegisterSignalHandler
@@ -58,19 +62,25 @@ from gslib.third_party.storage_apitools import storage_v1_messages as apitools_m
 from gslib.utils import constants
 from gslib.utils import copy_helper
 from gslib.utils import parallelism_framework_util
+from gslib.utils.boto_util import GetDeleteBatchSize
+from gslib.utils.boto_util import GetPatchBatchSize
+from gslib.utils.boto_util import GetRsyncReconcileInterval
+from gslib.utils.boto_util import GetRsyncReconcileStateDir
 from gslib.utils.boto_util import UsingCrcmodExtension
 from gslib.utils.cloud_api_helper import GetCloudApiInstance
 from gslib.utils.copy_helper import CreateCopyHelperOpts
 from gslib.utils.copy_helper import GetSourceFieldsNeededForCopy
 from gslib.utils.copy_helper import GZIP_ALL_FILES
 from gslib.utils.copy_helper import SkipUnsupportedObjectError
-from gslib.utils.hashing_helper import CalculateB64EncodedCrc32cFromContents
-from gslib.utils.hashing_helper import CalculateB64EncodedMd5FromContents
+from gslib.utils.file_hash_cache_util import CalculateFileHashes
+from gslib.utils.file_hash_cache_util import GetCachedFileHashes
 from gslib.utils.hashing_helper import SLOW_CRCMOD_RSYNC_WARNING
 from gslib.utils.hashing_helper import SLOW_CRCMOD_WARNING
 from gslib.utils.metadata_util import CreateCustomMetadata
 from gslib.utils.metadata_util import GetValueFromObjectCustomMetadata
 from gslib.utils.metadata_util import ObjectIsGzipEncoded
+from gslib.utils.parallelism_framework_util import TaskArgsBatch
+from gslib.utils.parallelism_framework_util import TaskArgsBatchingIterator
 from gslib.utils.posix_util import ATIME_ATTR
 from gslib.utils.posix_util import ConvertDatetimeToPOSIX
 from gslib.utils.posix_util import ConvertModeToBase8
@@ -294,6 +304,40 @@ _DETAILED_HELP_TEXT = ("""
   <https://cloud.google.com/storage/docs/retry-strategy#tools>`_.
 
 
+<B>SYNCHRONIZING CHANGES ANNOUNCED BY PUB/SUB NOTIFICATIONS</B>
+  Listing a large source bucket every time it is synchronized can be slow and
+  costly when only a few objects change between runs. If the source bucket
+  publishes change notifications to a Cloud Pub/Sub topic (see "gsutil help
+  notification"), you can instead pass a subscription to that topic with the
+  --subscription option, for example:
+
+    gsutil notification create -f json -t bucket-changes gs://src-bucket
+    gcloud pubsub subscriptions create bucket-changes-sync \\
+      --topic=bucket-changes
+    gsutil -m rsync -r -d --subscription=bucket-changes-sync \\
+      gs://src-bucket gs://dst-bucket
+
+  rsync then pulls the pending notifications, and copies or removes only the
+  objects they name, without listing the source or destination. However many
+  notifications name an object, its current state is synchronized once, and it
+  is compared with its destination as in a full synchronization, so objects
+  that already match aren't copied again. The notifications are acknowledged
+  once their changes have been applied, so notifications whose changes failed
+  are delivered again to the next run.
+
+  Because notifications can be lost (for example if they aren't acknowledged
+  before the subscription's message retention runs out), rsync falls back to
+  a full synchronization, listing the source and destination as usual, when
+  none has been performed for the same subscription, source and destination
+  in the last "rsync_reconcile_interval" seconds (one day by default; see
+  "gsutil help config"). The first run with a subscription always performs a
+  full synchronization.
+
+  The source URL must be a cloud URL, and the -i and -u options can't be
+  combined with --subscription. You can test this mode against the Cloud
+  Pub/Sub emulator by setting the PUBSUB_EMULATOR_HOST environment variable.
+
+
 <B>CHANGE DETECTION ALGORITHM</B>
   To determine if a file or object has changed, gsutil rsync first checks
   whether the file modification time (mtime) of both the source and destination
@@ -509,6 +553,14 @@ _DETAILED_HELP_TEXT = ("""
                  the ``|`` character. When using Windows PowerShell, use ``'``
                  instead of ``"`` and surround the ``|`` character with ``"``.
 
+  --subscription=subscription
+                 Synchronizes only the objects named in notifications pulled
+                 from the given Cloud Pub/Sub subscription, which may be a
+                 subscription name in the default project or a full name like
+                 projects/my-project/subscriptions/my-subscription. See the
+                 "SYNCHRONIZING CHANGES ANNOUNCED BY PUB/SUB NOTIFICATIONS"
+                 section above.
+
   -y pattern     Similar to the -x option, but the command will first skip
                  directories/prefixes using the provided pattern and then
                  exclude files/objects using the same pattern. This is usually
@@ -527,9 +579,33 @@ _DETAILED_HELP_TEXT = ("""
 # pylint: enable=anomalous-backslash-in-string
 
 _NA = '-'
+# Names of checksum algorithms for log messages.
+_CHECKSUM_ALG_NAMES = {'crc32c': 'CRC32C', 'md5': 'MD5'}
 _OUTPUT_BUFFER_SIZE = 64 * 1024
 _PROGRESS_REPORT_LISTING_COUNT = 10000
 
+# Maximum number of notifications pulled (and applied) at a time with
+# --subscription. Pulled notifications are redelivered if they aren't
+# acknowledged before their deadline, so they're pulled in small batches.
+_NOTIFICATION_PULL_SIZE = 100
+# Acknowledgement deadline of pulled notifications while their changes are
+# applied, in seconds. This is the maximum that Cloud Pub/Sub allows.
+_NOTIFICATION_ACK_DEADLINE = 600
+# Fields of objects named in notifications that are needed to compare them
+# with their destinations, as in _FieldedListingIterator.
+_NOTIFIED_OBJECT_FIELDS = [
+    'crc32c', 'md5Hash', 'metadata', 'name', 'size', 'timeCreated'
+]
+# Notification event types announcing a change of an object's live version.
+# Versioned buckets announce deletions as OBJECT_ARCHIVE rather than
+# OBJECT_DELETE events.
+_NOTIFICATION_EVENT_TYPES = frozenset(
+    ['OBJECT_FINALIZE', 'OBJECT_DELETE', 'OBJECT_ARCHIVE', 'METADATA_UPDATE'])
+
+# Source object named in a notification, and the destination it is synced to.
+_NotifiedObject = collections.namedtuple('_NotifiedObject',
+                                         ['src_url_str', 'dst_url_str'])
+
 # Tracks files we need to clean up at end or if interrupted. Because some
 # files are passed to rsync's diff iterators, it is difficult to manage when
 # they should be closed, especially in the event that we receive a signal to
@@ -575,6 +651,13 @@ def CleanUpTempFiles():
 
 def _DiffToApplyArgChecker(command_instance, diff_to_apply):
   """Arg checker that skips symlinks if -e flag specified."""
+  if isinstance(diff_to_apply, TaskArgsBatch):
+    # Drop skipped actions from the batch, so that they aren't counted.
+    diff_to_apply.args_list = [
+        batched_diff_to_apply for batched_diff_to_apply in diff_to_apply
+        if _DiffToApplyArgChecker(command_instance, batched_diff_to_apply)
+    ]
+    return bool(diff_to_apply.args_list)
   if (diff_to_apply.diff_action == DiffAction.REMOVE or
       not command_instance.exclude_symlinks):
     # No src URL is populated for REMOVE actions.
@@ -609,29 +692,38 @@ def _ComputeNeededFileChecksums(logger, src_url_str, src_size, src_crc32c,
   dst_url = StorageUrlFromString(dst_url_str)
   if src_url.IsFileUrl():
     if dst_crc32c != _NA or dst_url.IsFileUrl():
-      if src_size > TEN_MIB:
-        logger.info('Computing CRC32C for %s...', src_url_str)
-      with open(src_url.object_name, 'rb') as fp:
-        src_crc32c = CalculateB64EncodedCrc32cFromContents(fp)
+      src_crc32c = _GetFileChecksum(logger, src_url_str, src_size, 'crc32c')
     elif dst_md5 != _NA or dst_url.IsFileUrl():
-      if dst_size > TEN_MIB:
-        logger.info('Computing MD5 for %s...', src_url_str)
-      with open(src_url.object_name, 'rb') as fp:
-        src_md5 = CalculateB64EncodedMd5FromContents(fp)
+      src_md5 = _GetFileChecksum(logger, src_url_str, dst_size, 'md5')
   if dst_url.IsFileUrl():
     if src_crc32c != _NA:
-      if src_size > TEN_MIB:
-        logger.info('Computing CRC32C for %s...', dst_url_str)
-      with open(dst_url.object_name, 'rb') as fp:
-        dst_crc32c = CalculateB64EncodedCrc32cFromContents(fp)
+      dst_crc32c = _GetFileChecksum(logger, dst_url_str, src_size, 'crc32c')
     elif src_md5 != _NA:
-      if dst_size > TEN_MIB:
-        logger.info('Computing MD5 for %s...', dst_url_str)
-      with open(dst_url.object_name, 'rb') as fp:
-        dst_md5 = CalculateB64EncodedMd5FromContents(fp)
+      dst_md5 = _GetFileChecksum(logger, dst_url_str, dst_size, 'md5')
   return (src_crc32c, src_md5, dst_crc32c, dst_md5)
 
 
+def _GetFileChecksum(logger, url_str, size, alg):
+  """Returns a file's base64 checksum, computing it if it isn't cached.
+
+  Args:
+    logger: logging.logger for outputting log messages.
+    url_str: File URL string.
+    size: Size of the file, used to decide whether to log the computation.
+    alg: Checksum algorithm name ('crc32c' or 'md5').
+
+  Returns:
+    Base64 encoded checksum.
+  """
+  file_name = StorageUrlFromString(url_str).object_name
+  digests = GetCachedFileHashes(file_name, [alg])
+  if not digests:
+    if size > TEN_MIB:
+      logger.info('Computing %s for %s...', _CHECKSUM_ALG_NAMES[alg], url_str)
+    digests = CalculateFileHashes(file_name, [alg])
+  return digests[alg]
+
+
 def _ListUrlRootFunc(cls, args_tuple, thread_state=None):
   """Worker function for listing files/objects under to be sync'd.
 
@@ -685,10 +777,12 @@ def _LocalDirIterator(base_url):
   Yields:
     BucketListingObject for each file in the directory.
   """
-  for filename in os.listdir(base_url.object_name):
-    filename = os.path.join(base_url.object_name, filename)
-    if os.path.isfile(filename):
-      yield BucketListingObject(StorageUrlFromString(filename), None)
+  with os.scandir(base_url.object_name) as entries:
+    entries = list(entries)
+  for entry in entries:
+    if entry.is_file():
+      yield BucketListingObject(StorageUrlFromString(entry.path),
+                                stat_result=entry.stat())
 
 
 def _FieldedListingIterator(cls, gsutil_api, base_url_str, desc):
@@ -794,7 +888,9 @@ def _BuildTmpOutputLine(blr):
   uid = NA_ID
   url = blr.storage_url
   if url.IsFileUrl():
-    mode, _, _, _, uid, gid, size, atime, mtime, _ = os.stat(url.object_name)
+    # Files are usually stat'ed while being listed.
+    stat_result = blr.stat_result or os.stat(url.object_name)
+    mode, _, _, _, uid, gid, size, atime, mtime, _ = stat_result
     # atime/mtime can be a float, so it needs to be converted to a long.
     atime = long(atime)
     mtime = long(mtime)
@@ -942,118 +1038,17 @@ def _BatchSort(in_iter, out_file):
             chunk_file.name, e)
 
 
-class _DiffIterator(object):
-  """Iterator yielding sequence of RsyncDiffToApply objects."""
+class _ObjectComparator(object):
+  """Determines how to synchronize source and destination objects."""
 
-  def __init__(self, command_obj, base_src_url, base_dst_url):
+  def __init__(self, command_obj):
     self.command_obj = command_obj
     self.compute_file_checksums = command_obj.compute_file_checksums
-    self.delete_extras = command_obj.delete_extras
-    self.recursion_requested = command_obj.recursion_requested
     self.logger = self.command_obj.logger
-    self.base_src_url = base_src_url
-    self.base_dst_url = base_dst_url
     self.preserve_posix = command_obj.preserve_posix_attrs
     self.skip_old_files = command_obj.skip_old_files
     self.ignore_existing = command_obj.ignore_existing
 
-    self.logger.info('Building synchronization state...')
-
-    # Files to track src and dst state should be created in the system's
-    # preferred temp directory so that they are eventually cleaned up if our
-    # cleanup callback is interrupted.
-    temp_src_file = tempfile.NamedTemporaryFile(prefix='gsutil-rsync-src-',
-                                                delete=False)
-    temp_dst_file = tempfile.NamedTemporaryFile(prefix='gsutil-rsync-dst-',
-                                                delete=False)
-    self.sorted_list_src_file_name = temp_src_file.name
-    self.sorted_list_dst_file_name = temp_dst_file.name
-    _tmp_files.append(temp_src_file)
-    _tmp_files.append(temp_dst_file)
-    # Close the files, but don't delete them. Because Windows does not allow
-    # a temporary file to be reopened until it's been closed, we close the
-    # files before proceeding. This allows each step below to open the file at
-    # the specified path, perform I/O, and close it so that the next step may
-    # do the same thing.
-    temp_src_file.close()
-    temp_dst_file.close()
-
-    # Build sorted lists of src and dst URLs in parallel. To do this, pass
-    # args to _ListUrlRootFunc as tuple (base_url_str, out_filename, desc)
-    # where base_url_str is the starting URL string for listing.
-    args_iter = iter([
-        (
-            self.base_src_url.url_string,
-            self.sorted_list_src_file_name,
-            'source',
-        ),
-        (
-            self.base_dst_url.url_string,
-            self.sorted_list_dst_file_name,
-            'destination',
-        ),
-    ])
-
-    # Contains error message from non-retryable listing failure.
-    command_obj.non_retryable_listing_failures = 0
-    shared_attrs = ['non_retryable_listing_failures']
-    command_obj.Apply(
-        _ListUrlRootFunc,
-        args_iter,
-        _RootListingExceptionHandler,
-        shared_attrs,
-        arg_checker=DummyArgChecker,
-        parallel_operations_override=command_obj.ParallelOverrideReason.SPEED,
-        fail_on_error=True)
-
-    if command_obj.non_retryable_listing_failures:
-      raise CommandException('Caught non-retryable exception - aborting rsync')
-
-    # Note that while this leaves 2 open file handles, we track these in a
-    # global list to be closed (if not closed in the calling scope) and deleted
-    # at exit time.
-    self.sorted_list_src_file = open(self.sorted_list_src_file_name, 'r')
-    self.sorted_list_dst_file = open(self.sorted_list_dst_file_name, 'r')
-    _tmp_files.append(self.sorted_list_src_file)
-    _tmp_files.append(self.sorted_list_dst_file)
-
-    if (base_src_url.IsCloudUrl() and base_dst_url.IsFileUrl() and
-        self.preserve_posix):
-      self.sorted_src_urls_it = PluralityCheckableIterator(
-          iter(self.sorted_list_src_file))
-      self._ValidateObjectAccess()
-      # Reset our file pointers to the beginning.
-      self.sorted_list_src_file.seek(0)
-
-    # Wrap iterators in PluralityCheckableIterator so we can check emptiness.
-    self.sorted_src_urls_it = PluralityCheckableIterator(
-        iter(self.sorted_list_src_file))
-    self.sorted_dst_urls_it = PluralityCheckableIterator(
-        iter(self.sorted_list_dst_file))
-
-  def _ValidateObjectAccess(self):
-    """Validates that the user won't lose access to the files if copied.
-
-    Iterates over the src file list to check if access will be maintained. If at
-    any point we would orphan a file, a list of errors is compiled and logged
-    with an exception raised to the user.
-    """
-    errors = collections.deque()
-    for src_url in self.sorted_src_urls_it:
-      src_url_str, _, _, _, _, src_mode, src_uid, src_gid, _, _ = (
-          self._ParseTmpFileLine(src_url))
-      valid, err = ValidateFilePermissionAccess(src_url_str,
-                                                uid=src_uid,
-                                                gid=src_gid,
-                                                mode=src_mode)
-      if not valid:
-        errors.append(err)
-    if errors:
-      for err in errors:
-        self.logger.critical(err)
-      raise CommandException('This sync will orphan file(s), please fix their '
-                             'permissions before trying again.')
-
   def _ParseTmpFileLine(self, line):
     """Parses output from _BuildTmpOutputLine.
 
@@ -1138,10 +1133,11 @@ class _DiffIterator(object):
       A 3-tuple indicating if src should replace dst, and if src and dst have
       mtime.
     """
-    # Note: This function is called from __iter__, which is called from the
-    # Command.Apply driver. Thus, all checksum computation will be run in a
-    # single thread, which is good (having multiple threads concurrently
-    # computing checksums would thrash the disk).
+    # Note: When listing, this function is called from _DiffIterator.__iter__,
+    # which is called from the Command.Apply driver, so checksums of listed
+    # objects are computed in a single thread, which is good (having multiple
+    # threads concurrently computing checksums would thrash the disk). Objects
+    # announced by notifications are compared in Apply's worker threads.
     #
     # Comparison Hierarchy:
     # 1. mtime
@@ -1186,6 +1182,186 @@ class _DiffIterator(object):
     # comparison.
     return False, has_src_mtime, has_dst_mtime
 
+  def _DiffExistingObjects(self, src_fields, dst_fields):
+    """Returns how to synchronize a source object with its existing destination.
+
+    Args:
+      src_fields: Source tuple, as parsed by _ParseTmpFileLine.
+      dst_fields: Destination tuple, as parsed by _ParseTmpFileLine.
+
+    Returns:
+      The RsyncDiffToApply, or None if the destination is up to date.
+    """
+    (src_url_str, src_size, src_time_created, src_atime, src_mtime, src_mode,
+     src_uid, src_gid, src_crc32c, src_md5) = src_fields
+    # We don't need time created at the destination.
+    (dst_url_str, dst_size, _, dst_atime, dst_mtime, dst_mode, dst_uid,
+     dst_gid, dst_crc32c, dst_md5) = dst_fields
+    posix_attrs = POSIXAttributes(atime=src_atime,
+                                  mtime=src_mtime,
+                                  uid=src_uid,
+                                  gid=src_gid,
+                                  mode=src_mode)
+    if (StorageUrlFromString(src_url_str).IsCloudUrl() and
+        StorageUrlFromString(dst_url_str).IsFileUrl() and
+        src_mtime == NA_TIME):
+      src_mtime = src_time_created
+    should_replace, has_src_mtime, has_dst_mtime = (self._CompareObjects(
+        src_url_str, src_size, src_mtime, src_crc32c, src_md5, dst_url_str,
+        dst_size, dst_mtime, dst_crc32c, dst_md5))
+    if should_replace:
+      return RsyncDiffToApply(src_url_str, dst_url_str, posix_attrs,
+                              DiffAction.COPY, src_size)
+    elif self.preserve_posix:
+      posix_attrs, needs_update = NeedsPOSIXAttributeUpdate(
+          src_atime, dst_atime, src_mtime, dst_mtime, src_uid, dst_uid,
+          src_gid, dst_gid, src_mode, dst_mode)
+      if needs_update:
+        return RsyncDiffToApply(src_url_str, dst_url_str, posix_attrs,
+                                DiffAction.POSIX_SRC_TO_DST, src_size)
+    elif has_src_mtime and not has_dst_mtime:
+      # File/object at destination matches source but is missing mtime
+      # attribute at destination.
+      return RsyncDiffToApply(src_url_str, dst_url_str, posix_attrs,
+                              DiffAction.MTIME_SRC_TO_DST, src_size)
+    # else: we don't need to copy the file from src to dst since they're
+    # the same files.
+    return None
+
+  def DiffObjects(self, src_line, dst_line, dst_url_str):
+    """Returns how to synchronize a source object with its destination.
+
+    Args:
+      src_line: Source line, formatted per _BuildTmpOutputLine.
+      dst_line: Destination line, formatted per _BuildTmpOutputLine, or None if
+          the destination doesn't exist.
+      dst_url_str: Destination URL string.
+
+    Returns:
+      The RsyncDiffToApply, or None if the destination is up to date.
+    """
+    src_fields = self._ParseTmpFileLine(src_line)
+    if dst_line is None:
+      (src_url_str, src_size, _, src_atime, src_mtime, src_mode, src_uid,
+       src_gid, _, _) = src_fields
+      return RsyncDiffToApply(
+          src_url_str, dst_url_str,
+          POSIXAttributes(atime=src_atime,
+                          mtime=src_mtime,
+                          uid=src_uid,
+                          gid=src_gid,
+                          mode=src_mode), DiffAction.COPY, src_size)
+    return self._DiffExistingObjects(src_fields,
+                                     self._ParseTmpFileLine(dst_line))
+
+
+class _DiffIterator(_ObjectComparator):
+  """Iterator yielding sequence of RsyncDiffToApply objects."""
+
+  def __init__(self, command_obj, base_src_url, base_dst_url):
+    super(_DiffIterator, self).__init__(command_obj)
+    self.delete_extras = command_obj.delete_extras
+    self.recursion_requested = command_obj.recursion_requested
+    self.base_src_url = base_src_url
+    self.base_dst_url = base_dst_url
+
+    self.logger.info('Building synchronization state...')
+
+    # Files to track src and dst state should be created in the system's
+    # preferred temp directory so that they are eventually cleaned up if our
+    # cleanup callback is interrupted.
+    temp_src_file = tempfile.NamedTemporaryFile(prefix='gsutil-rsync-src-',
+                                                delete=False)
+    temp_dst_file = tempfile.NamedTemporaryFile(prefix='gsutil-rsync-dst-',
+                                                delete=False)
+    self.sorted_list_src_file_name = temp_src_file.name
+    self.sorted_list_dst_file_name = temp_dst_file.name
+    _tmp_files.append(temp_src_file)
+    _tmp_files.append(temp_dst_file)
+    # Close the files, but don't delete them. Because Windows does not allow
+    # a temporary file to be reopened until it's been closed, we close the
+    # files before proceeding. This allows each step below to open the file at
+    # the specified path, perform I/O, and close it so that the next step may
+    # do the same thing.
+    temp_src_file.close()
+    temp_dst_file.close()
+
+    # Build sorted lists of src and dst URLs in parallel. To do this, pass
+    # args to _ListUrlRootFunc as tuple (base_url_str, out_filename, desc)
+    # where base_url_str is the starting URL string for listing.
+    args_iter = iter([
+        (
+            self.base_src_url.url_string,
+            self.sorted_list_src_file_name,
+            'source',
+        ),
+        (
+            self.base_dst_url.url_string,
+            self.sorted_list_dst_file_name,
+            'destination',
+        ),
+    ])
+
+    # Contains error message from non-retryable listing failure.
+    command_obj.non_retryable_listing_failures = 0
+    shared_attrs = ['non_retryable_listing_failures']
+    command_obj.Apply(
+        _ListUrlRootFunc,
+        args_iter,
+        _RootListingExceptionHandler,
+        shared_attrs,
+        arg_checker=DummyArgChecker,
+        parallel_operations_override=command_obj.ParallelOverrideReason.SPEED,
+        fail_on_error=True)
+
+    if command_obj.non_retryable_listing_failures:
+      raise CommandException('Caught non-retryable exception - aborting rsync')
+
+    # Note that while this leaves 2 open file handles, we track these in a
+    # global list to be closed (if not closed in the calling scope) and deleted
+    # at exit time.
+    self.sorted_list_src_file = open(self.sorted_list_src_file_name, 'r')
+    self.sorted_list_dst_file = open(self.sorted_list_dst_file_name, 'r')
+    _tmp_files.append(self.sorted_list_src_file)
+    _tmp_files.append(self.sorted_list_dst_file)
+
+    if (base_src_url.IsCloudUrl() and base_dst_url.IsFileUrl() and
+        self.preserve_posix):
+      self.sorted_src_urls_it = PluralityCheckableIterator(
+          iter(self.sorted_list_src_file))
+      self._ValidateObjectAccess()
+      # Reset our file pointers to the beginning.
+      self.sorted_list_src_file.seek(0)
+
+    # Wrap iterators in PluralityCheckableIterator so we can check emptiness.
+    self.sorted_src_urls_it = PluralityCheckableIterator(
+        iter(self.sorted_list_src_file))
+    self.sorted_dst_urls_it = PluralityCheckableIterator(
+        iter(self.sorted_list_dst_file))
+
+  def _ValidateObjectAccess(self):
+    """Validates that the user won't lose access to the files if copied.
+
+    Iterates over the src file list to check if access will be maintained. If at
+    any point we would orphan a file, a list of errors is compiled and logged
+    with an exception raised to the user.
+    """
+    errors = collections.deque()
+    for src_url in self.sorted_src_urls_it:
+      src_url_str, _, _, _, _, src_mode, src_uid, src_gid, _, _ = (
+          self._ParseTmpFileLine(src_url))
+      valid, err = ValidateFilePermissionAccess(src_url_str,
+                                                uid=src_uid,
+                                                gid=src_gid,
+                                                mode=src_mode)
+      if not valid:
+        errors.append(err)
+    if errors:
+      for err in errors:
+        self.logger.critical(err)
+      raise CommandException('This sync will orphan file(s), please fix their '
+                             'permissions before trying again.')
+
   def __iter__(self):
     """Iterates over src/dst URLs and produces a RsyncDiffToApply sequence.
 
@@ -1209,9 +1385,9 @@ class _DiffIterator(object):
         if self.sorted_src_urls_it.IsEmpty():
           out_of_src_items = True
         else:
-          (src_url_str, src_size, src_time_created, src_atime, src_mtime,
-           src_mode, src_uid, src_gid, src_crc32c,
-           src_md5) = (self._ParseTmpFileLine(next(self.sorted_src_urls_it)))
+          src_fields = self._ParseTmpFileLine(next(self.sorted_src_urls_it))
+          (src_url_str, src_size, _, src_atime, src_mtime, src_mode, src_uid,
+           src_gid, _, _) = src_fields
           posix_attrs = POSIXAttributes(atime=src_atime,
                                         mtime=src_mtime,
                                         uid=src_uid,
@@ -1232,10 +1408,8 @@ class _DiffIterator(object):
               recursion_requested=self.recursion_requested).url_string
       if dst_url_str is None:
         if not self.sorted_dst_urls_it.IsEmpty():
-          # We don't need time created at the destination.
-          (dst_url_str, dst_size, _, dst_atime, dst_mtime, dst_mode, dst_uid,
-           dst_gid, dst_crc32c,
-           dst_md5) = self._ParseTmpFileLine(next(self.sorted_dst_urls_it))
+          dst_fields = self._ParseTmpFileLine(next(self.sorted_dst_urls_it))
+          dst_url_str = dst_fields[0]
           # Skip past base URL and normalize slashes so we can compare across
           # clouds/file systems (including Windows).
           dst_url_str_to_check = _EncodeUrl(
@@ -1262,30 +1436,9 @@ class _DiffIterator(object):
       else:
         # There is a dst object corresponding to src object, so check if objects
         # match.
-        if (StorageUrlFromString(src_url_str).IsCloudUrl() and
-            StorageUrlFromString(dst_url_str).IsFileUrl() and
-            src_mtime == NA_TIME):
-          src_mtime = src_time_created
-        should_replace, has_src_mtime, has_dst_mtime = (self._CompareObjects(
-            src_url_str, src_size, src_mtime, src_crc32c, src_md5, dst_url_str,
-            dst_size, dst_mtime, dst_crc32c, dst_md5))
-        if should_replace:
-          yield RsyncDiffToApply(src_url_str, dst_url_str, posix_attrs,
-                                 DiffAction.COPY, src_size)
-        elif self.preserve_posix:
-          posix_attrs, needs_update = NeedsPOSIXAttributeUpdate(
-              src_atime, dst_atime, src_mtime, dst_mtime, src_uid, dst_uid,
-              src_gid, dst_gid, src_mode, dst_mode)
-          if needs_update:
-            yield RsyncDiffToApply(src_url_str, dst_url_str, posix_attrs,
-                                   DiffAction.POSIX_SRC_TO_DST, src_size)
-        elif has_src_mtime and not has_dst_mtime:
-          # File/object at destination matches source but is missing mtime
-          # attribute at destination.
-          yield RsyncDiffToApply(src_url_str, dst_url_str, posix_attrs,
-                                 DiffAction.MTIME_SRC_TO_DST, src_size)
-        # else: we don't need to copy the file from src to dst since they're
-        # the same files.
+        diff_to_apply = self._DiffExistingObjects(src_fields, dst_fields)
+        if diff_to_apply is not None:
+          yield diff_to_apply
         # Advance to the next two objects.
         src_url_str = None
         dst_url_str = None
@@ -1371,8 +1524,139 @@ class _AvoidChecksumAndListingDiffIterator(_DiffIterator):
   # pylint: enable=super-init-not-called
 
 
+# Batch keys of the diff actions that can be combined into batch requests.
+_REMOVE_BATCH = 'remove'
+_PATCH_BATCH = 'patch'
+
+
+def _GetDiffBatchKey(diff_to_apply):
+  """Removals and metadata updates of cloud objects can be batched."""
+  if diff_to_apply.diff_action == DiffAction.REMOVE:
+    batch_type = _REMOVE_BATCH
+  elif diff_to_apply.diff_action in (DiffAction.MTIME_SRC_TO_DST,
+                                     DiffAction.POSIX_SRC_TO_DST):
+    batch_type = _PATCH_BATCH
+  else:
+    return None
+  dst_url = StorageUrlFromString(diff_to_apply.dst_url_str)
+  return (batch_type, dst_url.scheme) if dst_url.IsCloudUrl() else None
+
+
+def _GetDiffBatchSize(batch_key):
+  batch_type, _ = batch_key
+  if batch_type == _REMOVE_BATCH:
+    return GetDeleteBatchSize()
+  return GetPatchBatchSize()
+
+
+def _RaiseBatchErrors(cls, errors):
+  """Reports the failed operations of a batch, raising the last failure.
+
+  The last exception is raised so that it is handled like the failure of an
+  unbatched task; the others are accounted for as if they had been raised by
+  tasks of their own.
+
+  Args:
+    cls: Command instance.
+    errors: List of exceptions.
+
+  Raises:
+    The last exception in errors, if any.
+  """
+  for e in errors[:-1]:
+    IncrementFailureCount()
+    _RsyncExceptionHandler(cls, e)
+  if errors:
+    raise errors[-1]
+
+
+def _RemoveDstObjects(cls, diffs_to_apply, thread_state=None):
+  """Worker function for removing a batch of destination objects."""
+  gsutil_api = GetCloudApiInstance(cls, thread_state=thread_state)
+  dst_urls = [
+      StorageUrlFromString(diff_to_apply.dst_url_str)
+      for diff_to_apply in diffs_to_apply
+  ]
+  for dst_url in dst_urls:
+    cls.logger.info('%s %s', 'Would remove' if cls.dryrun else 'Removing',
+                    dst_url)
+  if cls.dryrun:
+    return
+  results = gsutil_api.DeleteObjects(
+      [(dst_url.bucket_name, dst_url.object_name, dst_url.generation)
+       for dst_url in dst_urls],
+      provider=dst_urls[0].scheme)
+  # As in _RsyncFunc, objects deleted by an external process are fine.
+  _RaiseBatchErrors(cls, [
+      e for e in results
+      if e is not None and not isinstance(e, NotFoundException)
+  ])
+
+
+def _PatchDstObjects(cls, diffs_to_apply, thread_state=None):
+  """Worker function for copying mtime or POSIX attributes to dst objects."""
+  gsutil_api = GetCloudApiInstance(cls, thread_state=thread_state)
+  objects_to_patch = []
+  for diff_to_apply in diffs_to_apply:
+    dst_url = StorageUrlFromString(diff_to_apply.dst_url_str)
+    posix_attrs = diff_to_apply.src_posix_attrs
+    obj_metadata = apitools_messages.Object()
+    if diff_to_apply.diff_action == DiffAction.MTIME_SRC_TO_DST:
+      cls.logger.info(
+          'Would set mtime for %s' if cls.dryrun else
+          'Copying mtime from src to dst for %s', dst_url)
+      obj_metadata.metadata = CreateCustomMetadata(
+          {MTIME_ATTR: posix_attrs.mtime})
+    else:
+      cls.logger.info(
+          'Would set POSIX attributes for %s' if cls.dryrun else
+          'Copying POSIX attributes from src to dst for %s', dst_url)
+      obj_metadata.metadata = apitools_messages.Object.MetadataValue(
+          additionalProperties=[])
+      SerializeFileAttributesToObjectMetadata(posix_attrs,
+                                              obj_metadata.metadata,
+                                              preserve_posix=True)
+    objects_to_patch.append((dst_url.bucket_name, dst_url.object_name,
+                             obj_metadata, dst_url.generation, None))
+  if cls.dryrun:
+    return
+  # All objects in a batch share the provider of the last one.
+  results = gsutil_api.PatchObjectsMetadata(objects_to_patch,
+                                            provider=dst_url.scheme)
+
+  errors = []
+  for diff_to_apply, e in zip(diffs_to_apply, results):
+    if e is None:
+      continue
+    if not isinstance(e, ServiceException):
+      errors.append(e)
+      continue
+    # As in _RsyncFunc, objects we can't patch are copied instead.
+    cls.logger.debug('Error while trying to patch: %s', e)
+    cls.logger.info(
+        'Copying whole file/object for %s instead of patching'
+        ' because you don\'t have patch permission on the '
+        'object.', diff_to_apply.dst_url_str)
+    try:
+      _RsyncFunc(cls,
+                 RsyncDiffToApply(diff_to_apply.src_url_str,
+                                  diff_to_apply.dst_url_str,
+                                  diff_to_apply.src_posix_attrs,
+                                  DiffAction.COPY, diff_to_apply.copy_size),
+                 thread_state=thread_state)
+    except Exception as copy_exception:  # pylint: disable=broad-except
+      errors.append(copy_exception)
+  _RaiseBatchErrors(cls, errors)
+
+
 def _RsyncFunc(cls, diff_to_apply, thread_state=None):
   """Worker function for performing the actual copy and remove operations."""
+  if isinstance(diff_to_apply, TaskArgsBatch):
+    if diff_to_apply.args_list[0].diff_action == DiffAction.REMOVE:
+      _RemoveDstObjects(cls, diff_to_apply, thread_state=thread_state)
+    else:
+      _PatchDstObjects(cls, diff_to_apply, thread_state=thread_state)
+    return
   gsutil_api = GetCloudApiInstance(cls, thread_state=thread_state)
   dst_url_str = diff_to_apply.dst_url_str
   dst_url = StorageUrlFromString(dst_url_str)
@@ -1579,6 +1863,149 @@ def _RsyncExceptionHandler(cls, e):
                    traceback.format_exc())
 
 
+def _GetNotifiedObjects(cls, base_src_url, base_dst_url, received_messages):
+  """Coalesces object change notifications into the objects to sync.
+
+  Args:
+    cls: Command instance.
+    base_src_url: StorageUrl of the source bucket or bucket subdir.
+    base_dst_url: StorageUrl of the destination container.
+    received_messages: List of ReceivedMessages pulled from the subscription.
+
+  Returns:
+    List of _NotifiedObjects, sorted by source URL, naming each source object
+    under base_src_url that isn't excluded once, however many notifications
+    name it.
+  """
+  prefix = ''
+  if base_src_url.object_name:
+    prefix = base_src_url.object_name.rstrip('/') + '/'
+  src_url_strs = set()
+  for received_message in received_messages:
+    message = received_message.message
+    if not message or not message.attributes:
+      continue
+    attributes = dict((prop.key, prop.value)
+                      for prop in message.attributes.additionalProperties)
+    if (attributes.get('eventType') not in _NOTIFICATION_EVENT_TYPES or
+        attributes.get('bucketId') != base_src_url.bucket_name):
+      continue
+    object_name = attributes.get('objectId')
+    if not object_name or not object_name.startswith(prefix):
+      continue
+    rel_name = object_name[len(prefix):]
+    if not rel_name or (not cls.recursion_requested and '/' in rel_name):
+      continue
+    if cls.exclude_pattern and cls.exclude_pattern.match(rel_name):
+      continue
+    src_url_str = '%s://%s/%s' % (base_src_url.scheme,
+                                  base_src_url.bucket_name, object_name)
+    if IsCloudSubdirPlaceholder(StorageUrlFromString(src_url_str)):
+      continue
+    src_url_strs.add(src_url_str)
+
+  notified_objects = []
+  for src_url_str in sorted(src_url_strs):
+    dst_url = copy_helper.ConstructDstUrl(
+        src_url=base_src_url,
+        exp_src_url=StorageUrlFromString(src_url_str),
+        src_url_names_container=True,
+        have_multiple_srcs=True,
+        has_multiple_top_level_srcs=False,
+        exp_dst_url=base_dst_url,
+        have_existing_dest_subdir=False,
+        recursion_requested=cls.recursion_requested)
+    notified_objects.append(_NotifiedObject(src_url_str, dst_url.url_string))
+  return notified_objects
+
+
+def _GetNotifiedObject(gsutil_api, url):
+  """Looks up an object named in notifications, or its destination.
+
+  Args:
+    gsutil_api: gsutil Cloud API instance to use for the lookup.
+    url: StorageUrl of the source object or of its destination.
+
+  Returns:
+    BucketListingObject for url, or None if the object doesn't exist.
+  """
+  if url.IsFileUrl():
+    try:
+      return BucketListingObject(url, stat_result=os.stat(url.object_name))
+    except OSError:
+      return None
+  try:
+    return BucketListingObject(url,
+                               root_object=gsutil_api.GetObjectMetadata(
+                                   url.bucket_name,
+                                   url.object_name,
+                                   provider=url.scheme,
+                                   fields=_NOTIFIED_OBJECT_FIELDS))
+  except NotFoundException:
+    return None
+
+
+def _SyncNotifiedObjectFunc(cls, notified_object, thread_state=None):
+  """Worker function for syncing an object named in notifications.
+
+  Notifications only tell that an object changed, so the current states of the
+  object and of its destination are looked up and compared as in a full
+  synchronization: objects are only copied if they differ from their
+  destination, and destination objects of deleted ones are removed if -d was
+  specified.
+  """
+  gsutil_api = GetCloudApiInstance(cls, thread_state=thread_state)
+  src_url = StorageUrlFromString(notified_object.src_url_str)
+  dst_url = StorageUrlFromString(notified_object.dst_url_str)
+  src_blr = _GetNotifiedObject(gsutil_api, src_url)
+  dst_blr = _GetNotifiedObject(gsutil_api, dst_url)
+  if src_blr is None:
+    if cls.delete_extras and dst_blr is not None:
+      _RsyncFunc(cls,
+                 RsyncDiffToApply(None, notified_object.dst_url_str,
+                                  POSIXAttributes(), DiffAction.REMOVE, None),
+                 thread_state=thread_state)
+    return
+  if cls.preserve_posix_attrs and dst_url.IsFileUrl():
+    # As in _DiffIterator._ValidateObjectAccess, don't orphan the file.
+    posix_attrs = DeserializeFileAttributesFromObjectMetadata(
+        src_blr.root_object, src_url.url_string)
+    valid, err = ValidateFilePermissionAccess(src_url.url_string,
+                                              uid=posix_attrs.uid,
+                                              gid=posix_attrs.gid,
+                                              mode=posix_attrs.mode)
+    if not valid:
+      raise CommandException(err)
+  dst_line = _BuildTmpOutputLine(dst_blr) if dst_blr is not None else None
+  diff_to_apply = _ObjectComparator(cls).DiffObjects(
+      _BuildTmpOutputLine(src_blr), dst_line, notified_object.dst_url_str)
+  if diff_to_apply is not None:
+    _RsyncFunc(cls, diff_to_apply, thread_state=thread_state)
+
+
+def _GetReconcileStateFilename(subscription_name, src_url, dst_url):
+  """Gets the file recording the last full sync of src_url to dst_url."""
+  state_key = '\n'.join(
+      [subscription_name, src_url.url_string, dst_url.url_string])
+  return os.path.join(
+      GetRsyncReconcileStateDir(),
+      hashlib.sha1(state_key.encode(constants.UTF8)).hexdigest())
+
+
+def _ReadLastReconcileTime(state_filename):
+  """Returns the time of the last full sync, or 0 if there was none."""
+  try:
+    with open(state_filename, 'r') as fp:
+      return float(fp.read().strip())
+  except (IOError, OSError, ValueError):
+    return 0
+
+
+def _WriteLastReconcileTime(state_filename, reconcile_time):
+  with open(state_filename, 'w') as fp:
+    fp.write('%f' % reconcile_time)
+
+
 class RsyncCommand(Command):
   """Implementation of gsutil rsync command."""
 
@@ -1590,6 +2017,7 @@ class RsyncCommand(Command):
       min_args=2,
       max_args=2,
       supported_sub_args='a:cCdenpPriRuUx:y:j:J',
+      supported_private_args=['subscription='],
       file_url_ok=True,
       provider_url_ok=False,
       urls_start_arg=0,
@@ -1694,6 +2122,9 @@ class RsyncCommand(Command):
 
     src_url = self._InsistContainer(self.args[0], False)
     dst_url = self._InsistContainer(self.args[1], True)
+    if self.subscription_name and not src_url.IsCloudUrl():
+      raise CommandException(
+          'The --subscription option requires a cloud source URL.')
     is_daisy_chain = (src_url.IsCloudUrl() and dst_url.IsCloudUrl() and
                       src_url.scheme != dst_url.scheme)
     LogPerformanceSummaryParams(has_file_src=src_url.IsFileUrl(),
@@ -1732,6 +2163,28 @@ class RsyncCommand(Command):
         worker_count=process_count * thread_count,
     )
 
+    start_time = time.time()
+    if self.subscription_name:
+      self._SyncNotifiedChanges(src_url, dst_url, shared_attrs)
+    else:
+      self._SyncListedChanges(src_url, dst_url, shared_attrs)
+
+    end_time = time.time()
+    self.total_elapsed_time = end_time - start_time
+    self.total_bytes_per_second = CalculateThroughput(
+        self.total_bytes_transferred, self.total_elapsed_time)
+    LogPerformanceSummaryParams(
+        avg_throughput=self.total_bytes_per_second,
+        total_elapsed_time=self.total_elapsed_time,
+        total_bytes_transferred=self.total_bytes_transferred)
+
+    if self.op_failure_count:
+      plural_str = 's' if self.op_failure_count else ''
+      raise CommandException('%d file%s/object%s could not be copied/removed.' %
+                             (self.op_failure_count, plural_str, plural_str))
+
+  def _SyncListedChanges(self, src_url, dst_url, shared_attrs):
+    """Lists the source and destination and applies their differences."""
     # Perform sync requests in parallel (-m) mode, if requested, using
     # configured number of parallel processes and threads. Otherwise,
     # perform requests with sequential function calls in current process.
@@ -1744,10 +2197,10 @@ class RsyncCommand(Command):
         _AvoidChecksumAndListingDiffIterator(diff_iterator))
 
     self.logger.info('Starting synchronization...')
-    start_time = time.time()
     try:
       self.Apply(_RsyncFunc,
-                 diff_iterator,
+                 TaskArgsBatchingIterator(diff_iterator, _GetDiffBatchSize,
+                                          _GetDiffBatchKey),
                  _RsyncExceptionHandler,
                  shared_attrs,
                  arg_checker=_DiffToApplyArgChecker,
@@ -1756,19 +2209,83 @@ class RsyncCommand(Command):
     finally:
       CleanUpTempFiles()
 
-    end_time = time.time()
-    self.total_elapsed_time = end_time - start_time
-    self.total_bytes_per_second = CalculateThroughput(
-        self.total_bytes_transferred, self.total_elapsed_time)
-    LogPerformanceSummaryParams(
-        avg_throughput=self.total_bytes_per_second,
-        total_elapsed_time=self.total_elapsed_time,
-        total_bytes_transferred=self.total_bytes_transferred)
+  def _SyncNotifiedChanges(self, src_url, dst_url, shared_attrs):
+    """Applies the changes announced by notifications on the subscription.
 
-    if self.op_failure_count:
-      plural_str = 's' if self.op_failure_count else ''
-      raise CommandException('%d file%s/object%s could not be copied/removed.' %
-                             (self.op_failure_count, plural_str, plural_str))
+    Once the last full synchronization is older than the reconcile interval,
+    the pending notifications are acknowledged without being applied and a
+    full synchronization is performed instead.
+
+    Args:
+      src_url: StorageUrl of the source bucket or bucket subdir.
+      dst_url: StorageUrl of the destination container.
+      shared_attrs: Attributes to share across processes in parallel mode.
+    """
+    pubsub_api = PubsubApi(logger=self.logger)
+    state_filename = _GetReconcileStateFilename(self.subscription_name,
+                                                src_url, dst_url)
+    reconcile_time = time.time()
+    if (reconcile_time - _ReadLastReconcileTime(state_filename) <
+        GetRsyncReconcileInterval()):
+      self._ApplyNotifications(pubsub_api, src_url, dst_url, shared_attrs)
+      return
+
+    self.logger.info('Reconciling %s with a full synchronization...', dst_url)
+    # Changes made after this point are either seen by the listing or
+    # announced by notifications that are left for the next run.
+    self._ApplyNotifications(pubsub_api,
+                             src_url,
+                             dst_url,
+                             shared_attrs,
+                             apply_changes=False)
+    self._SyncListedChanges(src_url, dst_url, shared_attrs)
+    if not self.op_failure_count and not self.dryrun:
+      _WriteLastReconcileTime(state_filename, reconcile_time)
+
+  def _ApplyNotifications(self,
+                          pubsub_api,
+                          src_url,
+                          dst_url,
+                          shared_attrs,
+                          apply_changes=True):
+    """Pulls and acknowledges notifications until none are left.
+
+    Args:
+      pubsub_api: PubsubApi to pull notifications with.
+      src_url: StorageUrl of the source bucket or bucket subdir.
+      dst_url: StorageUrl of the destination container.
+      shared_attrs: Attributes to share across processes in parallel mode.
+      apply_changes: If False, notifications are only acknowledged.
+    """
+    while True:
+      received_messages = pubsub_api.Pull(self.subscription_name,
+                                          _NOTIFICATION_PULL_SIZE)
+      if not received_messages:
+        return
+      ack_ids = [received_message.ackId for received_message in
+                 received_messages]
+      if apply_changes:
+        # Keep the notifications from being redelivered while their changes
+        # are applied.
+        pubsub_api.ModifyAckDeadline(self.subscription_name, ack_ids,
+                                     _NOTIFICATION_ACK_DEADLINE)
+        op_failure_count = self.op_failure_count
+        self.Apply(_SyncNotifiedObjectFunc,
+                   iter(
+                       _GetNotifiedObjects(self, src_url, dst_url,
+                                           received_messages)),
+                   _RsyncExceptionHandler,
+                   shared_attrs,
+                   arg_checker=DummyArgChecker,
+                   fail_on_error=True)
+        if self.op_failure_count > op_failure_count:
+          # Leave the notifications to be delivered to the next run.
+          return
+      if self.dryrun:
+        # Unacknowledged notifications would be pulled again once their
+        # acknowledgement deadline passes, so don't go on pulling.
+        return
+      pubsub_api.Acknowledge(self.subscription_name, ack_ids)
 
   def _ParseOpts(self):
     # exclude_symlinks is handled by Command parent class, so save in Command
@@ -1787,6 +2304,7 @@ class RsyncCommand(Command):
     self.skip_old_files = False
     self.ignore_existing = False
     self.skip_unsupported_objects = False
+    self.subscription_name = None
     # self.recursion_requested is initialized in command.py (so it can be
     # checked in parent class for all commands).
     canned_acl = None
@@ -1847,6 +2365,14 @@ class RsyncCommand(Command):
             self.exclude_pattern = re.compile(a)
           except re.error:
             raise CommandException('Invalid exclude filter (%s)' % a)
+        elif o == '--subscription':
+          if not a:
+            raise CommandException('Invalid blank subscription')
+          if '/' in a:
+            self.subscription_name = a
+          else:
+            self.subscription_name = 'projects/%s/subscriptions/%s' % (
+                PopulateProjectId(None), a)
 
     if self.preserve_acl and canned_acl:
       raise CommandException(
@@ -1854,6 +2380,10 @@ class RsyncCommand(Command):
     if gzip_arg_exts and gzip_arg_all:
       raise CommandException(
           'Specifying both the -j and -J options together is invalid.')
+    if self.subscription_name and (self.skip_old_files or
+                                   self.ignore_existing):
+      raise CommandException(
+          'The -i and -u options can\'t be combined with --subscription.')
     self.gzip_encoded = gzip_encoded
     self.gzip_exts = gzip_arg_exts or gzip_arg_all
 
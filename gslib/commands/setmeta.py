@@ -26,9 +26,11 @@ from gslib.cloud_api import AccessDeniedException
 from gslib.cloud_api import PreconditionException
 from gslib.cloud_api import Preconditions
 from gslib.command import Command
+from gslib.command import IncrementFailureCount
 from gslib.command_argument import CommandArgument
 from gslib.cs_api_map import ApiSelector
 from gslib.exception import CommandException
+from gslib.name_expansion import BatchNameExpansionIterator
 from gslib.name_expansion import NameExpansionIterator
 from gslib.name_expansion import SeekAheadNameExpansionIterator
 from gslib.storage_url import StorageUrlFromString
@@ -36,8 +38,10 @@ from gslib.third_party.storage_apitools import storage_v1_messages as apitools_m
 from gslib.thread_message import MetadataMessage
 from gslib.utils import constants
 from gslib.utils import parallelism_framework_util
+from gslib.utils.boto_util import GetPatchBatchSize
 from gslib.utils.cloud_api_helper import GetCloudApiInstance
 from gslib.utils.metadata_util import IsCustomMetadataHeader
+from gslib.utils.parallelism_framework_util import TaskArgsBatch
 from gslib.utils.retry_util import Retry
 from gslib.utils.shim_util import GcloudStorageFlag
 from gslib.utils.shim_util import GcloudStorageMap
@@ -140,7 +144,10 @@ def _SetMetadataExceptionHandler(cls, e):
 
 
 def _SetMetadataFuncWrapper(cls, name_expansion_result, thread_state=None):
-  cls.SetMetadataFunc(name_expansion_result, thread_state=thread_state)
+  if isinstance(name_expansion_result, TaskArgsBatch):
+    cls.SetMetadataBatchFunc(name_expansion_result, thread_state=thread_state)
+  else:
+    cls.SetMetadataFunc(name_expansion_result, thread_state=thread_state)
 
 
 class SetMetaCommand(Command):
@@ -239,6 +246,12 @@ class SetMetaCommand(Command):
         continue_on_error=self.parallel_operations,
         bucket_listing_fields=['generation', 'metadata', 'metageneration'])
 
+    if self.parallel_operations and GetPatchBatchSize() > 1:
+      # Without -m the command must stop at the first failed update, so
+      # objects are updated one at a time.
+      name_expansion_iterator = BatchNameExpansionIterator(
+          name_expansion_iterator, GetPatchBatchSize())
+
     seek_ahead_iterator = SeekAheadNameExpansionIterator(
         self.command_name,
         self.debug,
@@ -280,6 +293,66 @@ class SetMetaCommand(Command):
     exp_src_url = name_expansion_result.expanded_storage_url
     self.logger.info('Setting metadata on %s...', exp_src_url)
 
+    (bucket_name, object_name, patch_obj_metadata, generation,
+     preconditions) = self._GetObjectToPatch(name_expansion_result, gsutil_api)
+    gsutil_api.PatchObjectMetadata(bucket_name,
+                                   object_name,
+                                   patch_obj_metadata,
+                                   generation=generation,
+                                   preconditions=preconditions,
+                                   provider=exp_src_url.scheme,
+                                   fields=['id'])
+    _PutToQueueWithTimeout(gsutil_api.status_queue,
+                           MetadataMessage(message_time=time.time()))
+
+  def SetMetadataBatchFunc(self, name_expansion_results, thread_state=None):
+    """Sets metadata on a batch of objects, handling failures of each update.
+
+    Args:
+      name_expansion_results: TaskArgsBatch of NameExpansionResults describing
+          target objects.
+      thread_state: gsutil Cloud API instance to use for the operation.
+    """
+    gsutil_api = GetCloudApiInstance(self, thread_state=thread_state)
+
+    objects_to_patch = []
+    for name_expansion_result in name_expansion_results:
+      exp_src_url = name_expansion_result.expanded_storage_url
+      self.logger.info('Setting metadata on %s...', exp_src_url)
+      objects_to_patch.append(
+          self._GetObjectToPatch(name_expansion_result, gsutil_api))
+    # All objects in a batch share a provider.
+    results = gsutil_api.PatchObjectsMetadata(objects_to_patch,
+                                              provider=exp_src_url.scheme)
+    for name_expansion_result, e in zip(name_expansion_results, results):
+      if isinstance(e, PreconditionException):
+        # Retry the update on its own, as it would have been without batching.
+        try:
+          self.SetMetadataFunc(name_expansion_result, thread_state=thread_state)
+          continue
+        except Exception as retry_e:  # pylint: disable=broad-except
+          e = retry_e
+      if e is not None:
+        # Account for the failure as if the update had been its own task.
+        IncrementFailureCount()
+        _SetMetadataExceptionHandler(self, e)
+      _PutToQueueWithTimeout(gsutil_api.status_queue,
+                             MetadataMessage(message_time=time.time()))
+
+  def _GetObjectToPatch(self, name_expansion_result, gsutil_api):
+    """Returns the metadata update for an object.
+
+    Args:
+      name_expansion_result: NameExpansionResult describing target object.
+      gsutil_api: gsutil Cloud API instance to use for the operation.
+
+    Returns:
+      (bucket_name, object_name, metadata, generation, preconditions) tuple,
+      as accepted by CloudApi.PatchObjectsMetadata. The preconditions match
+      the generation and metageneration from the listing unless specified
+      with -h.
+    """
+    exp_src_url = name_expansion_result.expanded_storage_url
     cloud_obj_metadata = encoding.JsonToMessage(
         apitools_messages.Object, name_expansion_result.expanded_result)
 
@@ -307,15 +380,8 @@ class SetMetaCommand(Command):
       patch_obj_metadata.generation = None
       patch_obj_metadata.metageneration = None
 
-    gsutil_api.PatchObjectMetadata(exp_src_url.bucket_name,
-                                   exp_src_url.object_name,
-                                   patch_obj_metadata,
-                                   generation=exp_src_url.generation,
-                                   preconditions=preconditions,
-                                   provider=exp_src_url.scheme,
-                                   fields=['id'])
-    _PutToQueueWithTimeout(gsutil_api.status_queue,
-                           MetadataMessage(message_time=time.time()))
+    return (exp_src_url.bucket_name, exp_src_url.object_name,
+            patch_obj_metadata, exp_src_url.generation, preconditions)
 
   def _GetHeaderStringsFromSubOpts(self):
     """Gets header values from after the "setmeta" part of the command.
@@ -23,6 +23,7 @@ from __future__ import division
 from __future__ import unicode_literals
 
 import calendar
+from collections import namedtuple
 import copy
 from datetime import datetime
 from datetime import timedelta
@@ -41,6 +42,7 @@ from apitools.base.py.http_wrapper import Request
 from boto import config
 
 from gslib.command import Command
+from gslib.command import DummyArgChecker
 from gslib.command_argument import CommandArgument
 from gslib.cs_api_map import ApiSelector
 from gslib.exception import CommandException
@@ -49,8 +51,10 @@ from gslib.storage_url import StorageUrlFromString
 from gslib.utils import constants
 from gslib.utils import text_util
 from gslib.utils.boto_util import GetNewHttp
+from gslib.utils.cloud_api_helper import GetCloudApiInstance
 from gslib.utils.shim_util import GcloudStorageMap, GcloudStorageFlag
 from gslib.utils.signurl_helper import CreatePayload, GetFinalUrl, to_bytes
+from gslib.utils.system_util import StdinIterator
 
 try:
   from cryptography.hazmat.primitives import hashes
@@ -68,10 +72,23 @@ _AUTO_DETECT_REGION = 'auto'
 _MAX_EXPIRATION_TIME = timedelta(days=7)
 _MAX_EXPIRATION_TIME_WITH_MINUS_U = timedelta(hours=12)
 
+# This tuple is used only to encapsulate the arguments needed for
+# command.Apply() when signing a URL.
+# url: StorageUrl to sign.
+# gcs_path: URL-encoded path to the bucket or object, in the form 'bucket' or
+#     'bucket/object'.
+# region: Region in which the bucket resides.
+SignUrlArgs = namedtuple('SignUrlArgs', 'url gcs_path region')
+
+# Private keys parsed in the current process, keyed by their PEM encoding.
+# Keys can't be pickled, so worker processes parse them once on first use.
+_signing_keys = {}
+
 _SYNOPSIS = """
   gsutil signurl [-c <content_type>] [-d <duration>] [-m <http_method>] \\
       [-p <password>] [-r <region>] [-b <project>]  (-u | <private-key-file>) \\
       (gs://<bucket_name> | gs://<bucket_name>/<object_name>)...
+  gsutil signurl [<options>] (-u | <private-key-file>) -I
 """
 
 _DETAILED_HELP_TEXT = ("""
@@ -90,6 +107,18 @@ _DETAILED_HELP_TEXT = ("""
   will be produced for each provided URL, authorized
   for the specified HTTP method and valid for the given duration.
 
+  If you have a large number of URLs to sign, you can pass their names on stdin
+  instead of as command line arguments by using the -I option. This allows you
+  to sign URLs from a manifest file or from the output of another program, for
+  example:
+
+    gsutil -m signurl -d 1d <private-key-file> -I < manifest.txt
+
+  URLs are signed and printed as they are read, so memory use does not grow
+  with the number of URLs. Use the top-level gsutil -m option to sign URLs in
+  parallel on all available cores; in that case the signed URLs are printed
+  in the order in which they are produced rather than in input order.
+
   NOTE: Unlike the gsutil ls command, the signurl command does not support
   operations on sub-directories. For example, unless you have an object named
   ``some-directory/`` stored inside the bucket ``some-bucket``, the following
@@ -142,6 +171,9 @@ _DETAILED_HELP_TEXT = ("""
                 This limitation exists because the system-managed key used to
                 sign the URL may not remain valid after 12 hours.
 
+  -I            Causes gsutil to read the list of URLs to sign from stdin, one
+                per line. No URL arguments are allowed with this option.
+
   -m            Specifies the HTTP method to be authorized for use
                 with the signed URL, default is GET. You may also specify
                 RESUMABLE to create a signed resumable upload start URL. When
@@ -374,6 +406,92 @@ def _ReadJSONKeystore(ks_contents, passwd=None):
   return key, client_email
 
 
+def _LoadSigningKey(key_pem):
+  """Returns the private key for key_pem, parsing it once per process."""
+  if key_pem is None:
+    return None
+  key = _signing_keys.get(key_pem)
+  if key is None:
+    key = serialization.load_pem_private_key(key_pem, password=None)
+    _signing_keys[key_pem] = key
+  return key
+
+
+def _SignUrlExceptionHandler(cls, e):
+  """Simple exception handler to allow post-completion status."""
+  cls.logger.error(str(e))
+  cls.op_failure_count += 1
+
+
+def _SignUrlFn(cls, args, thread_state=None):
+  """Worker function for signing a URL, printing it and probing access.
+
+  Args:
+    cls: Command instance.
+    args: SignUrlArgs describing the URL to sign.
+    thread_state: gsutil Cloud API instance to use for the operation.
+  """
+  gsutil_api = GetCloudApiInstance(cls, thread_state=thread_state)
+  url = args.url
+  key = _LoadSigningKey(cls.signing_key_pem)
+  final_url = _GenSignedUrl(key=key,
+                            api=gsutil_api,
+                            use_service_account=cls.use_service_account,
+                            provider=url.scheme,
+                            client_id=cls.client_email,
+                            method=cls.method,
+                            duration=cls.delta,
+                            gcs_path=args.gcs_path,
+                            generation=url.generation,
+                            logger=cls.logger,
+                            region=args.region,
+                            content_type=cls.content_type,
+                            billing_project=cls.billing_project,
+                            string_to_sign_debug=True)
+
+  expiration = calendar.timegm((datetime.now(tz=timezone.utc).replace(tzinfo=None) + cls.delta).utctimetuple())
+  expiration_dt = datetime.fromtimestamp(expiration)
+
+  time_str = expiration_dt.strftime('%Y-%m-%d %H:%M:%S')
+  # TODO(PY3-ONLY): Delete this if block.
+  if six.PY2:
+    time_str = time_str.decode(constants.UTF8)
+
+  url_info_str = '{0}\t{1}\t{2}\t{3}'.format(url.url_string, cls.method,
+                                             time_str, final_url)
+
+  # TODO(PY3-ONLY): Delete this if block.
+  if six.PY2:
+    url_info_str = url_info_str.encode(constants.UTF8)
+
+  text_util.print_to_fd(url_info_str)
+  # Flush each line so that lines printed by parallel processes don't get
+  # interleaved.
+  sys.stdout.flush()
+
+  response_code = cls._ProbeObjectAccessWithClient(
+      gsutil_api, key, cls.use_service_account, url.scheme, cls.client_email,
+      args.gcs_path, url.generation, cls.logger, args.region,
+      cls.billing_project)
+
+  if response_code == 404:
+    if url.IsBucket() and cls.method != 'PUT':
+      raise CommandException(
+          'Bucket {0} does not exist. Please create a bucket with '
+          'that name before a creating signed URL to access it.'.format(url))
+    else:
+      if cls.method != 'PUT' and cls.method != 'RESUMABLE':
+        raise CommandException(
+            'Object {0} does not exist. Please create/upload an object '
+            'with that name before a creating signed URL to access it.'.format(
+                url))
+  elif response_code == 403:
+    cls.logger.warn(
+        '%s does not have permissions on %s, using this link will likely '
+        'result in a 403 error until at least READ permissions are granted',
+        cls.client_email or 'The account', url)
+
+
 class UrlSignCommand(Command):
   """Implementation of gsutil url_sign command."""
 
@@ -384,7 +502,7 @@ class UrlSignCommand(Command):
       usage_synopsis=_SYNOPSIS,
       min_args=1,
       max_args=constants.NO_MAX,
-      supported_sub_args='m:d:b:c:p:r:u',
+      supported_sub_args='m:d:b:c:p:r:uI',
       supported_private_args=['use-service-account'],
       file_url_ok=False,
       provider_url_ok=False,
@@ -489,6 +607,7 @@ class UrlSignCommand(Command):
     region = _AUTO_DETECT_REGION
     use_service_account = False
     billing_project = None
+    self.read_args_from_stdin = False
 
     for o, v in self.sub_opts:
       # TODO(PY3-ONLY): Delete this if block.
@@ -511,6 +630,8 @@ class UrlSignCommand(Command):
         use_service_account = True
       elif o == '-b':
         billing_project = v
+      elif o == '-I':
+        self.read_args_from_stdin = True
       else:
         self.RaiseInvalidArgumentException()
 
@@ -533,7 +654,11 @@ class UrlSignCommand(Command):
       raise CommandException('HTTP method must be one of'
                              '[GET|HEAD|PUT|DELETE|RESUMABLE]')
 
-    if not use_service_account and len(self.args) < 2:
+    num_url_args = len(self.args) - (0 if use_service_account else 1)
+    if self.read_args_from_stdin:
+      if num_url_args > 0:
+        raise CommandException('No URL arguments allowed with the -I flag.')
+    elif not use_service_account and num_url_args < 1:
       raise CommandException(
           'The command requires a key file argument and one or more '
           'URL arguments if the --use-service-account flag is missing. '
@@ -546,15 +671,16 @@ class UrlSignCommand(Command):
 
     return method, delta, content_type, passwd, region, use_service_account, billing_project
 
-  def _ProbeObjectAccessWithClient(self, key, use_service_account, provider,
-                                   client_email, gcs_path, generation, logger,
-                                   region, billing_project):
+  def _ProbeObjectAccessWithClient(self, api, key, use_service_account,
+                                   provider, client_email, gcs_path,
+                                   generation, logger, region,
+                                   billing_project):
     """Performs a head request against a signed URL to check for read access."""
 
     # Choose a reasonable time in the future; if the user's system clock is
     # 60 or more seconds behind the server's this will generate an error.
     signed_url = _GenSignedUrl(key=key,
-                               api=self.gsutil_api,
+                               api=api,
                                use_service_account=use_service_account,
                                provider=provider,
                                client_id=client_email,
@@ -591,49 +717,41 @@ class UrlSignCommand(Command):
       raise CommandException(error_string)
 
   def _EnumerateStorageUrls(self, in_urls):
-    ret = []
-
     for url_str in in_urls:
       if ContainsWildcard(url_str):
-        ret.extend([blr.storage_url for blr in self.WildcardIterator(url_str)])
+        for blr in self.WildcardIterator(url_str):
+          yield blr.storage_url
       else:
-        ret.append(StorageUrlFromString(url_str))
-
-    return ret
-
-  def RunCommand(self):
-    """Command entry point for signurl command."""
-    if not HAVE_CRYPTO:
-      raise CommandException(
-          'The signurl command requires the cryptography library (try pip '
-          'install cryptography)')
+        yield StorageUrlFromString(url_str)
 
-    method, delta, content_type, passwd, region, use_service_account, billing_project = (
-        self._ParseAndCheckSubOpts())
-    arg_start_index = 0 if use_service_account else 1
-    storage_urls = self._EnumerateStorageUrls(self.args[arg_start_index:])
-    region_cache = {}
-
-    key = None
-    if not use_service_account:
+  def _GetBucketRegion(self, bucket_name):
+    """Returns the region of a bucket, fetching it once per bucket."""
+    bucket_region = self.region_cache.get(bucket_name)
+    if bucket_region is None:
       try:
-        with open(self.args[0], 'rb') as f:
-          ks_contents = f.read()
-        try:
-          key, client_email = _ReadJSONKeystore(ks_contents, passwd)
-        except (ValueError, KeyError, json.JSONDecodeError):
-          # Ignore and try parsing as a pkcs12.
-          if not passwd:
-            passwd = getpass.getpass('Keystore password:')
-          key, client_email = _ReadKeystore(ks_contents, passwd)
-      except (OSError, IOError, CommandException) as e:
-        raise CommandException('Unable to parse private key from {0}: {1}'.format(
-            self.args[0], str(e)))
-    else:
-      client_email = self.gsutil_api.GetServiceAccountId(provider='gs')
-
-    text_util.print_to_fd('URL\tHTTP Method\tExpiration\tSigned URL')
-    for url in storage_urls:
+        _, bucket = self.GetSingleBucketUrlFromArg(
+            'gs://{}'.format(bucket_name), bucket_fields=['location'])
+      except Exception as e:
+        raise CommandException(
+            '{}: Failed to auto-detect location for bucket \'{}\'. Please '
+            'ensure you have storage.buckets.get permission on the bucket '
+            'or specify the bucket\'s location using the \'-r\' option.'.
+            format(e.__class__.__name__, bucket_name))
+      bucket_region = bucket.location.lower()
+      self.region_cache[bucket_name] = bucket_region
+    return bucket_region
+
+  def _GetSignUrlArgs(self, url_strs, region):
+    """Yields SignUrlArgs for each URL to sign.
+
+    Args:
+      url_strs: Iterable of URL strings, possibly containing wildcards.
+      region: Region given with the -r option, or _AUTO_DETECT_REGION.
+
+    Yields:
+      SignUrlArgs for each URL matched by url_strs.
+    """
+    for url in self._EnumerateStorageUrls(url_strs):
       if url.scheme != 'gs':
         raise CommandException('Can only create signed urls from gs:// urls')
       if url.IsBucket():
@@ -643,7 +761,7 @@ class UrlSignCommand(Command):
                                  'option. Run `gsutil help signurl` for more '
                                  'information about the \'-r\' option.')
         gcs_path = url.bucket_name
-        if method == 'RESUMABLE':
+        if self.method == 'RESUMABLE':
           raise CommandException('Resumable signed URLs require an object '
                                  'name.')
       else:
@@ -655,75 +773,67 @@ class UrlSignCommand(Command):
                                safe=b'/~'))
 
       if region == _AUTO_DETECT_REGION:
-        if url.bucket_name in region_cache:
-          bucket_region = region_cache[url.bucket_name]
-        else:
-          try:
-            _, bucket = self.GetSingleBucketUrlFromArg(
-                'gs://{}'.format(url.bucket_name), bucket_fields=['location'])
-          except Exception as e:
-            raise CommandException(
-                '{}: Failed to auto-detect location for bucket \'{}\'. Please '
-                'ensure you have storage.buckets.get permission on the bucket '
-                'or specify the bucket\'s location using the \'-r\' option.'.
-                format(e.__class__.__name__, url.bucket_name))
-          bucket_region = bucket.location.lower()
-          region_cache[url.bucket_name] = bucket_region
+        bucket_region = self._GetBucketRegion(url.bucket_name)
       else:
         bucket_region = region
-      final_url = _GenSignedUrl(key=key,
-                                api=self.gsutil_api,
-                                use_service_account=use_service_account,
-                                provider=url.scheme,
-                                client_id=client_email,
-                                method=method,
-                                duration=delta,
-                                gcs_path=gcs_path,
-                                generation=url.generation,
-                                logger=self.logger,
-                                region=bucket_region,
-                                content_type=content_type,
-                                billing_project=billing_project,
-                                string_to_sign_debug=True)
-
-      expiration = calendar.timegm((datetime.now(tz=timezone.utc).replace(tzinfo=None) + delta).utctimetuple())
-      expiration_dt = datetime.fromtimestamp(expiration)
-
-      time_str = expiration_dt.strftime('%Y-%m-%d %H:%M:%S')
-      # TODO(PY3-ONLY): Delete this if block.
-      if six.PY2:
-        time_str = time_str.decode(constants.UTF8)
-
-      url_info_str = '{0}\t{1}\t{2}\t{3}'.format(url.url_string, method,
-                                                 time_str, final_url)
-
-      # TODO(PY3-ONLY): Delete this if block.
-      if six.PY2:
-        url_info_str = url_info_str.encode(constants.UTF8)
+      yield SignUrlArgs(url, gcs_path, bucket_region)
 
+  def RunCommand(self):
+    """Command entry point for signurl command."""
+    if not HAVE_CRYPTO:
+      raise CommandException(
+          'The signurl command requires the cryptography library (try pip '
+          'install cryptography)')
 
-      text_util.print_to_fd(url_info_str)
+    (self.method, self.delta, self.content_type, passwd, region,
+     self.use_service_account, self.billing_project) = (
+         self._ParseAndCheckSubOpts())
+    arg_start_index = 0 if self.use_service_account else 1
+    if self.read_args_from_stdin:
+      url_strs = StdinIterator()
+    else:
+      url_strs = self.args[arg_start_index:]
 
-      response_code = self._ProbeObjectAccessWithClient(
-          key, use_service_account, url.scheme, client_email, gcs_path,
-          url.generation, self.logger, bucket_region, billing_project)
+    # Private keys can't be pickled, so the key is passed to worker processes
+    # in PEM encoding.
+    self.signing_key_pem = None
+    if not self.use_service_account:
+      try:
+        with open(self.args[0], 'rb') as f:
+          ks_contents = f.read()
+        try:
+          key, self.client_email = _ReadJSONKeystore(ks_contents, passwd)
+        except (ValueError, KeyError, json.JSONDecodeError):
+          # Ignore and try parsing as a pkcs12.
+          if not passwd:
+            passwd = getpass.getpass('Keystore password:')
+          key, self.client_email = _ReadKeystore(ks_contents, passwd)
+      except (OSError, IOError, CommandException) as e:
+        raise CommandException('Unable to parse private key from {0}: {1}'.format(
+            self.args[0], str(e)))
+      self.signing_key_pem = key.private_bytes(
+          serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+          serialization.NoEncryption())
+      _signing_keys[self.signing_key_pem] = key
+    else:
+      self.client_email = self.gsutil_api.GetServiceAccountId(provider='gs')
 
-      if response_code == 404:
-        if url.IsBucket() and method != 'PUT':
-          raise CommandException(
-              'Bucket {0} does not exist. Please create a bucket with '
-              'that name before a creating signed URL to access it.'.format(
-                  url))
-        else:
-          if method != 'PUT' and method != 'RESUMABLE':
-            raise CommandException(
-                'Object {0} does not exist. Please create/upload an object '
-                'with that name before a creating signed URL to access it.'.
-                format(url))
-      elif response_code == 403:
-        self.logger.warn(
-            '%s does not have permissions on %s, using this link will likely '
-            'result in a 403 error until at least READ permissions are granted',
-            client_email or 'The account', url)
+    # Auto-detected bucket regions are only cached for this invocation, so a
+    # bucket that was recreated elsewhere is never signed for its old region.
+    self.region_cache = {}
 
+    text_util.print_to_fd('URL\tHTTP Method\tExpiration\tSigned URL')
+    self.op_failure_count = 0
+    # URLs are expanded and signed as they are read, so memory use stays
+    # bounded however many URLs are signed.
+    self.Apply(_SignUrlFn,
+               self._GetSignUrlArgs(url_strs, region),
+               _SignUrlExceptionHandler, ('op_failure_count',),
+               arg_checker=DummyArgChecker,
+               fail_on_error=True)
+
+    # Errors are only collected rather than raised when signing in parallel.
+    if self.op_failure_count:
+      raise CommandException('%d URL(s) could not be signed.' %
+                             self.op_failure_count)
     return 0
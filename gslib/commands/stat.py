@@ -19,14 +19,18 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import unicode_literals
 
+import collections
+import itertools
 import logging
 import sys
 
+from apitools.base.py import encoding
 from gslib.bucket_listing_ref import BucketListingObject
 from gslib.cloud_api import AccessDeniedException
 from gslib.cloud_api import EncryptionException
 from gslib.cloud_api import NotFoundException
 from gslib.command import Command
+from gslib.command import DummyArgChecker
 from gslib.command_argument import CommandArgument
 from gslib.cs_api_map import ApiSelector
 from gslib.exception import CommandException
@@ -34,14 +38,18 @@ from gslib.exception import InvalidUrlError
 from gslib.exception import NO_URLS_MATCHED_TARGET
 from gslib.storage_url import ContainsWildcard
 from gslib.storage_url import StorageUrlFromString
+from gslib.third_party.storage_apitools import storage_v1_messages as apitools_messages
+from gslib.utils.cloud_api_helper import GetCloudApiInstance
 from gslib.utils.constants import NO_MAX
 from gslib.utils.ls_helper import ENCRYPTED_FIELDS
 from gslib.utils.ls_helper import PrintFullInfoAboutObject
 from gslib.utils.ls_helper import UNENCRYPTED_FULL_LISTING_FIELDS
 from gslib.utils.shim_util import GcloudStorageMap
+from gslib.utils.system_util import StdinIterator
 
 _SYNOPSIS = """
   gsutil stat url...
+  gsutil stat -I
 """
 
 _DETAILED_HELP_TEXT = ("""
@@ -86,8 +94,79 @@ _DETAILED_HELP_TEXT = ("""
   as expected:
 
     gsutil -q stat gs://some-bucket/some-subdir/file.txt
+
+  If you have a large number of objects to check, you might want to use the
+  ``gsutil -m`` option, which fetches the metadata of several objects at a
+  time. The results are still printed in the order the URLs were given.
+  You can also pass the URLs on stdin (one per line) instead of on the
+  command line, using the -I option:
+
+    some_program | gsutil -m -q stat -I
+
+
+<B>OPTIONS</B>
+  -I          Causes gsutil to read the list of object URLs to stat from
+              stdin.
 """)
 
+# Number of URLs whose metadata is fetched before printing their results.
+_STAT_CHUNK_SIZE = 1000
+
+# Arguments for fetching the metadata of the object at position index in the
+# URLs passed to the stat command.
+StatArgs = collections.namedtuple('StatArgs', ['index', 'url_str'])
+
+# Result of fetching the metadata of a single object. object_json is the
+# object metadata in MessageToJson form, or None if the object wasn't found or
+# (if access_denied is True) couldn't be read.
+StatResult = collections.namedtuple('StatResult',
+                                    ['index', 'object_json', 'access_denied'])
+
+
+def _GetObjectMetadata(gsutil_api, url, stat_fields):
+  """Gets the metadata of the object at url.
+
+  Args:
+    gsutil_api: gsutil Cloud API instance to use.
+    url: StorageUrl of the object.
+    stat_fields: Metadata fields to request.
+
+  Returns:
+    apitools Object with the requested fields, except for hashes of encrypted
+    objects whose encryption key isn't available.
+  """
+  try:
+    return gsutil_api.GetObjectMetadata(url.bucket_name,
+                                        url.object_name,
+                                        generation=url.generation,
+                                        provider=url.scheme,
+                                        fields=stat_fields)
+  except EncryptionException:
+    # Retry without requesting hashes.
+    return gsutil_api.GetObjectMetadata(url.bucket_name,
+                                        url.object_name,
+                                        generation=url.generation,
+                                        provider=url.scheme,
+                                        fields=UNENCRYPTED_FULL_LISTING_FIELDS)
+
+
+def _StatFunc(cls, args, thread_state=None):
+  """Worker function for fetching the metadata of a single object."""
+  gsutil_api = GetCloudApiInstance(cls, thread_state=thread_state)
+  try:
+    obj = _GetObjectMetadata(gsutil_api, StorageUrlFromString(args.url_str),
+                             ENCRYPTED_FIELDS + UNENCRYPTED_FULL_LISTING_FIELDS)
+  except AccessDeniedException:
+    return StatResult(args.index, None, True)
+  except NotFoundException:
+    return StatResult(args.index, None, False)
+  return StatResult(args.index, encoding.MessageToJson(obj), False)
+
+
+def _StatExceptionHandler(cls, e):
+  """Exception handler that reports errors and continues."""
+  cls.logger.error(str(e))
+
 
 # TODO: Add ability to stat buckets.
 class StatCommand(Command):
@@ -98,9 +177,9 @@ class StatCommand(Command):
       'stat',
       command_name_aliases=[],
       usage_synopsis=_SYNOPSIS,
-      min_args=1,
+      min_args=0,
       max_args=NO_MAX,
-      supported_sub_args='',
+      supported_sub_args='I',
       file_url_ok=False,
       provider_url_ok=False,
       urls_start_arg=0,
@@ -137,34 +216,85 @@ class StatCommand(Command):
 
   def RunCommand(self):
     """Command entry point for stat command."""
-    stat_fields = ENCRYPTED_FIELDS + UNENCRYPTED_FULL_LISTING_FIELDS
+    read_args_from_stdin = False
+    if self.sub_opts:
+      for o, _ in self.sub_opts:
+        if o == '-I':
+          read_args_from_stdin = True
+    if read_args_from_stdin:
+      if self.args:
+        raise CommandException('No URL arguments allowed with -I for stat.')
+      url_strs = StdinIterator()
+    else:
+      if not self.args:
+        self.RaiseWrongNumberOfArgumentsException()
+      url_strs = iter(self.args)
+
     found_nonmatching_arg = False
-    for url_str in self.args:
+    # Fetch and print results a chunk of URLs at a time, so that output starts
+    # promptly and memory use stays bounded for long lists of URLs.
+    while True:
+      url_strs_chunk = list(itertools.islice(url_strs, _STAT_CHUNK_SIZE))
+      if not url_strs_chunk:
+        break
+      if not self._StatUrls(url_strs_chunk):
+        found_nonmatching_arg = True
+    if found_nonmatching_arg:
+      return 1
+    return 0
+
+  def _StatUrls(self, url_strs):
+    """Prints the metadata of the objects matching the given URLs, in order.
+
+    The metadata of objects named without wildcards is fetched using Apply,
+    in parallel when the -m option is used.
+
+    Args:
+      url_strs: List of object URL strings.
+
+    Returns:
+      True if every URL matched an object, False otherwise.
+    """
+    stat_fields = ENCRYPTED_FIELDS + UNENCRYPTED_FULL_LISTING_FIELDS
+    for url_str in url_strs:
+      if not StorageUrlFromString(url_str).IsObject():
+        raise CommandException('The stat command only works with object URLs')
+    stat_args = [
+        StatArgs(index, url_str)
+        for index, url_str in enumerate(url_strs)
+        if not ContainsWildcard(url_str)
+    ]
+    stat_results = self.Apply(_StatFunc,
+                              stat_args,
+                              _StatExceptionHandler,
+                              arg_checker=DummyArgChecker,
+                              should_return_results=True,
+                              fail_on_error=True)
+    stat_results_by_index = {
+        stat_result.index: stat_result for stat_result in stat_results
+    }
+
+    all_args_matched = True
+    for index, url_str in enumerate(url_strs):
       arg_matches = 0
       url = StorageUrlFromString(url_str)
-      if not url.IsObject():
-        raise CommandException('The stat command only works with object URLs')
+      access_denied = False
       try:
         if ContainsWildcard(url_str):
           blr_iter = self.WildcardIterator(url_str).IterObjects(
               bucket_listing_fields=stat_fields)
         else:
-          try:
-            single_obj = self.gsutil_api.GetObjectMetadata(
-                url.bucket_name,
-                url.object_name,
-                generation=url.generation,
-                provider=url.scheme,
-                fields=stat_fields)
-          except EncryptionException:
-            # Retry without requesting hashes.
-            single_obj = self.gsutil_api.GetObjectMetadata(
-                url.bucket_name,
-                url.object_name,
-                generation=url.generation,
-                provider=url.scheme,
-                fields=UNENCRYPTED_FULL_LISTING_FIELDS)
-          blr_iter = [BucketListingObject(url, root_object=single_obj)]
+          stat_result = stat_results_by_index.get(index)
+          blr_iter = []
+          if stat_result is None:
+            # The fetch failed, and the error has already been reported.
+            pass
+          elif stat_result.access_denied:
+            access_denied = True
+          elif stat_result.object_json:
+            single_obj = encoding.JsonToMessage(apitools_messages.Object,
+                                                stat_result.object_json)
+            blr_iter = [BucketListingObject(url, root_object=single_obj)]
         for blr in blr_iter:
           if blr.IsObject():
             arg_matches += 1
@@ -172,17 +302,16 @@ class StatCommand(Command):
             if logging.getLogger().isEnabledFor(logging.INFO):
               PrintFullInfoAboutObject(blr, incl_acl=False)
       except AccessDeniedException:
-        if logging.getLogger().isEnabledFor(logging.INFO):
-          sys.stderr.write('You aren\'t authorized to read %s - skipping' %
-                           url_str + '\n')
+        access_denied = True
       except InvalidUrlError:
         raise
       except NotFoundException:
         pass
+      if access_denied and logging.getLogger().isEnabledFor(logging.INFO):
+        sys.stderr.write('You aren\'t authorized to read %s - skipping' %
+                         url_str + '\n')
       if not arg_matches:
         if logging.getLogger().isEnabledFor(logging.INFO):
           sys.stderr.write(NO_URLS_MATCHED_TARGET % url_str + '\n')
-        found_nonmatching_arg = True
-    if found_nonmatching_arg:
-      return 1
-    return 0
+        all_args_matched = False
+    return all_args_matched
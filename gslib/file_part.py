@@ -21,6 +21,46 @@ from __future__ import unicode_literals
 
 import os
 import io
+import threading
+
+# Descriptors shared by the PositionalFileParts of each file open in this
+# process, as {filename: [descriptor, number of open parts]}.
+_shared_fds = {}
+_shared_fds_lock = threading.Lock()
+
+
+def _AcquireSharedFd(filename):
+  with _shared_fds_lock:
+    entry = _shared_fds.get(filename)
+    if entry is None:
+      entry = [os.open(filename, os.O_RDONLY | getattr(os, 'O_BINARY', 0)), 0]
+      _shared_fds[filename] = entry
+    entry[1] += 1
+    return entry[0]
+
+
+def _ReleaseSharedFd(filename):
+  with _shared_fds_lock:
+    entry = _shared_fds[filename]
+    entry[1] -= 1
+    if not entry[1]:
+      os.close(entry[0])
+      del _shared_fds[filename]
+
+
+def OpenFilePart(filename, offset, length):
+  """Returns a PositionalFilePart if the platform supports it, else a FilePart.
+
+  Args:
+    filename: The name of the existing file, of which the object represents a
+              part.
+    offset: The position (in bytes) in the original file that corresponds to
+            the first byte of the part.
+    length: The total number of bytes in the part.
+  """
+  if hasattr(os, 'pread'):
+    return PositionalFilePart(filename, offset, length)
+  return FilePart(filename, offset, length)
 
 
 class FilePart(io.IOBase):
@@ -104,3 +144,65 @@ class FilePart(io.IOBase):
 
   def writelines(self, size=None):
     raise NotImplementedError('writelines is not implemented in FilePart.')
+
+
+class PositionalFilePart(FilePart):
+  """FilePart that reads with os.pread from a shared file descriptor.
+
+  All PositionalFileParts of a file that are open in a process read from the
+  same descriptor, each at its own position, so that uploading many components
+  of a large file neither opens a descriptor nor allocates a read buffer per
+  component.
+  """
+
+  # pylint: disable=super-init-not-called
+  def __init__(self, filename, offset, length):
+    """Initializes the PositionalFilePart.
+
+    Args:
+      filename: The name of the existing file, of which this object represents
+                a part.
+      offset: The position (in bytes) in the original file that corresponds to
+              the first byte of the PositionalFilePart.
+      length: The total number of bytes in the PositionalFilePart.
+    """
+    self._filename = filename
+    self._fd = None
+    self._fd = _AcquireSharedFd(filename)
+    self.length = length
+    self._start = offset
+    self._end = self._start + self.length
+    self._position = self._start
+
+  def tell(self):
+    return self._position - self._start
+
+  def read(self, size=-1):
+    if self._fd is None:
+      raise ValueError('I/O operation on closed file.')
+    if size < 0:
+      size = self.length
+    size = min(size, self._end - self._position)  # Only read to our EOF
+    data = []
+    while size > 0:
+      chunk = os.pread(self._fd, size, self._position)
+      if not chunk:
+        break
+      data.append(chunk)
+      self._position += len(chunk)
+      size -= len(chunk)
+    return b''.join(data)
+
+  def seek(self, offset, whence=os.SEEK_SET):
+    if whence == os.SEEK_END:
+      self._position = offset + self._end
+    elif whence == os.SEEK_CUR:
+      self._position += offset
+    else:
+      self._position = self._start + offset
+    return self.tell()
+
+  def close(self):
+    if self._fd is not None:
+      self._fd = None
+      _ReleaseSharedFd(self._filename)
@@ -32,6 +32,7 @@ import traceback
 
 import six
 
+from apitools.base.py import batch as apitools_batch
 from apitools.base.py import encoding
 from apitools.base.py import exceptions as apitools_exceptions
 from apitools.base.py import http_wrapper as apitools_http_wrapper
@@ -79,14 +80,18 @@ from gslib.tracker_file import HashRewriteParameters
 from gslib.tracker_file import ReadRewriteTrackerFile
 from gslib.tracker_file import WriteRewriteTrackerFile
 from gslib.utils.boto_util import GetCertsFile
+from gslib.utils.boto_util import GetDeleteBatchSize
 from gslib.utils.boto_util import GetGcsJsonApiVersion
 from gslib.utils.boto_util import GetJsonResumableChunkSize
 from gslib.utils.boto_util import GetMaxRetryDelay
 from gslib.utils.boto_util import GetNewHttp
 from gslib.utils.boto_util import GetNumRetries
+from gslib.utils.boto_util import GetPatchBatchSize
 from gslib.utils.boto_util import JsonResumableChunkSizeDefined
 from gslib.utils.cloud_api_helper import ListToGetFields
 from gslib.utils.cloud_api_helper import ValidateDstObjectMetadata
+from gslib.utils.connection_pool_util import PooledHTTPSConnectionWithTimeout
+from gslib.utils.connection_pool_util import ReleaseHttpConnections
 from gslib.utils.constants import IAM_POLICY_VERSION
 from gslib.utils.constants import NUM_OBJECTS_PER_LIST_PAGE
 from gslib.utils.constants import REQUEST_REASON_ENV_VAR
@@ -122,6 +127,9 @@ NotificationAdditionalProperty = (
 
 NUM_BUCKETS_PER_LIST_PAGE = 1000
 
+# Status codes for which individual calls within a batch request are retried.
+BATCH_RETRYABLE_STATUS_CODES = [429, 500, 502, 503, 504]
+
 TRANSLATABLE_APITOOLS_EXCEPTIONS = (apitools_exceptions.HttpError,
                                     apitools_exceptions.StreamExhausted,
                                     apitools_exceptions.TransferError,
@@ -239,6 +247,9 @@ class GcsJsonApi(CloudApi):
 
     self.certs_file = GetCertsFile()
     self.http = GetNewHttp()
+    # apitools looks up the connection class to use for metadata requests by
+    # URL scheme; use one that takes its initial socket from the pool.
+    self.http.connections = {'https': PooledHTTPSConnectionWithTimeout}
     SetUpJsonCredentialsAndCache(self, logger, credentials=credentials)
 
     # Re-use download and upload connections. This class is only called
@@ -301,6 +312,8 @@ class GcsJsonApi(CloudApi):
     self.api_version = GetGcsJsonApiVersion()
     self.url_base = (self.http_base + self.host_base + self.host_port + '/' +
                      'storage/' + self.api_version + '/')
+    self.batch_url = (self.http_base + self.host_base + self.host_port +
+                      '/batch/storage/' + self.api_version)
 
     self.global_params = apitools_messages.StandardQueryParameters(
         trace='token:%s' % trace_token) if trace_token else None
@@ -1191,8 +1204,11 @@ class GcsJsonApi(CloudApi):
         digesters=digesters)
     download_http_class = callback_class_factory.GetConnectionClass()
 
-    # Point our download HTTP at our download stream.
+    # Point our download HTTP at our download stream. The connection used by
+    # the previous transfer is returned to the pool so that its socket can be
+    # reused by this one.
     self.download_http.stream = download_stream
+    ReleaseHttpConnections(self.download_http)
     self.download_http.connections = {'https': download_http_class}
 
     if serialization_data:
@@ -1408,6 +1424,86 @@ class GcsJsonApi(CloudApi):
                           fields=None,
                           user_project=None):
     """See CloudApi class for function doc strings."""
+    (apitools_request, global_params,
+     apitools_include_fields) = self._GetObjectsPatchRequest(
+         bucket_name,
+         object_name,
+         metadata,
+         canned_acl=canned_acl,
+         generation=generation,
+         preconditions=preconditions,
+         fields=fields)
+
+    try:
+      with self.api_client.IncludeFields(apitools_include_fields):
+        return self.api_client.objects.Patch(apitools_request,
+                                             global_params=global_params)
+    except TRANSLATABLE_APITOOLS_EXCEPTIONS as e:
+      self._TranslateExceptionAndRaise(e,
+                                       bucket_name=bucket_name,
+                                       object_name=object_name,
+                                       generation=generation)
+
+  def PatchObjectsMetadata(self, objects_to_patch, provider=None):
+    """See CloudApi class for function doc strings."""
+    objects_to_patch = list(objects_to_patch)
+    batch_size = GetPatchBatchSize()
+    if len(objects_to_patch) < 2 or batch_size < 2:
+      return super(GcsJsonApi, self).PatchObjectsMetadata(objects_to_patch)
+
+    batch_request = apitools_batch.BatchApiRequest(
+        batch_url=self.batch_url,
+        retryable_codes=BATCH_RETRYABLE_STATUS_CODES)
+    for (bucket_name, object_name, metadata, generation,
+         preconditions) in objects_to_patch:
+      (apitools_request, global_params,
+       apitools_include_fields) = self._GetObjectsPatchRequest(
+           bucket_name,
+           object_name,
+           metadata,
+           generation=generation,
+           preconditions=preconditions,
+           fields=['id'])
+      # The request body is serialized when the request is added.
+      with self.api_client.IncludeFields(apitools_include_fields):
+        batch_request.Add(self.api_client.objects,
+                          'Patch',
+                          apitools_request,
+                          global_params=global_params)
+
+    def _PatchObjectIndividually(object_to_patch):
+      return super(GcsJsonApi, self).PatchObjectsMetadata([object_to_patch])[0]
+
+    return self._ExecuteObjectsBatchRequest(
+        batch_request, batch_size,
+        [(bucket_name, object_name, generation)
+         for bucket_name, object_name, _, generation, _ in objects_to_patch],
+        [functools.partial(_PatchObjectIndividually, object_to_patch)
+         for object_to_patch in objects_to_patch])
+
+  def _GetObjectsPatchRequest(self,
+                              bucket_name,
+                              object_name,
+                              metadata,
+                              canned_acl=None,
+                              generation=None,
+                              preconditions=None,
+                              fields=None):
+    """Builds an objects.patch request.
+
+    Args:
+      bucket_name: Bucket containing the object.
+      object_name: Object name for object.
+      metadata: Object object defining metadata to be updated.
+      canned_acl: Canned ACL to be set on the object.
+      generation: Generation (or version) of the object to update.
+      preconditions: Preconditions for the request.
+      fields: If present, return only these Object metadata fields.
+
+    Returns:
+      (StorageObjectsPatchRequest, StandardQueryParameters, list of fields
+      that must be included in the request body even though they are empty).
+    """
     projection = (apitools_messages.StorageObjectsPatchRequest.
                   ProjectionValueValuesEnum.noAcl)
     if self._FieldsContainsAclField(fields):
@@ -1452,16 +1548,7 @@ class GcsJsonApi(CloudApi):
     global_params = apitools_messages.StandardQueryParameters()
     if fields:
       global_params.fields = ','.join(set(fields))
-
-    try:
-      with self.api_client.IncludeFields(apitools_include_fields):
-        return self.api_client.objects.Patch(apitools_request,
-                                             global_params=global_params)
-    except TRANSLATABLE_APITOOLS_EXCEPTIONS as e:
-      self._TranslateExceptionAndRaise(e,
-                                       bucket_name=bucket_name,
-                                       object_name=object_name,
-                                       generation=generation)
+    return apitools_request, global_params, apitools_include_fields
 
   def _UploadObject(self,
                     upload_stream,
@@ -1510,6 +1597,7 @@ class GcsJsonApi(CloudApi):
         debug=self.debug)
 
     upload_http_class = callback_class_factory.GetConnectionClass()
+    ReleaseHttpConnections(self.upload_http)
     self.upload_http.connections = {
         'http': upload_http_class,
         'https': upload_http_class,
@@ -1958,6 +2046,96 @@ class GcsJsonApi(CloudApi):
                                        object_name=object_name,
                                        generation=generation)
 
+  def DeleteObjects(self, objects_to_delete, preconditions=None,
+                    provider=None):
+    """See CloudApi class for function doc strings."""
+    objects_to_delete = list(objects_to_delete)
+    batch_size = GetDeleteBatchSize()
+    if len(objects_to_delete) < 2 or batch_size < 2:
+      return super(GcsJsonApi, self).DeleteObjects(objects_to_delete,
+                                                   preconditions=preconditions)
+    if not preconditions:
+      preconditions = Preconditions()
+
+    batch_request = apitools_batch.BatchApiRequest(
+        batch_url=self.batch_url,
+        retryable_codes=BATCH_RETRYABLE_STATUS_CODES)
+    for bucket_name, object_name, generation in objects_to_delete:
+      batch_request.Add(
+          self.api_client.objects, 'Delete',
+          apitools_messages.StorageObjectsDeleteRequest(
+              bucket=bucket_name,
+              object=object_name,
+              generation=long(generation) if generation else None,
+              ifGenerationMatch=preconditions.gen_match,
+              ifMetagenerationMatch=preconditions.meta_gen_match,
+              userProject=self.user_project))
+
+    def _DeleteObjectIndividually(object_to_delete):
+      return super(GcsJsonApi, self).DeleteObjects(
+          [object_to_delete], preconditions=preconditions)[0]
+
+    return self._ExecuteObjectsBatchRequest(
+        batch_request, batch_size, objects_to_delete,
+        [functools.partial(_DeleteObjectIndividually, object_to_delete)
+         for object_to_delete in objects_to_delete])
+
+  def _ExecuteObjectsBatchRequest(self, batch_request, batch_size, objects,
+                                  individual_request_funcs):
+    """Executes a batch request containing one call per object.
+
+    Args:
+      batch_request: apitools BatchApiRequest to execute.
+      batch_size: Maximum number of calls per HTTP request.
+      objects: List of (bucket_name, object_name, generation) tuples naming
+               the object of each call, used for translating exceptions.
+      individual_request_funcs: List of functions, one per call, that perform
+               the call as a regular request and return None or the
+               exception that made it fail.
+
+    Returns:
+      List containing, for each call, None if it succeeded or the exception
+      that made it fail.
+    """
+    try:
+      # Only the calls that failed with a retryable status are retried, with
+      # the same backoff as other requests.
+      for retries in range(self.num_retries + 1):
+        if retries:
+          time.sleep(
+              CalculateWaitForRetry(retries, max_wait=self.max_retry_wait))
+        api_calls = batch_request.Execute(self.api_client.http,
+                                          sleep_between_polls=0,
+                                          max_retries=1,
+                                          max_batch_size=batch_size)
+        if all(api_call.terminal_state for api_call in api_calls):
+          break
+    except (apitools_exceptions.Error, httplib2.HttpLib2Error,
+            socket.error) as e:
+      # The batch request as a whole failed, possibly after some of its calls
+      # were sent, so perform whatever is left one call at a time.
+      self.logger.debug('Batch request failed, retrying calls '
+                        'individually: %s', GetPrintableExceptionString(e))
+      api_calls = batch_request.api_requests
+
+    results = []
+    for (bucket_name, object_name, generation), api_call, request_func in zip(
+        objects, api_calls, individual_request_funcs):
+      if not api_call.terminal_state:
+        # The call was never sent or kept failing with a retryable status;
+        # fall back to a regular request with its usual retry handling.
+        results.append(request_func())
+      elif api_call.is_error:
+        e = api_call.exception
+        results.append(
+            self._TranslateApitoolsException(e,
+                                             bucket_name=bucket_name,
+                                             object_name=object_name,
+                                             generation=generation) or e)
+      else:
+        results.append(None)
+    return results
+
   def ComposeObject(self,
                     src_objs_metadata,
                     dst_obj_metadata,
@@ -47,6 +47,7 @@ from gslib.utils.boto_util import GetCredentialStoreFilename
 from gslib.utils.boto_util import GetGceCredentialCacheFilename
 from gslib.utils.boto_util import GetGcsJsonApiVersion
 from gslib.utils.constants import UTF8
+from gslib.utils.credential_refresh_util import RegisterCredentialsForRefresh
 from gslib.utils.wrapped_credentials import WrappedCredentials
 from google.auth import _helpers
 from google.auth.crypt import base as crypt_base
@@ -254,6 +255,12 @@ def SetUpJsonCredentialsAndCache(api, logger, credentials=None):
         type(cached_cred) != oauth2client.client.OAuth2Credentials):
       api.credentials = cached_cred
 
+  # Refresh the access token in the background before it expires, so that
+  # requests don't stall on a refresh in the middle of a transfer.
+  RegisterCredentialsForRefresh(api.credentials,
+                                status_queue=getattr(api, 'status_queue',
+                                                     None))
+
 
 def _CheckAndGetCredentials(logger):
   """Returns credentials from the configuration file, if any are present.
@@ -38,6 +38,7 @@ from gslib.progress_callback import ProgressCallbackWithTimeout
 from gslib.utils.constants import DEBUGLEVEL_DUMP_REQUESTS
 from gslib.utils.constants import SSL_TIMEOUT_SEC
 from gslib.utils.constants import TRANSFER_BUFFER_SIZE
+from gslib.utils.connection_pool_util import PooledHTTPSConnectionWithTimeout
 from gslib.utils.constants import UTF8
 from gslib.utils import text_util
 import httplib2
@@ -104,7 +105,7 @@ class UploadCallbackConnectionClassFactory(object):
     outer_logger = self.logger
     outer_debug = self.debug
 
-    class UploadCallbackConnection(httplib2.HTTPSConnectionWithTimeout):
+    class UploadCallbackConnection(PooledHTTPSConnectionWithTimeout):
       """Connection class override for uploads."""
       bytes_uploaded_container = outer_bytes_uploaded_container
       # After we instantiate this class, apitools will check with the server
@@ -121,7 +122,7 @@ class UploadCallbackConnectionClassFactory(object):
 
       def __init__(self, *args, **kwargs):
         kwargs['timeout'] = SSL_TIMEOUT_SEC
-        httplib2.HTTPSConnectionWithTimeout.__init__(self, *args, **kwargs)
+        PooledHTTPSConnectionWithTimeout.__init__(self, *args, **kwargs)
 
       # Override httplib.HTTPConnection._send_output for debug logging.
       # Because the distinction between headers and message body occurs
@@ -342,7 +343,7 @@ class DownloadCallbackConnectionClassFactory(object):
   def GetConnectionClass(self):
     """Returns a connection class that overrides getresponse."""
 
-    class DownloadCallbackConnection(httplib2.HTTPSConnectionWithTimeout):
+    class DownloadCallbackConnection(PooledHTTPSConnectionWithTimeout):
       """Connection class override for downloads."""
       outer_total_size = self.total_size
       outer_digesters = self.digesters
@@ -353,7 +354,7 @@ class DownloadCallbackConnectionClassFactory(object):
 
       def __init__(self, *args, **kwargs):
         kwargs['timeout'] = SSL_TIMEOUT_SEC
-        httplib2.HTTPSConnectionWithTimeout.__init__(self, *args, **kwargs)
+        PooledHTTPSConnectionWithTimeout.__init__(self, *args, **kwargs)
 
       def getresponse(self, buffering=False):
         """Wraps an HTTPResponse to perform callbacks and hashing.
@@ -107,6 +107,10 @@ _GA_LABEL_MAP = {
     'Slowest Thread Throughput': 'cm12',
     'Fastest Thread Throughput': 'cm13',
     'Disk I/O Time': 'cm14',
+    'Num Connections Opened': 'cm15',
+    'Num Credential Refreshes': 'cm16',
+    'Credential Refresh Time': 'cm17',
+    'Num Metadata Requests Saved': 'cm18',
 }
 
 
@@ -229,6 +233,7 @@ class MetricsCollector(object):
         ('GSUtil', 'software_update_check_period'),
         ('GSUtil', 'tab_completion_timeout'),
         ('OAuth2', 'oauth2_refresh_retries'),
+        ('OAuth2', 'token_refresh_margin'),
     ):
       GetAndValidateConfigValue(section=section,
                                 category=small_int_category,
@@ -458,6 +463,15 @@ class MetricsCollector(object):
       self.num_retryable_service_errors = 0
       self.num_retryable_network_errors = 0
       self.provider_types = set()
+      # The number of new HTTP connections opened, as opposed to reused.
+      self.num_connections_opened = 0
+      # The number of access tokens refreshed ahead of their expiry, and the
+      # total time in seconds spent refreshing them.
+      self.num_credential_refreshes = 0
+      self.credential_refresh_time = 0
+      # The number of metadata requests served from a command's metadata
+      # cache or coalesced with an identical concurrent request.
+      self.num_metadata_requests_saved = 0
 
       # Store the disk stats at the beginning of the command so we can calculate
       # time spent on disk I/O.
@@ -542,6 +556,14 @@ class MetricsCollector(object):
                                         service errors that occurred.
         - num_retryable_network_errors: The additional number of retryable
                                         network errors that occurred.
+        - num_connections_opened: The additional number of new HTTP
+                                  connections that were opened.
+        - num_credential_refreshes: The additional number of access tokens
+                                    refreshed ahead of their expiry.
+        - credential_refresh_time: The additional amount of time spent
+                                   refreshing access tokens.
+        - num_metadata_requests_saved: The additional number of metadata
+                                       requests that were avoided.
         - num_processes: The number of processes used in a call to Apply.
         - num_threads: The number of threads used in a call to Apply.
         - num_objects_transferred: The total number of objects transferred, as
@@ -576,7 +598,11 @@ class MetricsCollector(object):
       # These parameters need to be incremented.
       if param_name in ('thread_idle_time', 'thread_execution_time',
                         'num_retryable_service_errors',
-                        'num_retryable_network_errors'):
+                        'num_retryable_network_errors',
+                        'num_connections_opened',
+                        'num_credential_refreshes',
+                        'credential_refresh_time',
+                        'num_metadata_requests_saved'):
         cur_value = getattr(self.perf_sum_params, param_name)
         setattr(self.perf_sum_params, param_name, cur_value + param)
 
@@ -650,6 +676,9 @@ class MetricsCollector(object):
         ('num_threads', 'Num Threads'),
         ('num_retryable_service_errors', 'Num Retryable Service Errors'),
         ('num_retryable_network_errors', 'Num Retryable Network Errors'),
+        ('num_connections_opened', 'Num Connections Opened'),
+        ('num_credential_refreshes', 'Num Credential Refreshes'),
+        ('num_metadata_requests_saved', 'Num Metadata Requests Saved'),
         ('avg_throughput', 'Average Overall Throughput'),
         ('num_objects_transferred', 'Number of Files/Objects Transferred'),
         ('total_bytes_transferred', 'Size of Files/Objects Transferred'),
@@ -657,6 +686,9 @@ class MetricsCollector(object):
       custom_params[_GA_LABEL_MAP[label]] = getattr(self.perf_sum_params,
                                                     attr_name)
 
+    custom_params[_GA_LABEL_MAP['Credential Refresh Time']] = _GetTimeInMillis(
+        self.perf_sum_params.credential_refresh_time)
+
     # Calculate the disk stats again to calculate deltas of time spent on I/O.
     if system_util.IS_LINUX:
       disk_start = self.perf_sum_params.disk_counters_start
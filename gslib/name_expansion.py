@@ -40,6 +40,8 @@ from gslib.exception import NO_URLS_MATCHED_TARGET
 from gslib.plurality_checkable_iterator import PluralityCheckableIterator
 from gslib.seek_ahead_thread import SeekAheadResult
 from gslib.third_party.storage_apitools import storage_v1_messages as apitools_messages
+from gslib.utils.parallelism_framework_util import TaskArgsBatch
+from gslib.utils.parallelism_framework_util import TaskArgsBatchingIterator
 import gslib.wildcard_iterator
 from gslib.wildcard_iterator import StorageUrlFromString
 
@@ -402,13 +404,32 @@ class SeekAheadNameExpansionIterator(object):
 
   def __iter__(self):
     for name_expansion_result in self.name_expansion_iterator:
-      if self.count_data_bytes and name_expansion_result.expanded_result:
-        iterated_metadata = encoding.JsonToMessage(
-            apitools_messages.Object, name_expansion_result.expanded_result)
-        iterated_size = iterated_metadata.size or 0
-        yield SeekAheadResult(data_bytes=iterated_size)
-      else:
-        yield SeekAheadResult()
+      yield self.GetSeekAheadResult(name_expansion_result)
+
+  def GetSeekAheadResult(self, name_expansion_result):
+    """Returns a SeekAheadResult estimating the work for a single result.
+
+    Args:
+      name_expansion_result: NameExpansionResult, or another result (such as a
+          CopyObjectInfo) that carries an expanded_result. May also be a
+          TaskArgsBatch of such results.
+
+    Returns:
+      SeekAheadResult for name_expansion_result.
+    """
+    if isinstance(name_expansion_result, TaskArgsBatch):
+      seek_ahead_results = [
+          self.GetSeekAheadResult(result) for result in name_expansion_result
+      ]
+      return SeekAheadResult(
+          est_num_ops=sum(result.est_num_ops for result in seek_ahead_results),
+          data_bytes=sum(result.data_bytes for result in seek_ahead_results))
+    expanded_result = getattr(name_expansion_result, 'expanded_result', None)
+    if self.count_data_bytes and expanded_result:
+      iterated_metadata = encoding.JsonToMessage(apitools_messages.Object,
+                                                 expanded_result)
+      return SeekAheadResult(data_bytes=iterated_metadata.size or 0)
+    return SeekAheadResult()
 
 
 def NameExpansionIterator(command_name,
@@ -478,6 +499,25 @@ def NameExpansionIterator(command_name,
   return name_expansion_iterator
 
 
+def _GetNameExpansionResultProvider(name_expansion_result):
+  return name_expansion_result.expanded_storage_url.scheme
+
+
+def BatchNameExpansionIterator(name_expansion_iterator, batch_size):
+  """Groups NameExpansionResults into TaskArgsBatches for batch requests.
+
+  Args:
+    name_expansion_iterator: Iterator of NameExpansionResults.
+    batch_size: Maximum number of NameExpansionResults per batch.
+
+  Returns:
+    Iterator yielding TaskArgsBatches of consecutive NameExpansionResults for
+    the same provider.
+  """
+  return TaskArgsBatchingIterator(name_expansion_iterator, batch_size,
+                                  _GetNameExpansionResultProvider)
+
+
 class _NonContainerTuplifyIterator(object):
   """Iterator that produces the tuple (False, blr) for each iterated value.
 
@@ -21,6 +21,7 @@ from __future__ import unicode_literals
 
 import json
 import logging
+import os
 import traceback
 
 from apitools.base.py import exceptions as apitools_exceptions
@@ -70,11 +71,20 @@ class PubsubApi(object):
 
     self.certs_file = GetCertsFile()
     self.http = GetNewHttp()
-    self.http_base = 'https://'
-    self.host_base = config.get('Credentials', 'gs_pubsub_host',
-                                'pubsub.googleapis.com')
-    gs_pubsub_port = config.get('Credentials', 'gs_pubsub_port', None)
-    self.host_port = (':' + gs_pubsub_port) if gs_pubsub_port else ''
+    emulator_host = os.environ.get('PUBSUB_EMULATOR_HOST')
+    if emulator_host:
+      # The Cloud Pub/Sub emulator serves plain HTTP and doesn't authenticate
+      # requests.
+      self.http_base = 'http://'
+      self.host_base = emulator_host
+      self.host_port = ''
+      credentials = credentials or NoOpCredentials()
+    else:
+      self.http_base = 'https://'
+      self.host_base = config.get('Credentials', 'gs_pubsub_host',
+                                  'pubsub.googleapis.com')
+      gs_pubsub_port = config.get('Credentials', 'gs_pubsub_port', None)
+      self.host_port = (':' + gs_pubsub_port) if gs_pubsub_port else ''
     self.url_base = (self.http_base + self.host_base + self.host_port)
 
     SetUpJsonCredentialsAndCache(self, logger, credentials=credentials)
@@ -140,6 +150,67 @@ class PubsubApi(object):
     except TRANSLATABLE_APITOOLS_EXCEPTIONS as e:
       self._TranslateExceptionAndRaise(e, topic_name=topic_name)
 
+  def Pull(self, subscription_name, max_messages):
+    """Pulls messages from a subscription.
+
+    The service returns once some messages are available or after a short
+    while without any.
+
+    Args:
+      subscription_name: Full subscription name, i.e.
+          projects/{project}/subscriptions/{subscription}.
+      max_messages: Maximum number of messages to return.
+
+    Returns:
+      List of ReceivedMessages, empty if no messages are available.
+    """
+    pull_request = apitools_messages.PullRequest(maxMessages=max_messages)
+    request = apitools_messages.PubsubProjectsSubscriptionsPullRequest(
+        subscription=subscription_name, pullRequest=pull_request)
+    try:
+      return self.api_client.projects_subscriptions.Pull(
+          request).receivedMessages
+    except TRANSLATABLE_APITOOLS_EXCEPTIONS as e:
+      self._TranslateExceptionAndRaise(e)
+
+  def Acknowledge(self, subscription_name, ack_ids):
+    """Acknowledges pulled messages so that they aren't delivered again.
+
+    Args:
+      subscription_name: Full subscription name, i.e.
+          projects/{project}/subscriptions/{subscription}.
+      ack_ids: Non-empty list of ackIds of ReceivedMessages to acknowledge.
+    """
+    acknowledge_request = apitools_messages.AcknowledgeRequest(ackIds=ack_ids)
+    request = apitools_messages.PubsubProjectsSubscriptionsAcknowledgeRequest(
+        subscription=subscription_name, acknowledgeRequest=acknowledge_request)
+    try:
+      return self.api_client.projects_subscriptions.Acknowledge(request)
+    except TRANSLATABLE_APITOOLS_EXCEPTIONS as e:
+      self._TranslateExceptionAndRaise(e)
+
+  def ModifyAckDeadline(self, subscription_name, ack_ids,
+                        ack_deadline_seconds):
+    """Changes the acknowledgement deadline of pulled messages.
+
+    Args:
+      subscription_name: Full subscription name, i.e.
+          projects/{project}/subscriptions/{subscription}.
+      ack_ids: Non-empty list of ackIds of ReceivedMessages.
+      ack_deadline_seconds: Seconds from now after which the messages are
+          delivered again unless they're acknowledged.
+    """
+    modify_request = apitools_messages.ModifyAckDeadlineRequest(
+        ackDeadlineSeconds=ack_deadline_seconds, ackIds=ack_ids)
+    request = (
+        apitools_messages.PubsubProjectsSubscriptionsModifyAckDeadlineRequest(
+            subscription=subscription_name,
+            modifyAckDeadlineRequest=modify_request))
+    try:
+      return self.api_client.projects_subscriptions.ModifyAckDeadline(request)
+    except TRANSLATABLE_APITOOLS_EXCEPTIONS as e:
+      self._TranslateExceptionAndRaise(e)
+
   def _TranslateExceptionAndRaise(self, e, topic_name=None):
     """Translates an HTTP exception and raises the translated or original value.
 
@@ -19,6 +19,10 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import unicode_literals
 
+import collections
+import os
+import pickle
+import tempfile
 import threading
 import time
 
@@ -28,6 +32,10 @@ from gslib.utils import parallelism_framework_util
 
 _PutToQueueWithTimeout = parallelism_framework_util.PutToQueueWithTimeout
 
+# Maximum number of listed results that a SharedListingIterator keeps in memory
+# on behalf of the ProducerThread; further results are spilled to disk.
+MAX_BUFFERED_LISTING_RESULTS = 10000
+
 
 class SeekAheadResult(object):
   """Result class for seek_ahead_iterator results.
@@ -126,3 +134,186 @@ class SeekAheadThread(threading.Thread):
         self.status_queue,
         thread_message.SeekAheadMessage(num_objects, num_data_bytes,
                                         time.time()))
+
+
+class _IteratorException(object):
+  """Wraps an exception raised by an iterator so it can be re-raised later."""
+
+  def __init__(self, exception):
+    self.exception = exception
+
+
+class _SpilledItemPlaceholder(object):
+  """Stands in for an item that is kept in memory in a _SpillBuffer's file."""
+
+  def __init__(self, item_id):
+    self.item_id = item_id
+
+
+class _SpillBuffer(object):
+  """FIFO buffer that keeps a bounded number of items in memory.
+
+  Items added while the in-memory portion is full are pickled to a temporary
+  file and read back once the in-memory items have been consumed. Items that
+  can't be pickled (and exceptions, many of which can't be unpickled) are kept
+  in memory, with a placeholder in the file that keeps their position. This
+  class is not thread-safe.
+  """
+
+  def __init__(self, max_in_memory):
+    self.max_in_memory = max_in_memory
+    self._memory = collections.deque()
+    self._spill_file = None
+    self._read_offset = 0
+    self._num_spilled = 0
+    # Maps placeholder IDs to the spilled items that are kept in memory.
+    self._unpicklable_items = {}
+    self._next_item_id = 0
+
+  def __len__(self):
+    return len(self._memory) + self._num_spilled
+
+  def Append(self, item):
+    if not self._num_spilled and len(self._memory) < self.max_in_memory:
+      self._memory.append(item)
+      return
+    data = None
+    if not isinstance(item, _IteratorException):
+      try:
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+      except (pickle.PicklingError, TypeError, AttributeError):
+        pass
+    if data is None:
+      self._next_item_id += 1
+      self._unpicklable_items[self._next_item_id] = item
+      data = pickle.dumps(_SpilledItemPlaceholder(self._next_item_id),
+                          pickle.HIGHEST_PROTOCOL)
+    if self._spill_file is None:
+      self._spill_file = tempfile.TemporaryFile(prefix='gsutil-seek-ahead-')
+    self._spill_file.seek(0, os.SEEK_END)
+    self._spill_file.write(data)
+    self._num_spilled += 1
+
+  def PopLeft(self):
+    if not self._memory:
+      self._ReadSpilledItems()
+    return self._memory.popleft()
+
+  def _ReadSpilledItems(self):
+    """Moves up to max_in_memory spilled items back into memory."""
+    self._spill_file.seek(self._read_offset)
+    while self._num_spilled and len(self._memory) < self.max_in_memory:
+      item = pickle.load(self._spill_file)
+      if isinstance(item, _SpilledItemPlaceholder):
+        item = self._unpicklable_items.pop(item.item_id)
+      self._memory.append(item)
+      self._num_spilled -= 1
+    self._read_offset = self._spill_file.tell()
+    if not self._num_spilled:
+      # Everything spilled has been read back, so start over with an empty
+      # file to keep it from growing indefinitely.
+      self._spill_file.seek(0)
+      self._spill_file.truncate()
+      self._read_offset = 0
+
+  def Close(self):
+    self._memory.clear()
+    self._num_spilled = 0
+    self._unpicklable_items.clear()
+    if self._spill_file is not None:
+      self._spill_file.close()
+      self._spill_file = None
+
+
+class SharedListingIterator(object):
+  """Shares a single iteration of the ProducerThread's arguments with seek-ahead.
+
+  Instead of listing everything a second time through a separate API instance,
+  the SeekAheadThread consumes IterSeekAheadResults, which advances the
+  ProducerThread's own iterator and buffers the results that the
+  ProducerThread has not consumed yet. Iterating this object yields buffered
+  results first and otherwise advances the underlying iterator directly;
+  results obtained that way are still reported to the SeekAheadThread, so the
+  estimate covers all iterated results no matter which thread listed them.
+
+  Exceptions raised by the underlying iterator while seeking ahead are
+  re-raised to the ProducerThread in the position they occurred.
+  """
+
+  def __init__(self,
+               args_iterator,
+               get_seek_ahead_result,
+               max_buffered_results=MAX_BUFFERED_LISTING_RESULTS):
+    """Instantiates a SharedListingIterator.
+
+    Args:
+      args_iterator: Iterator over the ProducerThread's arguments.
+      get_seek_ahead_result: Function that returns a SeekAheadResult
+          estimating the work for a single argument.
+      max_buffered_results: Number of buffered arguments to keep in memory
+          before spilling further arguments to disk.
+    """
+    self._args_iterator = iter(args_iterator)
+    self._get_seek_ahead_result = get_seek_ahead_result
+    self._lock = threading.Lock()
+    self._buffer = _SpillBuffer(max_buffered_results)
+    self._exhausted = False
+    # Work represented by arguments that were iterated directly by the
+    # ProducerThread and not yet reported via IterSeekAheadResults.
+    self._unreported_num_ops = 0
+    self._unreported_data_bytes = 0
+
+  def __iter__(self):
+    return self
+
+  def __next__(self):
+    with self._lock:
+      if len(self._buffer):
+        args = self._buffer.PopLeft()
+        if isinstance(args, _IteratorException):
+          raise args.exception
+        return args
+      if self._exhausted:
+        raise StopIteration
+      try:
+        args = next(self._args_iterator)
+      except StopIteration:
+        self._exhausted = True
+        raise
+      seek_ahead_result = self._get_seek_ahead_result(args)
+      self._unreported_num_ops += seek_ahead_result.est_num_ops
+      self._unreported_data_bytes += seek_ahead_result.data_bytes
+      return args
+
+  next = __next__  # Python 2 compatibility.
+
+  def IterSeekAheadResults(self):
+    """Yields SeekAheadResults for all arguments, listing ahead as needed."""
+    while True:
+      with self._lock:
+        if self._unreported_num_ops or self._unreported_data_bytes:
+          seek_ahead_result = SeekAheadResult(
+              est_num_ops=self._unreported_num_ops,
+              data_bytes=self._unreported_data_bytes)
+          self._unreported_num_ops = 0
+          self._unreported_data_bytes = 0
+        elif self._exhausted:
+          return
+        else:
+          try:
+            args = next(self._args_iterator)
+          except StopIteration:
+            self._exhausted = True
+            return
+          except Exception as e:  # pylint: disable=broad-except
+            self._buffer.Append(_IteratorException(e))
+            continue
+          self._buffer.Append(args)
+          seek_ahead_result = self._get_seek_ahead_result(args)
+      yield seek_ahead_result
+
+  def Close(self):
+    """Stops seeking ahead and releases buffered arguments."""
+    with self._lock:
+      self._exhausted = True
+      self._buffer.Close()
@@ -19,11 +19,15 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import unicode_literals
 
+import io
 import os
 import sys
 
+from gslib.bucket_listing_ref import BucketListingObject
 from gslib.cs_api_map import ApiSelector
 from gslib.exception import CommandException, NO_URLS_MATCHED_TARGET
+from gslib.exception import HashMismatchException
+from gslib.storage_url import StorageUrlFromString
 import gslib.tests.testcase as testcase
 from gslib.tests.testcase.integration_testcase import SkipForS3
 from gslib.tests.util import GenerationFromURI as urigen
@@ -33,7 +37,9 @@ from gslib.tests.util import SetBotoConfigForTest
 from gslib.tests.util import SetEnvironmentForTest
 from gslib.tests.util import TEST_ENCRYPTION_KEY1
 from gslib.tests.util import unittest
+from gslib.third_party.storage_apitools import storage_v1_messages as apitools_messages
 from gslib.utils import cat_helper
+from gslib.utils.hashing_helper import CalculateB64EncodedCrc32cFromContents
 from gslib.utils import shim_util
 
 from unittest import mock
@@ -271,7 +277,7 @@ class TestCatHelper(testcase.GsUtilUnitTestCase):
   """Unit tests for cat helper."""
 
   def test_cat_helper_runs_flush(self):
-    cat_command_mock = mock.Mock()
+    cat_command_mock = mock.Mock(parallel_operations=False)
     cat_helper_mock = cat_helper.CatHelper(command_obj=cat_command_mock)
 
     object_contents = '0123456789'
@@ -329,6 +335,121 @@ class TestCatHelper(testcase.GsUtilUnitTestCase):
     self.assertIn(write_flush_collector_mock.call_args_list[2:4],
                   [mock_part_one, mock_part_two])
 
+  def _RunCatHelperWithPrefetch(self, start_byte=0, end_byte=None):
+    """Cats two objects with prefetching and returns the output."""
+    contents = {'foo1': b'0123456789', 'foo2': b'abcdefghij'}
+    bucket_uri = self.CreateBucket(provider=self.default_provider)
+    for object_name in sorted(contents):
+      self.CreateObject(bucket_uri=bucket_uri,
+                        object_name=object_name,
+                        contents=contents[object_name])
+    cat_command_mock = mock.Mock(parallel_operations=True)
+    cat_command_mock.WildcardIterator.return_value = (
+        self._test_wildcard_iterator(suri(bucket_uri) + '/foo*'))
+
+    def _GetObjectMedia(unused_bucket_name, object_name, download_stream,
+                        start_byte=0, end_byte=None, **_):
+      download_stream.write(contents[object_name][start_byte:end_byte + 1])
+
+    fetch_api = mock.Mock()
+    fetch_api.GetObjectMedia.side_effect = _GetObjectMedia
+    out_fd = io.BytesIO()
+    # With 8 bytes of buffer over 2 threads, objects are fetched in 4 byte
+    # ranges.
+    with SetBotoConfigForTest([('GSUtil', 'stream_prefetch_buffer_size', '8'),
+                               ('GSUtil', 'stream_prefetch_threads', '2')]):
+      with mock.patch.object(cat_helper.StreamPrefetcher,
+                             '_CreateGsutilApi',
+                             return_value=fetch_api):
+        cat_helper.CatHelper(command_obj=cat_command_mock).CatUrlStrings(
+            [suri(bucket_uri) + '/foo*'],
+            start_byte=start_byte,
+            end_byte=end_byte,
+            cat_out_fd=out_fd)
+    self.assertFalse(cat_command_mock.gsutil_api.GetObjectMedia.called)
+    fetched_ranges = sorted(
+        (args[1], kwargs['start_byte'], kwargs['end_byte'])
+        for args, kwargs in fetch_api.GetObjectMedia.call_args_list)
+    return out_fd.getvalue(), fetched_ranges
+
+  def test_cat_helper_prefetches_ranges_in_order(self):
+    output, fetched_ranges = self._RunCatHelperWithPrefetch()
+    self.assertEqual(b'0123456789abcdefghij', output)
+    self.assertEqual([('foo1', 0, 3), ('foo1', 4, 7), ('foo1', 8, 9),
+                      ('foo2', 0, 3), ('foo2', 4, 7), ('foo2', 8, 9)],
+                     fetched_ranges)
+
+  def test_cat_helper_prefetches_requested_range(self):
+    output, fetched_ranges = self._RunCatHelperWithPrefetch(start_byte=-3)
+    self.assertEqual(b'789hij', output)
+    self.assertEqual([('foo1', 7, 9), ('foo2', 7, 9)], fetched_ranges)
+    output, fetched_ranges = self._RunCatHelperWithPrefetch(start_byte=2,
+                                                            end_byte=6)
+    self.assertEqual(b'23456cdefg', output)
+    self.assertEqual([('foo1', 2, 5), ('foo1', 6, 6), ('foo2', 2, 5),
+                      ('foo2', 6, 6)], fetched_ranges)
+
+  def _CatObjectWithPrefetchThreshold(self, contents, crc32c, out_fd):
+    """Cats an object as cp does when streaming to stdout.
+
+    Returns:
+      The calls made to fetch the object's ranges.
+    """
+    url = StorageUrlFromString('gs://bucket/obj')
+    cat_command_mock = mock.Mock(parallel_operations=False)
+    cat_command_mock.WildcardIterator.return_value.IterObjects.return_value = [
+        BucketListingObject(url,
+                            root_object=apitools_messages.Object(
+                                bucket='bucket',
+                                name='obj',
+                                size=len(contents),
+                                crc32c=crc32c,
+                                generation=1234))
+    ]
+
+    def _GetObjectMedia(unused_bucket_name, unused_object_name,
+                        download_stream, start_byte=0, end_byte=None, **_):
+      download_stream.write(contents[start_byte:end_byte + 1])
+
+    fetch_api = mock.Mock()
+    fetch_api.GetObjectMedia.side_effect = _GetObjectMedia
+    with SetBotoConfigForTest([('GSUtil', 'stream_prefetch_buffer_size', '8'),
+                               ('GSUtil', 'stream_prefetch_threads', '2'),
+                               ('GSUtil', 'test_assume_fast_crcmod', 'True')]):
+      with mock.patch.object(cat_helper.StreamPrefetcher,
+                             '_CreateGsutilApi',
+                             return_value=fetch_api):
+        cat_helper.CatHelper(command_obj=cat_command_mock).CatUrlStrings(
+            [url.url_string],
+            cat_out_fd=out_fd,
+            prefetch_threshold=len(contents),
+            validate_hashes=True)
+    self.assertEqual(3, fetch_api.GetObjectMedia.call_count)
+    return fetch_api.GetObjectMedia.call_args_list
+
+  def test_cat_helper_pins_prefetched_ranges_to_listed_generation(self):
+    contents = b'0123456789'
+    fetch_calls = self._CatObjectWithPrefetchThreshold(
+        contents, CalculateB64EncodedCrc32cFromContents(io.BytesIO(contents)),
+        io.BytesIO())
+    # The URL names the live object, but each range request must read the
+    # generation that was listed.
+    self.assertEqual([1234] * 3,
+                     [kwargs['generation'] for _, kwargs in fetch_calls])
+
+  def test_cat_helper_validates_prefetched_ranges(self):
+    contents = b'0123456789'
+    out_fd = io.BytesIO()
+    self._CatObjectWithPrefetchThreshold(
+        contents, CalculateB64EncodedCrc32cFromContents(io.BytesIO(contents)),
+        out_fd)
+    self.assertEqual(contents, out_fd.getvalue())
+
+    with self.assertRaises(HashMismatchException):
+      self._CatObjectWithPrefetchThreshold(
+          contents, CalculateB64EncodedCrc32cFromContents(io.BytesIO(b'x')),
+          io.BytesIO())
+
 
 class TestCatUnit(testcase.GsUtilUnitTestCase):
 
@@ -22,7 +22,9 @@ from __future__ import unicode_literals
 from six.moves import range
 from six.moves import range
 
+from gslib.commands.compose import COMPOSE_TEMP_NAMESPACE
 from gslib.commands.compose import MAX_COMPOSE_ARITY
+from gslib.commands.compose import SplitIntoComposeGroups
 from gslib.cs_api_map import ApiSelector
 import gslib.tests.testcase as testcase
 from gslib.tests.testcase.integration_testcase import SkipForS3
@@ -40,9 +42,9 @@ from gslib.project_id import PopulateProjectId
 class TestCompose(testcase.GsUtilIntegrationTestCase):
   """Integration tests for compose command."""
 
-  def check_n_ary_compose(self, num_components):
+  def check_n_ary_compose(self, num_components, bucket_uri=None):
     """Tests composing num_components object."""
-    bucket_uri = self.CreateBucket()
+    bucket_uri = bucket_uri or self.CreateBucket()
 
     data_list = [
         ('data-%d,' % i).encode('ascii') for i in range(num_components)
@@ -58,12 +60,13 @@ class TestCompose(testcase.GsUtilIntegrationTestCase):
     self.RunGsUtil(['compose'] + components + [composite.uri])
     self.assertEqual(composite.get_contents_as_string(), b''.join(data_list))
 
-  def test_compose_too_many_fails(self):
-    components = ['gs://b/component-obj'] * (MAX_COMPOSE_ARITY + 1)
-    stderr = self.RunGsUtil(['compose'] + components + ['gs://b/composite-obj'],
-                            expected_status=1,
-                            return_stderr=True)
-    self.assertIn('command accepts at most', stderr)
+  def test_compose_more_than_max_arity(self):
+    bucket_uri = self.CreateBucket()
+    self.check_n_ary_compose(MAX_COMPOSE_ARITY + 1, bucket_uri=bucket_uri)
+    # The intermediate objects have been deleted.
+    stdout = self.RunGsUtil(['ls', suri(bucket_uri)], return_stdout=True)
+    self.assertNotIn(COMPOSE_TEMP_NAMESPACE, stdout)
+    self.assertEqual(MAX_COMPOSE_ARITY + 2, len(stdout.splitlines()))
 
   def test_compose_too_few_fails(self):
     stderr = self.RunGsUtil(
@@ -380,3 +383,18 @@ class TestCompatibleCompose(testcase.GsUtilIntegrationTestCase):
       expected_msg = ('CommandException: "compose" called on URL with '
                       'unsupported provider (%s).\n' % 's3://b/o2')
       self.assertIn(expected_msg, stderr)
+
+
+class TestComposeUnit(testcase.GsUtilUnitTestCase):
+  """Unit tests for compose command."""
+
+  def test_split_into_compose_groups(self):
+    components = list(range(MAX_COMPOSE_ARITY))
+    self.assertEqual([components], SplitIntoComposeGroups(components))
+    # Groups are balanced rather than filled up one after the other.
+    components = list(range(MAX_COMPOSE_ARITY + 1))
+    groups = SplitIntoComposeGroups(components)
+    self.assertEqual([17, 16], [len(group) for group in groups])
+    self.assertEqual(components, [c for group in groups for c in group])
+    groups = SplitIntoComposeGroups(list(range(MAX_COMPOSE_ARITY * 3 + 2)))
+    self.assertEqual([25, 25, 24, 24], [len(group) for group in groups])
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for connection_pool_util.py."""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import socket
+
+from gslib.tests import testcase
+from gslib.tests.util import SetBotoConfigForTest
+from gslib.utils import connection_pool_util
+from gslib.utils.connection_pool_util import HttpConnectionPool
+from gslib.utils.connection_pool_util import PooledHTTPSConnectionWithTimeout
+
+from six import add_move, MovedModule
+
+add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+from six.moves import mock
+
+_KEY = ('storage.googleapis.com', 443)
+
+
+class TestConnectionPoolUtil(testcase.GsUtilUnitTestCase):
+  """Unit tests for the per-process HTTP connection pool."""
+
+  def setUp(self):
+    super(TestConnectionPoolUtil, self).setUp()
+    self.sockets = []
+
+  def tearDown(self):
+    for sock in self.sockets:
+      sock.close()
+    connection_pool_util.ResetHttpConnectionPool()
+    super(TestConnectionPoolUtil, self).tearDown()
+
+  def _GetIdleSocket(self):
+    """Returns a connected socket with no pending data."""
+    sock, peer = socket.socketpair()
+    self.sockets.extend([sock, peer])
+    return sock
+
+  def testCheckoutReturnsReleasedSocket(self):
+    pool = HttpConnectionPool(2, 30)
+    sock = self._GetIdleSocket()
+    self.assertIsNone(pool.Checkout(_KEY))
+    pool.Release(_KEY, sock)
+    self.assertIsNone(pool.Checkout(('other.host', 443)))
+    self.assertIs(sock, pool.Checkout(_KEY))
+    self.assertIsNone(pool.Checkout(_KEY))
+
+  def testCheckoutReturnsMostRecentlyReleasedSocket(self):
+    pool = HttpConnectionPool(2, 30)
+    first_sock = self._GetIdleSocket()
+    second_sock = self._GetIdleSocket()
+    pool.Release(_KEY, first_sock)
+    pool.Release(_KEY, second_sock)
+    self.assertIs(second_sock, pool.Checkout(_KEY))
+    self.assertIs(first_sock, pool.Checkout(_KEY))
+
+  def testReleaseClosesSocketWhenPoolIsFull(self):
+    pool = HttpConnectionPool(1, 30)
+    first_sock = self._GetIdleSocket()
+    second_sock = self._GetIdleSocket()
+    pool.Release(_KEY, first_sock)
+    pool.Release(_KEY, second_sock)
+    self.assertEqual(-1, second_sock.fileno())
+    self.assertIs(first_sock, pool.Checkout(_KEY))
+
+  def testCheckoutSkipsExpiredSocket(self):
+    pool = HttpConnectionPool(2, 30)
+    sock = self._GetIdleSocket()
+    with mock.patch.object(connection_pool_util.time, 'time',
+                           return_value=100):
+      pool.Release(_KEY, sock)
+    with mock.patch.object(connection_pool_util.time, 'time',
+                           return_value=131):
+      self.assertIsNone(pool.Checkout(_KEY))
+    self.assertEqual(-1, sock.fileno())
+
+  def testCheckoutSkipsSocketClosedByPeer(self):
+    pool = HttpConnectionPool(2, 30)
+    sock = self._GetIdleSocket()
+    # The peer is the last socket created by _GetIdleSocket.
+    self.sockets[-1].close()
+    pool.Release(_KEY, sock)
+    self.assertIsNone(pool.Checkout(_KEY))
+    self.assertEqual(-1, sock.fileno())
+
+  def testGetHttpConnectionPoolUsesBotoConfig(self):
+    connection_pool_util.ResetHttpConnectionPool()
+    with SetBotoConfigForTest([
+        ('GSUtil', 'http_connection_pool_size', '7'),
+        ('GSUtil', 'http_connection_pool_idle_timeout', '9')
+    ]):
+      pool = connection_pool_util.GetHttpConnectionPool()
+    self.assertEqual(7, pool.max_size)
+    self.assertEqual(9, pool.idle_timeout)
+    self.assertIs(pool, connection_pool_util.GetHttpConnectionPool())
+
+  def testGetHttpConnectionPoolReplacesPoolAfterFork(self):
+    pool = connection_pool_util.GetHttpConnectionPool()
+    sock = self._GetIdleSocket()
+    pool.Release(_KEY, sock)
+    pool.pid = -1
+    new_pool = connection_pool_util.GetHttpConnectionPool()
+    self.assertIsNot(pool, new_pool)
+    self.assertIsNone(new_pool.Checkout(_KEY))
+
+  def testConnectReusesPooledSocket(self):
+    sock = self._GetIdleSocket()
+    connection_pool_util.GetHttpConnectionPool().Release(_KEY, sock)
+    num_connections_opened = connection_pool_util.GetNumConnectionsOpened()
+    conn = PooledHTTPSConnectionWithTimeout(*_KEY)
+    conn.connect()
+    self.assertIs(sock, conn.sock)
+    self.assertEqual(num_connections_opened,
+                     connection_pool_util.GetNumConnectionsOpened())
+
+  def testReleaseToPoolReturnsIdleSocket(self):
+    sock = self._GetIdleSocket()
+    conn = PooledHTTPSConnectionWithTimeout(*_KEY)
+    conn.sock = sock
+    conn.ReleaseToPool()
+    self.assertIsNone(conn.sock)
+    self.assertIs(sock, connection_pool_util.GetHttpConnectionPool().Checkout(
+        _KEY))
+
+  def testReleaseToPoolClosesBusySocket(self):
+    sock = self._GetIdleSocket()
+    conn = PooledHTTPSConnectionWithTimeout(*_KEY)
+    conn.sock = sock
+    conn.putrequest('GET', '/')
+    conn.ReleaseToPool()
+    self.assertIsNone(conn.sock)
+    self.assertIsNone(
+        connection_pool_util.GetHttpConnectionPool().Checkout(_KEY))
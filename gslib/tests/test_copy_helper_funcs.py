@@ -55,6 +55,7 @@ from gslib.utils.copy_helper import _DelegateUploadFileToObject
 from gslib.utils.copy_helper import _GetPartitionInfo
 from gslib.utils.copy_helper import _SelectUploadCompressionStrategy
 from gslib.utils.copy_helper import _SetContentTypeFromFile
+from gslib.utils.copy_helper import ConstructReplicaDstUrl
 from gslib.utils.copy_helper import ExpandUrlToSingleBlr
 from gslib.utils.copy_helper import FilterExistingComponents
 from gslib.utils.copy_helper import GZIP_ALL_FILES
@@ -327,6 +328,25 @@ class TestCpFuncs(GsUtilUnitTestCase):
       self.assertTrue((uri.object_name, uri.generation) in expected_to_delete)
     self.assertEqual(len(expected_to_delete), len(existing_objects_to_delete))
 
+  def testConstructReplicaDstUrl(self):
+    replica_dst_urls = [
+        ConstructReplicaDstUrl(StorageUrlFromString(exp_dst_url_str),
+                               StorageUrlFromString(dst_url_str),
+                               StorageUrlFromString(replica_url_str))
+        for exp_dst_url_str, dst_url_str, replica_url_str in (
+            ('gs://b1', 'gs://b1/dir/obj', 'gs://b2'),
+            ('gs://b1/prefix/', 'gs://b1/prefix/dir/obj', 'gs://b2'),
+            ('gs://b1/prefix', 'gs://b1/prefix/dir/obj', 'gs://b2/backup'),
+            ('gs://b1/obj', 'gs://b1/obj', 'gs://b2'),
+            ('gs://b1/obj', 'gs://b1/obj', 's3://b2/copy'),
+            ('gs://b1/dir/obj', 'gs://b1/dir/obj', 'gs://b2/backup/'),
+        )
+    ]
+    self.assertEqual([
+        'gs://b2/dir/obj', 'gs://b2/dir/obj', 'gs://b2/backup/dir/obj',
+        'gs://b2/obj', 's3://b2/copy', 'gs://b2/backup/obj'
+    ], [url.url_string for url in replica_dst_urls])
+
   def testReauthChallengeIsPerformed(self):
     mock_api = mock.Mock(spec=CloudApi)
     destination_url = StorageUrlFromString('gs://bucket')
@@ -50,6 +50,7 @@ from gslib import name_expansion
 from gslib.command_runner import CommandRunner
 from gslib.cloud_api import ResumableUploadStartOverException
 from gslib.plurality_checkable_iterator import PluralityCheckableIterator
+from gslib.commands import cp
 from gslib.commands.config import DEFAULT_SLICED_OBJECT_DOWNLOAD_THRESHOLD
 from gslib.commands.cp import ShimTranslatePredefinedAclSubOptForCopy
 from gslib.cs_api_map import ApiSelector
@@ -118,6 +119,8 @@ from gslib.utils.posix_util import UID_ATTR
 from gslib.utils.posix_util import ParseAndSetPOSIXAttributes
 from gslib.utils.posix_util import ValidateFilePermissionAccess
 from gslib.utils.posix_util import ValidatePOSIXMode
+from gslib.utils.parallelism_framework_util import TaskArgsBatch
+from gslib.utils.parallelism_framework_util import TaskArgsBatchingIterator
 from gslib.utils.retry_util import Retry
 from gslib.utils.system_util import IS_WINDOWS
 from gslib.utils.text_util import get_random_ascii_chars
@@ -1304,11 +1307,10 @@ class TestCp(testcase.GsUtilIntegrationTestCase):
     else:
       self.assertIn('cannot be the destination for gsutil cp', stderr)
 
-  def test_versioning_no_parallelism(self):
-    """Tests that copy all-versions errors when parallelism is enabled."""
-    # TODO(b/135780661): Remove retry after bug resolved
-    @Retry(AssertionError, tries=3, timeout_secs=1)
-    def _Check():
+  @SkipForS3('S3 lists versioned objects in reverse timestamp order.')
+  def test_versioning_with_parallelism(self):
+    """Tests that parallel copy all-versions preserves version order."""
+    if self._use_gcloud_storage:
       stderr = self.RunGsUtil([
           '-m', 'cp', '-A',
           suri(self.nonexistent_bucket_name, 'foo'),
@@ -1316,10 +1318,38 @@ class TestCp(testcase.GsUtilIntegrationTestCase):
       ],
                               expected_status=1,
                               return_stderr=True)
-      if self._use_gcloud_storage:
-        self.assertIn('sequential instead of parallel task execution', stderr)
-      else:
-        self.assertIn('-m option is not supported with the cp -A flag', stderr)
+      self.assertIn('sequential instead of parallel task execution', stderr)
+      return
+    bucket1_uri = self.CreateVersionedBucket()
+    bucket2_uri = self.CreateVersionedBucket()
+    for object_name in ('k1', 'k2'):
+      v1_uri = self.CreateObject(bucket_uri=bucket1_uri,
+                                 object_name=object_name,
+                                 contents=b'data0')
+      self.CreateObject(bucket_uri=bucket1_uri,
+                        object_name=object_name,
+                        contents=b'longer_data1',
+                        gs_idempotent_generation=urigen(v1_uri))
+
+    self.RunGsUtil(
+        ['-m', 'cp', '-R', '-A',
+         suri(bucket1_uri, '*'),
+         suri(bucket2_uri)])
+
+    # Use @Retry as hedge against bucket listing eventual consistency.
+    @Retry(AssertionError, tries=3, timeout_secs=1)
+    def _Check():
+      listing = self.RunGsUtil(['ls', '-la', suri(bucket2_uri)],
+                               return_stdout=True).split('\n')
+      # 4 lines of listing output, 1 summary line, 1 empty line from \n split.
+      self.assertEqual(len(listing), 6)
+      # Each object's versions were copied oldest first.
+      for line, (object_name, contents) in zip(
+          listing, (('k1', b'data0'), ('k1', b'longer_data1'),
+                    ('k2', b'data0'), ('k2', b'longer_data1'))):
+        size, _, uri_str, _ = line.split()
+        self.assertEqual(size, str(len(contents)))
+        self.assertEqual(storage_uri(uri_str).object_name, object_name)
 
     _Check()
 
@@ -5128,6 +5158,64 @@ class TestCpUnitTests(testcase.GsUtilUnitTestCase):
           suri(bucket_uri, 'dst')
       ])
 
+  def test_cp_replicates_uploads(self):
+    bucket_uri = self.CreateBucket()
+    replica_bucket_uri = self.CreateBucket()
+    other_replica_bucket_uri = self.CreateBucket()
+    tmpdir = self.CreateTempDir(test_files=[('dir', 'a'), ('dir', 'b')])
+    self.RunCommand('cp', [
+        '-r', '--replicate-to', suri(replica_bucket_uri, 'backup'),
+        '--replicate-to', suri(other_replica_bucket_uri), tmpdir,
+        suri(bucket_uri, 'prefix')
+    ])
+    # The destination doesn't exist, so the directory is copied to its name.
+    for uri, prefix in ((bucket_uri, 'prefix/'), (replica_bucket_uri,
+                                                  'backup/'),
+                        (other_replica_bucket_uri, '')):
+      self.assertEqual([prefix + 'dir/a', prefix + 'dir/b'],
+                       sorted(key.name for key in uri.list_bucket()))
+      self.assertEqual(
+          'test 0',
+          self.RunCommand('cat', [suri(uri, prefix + 'dir/a')],
+                          return_stdout=True))
+
+  def test_cp_reports_replica_failures_separately(self):
+    bucket_uri = self.CreateBucket()
+    replica_bucket_uri = self.CreateBucket()
+    fpath = self.CreateTempFile(contents=b'data')
+    manifest_path = os.path.join(self.CreateTempDir(), 'manifest.csv')
+    with mock.patch.object(cp.CpCommand,
+                           '_ReplicateObject',
+                           side_effect=exception.CommandException('Failed')):
+      with self.assertRaisesRegex(exception.CommandException,
+                                  '1 file/object could not be transferred'):
+        self.RunCommand('cp', [
+            '-L', manifest_path, '--replicate-to',
+            suri(replica_bucket_uri), fpath,
+            suri(bucket_uri)
+        ])
+    # The object itself was copied, so its manifest row records the bytes
+    # copied to the destination as a success.
+    with open(manifest_path) as f:
+      rows = f.read().splitlines()
+    self.assertEqual(2, len(rows))
+    self.assertIn(',4,OK,', rows[1])
+
+  def test_cp_replicate_to_requires_cloud_urls(self):
+    bucket_uri = self.CreateBucket()
+    fpath = self.CreateTempFile()
+    with self.assertRaisesRegex(exception.CommandException,
+                                'requires a bucket, bucket subdirectory'):
+      self.RunCommand('cp', ['--replicate-to', 'local_dir', fpath,
+                             suri(bucket_uri)])
+    with self.assertRaisesRegex(exception.CommandException,
+                                'requires a cloud destination URL'):
+      self.RunCommand('cp', [
+          '--replicate-to',
+          suri(bucket_uri), suri(bucket_uri, 'obj'),
+          self.CreateTempDir()
+      ])
+
   def test_preserve_acl_and_canned_acl_fails(self):
     bucket_uri = self.CreateBucket()
     with self.assertRaisesRegex(
@@ -5138,19 +5226,41 @@ class TestCpUnitTests(testcase.GsUtilUnitTestCase):
           suri(bucket_uri)
       ])
 
-  def test_all_versions_with_parallel_fails(self):
-    bucket_uri = self.CreateBucket()
-    global _original_run_named_command
-    _original_run_named_command = CommandRunner.RunNamedCommand
-    with mock.patch.object(
-        CommandRunner, 'RunNamedCommand', _MockRunNamedCommand):
-      with self.assertRaisesRegex(
-          exception.CommandException,
-          'The gsutil -m option is not supported with the cp -A flag'):
-        self.RunCommand('cp', [
-            '-A', 'local_file',
-            suri(bucket_uri)
-        ])
+  def test_all_versions_with_parallel_batches_versions_by_object(self):
+    copy_object_infos = [
+        mock.Mock(expanded_storage_url=StorageUrlFromString(url_str))
+        for url_str in ('gs://bucket/a#1', 'gs://bucket/a#2', 'gs://bucket/b#1',
+                        'gs://bucket/a#3', 'local_file')
+    ]
+    batches = list(
+        TaskArgsBatchingIterator(copy_object_infos, None,
+                                 cp._GetSourceObjectKey))
+    self.assertEqual(4, len(batches))
+    self.assertEqual(copy_object_infos[:2], batches[0].args_list)
+    self.assertEqual(copy_object_infos[2:3], batches[1].args_list)
+    self.assertEqual(copy_object_infos[3:4], batches[2].args_list)
+    self.assertIs(copy_object_infos[4], batches[3])
+
+  def test_copy_versions_in_generation_order(self):
+    copy_object_infos = [
+        mock.Mock(expanded_storage_url=StorageUrlFromString(url_str))
+        for url_str in ('gs://bucket/a#30', 'gs://bucket/a#4', 'gs://bucket/a#5')
+    ]
+    command = mock.Mock(preserve_posix_attrs=False)
+    copied_generations = []
+
+    def _MockCopyFunc(copy_object_info, **_):
+      generation = copy_object_info.expanded_storage_url.generation
+      copied_generations.append(generation)
+      if generation == '4':
+        raise exception.CommandException('copy failed')
+
+    command.CopyFunc.side_effect = _MockCopyFunc
+    command.op_failure_count = 0
+    cp.CpCommand.CopyVersionsFunc(command, TaskArgsBatch(copy_object_infos))
+    # The failed copy doesn't stop the later versions from being copied.
+    self.assertEqual(['4', '5', '30'], copied_generations)
+    self.assertEqual(1, command.op_failure_count)
 
   def test_gzip_in_flight_and_local_together_fails(self):
     bucket_uri = self.CreateBucket()
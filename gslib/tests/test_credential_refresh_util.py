@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for credential_refresh_util.py."""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import datetime
+import json
+import threading
+
+from oauth2client import client
+from six.moves import queue as Queue
+
+from gslib.tests import testcase
+from gslib.tests.util import SetBotoConfigForTest
+from gslib.thread_message import CredentialRefreshMessage
+from gslib.utils import credential_refresh_util
+from gslib.utils.credential_refresh_util import CredentialRefresherThread
+
+from six import add_move, MovedModule
+
+add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+from six.moves import mock
+
+_NOW = datetime.datetime(2026, 1, 1, 12, 0, 0)
+
+
+class _FakeCredentials(client.OAuth2Credentials):
+  """OAuth2Credentials whose refreshes don't make any requests."""
+
+  def __init__(self, token_expiry, access_token='token'):
+    super(_FakeCredentials, self).__init__(access_token, 'client_id', None,
+                                           None, token_expiry, None, None)
+    self.num_refreshes = 0
+
+  def _refresh(self, http):
+    self.num_refreshes += 1
+    self.access_token = 'token%d' % self.num_refreshes
+    self.token_expiry = _NOW + datetime.timedelta(hours=1)
+
+
+class _SlowCredentials(_FakeCredentials):
+  """_FakeCredentials whose refreshes wait for finish_refresh to be set."""
+
+  def __init__(self, token_expiry):
+    super(_SlowCredentials, self).__init__(token_expiry)
+    self.refresh_started = threading.Event()
+    self.finish_refresh = threading.Event()
+
+  def _refresh(self, http):
+    self.refresh_started.set()
+    self.finish_refresh.wait()
+    super(_SlowCredentials, self)._refresh(http)
+
+
+class TestCredentialRefreshUtil(testcase.GsUtilUnitTestCase):
+  """Unit tests for background access token refreshes."""
+
+  def testNeedsRefresh(self):
+    refresher = CredentialRefresherThread(300)
+    self.assertFalse(
+        refresher.NeedsRefresh(
+            _FakeCredentials(_NOW + datetime.timedelta(seconds=301)), now=_NOW))
+    self.assertTrue(
+        refresher.NeedsRefresh(
+            _FakeCredentials(_NOW + datetime.timedelta(seconds=300)), now=_NOW))
+    self.assertTrue(
+        refresher.NeedsRefresh(
+            _FakeCredentials(_NOW - datetime.timedelta(seconds=1)), now=_NOW))
+    # Tokens that never expire or were never obtained are left alone.
+    self.assertFalse(refresher.NeedsRefresh(_FakeCredentials(None), now=_NOW))
+    self.assertFalse(
+        refresher.NeedsRefresh(_FakeCredentials(_NOW, access_token=None),
+                               now=_NOW))
+
+  def testRefreshExpiringCredentials(self):
+    refresher = CredentialRefresherThread(300)
+    status_queue = Queue.Queue()
+    expiring_creds = _FakeCredentials(_NOW + datetime.timedelta(seconds=60))
+    fresh_creds = _FakeCredentials(_NOW + datetime.timedelta(minutes=30))
+    refresher.Register(expiring_creds, status_queue=status_queue)
+    refresher.Register(expiring_creds, status_queue=status_queue)
+    refresher.Register(fresh_creds, status_queue=status_queue)
+
+    refresher.RefreshExpiringCredentials(now=_NOW)
+    self.assertEqual(1, expiring_creds.num_refreshes)
+    self.assertEqual('token1', expiring_creds.access_token)
+    self.assertEqual(0, fresh_creds.num_refreshes)
+    self.assertIsInstance(status_queue.get_nowait(), CredentialRefreshMessage)
+    self.assertTrue(status_queue.empty())
+
+    # The refreshed token is good for another hour.
+    refresher.RefreshExpiringCredentials(now=_NOW)
+    self.assertEqual(1, expiring_creds.num_refreshes)
+
+  def testRefreshFailureIsNotReported(self):
+    refresher = CredentialRefresherThread(300)
+    status_queue = Queue.Queue()
+    creds = _FakeCredentials(_NOW)
+    refresher.Register(creds, status_queue=status_queue)
+    with mock.patch.object(creds,
+                           '_refresh',
+                           side_effect=client.HttpAccessTokenRefreshError()):
+      refresher.RefreshExpiringCredentials(now=_NOW)
+    self.assertTrue(status_queue.empty())
+
+  def testRefreshesAreSerialized(self):
+    refresher = CredentialRefresherThread(300)
+    creds = _SlowCredentials(_NOW)
+    refresher.Register(creds)
+    # A refresh after a rejected request waits for the background refresh.
+    background_thread = threading.Thread(
+        target=refresher.RefreshExpiringCredentials, kwargs={'now': _NOW})
+    background_thread.start()
+    creds.refresh_started.wait()
+    request_thread = threading.Thread(target=creds._refresh, args=(None,))
+    request_thread.start()
+    request_thread.join(0.1)
+    self.assertTrue(request_thread.is_alive())
+    self.assertEqual(0, creds.num_refreshes)
+    creds.finish_refresh.set()
+    background_thread.join()
+    request_thread.join()
+    self.assertEqual(2, creds.num_refreshes)
+
+  def testRegisteredCredentialsCanBeStored(self):
+    refresher = CredentialRefresherThread(300)
+    creds = _FakeCredentials(_NOW)
+    refresher.Register(creds)
+    # The wrapped refresh isn't stored with the credentials.
+    self.assertNotIn('_refresh', json.loads(creds.to_json()))
+
+  def testGarbageCollectedCredentialsAreUnregistered(self):
+    refresher = CredentialRefresherThread(300)
+    refresher.Register(_FakeCredentials(_NOW))
+    refresher.RefreshExpiringCredentials(now=_NOW)
+    # pylint: disable=protected-access
+    self.assertEqual([], refresher._registered_credentials)
+
+  @mock.patch.object(credential_refresh_util, 'CredentialRefresherThread')
+  def testRegisterCredentialsForRefreshDisabled(self, mock_refresher_class):
+    with SetBotoConfigForTest([('OAuth2', 'token_refresh_margin', '0')]):
+      credential_refresh_util.RegisterCredentialsForRefresh(
+          _FakeCredentials(_NOW))
+    self.assertFalse(mock_refresher_class.called)
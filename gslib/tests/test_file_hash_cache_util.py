@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for file_hash_cache_util.py."""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import io
+import os
+
+from gslib.tests import testcase
+from gslib.tests.util import SetBotoConfigForTest
+from gslib.utils import file_hash_cache_util
+from gslib.utils.hashing_helper import CalculateB64EncodedCrc32cFromContents
+from gslib.utils.hashing_helper import CalculateB64EncodedMd5FromContents
+
+from six import add_move, MovedModule
+
+add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+from six.moves import mock
+
+# pylint: disable=protected-access
+
+_CONTENTS = b'some file contents'
+
+
+class TestFileHashCacheUtil(testcase.GsUtilUnitTestCase):
+  """Unit tests for caching local file checksums."""
+
+  def setUp(self):
+    super(TestFileHashCacheUtil, self).setUp()
+    self.file_name = self.CreateTempFile(contents=_CONTENTS)
+    self.state_dir = self.CreateTempDir()
+    self.expected_digests = {
+        'crc32c': CalculateB64EncodedCrc32cFromContents(io.BytesIO(_CONTENTS)),
+        'md5': CalculateB64EncodedMd5FromContents(io.BytesIO(_CONTENTS)),
+    }
+    # Don't reuse database connections between tests.
+    self.addCleanup(file_hash_cache_util._connections.Close)
+
+  def _CacheConfig(self, enabled=True):
+    return SetBotoConfigForTest([
+        ('GSUtil', 'use_file_hash_cache', str(enabled)),
+        ('GSUtil', 'state_dir', self.state_dir),
+    ])
+
+  def testCachesCalculatedHashes(self):
+    with self._CacheConfig():
+      self.assertIsNone(
+          file_hash_cache_util.GetCachedFileHashes(self.file_name, ['md5']))
+      self.assertEqual(
+          self.expected_digests,
+          file_hash_cache_util.CalculateFileHashes(self.file_name,
+                                                   ['crc32c', 'md5']))
+      with mock.patch.object(file_hash_cache_util,
+                             'CalculateHashesFromContents') as mock_calculate:
+        self.assertEqual(
+            {'md5': self.expected_digests['md5']},
+            file_hash_cache_util.GetCachedFileHashes(self.file_name, ['md5']))
+      mock_calculate.assert_not_called()
+
+  def testMergesHashes(self):
+    with self._CacheConfig():
+      file_hash_cache_util.CalculateFileHashes(self.file_name, ['crc32c'])
+      self.assertIsNone(
+          file_hash_cache_util.GetCachedFileHashes(self.file_name,
+                                                   ['crc32c', 'md5']))
+      file_hash_cache_util.CacheFileHashes(
+          self.file_name, {'md5': self.expected_digests['md5']})
+      self.assertEqual(
+          self.expected_digests,
+          file_hash_cache_util.GetCachedFileHashes(self.file_name,
+                                                   ['crc32c', 'md5']))
+
+  def testIgnoresModifiedFile(self):
+    with self._CacheConfig():
+      file_hash_cache_util.CalculateFileHashes(self.file_name, ['md5'])
+      with open(self.file_name, 'ab') as fp:
+        fp.write(b'more contents')
+      self.assertIsNone(
+          file_hash_cache_util.GetCachedFileHashes(self.file_name, ['md5']))
+
+  def testDoesNotCacheFileModifiedWhileHashing(self):
+    with self._CacheConfig():
+      stat_result = os.stat(self.file_name)
+      os.utime(self.file_name,
+               ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+      file_hash_cache_util.CacheFileHashes(self.file_name,
+                                           self.expected_digests,
+                                           stat_result=stat_result)
+      self.assertIsNone(
+          file_hash_cache_util.GetCachedFileHashes(self.file_name, ['md5']))
+
+  def testIgnoresFileWithChangedCtime(self):
+    with self._CacheConfig():
+      file_hash_cache_util.CalculateFileHashes(self.file_name, ['md5'])
+      # E.g. the file was modified in place and its mtime was restored.
+      stat_result = os.stat(self.file_name)
+      changed_stat_result = mock.Mock(st_size=stat_result.st_size,
+                                      st_mtime_ns=stat_result.st_mtime_ns,
+                                      st_ctime_ns=stat_result.st_ctime_ns + 1,
+                                      st_ino=stat_result.st_ino)
+      with mock.patch.object(file_hash_cache_util.os,
+                             'stat',
+                             return_value=changed_stat_result):
+        self.assertIsNone(
+            file_hash_cache_util.GetCachedFileHashes(self.file_name, ['md5']))
+
+  def testDisabledByDefault(self):
+    with self._CacheConfig(enabled=False):
+      file_hash_cache_util.CalculateFileHashes(self.file_name, ['md5'])
+    with self._CacheConfig():
+      self.assertIsNone(
+          file_hash_cache_util.GetCachedFileHashes(self.file_name, ['md5']))
+
+  def testStoresHashesInStateDir(self):
+    with self._CacheConfig():
+      file_hash_cache_util.CalculateFileHashes(self.file_name,
+                                               ['crc32c', 'md5'])
+      self.assertEqual(
+          self.expected_digests,
+          file_hash_cache_util.GetCachedFileHashes(self.file_name,
+                                                   ['crc32c', 'md5']))
+    self.assertTrue(
+        os.path.exists(os.path.join(self.state_dir,
+                                    'file-hash-cache.sqlite3')))
@@ -21,8 +21,19 @@ from __future__ import unicode_literals
 
 import os
 
+from gslib import file_part
 from gslib.file_part import FilePart
+from gslib.file_part import OpenFilePart
+from gslib.file_part import PositionalFilePart
 import gslib.tests.testcase as testcase
+from gslib.tests.util import unittest
+from gslib.utils.hashing_helper import GetMd5
+from gslib.utils.hashing_helper import HashingFileUploadWrapper
+
+from six import add_move, MovedModule
+
+add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+from six.moves import mock
 
 
 # pylint: disable=protected-access
@@ -129,3 +140,71 @@ class TestFilePart(testcase.GsUtilUnitTestCase):
       method = getattr(fp, method_name)
       with self.assertRaises(NotImplementedError):
         method()
+
+
+@unittest.skipUnless(hasattr(os, 'pread'), 'os.pread is not available.')
+class TestPositionalFilePart(testcase.GsUtilUnitTestCase):
+  """Unit tests for PositionalFilePart class."""
+
+  def test_seek_and_read(self):
+    contents = bytearray(range(256))
+    part_length = 23
+    start_pos = 50
+    fpath = self.CreateTempFile(contents=contents)
+    fp = PositionalFilePart(fpath, start_pos, part_length)
+    self.assertEqual(0, fp.tell())
+    self.assertEqual(contents[start_pos:(start_pos + part_length)], fp.read())
+    self.assertEqual(b'', fp.read(100))
+    self.assertEqual(10, fp.seek(10))
+    self.assertEqual(contents[(start_pos + 10):(start_pos + 15)], fp.read(5))
+    self.assertEqual(20, fp.seek(5, whence=os.SEEK_CUR))
+    self.assertEqual(part_length - 1, fp.seek(-1, whence=os.SEEK_END))
+    self.assertEqual(contents[(start_pos + part_length - 1):(start_pos +
+                                                             part_length)],
+                     fp.read())
+    fp.seek(1, whence=os.SEEK_END)
+    self.assertEqual(part_length + 1, fp.tell())
+    self.assertEqual(b'', fp.read())
+    fp.close()
+
+  def test_hashing_wrapper(self):
+    contents = os.urandom(100000)
+    fpath = self.CreateTempFile(contents=contents)
+    part = PositionalFilePart(fpath, 1000, 50000)
+    self.addCleanup(part.close)
+    fp = HashingFileUploadWrapper(part, {'md5': GetMd5()}, {'md5': GetMd5},
+                                  mock.Mock(), mock.Mock())
+    fp.read(30000)
+    fp.seek(10000)
+    while fp.read(8192):
+      pass
+    self.assertEqual(GetMd5(contents[1000:51000]).hexdigest(),
+                     fp._digesters['md5'].hexdigest())
+
+  def test_parts_share_descriptor(self):
+    fpath = self.CreateTempFile(contents=b'abcdefg')
+    parts = [PositionalFilePart(fpath, i, 2) for i in range(0, 6, 2)]
+    self.assertEqual(1, len(set(part._fd for part in parts)))
+    self.assertEqual([b'ab', b'cd', b'ef'], [part.read() for part in parts])
+    fd = parts[0]._fd
+    for part in parts:
+      part.close()
+    self.assertNotIn(fpath, file_part._shared_fds)
+    with self.assertRaises(OSError):
+      os.fstat(fd)
+
+  def test_close(self):
+    fpath = self.CreateTempFile(contents=b'abcdefg')
+    fp = PositionalFilePart(fpath, 1, 3)
+    with fp:
+      self.assertEqual(fp.read(), b'bcd')
+    with self.assertRaises(ValueError):
+      fp.read()
+    # Closing again is a no-op.
+    fp.close()
+
+  def test_open_file_part(self):
+    fpath = self.CreateTempFile(contents=b'abcdefg')
+    fp = OpenFilePart(fpath, 1, 3)
+    self.assertIsInstance(fp, PositionalFilePart)
+    fp.close()
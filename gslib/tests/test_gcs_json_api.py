@@ -19,6 +19,9 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import unicode_literals
 
+from apitools.base.py import batch as apitools_batch
+from apitools.base.py import exceptions as apitools_exceptions
+
 from gslib import cloud_api
 from gslib import gcs_json_api
 from gslib import context_config
@@ -26,6 +29,7 @@ from gslib.tests import testcase
 from gslib.tests.testcase import base
 from gslib.tests.util import SetBotoConfigForTest
 from gslib.tests.util import unittest
+from gslib.third_party.storage_apitools import storage_v1_messages as apitools_messages
 
 from six import add_move, MovedModule
 
@@ -90,3 +94,78 @@ class TestGcsJsonApi(testcase.GsUtilUnitTestCase):
       client = gcs_json_api.GcsJsonApi(None, None, None, None)
       self.assertEqual(client.api_client.additional_http_headers.get('Host'),
                        'custom-header')
+
+  @mock.patch.object(gcs_json_api.time, 'sleep')
+  @mock.patch.object(apitools_batch.BatchApiRequest, 'Execute')
+  @mock.patch.object(gcs_json_api.GcsJsonApi, 'DeleteObject')
+  def testDeleteObjectsUsesBatchRequest(self, mock_delete_object,
+                                        mock_execute, mock_sleep):
+    not_found_error = apitools_exceptions.HttpError({'status': 404}, '', '')
+    mock_execute.return_value = [
+        mock.Mock(terminal_state=True, is_error=False),
+        mock.Mock(terminal_state=True,
+                  is_error=True,
+                  exception=not_found_error),
+        # Calls that kept failing with a retryable status are not terminal.
+        mock.Mock(terminal_state=False, is_error=True),
+    ]
+    client = gcs_json_api.GcsJsonApi(None, None, None, None)
+    results = client.DeleteObjects([('bucket', 'obj1', None),
+                                    ('bucket', 'obj2', '5'),
+                                    ('bucket', 'obj3', None)])
+    self.assertIsNone(results[0])
+    self.assertIsInstance(results[1], cloud_api.NotFoundException)
+    self.assertIsNone(results[2])
+    mock_delete_object.assert_called_once_with('bucket',
+                                               'obj3',
+                                               preconditions=mock.ANY,
+                                               generation=None,
+                                               provider=None)
+    # The call that kept failing was retried with exponential backoff.
+    self.assertEqual(client.num_retries + 1, mock_execute.call_count)
+    waits = [call[0][0] for call in mock_sleep.call_args_list]
+    self.assertEqual(client.num_retries, len(waits))
+    self.assertTrue(all(wait <= client.max_retry_wait for wait in waits))
+    self.assertGreater(max(waits), 1)
+
+  @mock.patch.object(apitools_batch.BatchApiRequest, 'Execute')
+  @mock.patch.object(gcs_json_api.GcsJsonApi, 'DeleteObject')
+  def testDeleteObjectsWithoutBatching(self, mock_delete_object,
+                                       mock_execute):
+    client = gcs_json_api.GcsJsonApi(None, None, None, None)
+    self.assertEqual([None], client.DeleteObjects([('bucket', 'obj', None)]))
+    with SetBotoConfigForTest([('GSUtil', 'delete_batch_size', '1')]):
+      self.assertEqual([None, None],
+                       client.DeleteObjects([('bucket', 'obj1', None),
+                                             ('bucket', 'obj2', None)]))
+    self.assertEqual(3, mock_delete_object.call_count)
+    self.assertFalse(mock_execute.called)
+
+  @mock.patch.object(apitools_batch.BatchApiRequest, 'Execute', autospec=True)
+  def testPatchObjectsMetadataUsesBatchRequest(self, mock_execute):
+    request_bodies = []
+
+    def _Execute(batch_request, *unused_args, **unused_kwargs):
+      request_bodies.extend(api_call.http_request.body
+                            for api_call in batch_request.api_requests)
+      return [
+          mock.Mock(terminal_state=True, is_error=False),
+          mock.Mock(terminal_state=True,
+                    is_error=True,
+                    exception=apitools_exceptions.HttpError({'status': 412},
+                                                            '', '')),
+      ]
+
+    mock_execute.side_effect = _Execute
+    client = gcs_json_api.GcsJsonApi(None, None, None, None)
+    results = client.PatchObjectsMetadata([
+        ('bucket', 'obj1', apitools_messages.Object(cacheControl=''), None,
+         cloud_api.Preconditions(meta_gen_match=1)),
+        ('bucket', 'obj2', apitools_messages.Object(temporaryHold=True), '5',
+         cloud_api.Preconditions(meta_gen_match=2)),
+    ])
+    self.assertIsNone(results[0])
+    self.assertIsInstance(results[1], cloud_api.PreconditionException)
+    # Cleared fields are sent, even though they are empty.
+    self.assertIn('"cacheControl": null', request_bodies[0])
+    self.assertIn('"temporaryHold": true', request_bodies[1])
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for job_checkpoint_util.py."""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import os
+import pickle
+
+from gslib.exception import CommandException
+from gslib.tests import testcase
+from gslib.tests.util import SetBotoConfigForTest
+from gslib.utils import job_checkpoint_util
+from gslib.utils.copy_helper import Manifest
+from gslib.utils.job_checkpoint_util import GetJobCheckpointFilename
+from gslib.utils.job_checkpoint_util import JobCheckpoint
+
+from six import add_move, MovedModule
+
+add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+from six.moves import mock
+
+
+def _FailToList():
+  raise AssertionError('The sources should not be listed again.')
+
+
+class TestJobCheckpointUtil(testcase.GsUtilUnitTestCase):
+  """Unit tests for checkpointing cp -L jobs."""
+
+  def setUp(self):
+    super(TestJobCheckpointUtil, self).setUp()
+    config_patcher = SetBotoConfigForTest([
+        ('GSUtil', 'state_dir', self.CreateTempDir()),
+        ('GSUtil', 'use_job_checkpoints', 'True')
+    ])
+    config_patcher.__enter__()
+    self.addCleanup(config_patcher.__exit__, None, None, None)
+    self.manifest_path = self.CreateTempFile(file_name='manifest.csv')
+    self.checkpoint_path = GetJobCheckpointFilename(['cp', ['a', 'b']])
+
+  def _OpenCheckpoint(self):
+    checkpoint = JobCheckpoint(self.checkpoint_path, self.manifest_path,
+                               lambda task: task)
+    self.assertTrue(checkpoint.Open())
+    return checkpoint
+
+  def testReplaysPendingTasksWithoutListing(self):
+    checkpoint = self._OpenCheckpoint()
+    self.assertEqual(['a', 'b', 'c'],
+                     list(checkpoint.IterTasks(lambda: iter(['a', 'b', 'c']))))
+    checkpoint.MarkDone(['a', 'c'])
+
+    checkpoint = self._OpenCheckpoint()
+    self.assertEqual(['b'], list(checkpoint.IterTasks(_FailToList)))
+
+  def testListsAgainAfterInterruptedListing(self):
+    checkpoint = self._OpenCheckpoint()
+    list(checkpoint.IterTasks(lambda: iter(['a', 'b'])))
+    checkpoint.MarkDone(['a'])
+    # Simulate an interruption before the listing completed.
+    database = checkpoint._GetDatabase()
+    with database:
+      database.execute('DELETE FROM job_state WHERE key = \'listing_complete\'')
+
+    checkpoint = self._OpenCheckpoint()
+    self.assertEqual(['b', 'c'],
+                     list(checkpoint.IterTasks(lambda: iter(['a', 'b', 'c']))))
+
+  def testRaisesListingExceptionsInPosition(self):
+
+    def _ListWithError():
+      yield 'a'
+      raise CommandException('Listing failed')
+
+    checkpoint = self._OpenCheckpoint()
+    with mock.patch.object(job_checkpoint_util, '_JOURNAL_BATCH_SIZE', 1):
+      tasks = checkpoint.IterTasks(_ListWithError)
+      self.assertEqual('a', next(tasks))
+      self.assertRaisesRegex(CommandException, 'Listing failed', next, tasks)
+      self.assertRaises(StopIteration, next, tasks)
+
+    # Exceptions from a previous run are raised from their journaled messages.
+    checkpoint = self._OpenCheckpoint()
+    tasks = checkpoint.IterTasks(_FailToList)
+    self.assertEqual('a', next(tasks))
+    self.assertRaisesRegex(CommandException, 'Listing failed', next, tasks)
+    self.assertRaises(StopIteration, next, tasks)
+
+  def testResetsForReplacedManifest(self):
+    checkpoint = self._OpenCheckpoint()
+    list(checkpoint.IterTasks(lambda: iter(['a', 'b'])))
+    os.unlink(self.manifest_path)
+    self.manifest_path = self.CreateTempFile(file_name='manifest2.csv')
+
+    checkpoint = self._OpenCheckpoint()
+    self.assertEqual(['c'], list(checkpoint.IterTasks(lambda: iter(['c']))))
+
+  def testPickledCheckpointMarksTasksDone(self):
+    checkpoint = JobCheckpoint(self.checkpoint_path, self.manifest_path, str)
+    self.assertTrue(checkpoint.Open())
+    list(checkpoint.IterTasks(lambda: iter(['a', 'b'])))
+    pickle.loads(pickle.dumps(checkpoint)).MarkDone(['a'])
+
+    checkpoint = self._OpenCheckpoint()
+    self.assertEqual(['b'], list(checkpoint.IterTasks(_FailToList)))
+
+  def testDeletes(self):
+    checkpoint = self._OpenCheckpoint()
+    list(checkpoint.IterTasks(lambda: iter(['a'])))
+    checkpoint.Delete()
+    self.assertFalse(os.path.exists(self.checkpoint_path))
+
+  def testManifestMarksTasksDone(self):
+    manifest = Manifest(self.manifest_path + '.csv')
+    self.manifest_path = manifest.manifest_path
+    manifest.job_checkpoint = self._OpenCheckpoint()
+    self.assertEqual(['a', 'b'],
+                     list(manifest.job_checkpoint.IterTasks(
+                         lambda: iter(['a', 'b']))))
+    for source_url, result in (('a', 'OK'), ('b', 'error')):
+      manifest.Initialize(source_url, 'gs://bucket/' + source_url)
+      manifest.SetResult(source_url, 0, result)
+
+    checkpoint = self._OpenCheckpoint()
+    self.assertEqual(['b'], list(checkpoint.IterTasks(_FailToList)))
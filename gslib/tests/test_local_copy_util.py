@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for local_copy_util.py."""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import errno
+import io
+import os
+
+from gslib.tests import testcase
+from gslib.utils import local_copy_util
+
+from six import add_move, MovedModule
+
+add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+from six.moves import mock
+
+# pylint: disable=protected-access
+
+_CONTENTS = os.urandom(3 * 1024 * 1024 + 17)
+
+
+class TestLocalCopyUtil(testcase.GsUtilUnitTestCase):
+  """Unit tests for copying local file contents."""
+
+  def setUp(self):
+    super(TestLocalCopyUtil, self).setUp()
+    self.src_path = self.CreateTempFile(contents=_CONTENTS)
+    self.dst_path = os.path.join(self.CreateTempDir(), 'dst')
+
+  def _Copy(self, src_fp=None):
+    progress = []
+    with open(self.src_path, 'rb') as fp:
+      with open(self.dst_path, 'wb') as dst_fp:
+        bytes_copied = local_copy_util.CopyFileContents(
+            src_fp or fp, dst_fp, progress_callback=progress.append)
+    with open(self.dst_path, 'rb') as fp:
+      self.assertEqual(_CONTENTS, fp.read())
+    self.assertEqual(len(_CONTENTS), bytes_copied)
+    self.assertEqual(len(_CONTENTS), sum(progress))
+
+  def testCopiesFile(self):
+    self._Copy()
+
+  def testCopiesStream(self):
+    self._Copy(src_fp=io.BytesIO(_CONTENTS))
+
+  @mock.patch.object(local_copy_util, '_CloneFile', return_value=False)
+  def testFallsBackWhenKernelCopyUnsupported(self, _):
+    with mock.patch.object(local_copy_util,
+                           '_CopyFileRange',
+                           side_effect=OSError(errno.EXDEV, 'EXDEV')), \
+         mock.patch.object(local_copy_util,
+                           '_SendFile',
+                           side_effect=OSError(errno.EINVAL, 'EINVAL')):
+      self._Copy()
+
+  @mock.patch.object(local_copy_util, '_CloneFile', return_value=False)
+  def testCompletesPartialKernelCopy(self, _):
+    # Stop the kernel copy after one chunk, leaving the rest for user space.
+    copy_results = [1024 * 1024, 0]
+
+    def _CopyFirstMebibyte(src_fd, dst_fd, unused_count):
+      count = copy_results.pop(0)
+      os.write(dst_fd, os.read(src_fd, count))
+      return count
+
+    with mock.patch.object(local_copy_util,
+                           '_CopyFileRange',
+                           side_effect=_CopyFirstMebibyte):
+      self._Copy()
+
+  @mock.patch.object(local_copy_util, '_CloneFile', return_value=False)
+  def testRaisesKernelCopyErrors(self, _):
+    with mock.patch.object(local_copy_util,
+                           '_CopyFileRange',
+                           side_effect=OSError(errno.ENOSPC, 'ENOSPC')):
+      with self.assertRaises(OSError):
+        self._Copy()
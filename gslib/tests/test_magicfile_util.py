@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for magicfile_util.py."""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import gzip
+import io
+import os
+import threading
+
+from gslib.tests import testcase
+from gslib.tests.util import unittest
+from gslib.utils import magicfile_util
+from gslib.utils.system_util import IS_WINDOWS
+
+from six import add_move, MovedModule
+
+add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+from six.moves import mock
+
+# pylint: disable=protected-access
+
+
+def _GzipContents(contents):
+  buf = io.BytesIO()
+  with gzip.GzipFile(fileobj=buf, mode='wb', mtime=0) as gzip_file:
+    gzip_file.write(contents)
+  return buf.getvalue()
+
+
+_CORPUS = {
+    'empty': b'',
+    'plain.txt': b'Just some text.\n',
+    'page.txt': b'<html><body>And you thought I was just text!</body></html>',
+    'data.json': b'{"key": ["value", 1, 2.5]}\n',
+    'script': b'#!/bin/sh\necho hello\n',
+    'unicode.txt': 'Grüße à tous\n'.encode('utf-8'),
+    'latin1.txt': 'café\n'.encode('latin-1'),
+    'image.png': (b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01'
+                  b'\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89'),
+    'archive.gz': _GzipContents(b'compressed'),
+    'random.bin': bytes(bytearray(range(256))) * 4,
+}
+
+
+@unittest.skipIf(IS_WINDOWS, 'use_magicfile is not available on Windows.')
+class TestMagicfileUtil(testcase.GsUtilUnitTestCase):
+  """Unit tests for in-process content type detection."""
+
+  def setUp(self):
+    super(TestMagicfileUtil, self).setUp()
+    if not magicfile_util._GetLibmagic():
+      self.skipTest('libmagic is not available.')
+    self.tmpdir = self.CreateTempDir()
+
+  def testMatchesFileCommand(self):
+    for file_name, contents in _CORPUS.items():
+      file_path = self.CreateTempFile(tmpdir=self.tmpdir,
+                                      file_name=file_name,
+                                      contents=contents)
+      self.assertEqual(
+          magicfile_util._RunFileCommand(file_path),
+          magicfile_util.GetMagicContentType(file_path),
+          'Content types of %s differ' % file_name)
+
+  def testDetectsFromContents(self):
+    file_path = self.CreateTempFile(tmpdir=self.tmpdir,
+                                    file_name='html_in_disguise.txt',
+                                    contents=_CORPUS['page.txt'])
+    self.assertEqual('text/html; charset=us-ascii',
+                     magicfile_util.GetMagicContentType(file_path))
+
+  def testDetectsFilesWithUndecodableNames(self):
+    # Names that aren't valid UTF-8 are listed with surrogate escapes.
+    file_path = os.path.join(self.tmpdir, os.fsdecode(b'page-\xff.txt'))
+    with open(file_path, 'wb') as fp:
+      fp.write(_CORPUS['page.txt'])
+    self.assertEqual('text/html; charset=us-ascii',
+                     magicfile_util.GetMagicContentType(file_path))
+
+  def testThreadsUseSeparateHandles(self):
+    file_path = self.CreateTempFile(tmpdir=self.tmpdir,
+                                    contents=_CORPUS['plain.txt'])
+    magicfile_util.GetMagicContentType(file_path)
+    cookies = []
+
+    def _Detect():
+      magicfile_util.GetMagicContentType(file_path)
+      cookies.append(magicfile_util._thread_state.cookie)
+
+    thread = threading.Thread(target=_Detect)
+    thread.start()
+    thread.join()
+    self.assertIsNotNone(cookies[0])
+    self.assertNotEqual(magicfile_util._thread_state.cookie, cookies[0])
+
+  @mock.patch.object(magicfile_util, '_GetLibmagic', return_value=None)
+  def testFallsBackToFileCommand(self, _):
+    file_path = self.CreateTempFile(tmpdir=self.tmpdir,
+                                    contents=_CORPUS['page.txt'])
+    with mock.patch.object(magicfile_util,
+                           '_RunFileCommand',
+                           return_value='text/html; charset=us-ascii') as (
+                               mock_run_file_command):
+      self.assertEqual('text/html; charset=us-ascii',
+                       magicfile_util.GetMagicContentType(file_path))
+    mock_run_file_command.assert_called_once_with(file_path)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for manifest_index_util.py and the cp -L manifest."""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import csv
+import os
+import pickle
+import threading
+
+from gslib.exception import CommandException
+from gslib.tests import testcase
+from gslib.tests.util import SetBotoConfigForTest
+from gslib.utils import manifest_index_util
+from gslib.utils.copy_helper import Manifest
+from gslib.utils.manifest_index_util import ManifestIndex
+
+from six import add_move, MovedModule
+
+add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+from six.moves import mock
+
+
+class TestManifestIndexUtil(testcase.GsUtilUnitTestCase):
+  """Unit tests for indexing cp -L manifest files."""
+
+  def setUp(self):
+    super(TestManifestIndexUtil, self).setUp()
+    self.manifest_path = os.path.join(self.CreateTempDir(), 'manifest.csv')
+    config_patcher = SetBotoConfigForTest([('GSUtil', 'state_dir',
+                                            self.CreateTempDir())])
+    config_patcher.__enter__()
+    self.addCleanup(config_patcher.__exit__, None, None, None)
+
+  def _AddResult(self, manifest, source_url, result):
+    manifest.Initialize(source_url, 'gs://bucket/' + source_url)
+    manifest.SetResult(source_url, 0, result)
+
+  def _ReadResults(self):
+    with open(self.manifest_path, 'r') as f:
+      return [(row[0], row[8]) for row in csv.reader(f)]
+
+  def testResumesWithIndex(self):
+    manifest = Manifest(self.manifest_path)
+    self._AddResult(manifest, 'a', 'OK')
+    self._AddResult(manifest, 'b', 'error')
+    self._AddResult(manifest, 'c', 'skip')
+    self.assertEqual([('Source', 'Result'), ('a', 'OK'), ('b', 'error'),
+                      ('c', 'skip')], self._ReadResults())
+
+    with mock.patch.object(ManifestIndex, 'Update') as mock_update:
+      manifest = Manifest(self.manifest_path)
+    # The index was updated as the rows were written.
+    mock_update.assert_called_once_with()
+    self.assertIsNotNone(manifest.index)
+    self.assertTrue(manifest.WasSuccessful('a'))
+    self.assertFalse(manifest.WasSuccessful('b'))
+    self.assertTrue(manifest.WasSuccessful('c'))
+    self.assertFalse(manifest.WasSuccessful('d'))
+
+  def testIndexesRowsMissingFromIndex(self):
+    manifest = Manifest(self.manifest_path)
+    self._AddResult(manifest, 'a', 'OK')
+    with mock.patch.object(ManifestIndex, 'AddSuccessfulSources'):
+      self._AddResult(manifest, 'b', 'OK')
+    self._AddResult(manifest, 'c', 'OK')
+    self.assertFalse(manifest.WasSuccessful('b'))
+
+    manifest = Manifest(self.manifest_path)
+    for source_url in ('a', 'b', 'c'):
+      self.assertTrue(manifest.WasSuccessful(source_url))
+
+  def testReindexesReplacedManifest(self):
+    manifest = Manifest(self.manifest_path)
+    self._AddResult(manifest, 'a', 'OK')
+    os.unlink(self.manifest_path)
+    manifest = Manifest(self.manifest_path)
+    self._AddResult(manifest, 'b', 'OK')
+
+    manifest = Manifest(self.manifest_path)
+    self.assertFalse(manifest.WasSuccessful('a'))
+    self.assertTrue(manifest.WasSuccessful('b'))
+
+  def testReindexesManifestRewrittenInPlace(self):
+    with open(self.manifest_path, 'w') as f:
+      f.write('Source,Result\na,OK\nb,error\n')
+    index = ManifestIndex(self.manifest_path)
+    index.Update()
+    # Rewrite the rows without replacing the file or making it shorter.
+    with open(self.manifest_path, 'r+') as f:
+      f.write('Source,Result\na,error\nb,OK\nc,OK\n')
+
+    index = ManifestIndex(self.manifest_path)
+    index.Update()
+    self.assertFalse(index.WasSuccessful('a'))
+    self.assertTrue(index.WasSuccessful('b'))
+    self.assertTrue(index.WasSuccessful('c'))
+
+  def testIndexesExistingManifest(self):
+    with open(self.manifest_path, 'w') as f:
+      f.write('Result,Source\nOK,a\nerror,b\n')
+    index = ManifestIndex(self.manifest_path)
+    index.Update()
+    self.assertTrue(index.WasSuccessful('a'))
+    self.assertFalse(index.WasSuccessful('b'))
+
+  def testRaisesForMissingHeaders(self):
+    with open(self.manifest_path, 'w') as f:
+      f.write('a,OK\n')
+    with self.assertRaisesRegex(CommandException, 'Missing headers'):
+      Manifest(self.manifest_path)
+
+  @mock.patch.object(manifest_index_util, 'sqlite3', None)
+  def testWorksWithoutIndex(self):
+    manifest = Manifest(self.manifest_path)
+    self._AddResult(manifest, 'a', 'OK')
+    manifest = Manifest(self.manifest_path)
+    self.assertIsNone(manifest.index)
+    self.assertTrue(manifest.WasSuccessful('a'))
+    self.assertFalse(manifest.WasSuccessful('b'))
+
+  def testWritesRowsFromConcurrentThreads(self):
+    manifest = Manifest(self.manifest_path)
+    source_urls = ['file%d' % i for i in range(50)]
+    threads = [
+        threading.Thread(target=self._AddResult,
+                         args=(manifest, source_url, 'OK'))
+        for source_url in source_urls
+    ]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    self.assertEqual(sorted(source_urls),
+                     sorted(source for source, _ in self._ReadResults()[1:]))
+
+    manifest = Manifest(self.manifest_path)
+    for source_url in source_urls:
+      self.assertTrue(manifest.WasSuccessful(source_url))
+
+  def testPicklesManifest(self):
+    manifest = Manifest(self.manifest_path)
+    self._AddResult(manifest, 'a', 'OK')
+    manifest = pickle.loads(pickle.dumps(manifest))
+    self._AddResult(manifest, 'b', 'OK')
+    self.assertTrue(manifest.WasSuccessful('a'))
+    self.assertTrue(manifest.WasSuccessful('b'))
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for metadata_cache_util.py."""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import pickle
+import threading
+
+from gslib.cloud_api import NotFoundException
+from gslib.tests import testcase
+from gslib.third_party.storage_apitools import storage_v1_messages as apitools_messages
+from gslib.utils.cloud_api_helper import GetCloudApiInstance
+from gslib.utils.metadata_cache_util import GetNumMetadataRequestsSaved
+from gslib.utils.metadata_cache_util import MetadataCache
+from gslib.utils.metadata_cache_util import MetadataCachingCloudApi
+
+from six import add_move, MovedModule
+
+add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+from six.moves import mock
+
+_BUCKET_KEY = MetadataCache.BucketKey('gs', 'bucket')
+
+
+class TestMetadataCacheUtil(testcase.GsUtilUnitTestCase):
+  """Unit tests for the command-scoped metadata cache."""
+
+  def _GetCachingApi(self):
+    gsutil_api = mock.Mock(provider='gs')
+    gsutil_api.GetBucket.side_effect = (
+        lambda bucket_name, **_: apitools_messages.Bucket(name=bucket_name))
+    gsutil_api.GetObjectMetadata.side_effect = (
+        lambda bucket_name, object_name, generation=None, **_:
+        apitools_messages.Object(bucket=bucket_name,
+                                 name=object_name,
+                                 generation=generation))
+    return MetadataCachingCloudApi(gsutil_api, MetadataCache())
+
+  def testGetReturnsCopyOfCachedMetadata(self):
+    cache = MetadataCache()
+    fetch_func = mock.Mock(return_value=apitools_messages.Bucket(name='b'))
+    num_saved = GetNumMetadataRequestsSaved()
+    first = cache.Get(_BUCKET_KEY, ['name', 'location'], fetch_func)
+    first.name = 'modified'
+    second = cache.Get(_BUCKET_KEY, ['name', 'location'], fetch_func)
+    self.assertEqual('b', second.name)
+    # A subset of the cached fields is also served from the cache.
+    cache.Get(_BUCKET_KEY, ['location'], fetch_func)
+    self.assertEqual(1, fetch_func.call_count)
+    self.assertEqual(num_saved + 2, GetNumMetadataRequestsSaved())
+    # A superset of the cached fields is not.
+    cache.Get(_BUCKET_KEY, ['name', 'location', 'acl'], fetch_func)
+    self.assertEqual(2, fetch_func.call_count)
+
+  def testExceptionsAreNotCached(self):
+    cache = MetadataCache()
+    fetch_func = mock.Mock(side_effect=[
+        NotFoundException('not found'),
+        apitools_messages.Bucket(name='b')
+    ])
+    with self.assertRaises(NotFoundException):
+      cache.Get(_BUCKET_KEY, None, fetch_func)
+    self.assertEqual('b', cache.Get(_BUCKET_KEY, None, fetch_func).name)
+
+  def testConcurrentRequestsAreCoalesced(self):
+    cache = MetadataCache()
+    fetch_started = threading.Event()
+    release_fetch = threading.Event()
+    fetch_calls = []
+
+    def _Fetch():
+      fetch_calls.append(1)
+      fetch_started.set()
+      release_fetch.wait()
+      return apitools_messages.Bucket(name='b')
+
+    results = []
+    owner = threading.Thread(
+        target=lambda: results.append(cache.Get(_BUCKET_KEY, None, _Fetch)))
+    owner.start()
+    fetch_started.wait()
+    waiter = threading.Thread(
+        target=lambda: results.append(cache.Get(_BUCKET_KEY, None, _Fetch)))
+    waiter.start()
+    release_fetch.set()
+    owner.join()
+    waiter.join()
+    self.assertEqual(1, len(fetch_calls))
+    self.assertEqual(['b', 'b'], [bucket.name for bucket in results])
+    self.assertIsNot(results[0], results[1])
+
+  def testInvalidationDuringFetchIsNotCached(self):
+    cache = MetadataCache()
+
+    def _FetchAndInvalidate():
+      cache.Invalidate(_BUCKET_KEY)
+      return apitools_messages.Bucket(name='stale')
+
+    self.assertEqual('stale',
+                     cache.Get(_BUCKET_KEY, None, _FetchAndInvalidate).name)
+    fetch_func = mock.Mock(return_value=apitools_messages.Bucket(name='b'))
+    self.assertEqual('b', cache.Get(_BUCKET_KEY, None, fetch_func).name)
+
+  def testBucketMutationsInvalidateBucket(self):
+    caching_api = self._GetCachingApi()
+    caching_api.GetBucket('bucket', fields=['location'])
+    caching_api.GetBucket('bucket', provider='gs', fields=['location'])
+    self.assertEqual(1, caching_api.gsutil_api.GetBucket.call_count)
+    caching_api.PatchBucket('bucket', apitools_messages.Bucket())
+    caching_api.GetBucket('bucket', fields=['location'])
+    self.assertEqual(2, caching_api.gsutil_api.GetBucket.call_count)
+
+  def testObjectWritesOnlyInvalidateLiveObject(self):
+    caching_api = self._GetCachingApi()
+    caching_api.GetObjectMetadata('bucket', 'obj')
+    caching_api.GetObjectMetadata('bucket', 'obj', generation=1)
+    caching_api.UploadObject(
+        None, apitools_messages.Object(bucket='bucket', name='obj'))
+    caching_api.GetObjectMetadata('bucket', 'obj')
+    caching_api.GetObjectMetadata('bucket', 'obj', generation=1)
+    self.assertEqual(3, caching_api.gsutil_api.GetObjectMetadata.call_count)
+
+  def testObjectPatchInvalidatesAllGenerations(self):
+    caching_api = self._GetCachingApi()
+    caching_api.GetObjectMetadata('bucket', 'obj', generation=1)
+    caching_api.GetObjectMetadata('bucket', 'obj2', generation=1)
+    caching_api.PatchObjectMetadata('bucket', 'obj',
+                                    apitools_messages.Object())
+    caching_api.GetObjectMetadata('bucket', 'obj', generation=1)
+    caching_api.GetObjectMetadata('bucket', 'obj2', generation=1)
+    self.assertEqual(3, caching_api.gsutil_api.GetObjectMetadata.call_count)
+
+  def testPickledCacheIsEmpty(self):
+    cache = MetadataCache()
+    cache.Add(_BUCKET_KEY, None, apitools_messages.Bucket(name='b'))
+    fetch_func = mock.Mock(return_value=apitools_messages.Bucket(name='b'))
+    unpickled_cache = pickle.loads(pickle.dumps(cache))
+    unpickled_cache.Get(_BUCKET_KEY, None, fetch_func)
+    cache.Get(_BUCKET_KEY, None, fetch_func)
+    self.assertEqual(1, fetch_func.call_count)
+
+  def testGetCloudApiInstanceUsesCommandMetadataCache(self):
+    command = mock.Mock(gsutil_api=mock.Mock(), metadata_cache=None)
+    self.assertIs(command.gsutil_api, GetCloudApiInstance(command))
+    command.metadata_cache = MetadataCache()
+    caching_api = GetCloudApiInstance(command)
+    self.assertIsInstance(caching_api, MetadataCachingCloudApi)
+    self.assertIs(command.gsutil_api, caching_api.gsutil_api)
+    self.assertIs(command.metadata_cache, caching_api.metadata_cache)
@@ -255,7 +255,8 @@ class TestMetricsUnitTests(testcase.GsUtilUnitTestCase):
         'parallel_process_count', 'parallel_thread_count',
         'resumable_threshold', 'rsync_buffer_lines',
         'sliced_object_download_max_components', 'software_update_check_period',
-        'tab_completion_timeout', 'task_estimation_threshold'
+        'tab_completion_timeout', 'task_estimation_threshold',
+        'token_refresh_margin'
     ]
     all_categories = sorted(string_and_bool_categories + int_categories)
 
@@ -316,7 +317,7 @@ class TestMetricsUnitTests(testcase.GsUtilUnitTestCase):
           'resumable_threshold:1999,rsync_buffer_lines:1999,'
           'sliced_object_download_max_components:1999,'
           'software_update_check_period:1999,tab_completion_timeout:1999,'
-          'task_estimation_threshold:1999',
+          'task_estimation_threshold:1999,token_refresh_margin:1999',
           self.collector._ValidateAndGetConfigValues())
 
     def MockValidLargeInts(_, category):
@@ -333,7 +334,8 @@ class TestMetricsUnitTests(testcase.GsUtilUnitTestCase):
           'resumable_threshold:2001,rsync_buffer_lines:2001,'
           'sliced_object_download_max_components:INVALID,'
           'software_update_check_period:INVALID,'
-          'tab_completion_timeout:INVALID,task_estimation_threshold:2001',
+          'tab_completion_timeout:INVALID,task_estimation_threshold:2001,'
+          'token_refresh_margin:INVALID',
           self.collector._ValidateAndGetConfigValues())
 
       # Test that a non-integer return value is invalid.
@@ -402,6 +404,9 @@ class TestMetricsUnitTests(testcase.GsUtilUnitTestCase):
                                           num_processes=2,
                                           num_threads=3,
                                           num_objects_transferred=3,
+                                          num_credential_refreshes=2,
+                                          credential_refresh_time=0.5,
+                                          num_metadata_requests_saved=4,
                                           provider_types=['gs'])
 
     # Log a retryable service error and two retryable network errors.
@@ -445,6 +450,9 @@ class TestMetricsUnitTests(testcase.GsUtilUnitTestCase):
         ('Average Overall Throughput', '10'),
         ('Num Retryable Service Errors', '1'),
         ('Num Retryable Network Errors', '2'),
+        ('Num Credential Refreshes', '2'),
+        ('Credential Refresh Time', '500'),
+        ('Num Metadata Requests Saved', '4'),
         ('Thread Idle Time Percent', '0.8'),
         ('Slowest Thread Throughput', '10'),
         ('Fastest Thread Throughput', '10'),
@@ -20,7 +20,10 @@ from __future__ import division
 from __future__ import unicode_literals
 
 import os
+from unittest import mock
 
+from gslib import exception
+from gslib.commands import cp
 from gslib.cs_api_map import ApiSelector
 from gslib.tests.test_cp import TestCpMvPOSIXBucketToLocalErrors
 from gslib.tests.test_cp import TestCpMvPOSIXBucketToLocalNoErrors
@@ -107,6 +110,34 @@ class TestMvUnitTests(testcase.GsUtilUnitTestCase):
     ])
     self.assertEqual(actual, expected)
 
+  def test_mv_keeps_sources_that_were_not_replicated(self):
+    """Tests that a source isn't removed if copying a replica failed."""
+    bucket_uri = self.CreateBucket()
+    replica_bucket_uri = self.CreateBucket()
+    fpath = self.CreateTempFile(contents=b'data')
+    with mock.patch.object(cp.CpCommand,
+                           '_ReplicateObject',
+                           side_effect=exception.CommandException('Failed')):
+      with self.assertRaisesRegex(exception.CommandException,
+                                  '1 file/object could not be transferred'):
+        self.RunCommand('mv', [
+            '--replicate-to',
+            suri(replica_bucket_uri), fpath,
+            suri(bucket_uri)
+        ])
+    self.assertTrue(os.path.exists(fpath))
+
+    self.RunCommand('mv', [
+        '--replicate-to',
+        suri(replica_bucket_uri), fpath,
+        suri(bucket_uri, 'obj')
+    ])
+    self.assertFalse(os.path.exists(fpath))
+    self.assertEqual(
+        [suri(replica_bucket_uri, 'obj')],
+        [str(u) for u in self._test_wildcard_iterator(
+            suri(replica_bucket_uri, '**')).IterAll()])
+
 
 class TestMvUnitTestsWithShim(testcase.ShimUnitTestBase):
   """Unit tests for mv command with shim."""
@@ -59,7 +59,7 @@ from gslib.utils.parallelism_framework_util import CheckMultiprocessingAvailable
 from gslib.utils.parallelism_framework_util import multiprocessing_context
 from gslib.utils.parallelism_framework_util import (
     AtomicDict, CreateLock, ProcessAndThreadSafeInt, PutToQueueWithTimeout,
-    ShouldProhibitMultiprocessing)
+    ShouldProhibitMultiprocessing, TaskArgsBatch, TaskArgsBatchingIterator)
 from gslib.utils.system_util import IS_OSX
 from gslib.utils.system_util import IS_WINDOWS
 
@@ -1015,6 +1015,36 @@ class TestParallelismFramework(testcase.GsUtilUnitTestCase):
         CreateLock()
         mock_thread_lock.assert_called_once()
 
+  def test_task_args_batching_iterator(self):
+    # Even numbers are batched by their remainder modulo 4, odd numbers are
+    # not batched at all.
+    get_batch_key = lambda arg: None if arg % 2 else arg % 4
+    batching_iterator = TaskArgsBatchingIterator([0, 4, 8, 12, 2, 1, 6, 10],
+                                                 3, get_batch_key)
+    results = [
+        list(item) if isinstance(item, TaskArgsBatch) else item
+        for item in batching_iterator
+    ]
+    self.assertEqual([[0, 4, 8], [12], [2], 1, [6, 10]], results)
+
+  def test_task_args_batching_iterator_batch_size_per_key(self):
+    batching_iterator = TaskArgsBatchingIterator(
+        ['a1', 'a2', 'a3', 'b1', 'b2', 'b3'], {
+            'a': 2,
+            'b': 3
+        }.get, lambda arg: arg[0])
+    self.assertEqual([['a1', 'a2'], ['a3'], ['b1', 'b2', 'b3']],
+                     [list(batch) for batch in batching_iterator])
+
+  def test_task_args_batching_iterator_exceptions(self):
+    batching_iterator = TaskArgsBatchingIterator(FailingIterator(6, [2, 3]), 10,
+                                                 lambda _: 'key')
+    self.assertEqual([0, 1], list(next(batching_iterator)))
+    self.assertRaises(CustomException, next, batching_iterator)
+    self.assertRaises(CustomException, next, batching_iterator)
+    self.assertEqual([4, 5], list(next(batching_iterator)))
+    self.assertRaises(StopIteration, next, batching_iterator)
+
 
 # _ResetConnectionPool is only called in child processes, so we need a queue
 # to track calls.
@@ -56,6 +56,46 @@ class TestPosixUtil(testcase.GsUtilUnitTestCase):
       posix_util.InitializeDefaultMode()
     mock_umask.assert_called_once_with(0o177)
 
+  @unittest.skipIf(IS_WINDOWS, 'POSIX attributes not available on Windows.')
+  @mock.patch('os.geteuid', new=mock.Mock(return_value=1))
+  @mock.patch('os.getuid', new=mock.Mock(return_value=1))
+  @mock.patch.object(posix_util.grp, 'getgrgid', autospec=True)
+  def test_validate_file_permission_access_caches_results(self, mock_getgrgid):
+    posix_util.InitializeUserGroups()
+    self.addCleanup(posix_util.InitializeUserGroups)
+    with mock.patch.object(posix_util,
+                           '_GetUserGroups',
+                           return_value=set([2])) as mock_get_user_groups:
+      self.assertEqual((True, ''),
+                       posix_util.ValidateFilePermissionAccess('a',
+                                                               gid=2,
+                                                               mode=640))
+      self.assertEqual(
+          (False, 'Insufficient access with uid/gid/mode for b, gid: 2, '
+           'mode: 600'),
+          posix_util.ValidateFilePermissionAccess('b', gid=2, mode=600))
+      self.assertEqual((True, ''),
+                       posix_util.ValidateFilePermissionAccess('c',
+                                                               gid=2,
+                                                               mode=640))
+      self.assertEqual(
+          (False, 'Insufficient access with uid/gid/mode for d, gid: 2, '
+           'mode: 600'),
+          posix_util.ValidateFilePermissionAccess('d', gid=2, mode=600))
+    self.assertEqual(2, mock_getgrgid.call_count)
+    self.assertEqual(2, mock_get_user_groups.call_count)
+
+  @unittest.skipIf(IS_WINDOWS, 'POSIX attributes not available on Windows.')
+  @mock.patch.object(os, 'getgrouplist', create=True, return_value=[1, 2])
+  def test_initialize_user_groups_looks_up_groups_lazily(
+      self, mock_getgrouplist):
+    posix_util.InitializeUserGroups()
+    self.addCleanup(posix_util.InitializeUserGroups)
+    mock_getgrouplist.assert_not_called()
+    self.assertEqual(set([1, 2]), posix_util._GetUserGroups())
+    self.assertEqual(set([1, 2]), posix_util._GetUserGroups())
+    mock_getgrouplist.assert_called_once_with(mock.ANY, mock.ANY)
+
   def test_convert_mode_to_base8(self):
     self.assertEqual(posix_util.ConvertModeToBase8(33188), 644)
     self.assertEqual(posix_util.ConvertModeToBase8(33261), 755)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for read_ahead_util.py."""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import os
+
+from gslib.file_part import FilePart
+from gslib.tests import testcase
+from gslib.utils import read_ahead_util
+from gslib.utils.hashing_helper import HashingFileUploadWrapper
+from gslib.utils.hashing_helper import GetMd5
+from gslib.utils.read_ahead_util import ReadAheadFileWrapper
+
+from six import add_move, MovedModule
+
+add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+from six.moves import mock
+
+_CONTENTS = os.urandom(3 * 1024 * 1024 + 17)
+_BUFFER_SIZE = 2 * 1024 * 1024
+
+
+class TestReadAheadUtil(testcase.GsUtilUnitTestCase):
+  """Unit tests for reading files ahead of uploads."""
+
+  def setUp(self):
+    super(TestReadAheadUtil, self).setUp()
+    self.file_name = self.CreateTempFile(contents=_CONTENTS)
+
+  def _OpenWrapper(self):
+    wrapper = ReadAheadFileWrapper(open(self.file_name, 'rb'), _BUFFER_SIZE)
+    self.addCleanup(wrapper.close)
+    return wrapper
+
+  def testReadsSequentially(self):
+    wrapper = self._OpenWrapper()
+    data = []
+    while True:
+      chunk = wrapper.read(300 * 1000)
+      if not chunk:
+        break
+      data.append(chunk)
+      self.assertEqual(sum(len(d) for d in data), wrapper.tell())
+    self.assertEqual(_CONTENTS, b''.join(data))
+    self.assertEqual(b'', wrapper.read())
+
+  def testSeeks(self):
+    wrapper = self._OpenWrapper()
+    self.assertEqual(_CONTENTS[:10], wrapper.read(10))
+    self.assertEqual(2000000, wrapper.seek(2000000))
+    self.assertEqual(_CONTENTS[2000000:2000010], wrapper.read(10))
+    self.assertEqual(5, wrapper.seek(5))
+    self.assertEqual(_CONTENTS[5:], wrapper.read())
+    self.assertEqual(len(_CONTENTS), wrapper.seek(0, os.SEEK_END))
+    self.assertEqual(len(_CONTENTS) - 7, wrapper.seek(-7, os.SEEK_CUR))
+    self.assertEqual(_CONTENTS[-7:], wrapper.read())
+
+  def testWrapsFilePart(self):
+    wrapper = ReadAheadFileWrapper(FilePart(self.file_name, 1000, 5000),
+                                   _BUFFER_SIZE)
+    self.addCleanup(wrapper.close)
+    self.assertEqual(_CONTENTS[1000:6000], wrapper.read())
+    self.assertEqual(10, wrapper.seek(10))
+    self.assertEqual(_CONTENTS[1010:1020], wrapper.read(10))
+
+  def testHashesWithSeeks(self):
+    wrapper = HashingFileUploadWrapper(self._OpenWrapper(), {'md5': GetMd5()},
+                                       {'md5': GetMd5}, mock.Mock(),
+                                       mock.Mock())
+    wrapper.read(1500000)
+    wrapper.seek(1000000)
+    while wrapper.read(100000):
+      pass
+    expected_md5 = GetMd5()
+    expected_md5.update(_CONTENTS)
+    self.assertEqual(expected_md5.hexdigest(),
+                     wrapper._digesters['md5'].hexdigest())
+
+  def testRaisesReadErrorsWhenReached(self):
+    fp = open(self.file_name, 'rb')
+    orig_read = fp.read
+    reads = []
+
+    def _FailSecondRead(size):
+      reads.append(size)
+      if len(reads) == 2:
+        raise IOError('Transient error')
+      return orig_read(size)
+
+    with mock.patch.object(read_ahead_util, '_READ_AHEAD_CHUNK_SIZE', 1000):
+      wrapper = ReadAheadFileWrapper(mock.Mock(wraps=fp,
+                                               read=_FailSecondRead),
+                                     _BUFFER_SIZE)
+    self.addCleanup(wrapper.close)
+    self.assertEqual(_CONTENTS[:1000], wrapper.read(1000))
+    self.assertRaises(IOError, wrapper.read, 1000)
+    # The read is retried from the same position.
+    self.assertEqual(_CONTENTS[1000:2000], wrapper.read(1000))
@@ -21,6 +21,7 @@ from __future__ import unicode_literals
 
 import os
 import re
+import time
 from unittest import mock
 
 import six
@@ -31,6 +32,7 @@ from gslib.project_id import PopulateProjectId
 from gslib.exception import CommandException
 from gslib.storage_url import StorageUrlFromString
 import gslib.tests.testcase as testcase
+from gslib.third_party.pubsub_apitools import pubsub_v1_messages as pubsub_messages
 from gslib.tests.testcase.integration_testcase import SkipForGS
 from gslib.tests.testcase.integration_testcase import SkipForS3
 from gslib.tests.testcase.integration_testcase import SkipForXML
@@ -184,6 +186,152 @@ class TestRsyncUnit(testcase.GsUtilUnitTestCase):
           '-j', 'html', '-J', 'gs://b1', 'gs://b2'
       ])
 
+  def _MakeNotification(self, ack_id, event_type, bucket_name, object_name):
+    attributes = pubsub_messages.PubsubMessage.AttributesValue(
+        additionalProperties=[
+            pubsub_messages.PubsubMessage.AttributesValue.AdditionalProperty(
+                key=key, value=value)
+            for key, value in (('eventType', event_type),
+                               ('bucketId', bucket_name),
+                               ('objectId', object_name))
+        ])
+    return pubsub_messages.ReceivedMessage(
+        ackId=ack_id,
+        message=pubsub_messages.PubsubMessage(attributes=attributes))
+
+  def _RunRsyncWithSubscription(self, notifications, last_reconcile_time,
+                                args):
+    """Runs rsync --subscription, pulling notifications from a fake."""
+    mock_pubsub_api = mock.Mock()
+    mock_pubsub_api.Pull.side_effect = [notifications, []]
+    state_filename = os.path.join(self.CreateTempDir(), 'state')
+    if last_reconcile_time is not None:
+      rsync._WriteLastReconcileTime(state_filename, last_reconcile_time)
+    with mock.patch.object(rsync, 'PubsubApi', return_value=mock_pubsub_api):
+      with mock.patch.object(rsync,
+                             '_GetReconcileStateFilename',
+                             return_value=state_filename):
+        self.RunCommand(
+            'rsync',
+            ['--subscription=projects/p/subscriptions/s'] + args)
+    return mock_pubsub_api, state_filename
+
+  def test_rsync_subscription_applies_notified_changes(self):
+    bucket_uri = self.CreateBucket()
+    self.CreateObject(bucket_uri=bucket_uri, object_name='dir/obj1',
+                      contents=b'obj1')
+    self.CreateObject(bucket_uri=bucket_uri, object_name='dir/obj2',
+                      contents=b'obj2')
+    dst_bucket_uri = self.CreateBucket()
+    self.CreateObject(bucket_uri=dst_bucket_uri, object_name='deleted',
+                      contents=b'x')
+    self.CreateObject(bucket_uri=dst_bucket_uri, object_name='unchanged',
+                      contents=b'x')
+    bucket_name = bucket_uri.bucket_name
+    notifications = [
+        self._MakeNotification('1', 'OBJECT_FINALIZE', bucket_name,
+                               'dir/obj1'),
+        self._MakeNotification('2', 'OBJECT_FINALIZE', bucket_name,
+                               'dir/obj1'),
+        self._MakeNotification('3', 'OBJECT_DELETE', bucket_name,
+                               'dir/deleted'),
+        self._MakeNotification('4', 'OBJECT_FINALIZE', 'other-bucket',
+                               'dir/obj2'),
+        self._MakeNotification('5', 'OBJECT_FINALIZE', bucket_name, 'obj3'),
+    ]
+
+    mock_pubsub_api, _ = self._RunRsyncWithSubscription(
+        notifications, time.time(),
+        ['-d', suri(bucket_uri, 'dir'), suri(dst_bucket_uri)])
+
+    # Only the notified objects under the source URL were synced, without
+    # listing the source or destination.
+    stdout = self.RunCommand('ls', [suri(dst_bucket_uri)], return_stdout=True)
+    self.assertEqual(
+        [suri(dst_bucket_uri, 'obj1'),
+         suri(dst_bucket_uri, 'unchanged')], sorted(stdout.split()))
+    mock_pubsub_api.Acknowledge.assert_called_once_with(
+        'projects/p/subscriptions/s', ['1', '2', '3', '4', '5'])
+
+  def test_rsync_subscription_compares_notified_objects(self):
+    bucket_uri = self.CreateBucket()
+    self.CreateObject(bucket_uri=bucket_uri, object_name='same',
+                      contents=b'same')
+    self.CreateObject(bucket_uri=bucket_uri, object_name='changed',
+                      contents=b'new contents')
+    dst_bucket_uri = self.CreateBucket()
+    self.CreateObject(bucket_uri=dst_bucket_uri, object_name='same',
+                      contents=b'same')
+    self.CreateObject(bucket_uri=dst_bucket_uri, object_name='changed',
+                      contents=b'old')
+    notifications = [
+        self._MakeNotification(str(i), 'OBJECT_FINALIZE',
+                               bucket_uri.bucket_name, object_name)
+        for i, object_name in enumerate(('same', 'changed'))
+    ]
+
+    with mock.patch.object(rsync, '_RsyncFunc',
+                           wraps=rsync._RsyncFunc) as mock_rsync_func:
+      mock_pubsub_api, _ = self._RunRsyncWithSubscription(
+          notifications, time.time(), [suri(bucket_uri), suri(dst_bucket_uri)])
+
+    # Only the object that differs from its destination was copied.
+    self.assertEqual([(suri(bucket_uri, 'changed'), rsync.DiffAction.COPY)],
+                     [(call[0][1].src_url_str, call[0][1].diff_action)
+                      for call in mock_rsync_func.call_args_list])
+    self.assertEqual(
+        'new contents',
+        self.RunCommand('cat', [suri(dst_bucket_uri, 'changed')],
+                        return_stdout=True))
+    # The notifications were kept from being redelivered while they were
+    # applied.
+    mock_pubsub_api.ModifyAckDeadline.assert_called_once_with(
+        'projects/p/subscriptions/s', ['0', '1'],
+        rsync._NOTIFICATION_ACK_DEADLINE)
+
+  def test_rsync_subscription_reconciles_with_full_sync(self):
+    bucket_uri = self.CreateBucket()
+    self.CreateObject(bucket_uri=bucket_uri, object_name='obj1',
+                      contents=b'obj1')
+    self.CreateObject(bucket_uri=bucket_uri, object_name='obj2',
+                      contents=b'obj2')
+    dst_bucket_uri = self.CreateBucket()
+    notifications = [
+        self._MakeNotification('1', 'OBJECT_FINALIZE',
+                               bucket_uri.bucket_name, 'obj1'),
+    ]
+
+    start_time = time.time()
+    mock_pubsub_api, state_filename = self._RunRsyncWithSubscription(
+        notifications, None, [suri(bucket_uri), suri(dst_bucket_uri)])
+
+    # Objects that weren't notified are synced by the full listing, and the
+    # pending notifications are acknowledged.
+    stdout = self.RunCommand('ls', [suri(dst_bucket_uri)], return_stdout=True)
+    self.assertEqual(
+        [suri(dst_bucket_uri, 'obj1'),
+         suri(dst_bucket_uri, 'obj2')], sorted(stdout.split()))
+    mock_pubsub_api.Acknowledge.assert_called_once_with(
+        'projects/p/subscriptions/s', ['1'])
+    self.assertGreaterEqual(rsync._ReadLastReconcileTime(state_filename),
+                            int(start_time))
+
+  def test_rsync_subscription_requires_cloud_source(self):
+    with self.assertRaisesRegex(CommandException,
+                                'requires a cloud source URL'):
+      self.RunCommand('rsync', [
+          '--subscription=s', self.CreateTempDir(),
+          suri(self.CreateBucket())
+      ])
+
+  def test_rsync_subscription_and_u_options_together_fails(self):
+    with self.assertRaisesRegex(CommandException,
+                                "can't be combined with --subscription"):
+      self.RunCommand('rsync', [
+          '-u', '--subscription=projects/p/subscriptions/s', 'gs://b1',
+          'gs://b2'
+      ])
+
 
 class TestRsyncUnitWithShim(testcase.ShimUnitTestBase):
 
@@ -182,3 +182,90 @@ class TestRsyncFuncs(GsUtilUnitTestCase):
     mock_islink.return_value = False
     self.assertTrue(_DiffToApplyArgChecker(cmd, diff))
 
+
+  @mock.patch('os.path.islink')
+  def test_diff_to_apply_arg_checker_filters_batches(self, mock_islink):
+    from gslib.commands.rsync import _DiffToApplyArgChecker
+    from gslib.utils.parallelism_framework_util import TaskArgsBatch
+    from gslib.utils.rsync_util import RsyncDiffToApply, DiffAction
+
+    cmd = mock.Mock(exclude_symlinks=True)
+    mock_islink.side_effect = lambda path: path == '/tmp/src-link'
+    batch = TaskArgsBatch([
+        RsyncDiffToApply('file:///tmp/src-link', 'gs://bucket/link', None,
+                         DiffAction.MTIME_SRC_TO_DST, None),
+        RsyncDiffToApply('file:///tmp/src-file', 'gs://bucket/file', None,
+                         DiffAction.MTIME_SRC_TO_DST, None),
+    ])
+    self.assertTrue(_DiffToApplyArgChecker(cmd, batch))
+    self.assertEqual(['gs://bucket/file'],
+                     [diff.dst_url_str for diff in batch])
+
+    mock_islink.side_effect = lambda _: True
+    self.assertFalse(_DiffToApplyArgChecker(cmd, batch))
+
+  def test_patch_dst_objects_copies_objects_that_cannot_be_patched(self):
+    from gslib.cloud_api import AccessDeniedException
+    from gslib.commands import rsync
+    from gslib.utils.parallelism_framework_util import TaskArgsBatch
+    from gslib.utils.posix_util import POSIXAttributes
+    from gslib.utils.rsync_util import RsyncDiffToApply, DiffAction
+
+    cmd = mock.Mock(dryrun=False)
+    gsutil_api = mock.Mock()
+    gsutil_api.PatchObjectsMetadata.return_value = [
+        None, AccessDeniedException('denied')
+    ]
+    batch = TaskArgsBatch([
+        RsyncDiffToApply('file:///tmp/a', 'gs://bucket/a',
+                         POSIXAttributes(mtime=10),
+                         DiffAction.MTIME_SRC_TO_DST, 1),
+        RsyncDiffToApply('file:///tmp/b', 'gs://bucket/b',
+                         POSIXAttributes(mtime=20),
+                         DiffAction.POSIX_SRC_TO_DST, 2),
+    ])
+    with mock.patch.object(rsync, 'GetCloudApiInstance',
+                           return_value=gsutil_api):
+      with mock.patch.object(rsync, '_RsyncFunc') as mock_rsync_func:
+        rsync._PatchDstObjects(cmd, batch)
+
+    objects_to_patch = gsutil_api.PatchObjectsMetadata.call_args[0][0]
+    self.assertEqual(['a', 'b'], [obj[1] for obj in objects_to_patch])
+    self.assertEqual(
+        '10', objects_to_patch[0][2].metadata.additionalProperties[0].value)
+    # Only the object that could not be patched is copied.
+    self.assertEqual(1, mock_rsync_func.call_count)
+    copy_diff = mock_rsync_func.call_args[0][1]
+    self.assertEqual('gs://bucket/b', copy_diff.dst_url_str)
+    self.assertEqual(DiffAction.COPY, copy_diff.diff_action)
+
+  def test_remove_dst_objects_reports_every_failure(self):
+    from gslib.cloud_api import AccessDeniedException
+    from gslib.cloud_api import NotFoundException
+    from gslib.commands import rsync
+    from gslib.utils.parallelism_framework_util import TaskArgsBatch
+    from gslib.utils.rsync_util import RsyncDiffToApply, DiffAction
+
+    cmd = mock.Mock(dryrun=False, op_failure_count=0)
+    gsutil_api = mock.Mock()
+    gsutil_api.DeleteObjects.return_value = [
+        AccessDeniedException('denied a'),
+        NotFoundException('missing b'), None,
+        AccessDeniedException('denied d')
+    ]
+    batch = TaskArgsBatch([
+        RsyncDiffToApply(None, 'gs://bucket/%s' % name, None,
+                         DiffAction.REMOVE, None) for name in 'abcd'
+    ])
+    with mock.patch.object(rsync, 'GetCloudApiInstance',
+                           return_value=gsutil_api):
+      with mock.patch.object(rsync, 'IncrementFailureCount') as mock_increment:
+        with self.assertRaisesRegex(AccessDeniedException, 'denied d'):
+          rsync._RemoveDstObjects(cmd, batch)
+
+    # The last failure is raised for Apply to count; the others are handled
+    # here, and objects that are already gone aren't failures.
+    self.assertEqual(1, mock_increment.call_count)
+    self.assertEqual(1, cmd.op_failure_count)
+    cmd.logger.error.assert_called_once_with(
+        'AccessDeniedException: denied a')
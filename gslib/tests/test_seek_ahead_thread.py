@@ -25,9 +25,13 @@ import six
 from six.moves import queue as Queue
 from six.moves import range
 
+from gslib.exception import CommandException
 from gslib.name_expansion import SeekAheadNameExpansionIterator
+from gslib.seek_ahead_thread import _IteratorException
+from gslib.seek_ahead_thread import _SpillBuffer
 from gslib.seek_ahead_thread import SeekAheadResult
 from gslib.seek_ahead_thread import SeekAheadThread
+from gslib.seek_ahead_thread import SharedListingIterator
 import gslib.tests.testcase as testcase
 from gslib.ui_controller import UIController
 from gslib.ui_controller import UIThread
@@ -268,3 +272,79 @@ class TestSeekAheadThread(testcase.GsUtilUnitTestCase):
     message = stream.getvalue()
     self.assertEqual(message, '')
 
+
+  def testSharedListingIteratorListsOnce(self):
+    """Tests that seek-ahead and the producer share a single iteration."""
+    num_iterated = [0]
+
+    def _ArgsIterator():
+      for i in range(10):
+        num_iterated[0] += 1
+        yield i
+
+    shared_listing = SharedListingIterator(
+        _ArgsIterator(),
+        lambda args: SeekAheadResult(data_bytes=args),
+        max_buffered_results=3)
+    # The producer consumes a few arguments before seek-ahead starts.
+    self.assertEqual([0, 1], [next(shared_listing), next(shared_listing)])
+
+    seek_ahead_results = list(shared_listing.IterSeekAheadResults())
+    self.assertEqual(10, sum(r.est_num_ops for r in seek_ahead_results))
+    self.assertEqual(45, sum(r.data_bytes for r in seek_ahead_results))
+
+    # The remaining arguments come from the buffer, some of them spilled to
+    # disk, in their original order.
+    self.assertEqual(list(range(2, 10)), list(shared_listing))
+    self.assertEqual(10, num_iterated[0])
+
+  def testSpillBufferKeepsOrderOfUnspillableItems(self):
+    """Tests that items kept in memory while spilling keep their position."""
+    spill_buffer = _SpillBuffer(2)
+    unpicklable = lambda: None
+    exception = _IteratorException(CommandException('fail'))
+    items = [0, 1, 2, unpicklable, 3, exception, 4]
+    for item in items:
+      spill_buffer.Append(item)
+    self.assertEqual(items, [spill_buffer.PopLeft() for _ in items])
+    spill_buffer.Close()
+
+  def testSharedListingIteratorReraisesExceptionsInOrder(self):
+    """Tests that exceptions seen while seeking ahead reach the producer."""
+
+    class _RaisingIterator(object):
+
+      def __init__(self):
+        self.items = [1, ValueError('fail'), 2]
+
+      def __iter__(self):
+        return self
+
+      def __next__(self):
+        if not self.items:
+          raise StopIteration
+        item = self.items.pop(0)
+        if isinstance(item, Exception):
+          raise item
+        return item
+
+      next = __next__
+
+    shared_listing = SharedListingIterator(_RaisingIterator(),
+                                           lambda _: SeekAheadResult())
+    self.assertEqual(
+        2, sum(r.est_num_ops for r in shared_listing.IterSeekAheadResults()))
+    self.assertEqual(1, next(shared_listing))
+    self.assertRaises(ValueError, next, shared_listing)
+    self.assertEqual(2, next(shared_listing))
+    self.assertRaises(StopIteration, next, shared_listing)
+
+  def testSharedListingIteratorClose(self):
+    """Tests that a closed SharedListingIterator stops seeking ahead."""
+    shared_listing = SharedListingIterator(iter(range(10)),
+                                           lambda _: SeekAheadResult())
+    seek_ahead_results = shared_listing.IterSeekAheadResults()
+    next(seek_ahead_results)
+    shared_listing.Close()
+    self.assertEqual([], list(seek_ahead_results))
+    self.assertEqual([], list(shared_listing))
@@ -25,6 +25,7 @@ from unittest import mock
 
 import six
 
+from gslib.cloud_api import PreconditionException
 from gslib.commands import setmeta
 from gslib.exception import CommandException
 from gslib.cs_api_map import ApiSelector
@@ -360,6 +361,33 @@ class TestSetMetaUnit(testcase.GsUtilUnitTestCase):
       self.RunCommand(
           'setmeta', ['-h', 'x-goog-meta-héader:val', 'gs://bucket/obj'])
 
+  @mock.patch.object(setmeta, 'IncrementFailureCount')
+  @mock.patch.object(setmeta, 'GetCloudApiInstance')
+  def test_setmeta_batch_retries_precondition_failures(
+      self, mock_get_cloud_api_instance, mock_increment_failure_count):
+    command = mock.Mock(everything_set_okay=True)
+    command.SetMetadataFunc.side_effect = [None, PreconditionException('obj3')]
+    gsutil_api = mock_get_cloud_api_instance.return_value
+    gsutil_api.PatchObjectsMetadata.return_value = [
+        None, PreconditionException('obj2'),
+        PreconditionException('obj3')
+    ]
+    name_expansion_results = [mock.Mock(), mock.Mock(), mock.Mock()]
+
+    setmeta.SetMetaCommand.SetMetadataBatchFunc(command,
+                                                name_expansion_results)
+
+    # Only the objects whose update failed a precondition are retried, and
+    # only the failed retry is reported.
+    self.assertEqual([
+        mock.call(name_expansion_results[1], thread_state=None),
+        mock.call(name_expansion_results[2], thread_state=None)
+    ], command.SetMetadataFunc.call_args_list)
+    mock_increment_failure_count.assert_called_once_with()
+    self.assertEqual(1, command.logger.error.call_count)
+    self.assertIn('obj3', str(command.logger.error.call_args[0][0]))
+    self.assertFalse(command.everything_set_okay)
+
   def test_setmeta_non_ascii_standard_value_raises(self):
     with self.assertRaisesRegex(
         CommandException, r'Invalid non-ASCII'):
@@ -23,8 +23,10 @@ from datetime import datetime
 from datetime import timedelta
 import os
 import pkgutil
+import sys
 
 import boto
+import six
 
 import gslib.commands.signurl
 from gslib.commands.signurl import HAVE_CRYPTO
@@ -626,6 +628,47 @@ class UnitTestSignUrl(testcase.GsUtilUnitTestCase):
           billing_project='myproject')
     self.assertEqual(expected, signed_url)
 
+  def testSignUrlsFromStdin(self):
+    """Tests that -I signs the URLs read from stdin."""
+    ks_file = self.CreateTempFile(
+        contents=pkgutil.get_data('gslib', 'tests/test_data/test.json'))
+    stdin = six.StringIO('gs://bucket/obj1\ngs://bucket/obj2\n')
+    with mock.patch.object(sys, 'stdin', stdin):
+      with mock.patch.object(gslib.commands.signurl.UrlSignCommand,
+                             '_ProbeObjectAccessWithClient',
+                             return_value=200) as mock_probe:
+        stdout = self.RunCommand('signurl',
+                                 ['-I', '-r', 'us-east1', ks_file],
+                                 return_stdout=True)
+    lines = stdout.splitlines()
+    self.assertEqual(3, len(lines))
+    self.assertTrue(lines[1].startswith('gs://bucket/obj1\tGET\t'))
+    self.assertIn('https://storage.googleapis.com/bucket/obj1?', lines[1])
+    self.assertTrue(lines[2].startswith('gs://bucket/obj2\tGET\t'))
+    self.assertEqual(2, mock_probe.call_count)
+
+  def testSignUrlsFromStdinRejectsUrlArgs(self):
+    """Tests that -I can't be combined with URL arguments."""
+    with self.assertRaisesRegex(CommandException, 'No URL arguments allowed'):
+      self.RunCommand('signurl', ['-I', 'key-file', 'gs://bucket/obj'])
+
+  def testBucketRegionFetchedOncePerBucket(self):
+    """Tests that auto-detected bucket regions are cached for the command."""
+    ks_file = self.CreateTempFile(
+        contents=pkgutil.get_data('gslib', 'tests/test_data/test.json'))
+    bucket = mock.Mock(location='US-EAST1')
+    with mock.patch.object(gslib.commands.signurl.UrlSignCommand,
+                           'GetSingleBucketUrlFromArg',
+                           return_value=(None, bucket)) as mock_get_bucket:
+      with mock.patch.object(gslib.commands.signurl.UrlSignCommand,
+                             '_ProbeObjectAccessWithClient',
+                             return_value=200):
+        stdout = self.RunCommand(
+            'signurl', [ks_file, 'gs://bucket/obj1', 'gs://bucket/obj2'],
+            return_stdout=True)
+    self.assertEqual(1, mock_get_bucket.call_count)
+    self.assertEqual(2, stdout.count('us-east1%2Fstorage'))
+
 
 @unittest.skipUnless(HAVE_CRYPTO, 'signurl requires cryptography library.')
 class UnitTestSignUrlWithShim(testcase.ShimUnitTestBase):
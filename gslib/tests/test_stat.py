@@ -19,7 +19,13 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import unicode_literals
 
+import sys
+
+import six
+
+from gslib.command_runner import CommandRunner
 from gslib.cs_api_map import ApiSelector
+from gslib.exception import CommandException
 from gslib.exception import NO_URLS_MATCHED_TARGET
 import gslib.tests.testcase as testcase
 from gslib.tests.testcase.integration_testcase import SkipForS3
@@ -43,6 +49,11 @@ from gslib.tests.util import TEST_ENCRYPTION_KEY2_SHA256_B64
 from gslib.tests.util import unittest
 from gslib.utils.retry_util import Retry
 
+from six import add_move, MovedModule
+
+add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+from six.moves import mock
+
 
 class TestStat(testcase.GsUtilIntegrationTestCase):
   """Integration tests for stat command."""
@@ -270,3 +281,61 @@ class TestStat(testcase.GsUtilIntegrationTestCase):
     stderr = self.RunGsUtil(['stat', nonexistent_object_uri], expected_status=1, return_stderr=True)
     self.assertIn(NO_URLS_MATCHED_TARGET % nonexistent_object_uri, stderr)
 
+
+class TestStatUnit(testcase.GsUtilUnitTestCase):
+  """Unit tests for the stat command."""
+
+  def _CreateObjects(self):
+    bucket_uri = self.CreateBucket()
+    url_strs = [
+        suri(
+            self.CreateObject(bucket_uri=bucket_uri,
+                              object_name=object_name,
+                              contents=b'z'))
+        for object_name in ('c', 'a', 'b')
+    ]
+    url_strs.insert(1, suri(bucket_uri, 'missing'))
+    return url_strs
+
+  def _AssertStatOutputInOrder(self, url_strs, stdout, stderr):
+    self.assertEqual(
+        [url_strs[0], url_strs[2], url_strs[3]],
+        [line[:-1] for line in stdout.splitlines() if line.endswith(':')])
+    self.assertIn(NO_URLS_MATCHED_TARGET % url_strs[1], stderr)
+
+  def test_stat_prints_results_in_input_order(self):
+    url_strs = self._CreateObjects()
+    stdout, stderr = self.RunCommand('stat',
+                                     url_strs,
+                                     return_stdout=True,
+                                     return_stderr=True)
+    self._AssertStatOutputInOrder(url_strs, stdout, stderr)
+
+  def test_stat_parallel_prints_results_in_input_order(self):
+    url_strs = self._CreateObjects()
+    original_run_named_command = CommandRunner.RunNamedCommand
+
+    def _RunNamedCommandInParallel(runner, *args, **kwargs):
+      kwargs['parallel_operations'] = True
+      return original_run_named_command(runner, *args, **kwargs)
+
+    with mock.patch.object(CommandRunner, 'RunNamedCommand',
+                           _RunNamedCommandInParallel):
+      stdout, stderr = self.RunCommand('stat',
+                                       url_strs,
+                                       return_stdout=True,
+                                       return_stderr=True)
+    self._AssertStatOutputInOrder(url_strs, stdout, stderr)
+
+  def test_stat_reads_urls_from_stdin(self):
+    url_strs = self._CreateObjects()
+    stdin = six.StringIO('\n'.join(url_strs) + '\n')
+    with mock.patch.object(sys, 'stdin', stdin):
+      stdout, stderr = self.RunCommand('stat', ['-I'],
+                                       return_stdout=True,
+                                       return_stderr=True)
+    self._AssertStatOutputInOrder(url_strs, stdout, stderr)
+
+  def test_stat_stdin_rejects_url_args(self):
+    with self.assertRaisesRegex(CommandException, 'No URL arguments allowed'):
+      self.RunCommand('stat', ['-I', 'gs://bucket/obj'])
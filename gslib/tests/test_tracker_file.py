@@ -30,7 +30,9 @@ from gslib.parallel_tracker_file import WriteComponentToParallelUploadTrackerFil
 from gslib.parallel_tracker_file import WriteParallelUploadTrackerFile
 from gslib.storage_url import StorageUrlFromString
 from gslib.tests.testcase.unit_testcase import GsUtilUnitTestCase
+from gslib.tests.util import SetBotoConfigForTest
 from gslib.third_party.storage_apitools import storage_v1_messages as apitools_messages
+from gslib import tracker_file
 from gslib.tracker_file import _HashFilename
 from gslib.tracker_file import DeleteTrackerFile
 from gslib.tracker_file import GetRewriteTrackerFilePath
@@ -40,6 +42,11 @@ from gslib.tracker_file import WriteRewriteTrackerFile
 from gslib.utils import parallelism_framework_util
 from gslib.utils.constants import UTF8
 
+from six import add_move, MovedModule
+
+add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+from six.moves import mock
+
 
 class TestTrackerFile(GsUtilUnitTestCase):
   """Unit tests for parallel upload functions in cp command."""
@@ -298,3 +305,106 @@ class TestTrackerFile(GsUtilUnitTestCase):
     # Clean up
     DeleteTrackerFile(tracker_file_name)
 
+
+
+class TestTrackerDatabase(GsUtilUnitTestCase):
+  """Unit tests for keeping tracker data in the tracker database."""
+
+  def setUp(self):
+    super(TestTrackerDatabase, self).setUp()
+    self.tracker_dir = self.CreateTempDir()
+    # Don't reuse database connections between tests.
+    self.addCleanup(tracker_file._connections.Close)  # pylint: disable=protected-access
+
+  def _TrackerConfig(self, use_tracker_database=True):
+    return SetBotoConfigForTest([
+        ('GSUtil', 'use_tracker_database', str(use_tracker_database)),
+        ('GSUtil', 'resumable_tracker_dir', self.tracker_dir),
+    ])
+
+  def _GetRewriteTrackerFilePath(self):
+    return GetRewriteTrackerFilePath('bk1', 'obj1', 'bk2', 'obj2',
+                                     self.test_api)
+
+  def testRewriteTrackerData(self):
+    with self._TrackerConfig():
+      tracker_file_name = self._GetRewriteTrackerFilePath()
+      self.assertIsNone(ReadRewriteTrackerFile(tracker_file_name, 'hash1'))
+      WriteRewriteTrackerFile(tracker_file_name, 'hash1', 'token1')
+      self.assertFalse(os.path.exists(tracker_file_name))
+      self.assertEqual('token1',
+                       ReadRewriteTrackerFile(tracker_file_name, 'hash1'))
+      self.assertIsNone(ReadRewriteTrackerFile(tracker_file_name, 'hash2'))
+      DeleteTrackerFile(tracker_file_name)
+      self.assertIsNone(ReadRewriteTrackerFile(tracker_file_name, 'hash1'))
+    self.assertEqual(
+        [tracker_file.TRACKER_DATABASE_NAME],
+        [name for name in os.listdir(self.tracker_dir)
+         if not name.endswith(('-wal', '-shm'))])
+    if os.name == 'posix':
+      mode = oct(
+          stat.S_IMODE(
+              os.stat(
+                  os.path.join(self.tracker_dir,
+                               tracker_file.TRACKER_DATABASE_NAME)).st_mode))
+      self.assertEqual(oct(0o600), mode)
+
+  def testMovesTrackerFilesIntoDatabase(self):
+    with self._TrackerConfig(use_tracker_database=False):
+      tracker_file_name = self._GetRewriteTrackerFilePath()
+      WriteRewriteTrackerFile(tracker_file_name, 'hash1', 'token1')
+    self.assertTrue(os.path.exists(tracker_file_name))
+    with self._TrackerConfig():
+      self.assertEqual('token1',
+                       ReadRewriteTrackerFile(tracker_file_name, 'hash1'))
+      self.assertFalse(os.path.exists(tracker_file_name))
+      self.assertEqual('token1',
+                       ReadRewriteTrackerFile(tracker_file_name, 'hash1'))
+
+  def testParallelUploadTrackerData(self):
+    with self._TrackerConfig():
+      tracker_file_name = os.path.join(self.tracker_dir, 'foo')
+      objects = [
+          ObjectFromTracker('obj1', '42'),
+          ObjectFromTracker('obj2', '314159')
+      ]
+      WriteParallelUploadTrackerFile(tracker_file_name,
+                                     '123',
+                                     objects,
+                                     encryption_key_sha256='456')
+      WriteComponentToParallelUploadTrackerFile(
+          tracker_file_name,
+          parallelism_framework_util.CreateLock(),
+          ObjectFromTracker('obj3', '43'),
+          self.logger,
+          encryption_key_sha256='456')
+      self.assertEqual(
+          ('456', '123', objects + [ObjectFromTracker('obj3', '43')]),
+          ReadParallelUploadTrackerFile(tracker_file_name, self.logger))
+      self.assertFalse(os.path.exists(tracker_file_name))
+
+  def testDownloadTrackerData(self):
+    from gslib.tracker_file import ReadOrCreateDownloadTrackerFile
+
+    dst_url = StorageUrlFromString('file:///tmp/download.txt')
+    src_obj_metadata = apitools_messages.Object(bucket='bucket',
+                                                name='obj',
+                                                etag='etag123',
+                                                size=20 * 1024 * 1024)
+    with self._TrackerConfig():
+      tracker_file_name, start_byte = ReadOrCreateDownloadTrackerFile(
+          src_obj_metadata,
+          dst_url,
+          self.logger,
+          self.test_api,
+          start_byte=0,
+          existing_file_size=0)
+      self.assertEqual(0, start_byte)
+      self.assertFalse(os.path.exists(tracker_file_name))
+      _, start_byte = ReadOrCreateDownloadTrackerFile(src_obj_metadata,
+                                                      dst_url,
+                                                      self.logger,
+                                                      self.test_api,
+                                                      start_byte=0,
+                                                      existing_file_size=5000)
+      self.assertEqual(5000, start_byte)
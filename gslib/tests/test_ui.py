@@ -72,6 +72,7 @@ from gslib.utils.constants import UTF8
 from gslib.utils.copy_helper import PARALLEL_UPLOAD_STATIC_SALT
 from gslib.utils.copy_helper import PARALLEL_UPLOAD_TEMP_NAMESPACE
 from gslib.utils.hashing_helper import GetMd5
+from gslib.utils.parallelism_framework_util import CoalescingStatusQueue
 from gslib.utils.parallelism_framework_util import PutToQueueWithTimeout
 from gslib.utils.parallelism_framework_util import ZERO_TASKS_TO_DO_ARGUMENT
 from gslib.utils.retry_util import Retry
@@ -1640,3 +1641,73 @@ class TestUiUnitTests(testcase.GsUtilUnitTestCase):
 
     # Verify that the metrics log handler was invoked
     mock_log_retryable.assert_called_once_with(error_msg)
+
+  def test_ui_coalescing_status_queue_progress(self):
+    """Tests that progress is coalesced per file without reordering."""
+    status_queue = Queue.Queue()
+    coalescing_queue = CoalescingStatusQueue(status_queue, flush_period=60)
+    src_url = StorageUrlFromString('foo')
+    start_time = self.start_time
+    PutToQueueWithTimeout(
+        coalescing_queue,
+        FileMessage(src_url,
+                    None,
+                    start_time,
+                    size=100,
+                    message_type=FileMessage.FILE_UPLOAD))
+    for i in range(1, 11):
+      PutToQueueWithTimeout(
+          coalescing_queue,
+          ProgressMessage(100, 10 * i, src_url, start_time + i))
+    # Only the file start message has been published so far.
+    self.assertEqual(1, status_queue.qsize())
+    PutToQueueWithTimeout(
+        coalescing_queue,
+        FileMessage(src_url,
+                    None,
+                    start_time + 11,
+                    size=100,
+                    finished=True,
+                    message_type=FileMessage.FILE_UPLOAD))
+    messages = [status_queue.get() for _ in range(status_queue.qsize())]
+    self.assertEqual(3, len(messages))
+    self.assertIsInstance(messages[0], FileMessage)
+    # The latest progress snapshot precedes the file finished message.
+    self.assertIsInstance(messages[1], ProgressMessage)
+    self.assertEqual(100, messages[1].processed_bytes)
+    self.assertIsInstance(messages[2], FileMessage)
+    self.assertTrue(messages[2].finished)
+
+  def test_ui_coalescing_status_queue_metadata(self):
+    """Tests that MetadataMessages are coalesced into a single count."""
+    status_queue = Queue.Queue()
+    coalescing_queue = CoalescingStatusQueue(status_queue, flush_period=60)
+    for i in range(50):
+      PutToQueueWithTimeout(coalescing_queue,
+                            MetadataMessage(self.start_time + i))
+    self.assertEqual(0, status_queue.qsize())
+    coalescing_queue.Flush(include_metadata=False)
+    self.assertEqual(0, status_queue.qsize())
+    coalescing_queue.Flush()
+    self.assertEqual(1, status_queue.qsize())
+    message = status_queue.get()
+    self.assertEqual(50, message.num_objects)
+    self.assertEqual(self.start_time + 49, message.time)
+
+    # The MetadataManager accounts for every coalesced operation.
+    stream = six.StringIO()
+    ui_controller = UIController(custom_time=self.start_time)
+    PutToQueueWithTimeout(MainThreadUIQueue(stream, ui_controller), message)
+    self.assertEqual(50, ui_controller.manager.objects_finished)
+    self.assertEqual(50, ui_controller.manager.num_objects)
+
+  def test_ui_coalescing_status_queue_flush_resets_period(self):
+    """Tests that every flush restarts the coalescing period."""
+    status_queue = Queue.Queue()
+    coalescing_queue = CoalescingStatusQueue(status_queue, flush_period=60)
+    coalescing_queue.last_flush_time -= 120
+    coalescing_queue.Flush(include_metadata=False)
+    PutToQueueWithTimeout(
+        coalescing_queue,
+        ProgressMessage(100, 10, StorageUrlFromString('foo'), self.start_time))
+    self.assertEqual(0, status_queue.qsize())
@@ -26,6 +26,7 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import unicode_literals
 
+import concurrent.futures
 import os
 import re
 import six
@@ -38,6 +39,7 @@ from gslib.utils import system_util
 from gslib.storage_url import StorageUrlFromString
 import gslib.tests.testcase as testcase
 from gslib.tests.util import ObjectToURI as suri
+from gslib.tests.util import SetBotoConfigForTest
 from gslib.tests.util import SetDummyProjectForUnitTest
 from gslib.tests.util import unittest
 from unittest import mock
@@ -512,6 +514,60 @@ class FileIteratorTests(testcase.GsUtilUnitTestCase):
             expand_top_level_buckets=True))
     self.assertEqual(self.all_file_uri_strs, actual_uri_strs)
 
+  def testRecursiveListingCarriesStatResults(self):
+    """Tests that recursively listed files keep the stat results."""
+    uri = self._test_storage_uri(suri(self.test_dir, '**'))
+    blrs = list(
+        self._test_wildcard_iterator(uri).IterAll(
+            bucket_listing_fields=['size']))
+    self.assertEqual(self.all_file_uri_strs, set(str(blr) for blr in blrs))
+    for blr in blrs:
+      # Size is based on contents "Test N" as created by CreateTempDir.
+      self.assertEqual(6, blr.root_object.size)
+      self.assertEqual(6, blr.stat_result.st_size)
+    # Files aren't stat'ed unless their size is requested.
+    for blr in self._test_wildcard_iterator(uri).IterAll():
+      self.assertIsNone(blr.stat_result)
+
+  def testRecursiveListingMatchesOsWalkOrder(self):
+    """Tests that concurrently scanned files are listed in os.walk order."""
+    test_files = []
+    for i in range(4):
+      for j in range(4):
+        test_files.append(('d%d' % i, 'e%d' % j, 'f'))
+        test_files.append(('d%d' % i, 'g%d' % j))
+    test_dir = self.CreateTempDir(test_files=test_files)
+    expected_paths = []
+    for dirpath, _, filenames in os.walk(test_dir):
+      expected_paths.extend(
+          os.path.join(dirpath, filename) for filename in filenames)
+    uri = self._test_storage_uri(suri(test_dir, '**'))
+    with SetBotoConfigForTest([('GSUtil', 'file_listing_threads', '3')]):
+      actual_paths = [
+          blr.storage_url.object_name
+          for blr in self._test_wildcard_iterator(uri).IterAll()
+      ]
+    self.assertEqual(expected_paths, actual_paths)
+
+  def testRecursiveListingLimitsScansAhead(self):
+    """Tests that only the next few directories are scanned ahead."""
+    test_dir = self.CreateTempDir(test_files=[('d%02d' % i, 'f')
+                                              for i in range(20)])
+    uri = self._test_storage_uri(suri(test_dir, '**'))
+    submit = concurrent.futures.ThreadPoolExecutor.submit
+    with SetBotoConfigForTest([('GSUtil', 'file_listing_threads', '1')]):
+      with mock.patch.object(concurrent.futures.ThreadPoolExecutor,
+                             'submit',
+                             autospec=True,
+                             side_effect=submit) as mock_submit:
+        blrs = self._test_wildcard_iterator(uri).IterAll()
+        next(blrs)
+        # Scans of the top directory and of the next two subdirectories have
+        # been submitted.
+        self.assertEqual(3, mock_submit.call_count)
+        self.assertEqual(19, len(list(blrs)))
+    self.assertEqual(21, mock_submit.call_count)
+
   def testInvalidRecursiveDirectoryWildcard(self):
     """Tests that wildcard containing '***' raises exception."""
     try:
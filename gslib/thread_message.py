@@ -112,6 +112,31 @@ class RetryableErrorMessage(StatusMessage):
              self.total_wait_sec, self.time, self.process_id, self.thread_id))
 
 
+class CredentialRefreshMessage(StatusMessage):
+  """Message class for access tokens refreshed ahead of their expiry.
+
+  This class contains the time spent refreshing the token, to report to
+  analytics collection.
+  """
+
+  def __init__(self, refresh_time, message_time):
+    """Creates a CredentialRefreshMessage.
+
+    Args:
+      refresh_time: Float representing how long the refresh took, in seconds.
+      message_time: Float representing when message was created (seconds since
+          Epoch).
+    """
+    super(CredentialRefreshMessage, self).__init__(message_time)
+    self.refresh_time = refresh_time
+
+  def __str__(self):
+    """Returns a string with a valid constructor for this message."""
+    return ('%s(%s, %s, process_id=%s, thread_id=%s)' %
+            (self.__class__.__name__, self.refresh_time, self.time,
+             self.process_id, self.thread_id))
+
+
 class FinalMessage(StatusMessage):
   """Creates a FinalMessage.
 
@@ -132,18 +157,26 @@ class MetadataMessage(StatusMessage):
   """Creates a MetadataMessage.
 
   A MetadataMessage simply indicates that a metadata operation on a given object
-  has been successfully done. The only passed argument is the time when such
-  operation has finished.
+  has been successfully done. Worker pools may coalesce several of these
+  messages into one, in which case num_objects operations have finished.
   """
 
-  def __init__(self, message_time):
+  def __init__(self, message_time, num_objects=1):
     """Creates a MetadataMessage.
 
     Args:
       message_time: Float representing when message was created (seconds since
           Epoch).
+      num_objects: Number of metadata operations that have finished.
     """
     super(MetadataMessage, self).__init__(message_time)
+    self.num_objects = num_objects
+
+  def __str__(self):
+    """Returns a string with a valid constructor for this message."""
+    return ('%s(%s, num_objects=%s, process_id=%s, thread_id=%s)' %
+            (self.__class__.__name__, self.time, self.num_objects,
+             self.process_id, self.thread_id))
 
 
 class FileMessage(StatusMessage):
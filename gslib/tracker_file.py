@@ -33,6 +33,8 @@ from gslib.utils.boto_util import GetGsutilStateDir
 from gslib.utils.boto_util import ResumableThreshold
 from gslib.utils.constants import UTF8
 from gslib.utils.hashing_helper import GetMd5
+from gslib.utils.sqlite_util import sqlite3
+from gslib.utils.sqlite_util import ThreadLocalConnection
 from gslib.utils.system_util import CreateDirIfNeeded
 
 # The maximum length of a file name can vary wildly between different
@@ -48,6 +50,23 @@ TRACKER_FILE_UNWRITABLE_EXCEPTION_TEXT = (
 ENCRYPTION_UPLOAD_TRACKER_ENTRY = 'encryption_key_sha256'
 SERIALIZATION_UPLOAD_TRACKER_ENTRY = 'serialization_data'
 
+# Name of the database that holds tracker data in the tracker file directory
+# when the use_tracker_database option is enabled. Tracker "files" are then
+# rows of the database, keyed by the tracker file path they would otherwise be
+# written to.
+TRACKER_DATABASE_NAME = 'tracker-files.sqlite3'
+
+_CREATE_TABLE_STATEMENT = ('CREATE TABLE IF NOT EXISTS tracker_files '
+                           '(path TEXT PRIMARY KEY, data TEXT NOT NULL)')
+
+# Every write is its own transaction, so a tracker entry is either fully
+# updated or not at all if gsutil is killed, as with tracker files. Tracker
+# data may include resumable upload URLs, so the database gets the same
+# permissions as tracker files.
+_connections = ThreadLocalConnection([_CREATE_TABLE_STATEMENT],
+                                     isolation_level=None,
+                                     file_mode=0o600)
+
 
 class TrackerFileType(object):
   UPLOAD = 'upload'
@@ -101,6 +120,22 @@ def CreateTrackerDirIfNeeded():
   return tracker_dir
 
 
+def UseTrackerDatabase():
+  return (sqlite3 is not None and
+          config.getbool('GSUtil', 'use_tracker_database', False))
+
+
+def _GetTrackerDatabase():
+  """Returns this thread's connection to the tracker database.
+
+  Raises:
+    OSError: If the database file can't be created.
+    sqlite3.Error: If the database can't be opened.
+  """
+  return _connections.Get(
+      os.path.join(CreateTrackerDirIfNeeded(), TRACKER_DATABASE_NAME))
+
+
 def GetRewriteTrackerFilePath(src_bucket_name, src_obj_name, dst_bucket_name,
                               dst_obj_name, api_selector):
   """Gets the tracker file name described by the arguments.
@@ -216,15 +251,11 @@ def GetSlicedDownloadTrackerFilePaths(dst_url,
 
   # If we don't know the number of components, check the tracker file.
   if num_components is None:
-    tracker_file = None
     try:
-      tracker_file = open(parallel_tracker_file_path, 'r')
-      num_components = json.load(tracker_file)['num_components']
+      num_components = json.loads(
+          ReadTrackerFile(parallel_tracker_file_path))['num_components']
     except (IOError, ValueError):
       return tracker_file_paths
-    finally:
-      if tracker_file:
-        tracker_file.close()
 
   for i in range(num_components):
     tracker_file_paths.append(
@@ -257,7 +288,16 @@ def _HashAndReturnPath(res_tracker_file_name, tracker_file_type):
 
 
 def DeleteTrackerFile(tracker_file_name):
-  if tracker_file_name and os.path.exists(tracker_file_name):
+  if not tracker_file_name:
+    return
+  if UseTrackerDatabase():
+    try:
+      _GetTrackerDatabase().execute('DELETE FROM tracker_files WHERE path = ?',
+                                    (tracker_file_name,))
+    except (IOError, OSError, sqlite3.Error) as e:
+      RaiseUnwritableTrackerFileException(tracker_file_name, str(e))
+  # Tracker files may remain from before the database was enabled.
+  if os.path.exists(tracker_file_name):
     os.unlink(tracker_file_name)
 
 
@@ -341,24 +381,20 @@ def ReadRewriteTrackerFile(tracker_file_name, rewrite_params_hash):
     file exists, None otherwise (which will result in starting a new rewrite).
   """
   # Check to see if we already have a matching tracker file.
-  tracker_file = None
   if not rewrite_params_hash:
     return
   try:
-    tracker_file = open(tracker_file_name, 'r')
-    existing_hash = tracker_file.readline().rstrip('\n')
+    existing_hash, _, tracker_data = (
+        ReadTrackerFile(tracker_file_name).partition('\n'))
     if existing_hash == rewrite_params_hash:
       # Next line is the rewrite token.
-      return tracker_file.readline().rstrip('\n')
+      return tracker_data.partition('\n')[0]
   except IOError as e:
     # Ignore non-existent file (happens first time a rewrite is attempted.
     if e.errno != errno.ENOENT:
       sys.stderr.write(
           ('Couldn\'t read Copy tracker file (%s): %s. Restarting copy '
            'from scratch.' % (tracker_file_name, e.strerror)))
-  finally:
-    if tracker_file:
-      tracker_file.close()
 
 
 def WriteRewriteTrackerFile(tracker_file_name, rewrite_params_hash,
@@ -427,16 +463,15 @@ def ReadOrCreateDownloadTrackerFile(src_obj_metadata,
                                          tracker_file_type,
                                          api_selector,
                                          component_num=component_num)
-  tracker_file = None
   # Check to see if we already have a matching tracker file.
   try:
-    tracker_file = open(tracker_file_name, 'r')
+    tracker_data = ReadTrackerFile(tracker_file_name)
     if tracker_file_type is TrackerFileType.DOWNLOAD:
-      etag_value = tracker_file.readline().rstrip('\n')
+      etag_value = tracker_data.partition('\n')[0]
       if etag_value == src_obj_metadata.etag:
         return tracker_file_name, existing_file_size
     elif tracker_file_type is TrackerFileType.DOWNLOAD_COMPONENT:
-      component_data = json.loads(tracker_file.read())
+      component_data = json.loads(tracker_data)
       if (component_data['etag'] == src_obj_metadata.etag and
           component_data['generation'] == src_obj_metadata.generation):
         return tracker_file_name, component_data['download_start_byte']
@@ -450,9 +485,6 @@ def ReadOrCreateDownloadTrackerFile(src_obj_metadata,
     if isinstance(e, ValueError) or e.errno != errno.ENOENT:
       logger.warn('Couldn\'t read download tracker file (%s): %s. Restarting '
                   'download from scratch.' % (tracker_file_name, str(e)))
-  finally:
-    if tracker_file:
-      tracker_file.close()
 
   # There wasn't a matching tracker file, so create one and then start the
   # download from scratch.
@@ -507,16 +539,15 @@ def GetDownloadStartByte(src_obj_metadata,
                                          tracker_file_type,
                                          api_selector,
                                          component_num=component_num)
-  tracker_file = None
   # Check to see if we already have a matching tracker file.
   try:
-    tracker_file = open(tracker_file_name, 'r')
+    tracker_data = ReadTrackerFile(tracker_file_name)
     if tracker_file_type is TrackerFileType.DOWNLOAD:
-      etag_value = tracker_file.readline().rstrip('\n')
+      etag_value = tracker_data.partition('\n')[0]
       if etag_value == src_obj_metadata.etag:
         return existing_file_size
     elif tracker_file_type is TrackerFileType.DOWNLOAD_COMPONENT:
-      component_data = json.loads(tracker_file.read())
+      component_data = json.loads(tracker_data)
       if (component_data['etag'] == src_obj_metadata.etag and
           component_data['generation'] == src_obj_metadata.generation):
         return component_data['download_start_byte']
@@ -525,10 +556,6 @@ def GetDownloadStartByte(src_obj_metadata,
     # If the file does not exist, there is not much we can do at this point.
     pass
 
-  finally:
-    if tracker_file:
-      tracker_file.close()
-
   # There wasn't a matching tracker file, which means our starting point is
   # start_byte.
   return start_byte
@@ -552,8 +579,52 @@ def WriteDownloadComponentTrackerFile(tracker_file_name, src_obj_metadata,
   _WriteTrackerFile(tracker_file_name, json.dumps(component_data))
 
 
+def ReadTrackerFile(tracker_file_name):
+  """Reads the data stored in a tracker file.
+
+  If the tracker database is enabled and doesn't have the data yet, it's read
+  from the tracker file, which is then moved into the database.
+
+  Args:
+    tracker_file_name: Tracker file path string.
+
+  Returns:
+    The tracker data string.
+
+  Raises:
+    IOError: If the tracker file doesn't exist (with errno ENOENT), or if it
+        can't be read.
+  """
+  use_tracker_database = UseTrackerDatabase()
+  if use_tracker_database:
+    try:
+      row = _GetTrackerDatabase().execute(
+          'SELECT data FROM tracker_files WHERE path = ?',
+          (tracker_file_name,)).fetchone()
+    except sqlite3.Error as e:
+      raise IOError(errno.EIO, str(e))
+    if row:
+      return row[0]
+  with open(tracker_file_name, 'r') as tracker_file:
+    tracker_data = tracker_file.read()
+  if use_tracker_database:
+    _WriteTrackerFile(tracker_file_name, tracker_data)
+  return tracker_data
+
+
 def _WriteTrackerFile(tracker_file_name, data):
   """Creates a tracker file, storing the input data."""
+  if UseTrackerDatabase():
+    try:
+      _GetTrackerDatabase().execute(
+          'INSERT OR REPLACE INTO tracker_files (path, data) VALUES (?, ?)',
+          (tracker_file_name, data))
+    except (IOError, OSError, sqlite3.Error) as e:
+      RaiseUnwritableTrackerFileException(tracker_file_name, str(e))
+    # The database takes precedence, so an existing tracker file is stale.
+    if os.path.exists(tracker_file_name):
+      os.unlink(tracker_file_name)
+    return False
   try:
     fd = os.open(tracker_file_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
                  0o600)
@@ -592,15 +663,13 @@ def GetUploadTrackerData(tracker_file_name, logger, encryption_key_sha256=None):
     Serialization data if the tracker file already exists (resume existing
     upload), None otherwise.
   """
-  tracker_file = None
   remove_tracker_file = False
   encryption_restart = False
 
   # If we already have a matching tracker file, get the serialization data
   # so that we can resume the upload.
   try:
-    tracker_file = open(tracker_file_name, 'r')
-    tracker_data = tracker_file.read()
+    tracker_data = ReadTrackerFile(tracker_file_name)
     tracker_json = json.loads(tracker_data)
     if tracker_json[ENCRYPTION_UPLOAD_TRACKER_ENTRY] != encryption_key_sha256:
       encryption_restart = True
@@ -625,8 +694,6 @@ def GetUploadTrackerData(tracker_file_name, logger, encryption_key_sha256=None):
       # If encryption key is still None, we can resume using the old format.
       return tracker_data
   finally:
-    if tracker_file:
-      tracker_file.close()
     if encryption_restart:
       logger.warn(
           'Upload tracker file (%s) does not match current encryption '
@@ -28,6 +28,7 @@ from six.moves import queue as Queue
 
 from gslib.metrics import LogPerformanceSummaryParams
 from gslib.metrics import LogRetryableError
+from gslib.thread_message import CredentialRefreshMessage
 from gslib.thread_message import FileMessage
 from gslib.thread_message import FinalMessage
 from gslib.thread_message import MetadataMessage
@@ -259,6 +260,16 @@ class StatusMessageManager(object):
     """
     LogPerformanceSummaryParams(uses_slice=status_message.uses_slice)
 
+  def _HandleCredentialRefreshMessage(self, status_message):
+    """Handles a CredentialRefreshMessage.
+
+    Args:
+      status_message: The CredentialRefreshMessage to be processed.
+    """
+    LogPerformanceSummaryParams(
+        num_credential_refreshes=1,
+        credential_refresh_time=status_message.refresh_time)
+
   def ShouldTrackThroughput(self, cur_time):
     """Decides whether enough time has passed to start tracking throughput.
 
@@ -410,10 +421,10 @@ class MetadataManager(StatusMessageManager):
     Args:
       status_message: The MetadataMessage to be processed.
     """
-    self.objects_finished += 1
+    self.objects_finished += status_message.num_objects
     if self.num_objects_source >= EstimationSource.INDIVIDUAL_MESSAGES:
       self.num_objects_source = EstimationSource.INDIVIDUAL_MESSAGES
-      self.num_objects += 1
+      self.num_objects += status_message.num_objects
     # Ensures we print periodic progress, and that we send a final message.
     self.object_report_change = True
     self.last_progress_time = status_message.time
@@ -439,6 +450,8 @@ class MetadataManager(StatusMessageManager):
       LogRetryableError(status_message)
     elif isinstance(status_message, PerformanceSummaryMessage):
       self._HandlePerformanceSummaryMessage(status_message)
+    elif isinstance(status_message, CredentialRefreshMessage):
+      self._HandleCredentialRefreshMessage(status_message)
     self.old_progress.append(
         self._ThroughputInformation(self.objects_finished, status_message.time))
 
@@ -518,7 +531,8 @@ class MetadataManager(StatusMessageManager):
     if isinstance(
         status_message,
         (SeekAheadMessage, ProducerThreadMessage, MetadataMessage, FinalMessage,
-         RetryableErrorMessage, PerformanceSummaryMessage)):
+         RetryableErrorMessage, PerformanceSummaryMessage,
+         CredentialRefreshMessage)):
       return True
     return False
 
@@ -796,6 +810,9 @@ class DataManager(StatusMessageManager):
     elif isinstance(status_message, PerformanceSummaryMessage):
       self._HandlePerformanceSummaryMessage(status_message)
 
+    elif isinstance(status_message, CredentialRefreshMessage):
+      self._HandleCredentialRefreshMessage(status_message)
+
     self.old_progress.append(
         self._ThroughputInformation(self.new_progress, status_message.time))
 
@@ -900,6 +917,7 @@ class DataManager(StatusMessageManager):
         FinalMessage,
         RetryableErrorMessage,
         PerformanceSummaryMessage,
+        CredentialRefreshMessage,
     )):
       return True
     return False
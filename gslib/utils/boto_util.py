@@ -41,8 +41,20 @@ import gslib
 from gslib import context_config
 from gslib.exception import CommandException
 from gslib.utils import system_util
+from gslib.utils.constants import DEFAULT_DELETE_BATCH_SIZE
+from gslib.utils.constants import DEFAULT_FILE_LISTING_THREADS
 from gslib.utils.constants import DEFAULT_GCS_JSON_API_VERSION
 from gslib.utils.constants import DEFAULT_GSUTIL_STATE_DIR
+from gslib.utils.constants import DEFAULT_HTTP_CONNECTION_POOL_IDLE_TIMEOUT_SEC
+from gslib.utils.constants import DEFAULT_HTTP_CONNECTION_POOL_SIZE
+from gslib.utils.constants import DEFAULT_PATCH_BATCH_SIZE
+from gslib.utils.constants import DEFAULT_RSYNC_RECONCILE_INTERVAL_SEC
+from gslib.utils.constants import DEFAULT_STREAM_PREFETCH_BUFFER_SIZE
+from gslib.utils.constants import DEFAULT_STREAM_PREFETCH_THREADS
+from gslib.utils.constants import DEFAULT_TOKEN_REFRESH_MARGIN_SEC
+from gslib.utils.constants import DEFAULT_UPLOAD_READ_AHEAD_BUFFER_SIZE
+from gslib.utils.constants import MAX_DELETE_BATCH_SIZE
+from gslib.utils.constants import MAX_PATCH_BATCH_SIZE
 from gslib.utils.constants import SSL_TIMEOUT_SEC
 from gslib.utils.constants import UTF8
 from gslib.utils.unit_util import HumanReadableToBytes
@@ -171,6 +183,30 @@ def GetConfigFilePaths():
   return readable_config_paths
 
 
+def GetDeleteBatchSize():
+  """Gets the number of object deletes to send per batch request.
+
+  Returns:
+    Batch size between 1 and MAX_DELETE_BATCH_SIZE. A batch size of 1 disables
+    batching.
+  """
+  batch_size = config.getint('GSUtil', 'delete_batch_size',
+                             DEFAULT_DELETE_BATCH_SIZE)
+  return max(1, min(batch_size, MAX_DELETE_BATCH_SIZE))
+
+
+def GetFileListingThreads():
+  """Gets the number of threads recursive local directory listings use."""
+  return max(
+      1,
+      config.getint('GSUtil', 'file_listing_threads',
+                    DEFAULT_FILE_LISTING_THREADS))
+
+
+def GetFileHashCacheFilename():
+  return os.path.join(GetGsutilStateDir(), 'file-hash-cache.sqlite3')
+
+
 def GetFriendlyConfigFilePaths():
   """Like GetConfigFilePaths but returns a not-found message if paths empty."""
   readable_config_paths = GetConfigFilePaths()
@@ -223,6 +259,18 @@ def GetJsonResumableChunkSize():
   return chunk_size
 
 
+def GetHttpConnectionPoolIdleTimeout():
+  """Gets the number of seconds an idle pooled HTTP connection is kept."""
+  return config.getint('GSUtil', 'http_connection_pool_idle_timeout',
+                       DEFAULT_HTTP_CONNECTION_POOL_IDLE_TIMEOUT_SEC)
+
+
+def GetHttpConnectionPoolSize():
+  """Gets the maximum number of idle HTTP connections pooled per process."""
+  return config.getint('GSUtil', 'http_connection_pool_size',
+                       DEFAULT_HTTP_CONNECTION_POOL_SIZE)
+
+
 def GetLastCheckedForGsutilUpdateTimestampFile():
   return os.path.join(GetGsutilStateDir(), '.last_software_update_check')
 
@@ -313,6 +361,47 @@ def GetNumRetries():
   return config.getint('Boto', 'num_retries', 23)
 
 
+def GetPatchBatchSize():
+  """Gets the number of object metadata patches to send per batch request.
+
+  Returns:
+    Batch size between 1 and MAX_PATCH_BATCH_SIZE. A batch size of 1 disables
+    batching.
+  """
+  batch_size = config.getint('GSUtil', 'patch_batch_size',
+                             DEFAULT_PATCH_BATCH_SIZE)
+  return max(1, min(batch_size, MAX_PATCH_BATCH_SIZE))
+
+
+def GetRsyncReconcileInterval():
+  """Gets the number of seconds between full rsync --subscription listings."""
+  return config.getint('GSUtil', 'rsync_reconcile_interval',
+                       DEFAULT_RSYNC_RECONCILE_INTERVAL_SEC)
+
+
+def GetRsyncReconcileStateDir():
+  rsync_dir = os.path.join(GetGsutilStateDir(), 'rsync-reconcile')
+  system_util.CreateDirIfNeeded(rsync_dir, mode=0o700)
+  return rsync_dir
+
+
+def GetStreamPrefetchBufferSize():
+  """Gets the max amount of memory streaming downloads may prefetch into."""
+  return max(
+      1,
+      HumanReadableToBytes(
+          config.get('GSUtil', 'stream_prefetch_buffer_size',
+                     DEFAULT_STREAM_PREFETCH_BUFFER_SIZE)))
+
+
+def GetStreamPrefetchThreads():
+  """Gets the number of threads streaming downloads prefetch data with."""
+  return max(
+      1,
+      config.getint('GSUtil', 'stream_prefetch_threads',
+                    DEFAULT_STREAM_PREFETCH_THREADS))
+
+
 def GetTabCompletionLogFilename():
   return os.path.join(GetGsutilStateDir(), 'tab-completion-logs')
 
@@ -324,6 +413,21 @@ def GetTabCompletionCacheFilename():
   return os.path.join(tab_completion_dir, 'cache')
 
 
+def GetTokenRefreshMargin():
+  """Gets the number of seconds before expiry to refresh access tokens."""
+  return config.getint('OAuth2', 'token_refresh_margin',
+                       DEFAULT_TOKEN_REFRESH_MARGIN_SEC)
+
+
+def GetUploadReadAheadBufferSize():
+  """Gets how much data uploads may read ahead of sending it, or 0."""
+  return max(
+      0,
+      HumanReadableToBytes(
+          config.get('GSUtil', 'upload_read_ahead_buffer_size',
+                     DEFAULT_UPLOAD_READ_AHEAD_BUFFER_SIZE)))
+
+
 def HasConfiguredCredentials():
   """Determines if boto credential/config file exists."""
   has_goog_creds = (config.has_option('Credentials', 'gs_access_key_id') and
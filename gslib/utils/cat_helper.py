@@ -19,17 +19,33 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import unicode_literals
 
+from collections import deque
+from collections import namedtuple
 import io
 import sys
+import threading
 
 from boto import config
+import crcmod
+import six
+from six.moves import queue as Queue
 
 from gslib.cloud_api import EncryptionException
+from gslib.cloud_api_delegator import CloudApiDelegator
 from gslib.exception import CommandException
+from gslib.exception import HashMismatchException
 from gslib.exception import NO_URLS_MATCHED_TARGET
 from gslib.storage_url import StorageUrlFromString
+from gslib.utils.boto_util import GetStreamPrefetchBufferSize
+from gslib.utils.boto_util import GetStreamPrefetchThreads
+from gslib.utils.boto_util import UsingCrcmodExtension
 from gslib.utils.encryption_helper import CryptoKeyWrapperFromKey
 from gslib.utils.encryption_helper import FindMatchingCSEKInBotoConfig
+from gslib.utils.hashing_helper import Base64EncodeHash
+from gslib.utils.hashing_helper import CHECK_HASH_ALWAYS
+from gslib.utils.hashing_helper import CHECK_HASH_IF_FAST_ELSE_FAIL
+from gslib.utils.hashing_helper import CHECK_HASH_NEVER
+from gslib.utils.hashing_helper import ConcatCrc32c
 from gslib.utils.metadata_util import ObjectIsGzipEncoded
 from gslib.utils import text_util
 
@@ -44,6 +60,137 @@ _CAT_BUCKET_LISTING_FIELDS = [
     'size',
 ]
 
+# A piece of output for the cat command, written in order.
+# header: Header line to print before the data, or None.
+# storage_url: StorageUrl of the object or file.
+# cat_object: Object metadata of the object, or None for files.
+# start_byte: Starting byte of the range to write.
+# end_byte: Ending byte of the range to write, as for GetObjectMedia.
+# decryption_tuple: CryptoKeyWrapper for decrypting the object, or None.
+# prefetch: True if the range can be fetched into memory ahead of time, in
+#     which case start_byte and end_byte are absolute offsets within the
+#     object. Other parts are streamed directly once it is their turn.
+# validate_hash: True if the CRC32C of the object's prefetched parts is to be
+#     checked against the object's CRC32C once its last part is written.
+# last: True if this is the last part of the object.
+CatPart = namedtuple(
+    'CatPart', 'header storage_url cat_object start_byte end_byte '
+    'decryption_tuple prefetch validate_hash last')
+
+
+def _GetPrefetchSize(part):
+  """Returns the number of bytes buffered when prefetching part."""
+  if not part.prefetch:
+    return 0
+  return part.end_byte - part.start_byte + 1
+
+
+class _PrefetchResult(object):
+  """Holds the data of a prefetched CatPart once it has been fetched."""
+
+  def __init__(self):
+    self.done = threading.Event()
+    self.data = None
+    self.crc32c = None
+    self.exception = None
+
+  def Wait(self):
+    """Returns the prefetched data, raising the fetch's exception if any."""
+    self.done.wait()
+    if self.exception is not None:
+      raise self.exception
+    return self.data
+
+
+class StreamPrefetcher(object):
+  """Fetches byte ranges of objects into memory with a pool of threads."""
+
+  def __init__(self, command_obj, num_threads):
+    """Instantiates a StreamPrefetcher.
+
+    Args:
+      command_obj: gsutil command instance whose API settings the fetch
+          threads use.
+      num_threads: Number of fetch threads.
+    """
+    self.command_obj = command_obj
+    self.num_threads = num_threads
+    self._task_queue = Queue.Queue()
+    self._threads = []
+
+  def _CreateGsutilApi(self):
+    """Creates a Cloud API instance for a fetch thread."""
+    command_obj = self.command_obj
+    return CloudApiDelegator(command_obj.bucket_storage_uri_class,
+                             command_obj.gsutil_api_map,
+                             command_obj.logger,
+                             command_obj.gsutil_api.status_queue,
+                             debug=command_obj.debug,
+                             http_headers=command_obj.non_metadata_headers,
+                             trace_token=command_obj.trace_token,
+                             perf_trace_token=command_obj.perf_trace_token,
+                             user_project=command_obj.user_project)
+
+  def _FetchThread(self):
+    # Cloud API instances aren't thread-safe, so each thread uses its own.
+    gsutil_api = self._CreateGsutilApi()
+    while True:
+      task = self._task_queue.get()
+      if task is None:
+        return
+      part, result = task
+      try:
+        buf = io.BytesIO()
+        gsutil_api.GetObjectMedia(part.cat_object.bucket,
+                                  part.cat_object.name,
+                                  buf,
+                                  compressed_encoding=False,
+                                  start_byte=part.start_byte,
+                                  end_byte=part.end_byte,
+                                  object_size=part.cat_object.size,
+                                  # Pin every range to the listed generation
+                                  # so an object that is overwritten while
+                                  # it's fetched isn't spliced together from
+                                  # different generations.
+                                  generation=part.cat_object.generation,
+                                  decryption_tuple=part.decryption_tuple,
+                                  provider=part.storage_url.scheme)
+        result.data = buf.getvalue()
+        if part.validate_hash:
+          # Each range is hashed by the thread that fetched it, and the
+          # hashes are combined in order as the ranges are written.
+          crc = crcmod.predefined.Crc('crc-32c')
+          crc.update(result.data)
+          result.crc32c = crc.crcValue
+      except Exception as e:  # pylint: disable=broad-except
+        result.exception = e
+      result.done.set()
+
+  def Submit(self, part):
+    """Queues part for fetching.
+
+    Args:
+      part: CatPart with prefetch set.
+
+    Returns:
+      _PrefetchResult that will hold the part's data.
+    """
+    if not self._threads:
+      for _ in range(self.num_threads):
+        thread = threading.Thread(target=self._FetchThread)
+        thread.daemon = True
+        thread.start()
+        self._threads.append(thread)
+    result = _PrefetchResult()
+    self._task_queue.put((part, result))
+    return result
+
+  def Shutdown(self):
+    """Stops the fetch threads once they have finished their queued work."""
+    for _ in self._threads:
+      self._task_queue.put(None)
+    self._threads = []
+
 
 class CatHelper(object):
   """Provides methods for the "cat" command and associated functionality."""
@@ -73,14 +220,242 @@ class CatHelper(object):
         break
       text_util.write_to_fd(dst_fd, buf)
 
+  def _GetCatParts(self,
+                   url_strings,
+                   show_header=False,
+                   start_byte=0,
+                   end_byte=None,
+                   part_size=None,
+                   min_prefetch_size=0,
+                   validate_hashes=False):
+    """Yields the CatParts to write for url_strings, in order.
+
+    Args:
+      url_strings: String iterable.
+      show_header: If true, include a header per file.
+      start_byte: Starting byte of the file to print.
+      end_byte: Ending byte of the file to print.
+      part_size: If not None, objects that can be fetched with range requests
+          are split into CatParts of at most this many bytes to prefetch.
+      min_prefetch_size: Objects smaller than this are streamed directly.
+      validate_hashes: If true, validate the CRC32C of entire objects that are
+          prefetched, as allowed by the check_hashes config option.
+
+    Yields:
+      CatPart for each object, or range of an object, to write.
+
+    Raises:
+      CommandException if no URLs can be found.
+    """
+    for url_str in url_strings:
+      did_some_work = False
+      # TODO: Get only the needed fields here.
+      for blr in self.command_obj.WildcardIterator(url_str).IterObjects(
+          bucket_listing_fields=_CAT_BUCKET_LISTING_FIELDS):
+        decryption_keywrapper = None
+        if (blr.root_object and blr.root_object.customerEncryption and
+            blr.root_object.customerEncryption.keySha256):
+          decryption_key = FindMatchingCSEKInBotoConfig(
+              blr.root_object.customerEncryption.keySha256, config)
+          if not decryption_key:
+            raise EncryptionException(
+                'Missing decryption key with SHA256 hash %s. No decryption '
+                'key matches object %s' %
+                (blr.root_object.customerEncryption.keySha256, blr.url_string))
+          decryption_keywrapper = CryptoKeyWrapperFromKey(decryption_key)
+
+        did_some_work = True
+        header = '==> %s <==' % blr if show_header else None
+        cat_object = blr.root_object
+        # This if statement ensures nothing is outputted and no error
+        # is thrown if the user enters an out of bounds range for the object.
+        if 0 < getattr(cat_object, 'size', -1) <= start_byte:
+          return
+        storage_url = StorageUrlFromString(blr.url_string)
+        validate_hash = False
+        can_prefetch = (part_size is not None and storage_url.IsCloudUrl() and
+                        cat_object.size >= min_prefetch_size and
+                        # Objects served with decompressive transcoding can't
+                        # be fetched in ranges, and their size isn't known
+                        # ahead of time.
+                        not ObjectIsGzipEncoded(cat_object))
+        if (can_prefetch and validate_hashes and cat_object.crc32c and
+            start_byte == 0 and end_byte is None):
+          check_hashes_config = config.get('GSUtil', 'check_hashes',
+                                           CHECK_HASH_IF_FAST_ELSE_FAIL)
+          if check_hashes_config != CHECK_HASH_NEVER:
+            validate_hash = (UsingCrcmodExtension() or
+                             check_hashes_config == CHECK_HASH_ALWAYS)
+            # As with sliced downloads to files, don't split the download if
+            # that would prevent an integrity check.
+            can_prefetch = validate_hash
+        if not can_prefetch:
+          yield CatPart(header, storage_url, cat_object, start_byte, end_byte,
+                        decryption_keywrapper, False, False, True)
+          continue
+
+        # Convert the requested range to absolute offsets within the object.
+        if start_byte < 0:
+          first_byte = max(cat_object.size + start_byte, 0)
+          last_byte = cat_object.size - 1
+        else:
+          first_byte = start_byte
+          last_byte = cat_object.size - 1
+          if end_byte is not None:
+            last_byte = min(end_byte, last_byte)
+        if first_byte > last_byte:
+          # Empty objects and empty ranges are left to the service.
+          yield CatPart(header, storage_url, cat_object, start_byte, end_byte,
+                        decryption_keywrapper, False, False, True)
+          continue
+        for part_start in range(first_byte, last_byte + 1, part_size):
+          part_end = min(part_start + part_size - 1, last_byte)
+          yield CatPart(header if part_start == first_byte else None,
+                        storage_url, cat_object, part_start, part_end,
+                        decryption_keywrapper, True, validate_hash,
+                        part_end == last_byte)
+      if not did_some_work:
+        raise CommandException(NO_URLS_MATCHED_TARGET % url_str)
+
+  def _WritePart(self, part, cat_out_fd, prefetch_result=None):
+    """Writes a CatPart to cat_out_fd.
+
+    Args:
+      part: CatPart to write.
+      cat_out_fd: File descriptor to which output should be written.
+      prefetch_result: _PrefetchResult holding the part's data if it was
+          prefetched.
+    """
+    if part.header is not None:
+      if self.printed_one:
+        print()
+      print(part.header)
+      self.printed_one = True
+    if prefetch_result is not None:
+      data = prefetch_result.Wait()
+      text_util.write_to_fd(cat_out_fd, data)
+      cat_out_fd.flush()
+      if part.validate_hash:
+        self._ValidatePartHash(part, prefetch_result.crc32c, len(data))
+    elif part.storage_url.IsCloudUrl():
+      compressed_encoding = ObjectIsGzipEncoded(part.cat_object)
+      self.command_obj.gsutil_api.GetObjectMedia(
+          part.cat_object.bucket,
+          part.cat_object.name,
+          cat_out_fd,
+          compressed_encoding=compressed_encoding,
+          start_byte=part.start_byte,
+          end_byte=part.end_byte,
+          object_size=part.cat_object.size,
+          generation=part.storage_url.generation,
+          decryption_tuple=part.decryption_tuple,
+          provider=part.storage_url.scheme)
+      cat_out_fd.flush()
+    else:
+      with open(part.storage_url.object_name, 'rb') as f:
+        self._WriteBytesBufferedFileToFile(f, cat_out_fd)
+
+  def _ValidatePartHash(self, part, part_crc32c, part_size):
+    """Adds a written part's CRC32C to its object's and validates the latter.
+
+    Args:
+      part: CatPart that was written.
+      part_crc32c: CRC32C of the part's data.
+      part_size: Number of bytes in the part.
+
+    Raises:
+      HashMismatchException if this was the object's last part and the CRC32C
+      of the written object doesn't match the cloud-supplied one.
+    """
+    if self.object_crc32c is None:
+      self.object_crc32c = part_crc32c
+    else:
+      self.object_crc32c = ConcatCrc32c(self.object_crc32c, part_crc32c,
+                                        part_size)
+    if not part.last:
+      return
+    # The object's data has already been written by now, so this can only
+    # fail the command. Since all ranges are fetched from the listed
+    # generation, a mismatch means the data was corrupted rather than that
+    # the object changed while it was being fetched.
+    crc = crcmod.predefined.Crc('crc-32c')
+    crc.crcValue = self.object_crc32c
+    self.object_crc32c = None
+    local_b64_digest = six.ensure_binary(Base64EncodeHash(crc.hexdigest()))
+    cloud_b64_digest = six.ensure_binary(part.cat_object.crc32c).rstrip(b'\n')
+    if local_b64_digest != cloud_b64_digest:
+      raise HashMismatchException(
+          'crc32c signature computed for streamed object %s (%s) doesn\'t '
+          'match cloud-supplied digest (%s). The data written for it is '
+          'corrupt.' % (part.storage_url, local_b64_digest, cloud_b64_digest))
+
+  def _WritePartsWithPrefetch(self, parts, cat_out_fd, prefetcher,
+                              buffer_size):
+    """Writes parts in order while prefetching upcoming ones.
+
+    Args:
+      parts: Iterator of CatParts.
+      cat_out_fd: File descriptor to which output should be written.
+      prefetcher: StreamPrefetcher for fetching the parts.
+      buffer_size: Maximum number of prefetched bytes to hold in memory.
+
+    Raises:
+      Any exception raised by parts, once all preceding parts are written.
+    """
+    # (part, prefetch result) tuples of parts not yet written, in order.
+    pending = deque()
+    pending_bytes = 0
+    # Queueing more parts than there are threads doesn't fetch anything
+    # sooner, so bound the number of parts held on to as well.
+    max_pending = 2 * prefetcher.num_threads
+    next_part = None
+    parts_exception = None
+    try:
+      while True:
+        while parts_exception is None and len(pending) < max_pending:
+          if next_part is None:
+            try:
+              next_part = next(parts)
+            except StopIteration:
+              break
+            except Exception as e:  # pylint: disable=broad-except
+              # Write out everything before the failing URL first, as cat
+              # does without prefetching.
+              parts_exception = e
+              break
+          part_bytes = _GetPrefetchSize(next_part)
+          if pending and pending_bytes + part_bytes > buffer_size:
+            break
+          prefetch_result = None
+          if next_part.prefetch:
+            prefetch_result = prefetcher.Submit(next_part)
+          pending.append((next_part, prefetch_result))
+          pending_bytes += part_bytes
+          next_part = None
+        if not pending:
+          break
+        part, prefetch_result = pending.popleft()
+        self._WritePart(part, cat_out_fd, prefetch_result=prefetch_result)
+        pending_bytes -= _GetPrefetchSize(part)
+    finally:
+      prefetcher.Shutdown()
+    if parts_exception is not None:
+      raise parts_exception
+
   def CatUrlStrings(self,
                     url_strings,
                     show_header=False,
                     start_byte=0,
                     end_byte=None,
-                    cat_out_fd=None):
+                    cat_out_fd=None,
+                    prefetch_threshold=None,
+                    validate_hashes=False):
     """Prints each of the url strings to stdout.
 
+    When the command runs with parallel operations (gsutil -m), upcoming
+    objects and byte ranges of large objects are prefetched concurrently into
+    a bounded amount of memory while the output is written in order.
+
     Args:
       url_strings: String iterable.
       show_header: If true, print a header per file.
@@ -91,13 +466,20 @@ class CatHelper(object):
                 and end range is sent over HTTP (such as range: bytes -9)
       cat_out_fd: File descriptor to which output should be written. Defaults to
                  stdout if no file descriptor is supplied.
+      prefetch_threshold: If not None, objects of at least this size are
+                          fetched in concurrent ranges even without parallel
+                          operations.
+      validate_hashes: If true, validate the CRC32C of the objects that are
+                       fetched in concurrent ranges.
     Returns:
       0 on success.
 
     Raises:
       CommandException if no URLs can be found.
     """
-    printed_one = False
+    self.printed_one = False
+    # CRC32C of the parts of the current object written so far.
+    self.object_crc32c = None
     # This should refer to whatever sys.stdin refers to when this method is
     # run, not when this method is defined, so we do the initialization here
     # rather than define sys.stdin as the cat_out_fd parameter's default value.
@@ -110,57 +492,31 @@ class CatHelper(object):
     try:
       if url_strings and url_strings[0] in ('-', 'file://-'):
         self._WriteBytesBufferedFileToFile(sys.stdin, cat_out_fd)
+      elif (self.command_obj.parallel_operations or
+            prefetch_threshold is not None):
+        min_prefetch_size = 0
+        if not self.command_obj.parallel_operations:
+          min_prefetch_size = prefetch_threshold
+        num_threads = GetStreamPrefetchThreads()
+        buffer_size = GetStreamPrefetchBufferSize()
+        # Split large objects so that every thread has a range to fetch.
+        part_size = max(1, buffer_size // num_threads)
+        parts = self._GetCatParts(url_strings,
+                                  show_header=show_header,
+                                  start_byte=start_byte,
+                                  end_byte=end_byte,
+                                  part_size=part_size,
+                                  min_prefetch_size=min_prefetch_size,
+                                  validate_hashes=validate_hashes)
+        self._WritePartsWithPrefetch(
+            parts, cat_out_fd, StreamPrefetcher(self.command_obj, num_threads),
+            buffer_size)
       else:
-        for url_str in url_strings:
-          did_some_work = False
-          # TODO: Get only the needed fields here.
-          for blr in self.command_obj.WildcardIterator(url_str).IterObjects(
-              bucket_listing_fields=_CAT_BUCKET_LISTING_FIELDS):
-            decryption_keywrapper = None
-            if (blr.root_object and blr.root_object.customerEncryption and
-                blr.root_object.customerEncryption.keySha256):
-              decryption_key = FindMatchingCSEKInBotoConfig(
-                  blr.root_object.customerEncryption.keySha256, config)
-              if not decryption_key:
-                raise EncryptionException(
-                    'Missing decryption key with SHA256 hash %s. No decryption '
-                    'key matches object %s' %
-                    (blr.root_object.customerEncryption.keySha256,
-                     blr.url_string))
-              decryption_keywrapper = CryptoKeyWrapperFromKey(decryption_key)
-
-            did_some_work = True
-            if show_header:
-              if printed_one:
-                print()
-              print('==> %s <==' % blr)
-              printed_one = True
-            cat_object = blr.root_object
-            # This if statement ensures nothing is outputted and no error
-            # is thrown if the user enters an out of bounds range for the object.
-            if 0 < getattr(cat_object, 'size', -1) <= start_byte:
-              return 0
-            storage_url = StorageUrlFromString(blr.url_string)
-            if storage_url.IsCloudUrl():
-              compressed_encoding = ObjectIsGzipEncoded(cat_object)
-              self.command_obj.gsutil_api.GetObjectMedia(
-                  cat_object.bucket,
-                  cat_object.name,
-                  cat_out_fd,
-                  compressed_encoding=compressed_encoding,
-                  start_byte=start_byte,
-                  end_byte=end_byte,
-                  object_size=cat_object.size,
-                  generation=storage_url.generation,
-                  decryption_tuple=decryption_keywrapper,
-                  provider=storage_url.scheme)
-              cat_out_fd.flush()
-
-            else:
-              with open(storage_url.object_name, 'rb') as f:
-                self._WriteBytesBufferedFileToFile(f, cat_out_fd)
-          if not did_some_work:
-            raise CommandException(NO_URLS_MATCHED_TARGET % url_str)
+        for part in self._GetCatParts(url_strings,
+                                      show_header=show_header,
+                                      start_byte=start_byte,
+                                      end_byte=end_byte):
+          self._WritePart(part, cat_out_fd)
     finally:
       sys.stdout = old_stdout
 
@@ -25,6 +25,7 @@ import re
 import six
 
 from gslib.cloud_api import ArgumentException
+from gslib.utils.metadata_cache_util import MetadataCachingCloudApi
 from gslib.utils.text_util import AddQueryParamToUrl
 
 
@@ -35,6 +36,9 @@ def GetCloudApiInstance(cls, thread_state=None):
   thread needs its own instance. These instances are passed to each thread
   via the thread pool logic in command.
 
+  If the command has a metadata cache, the instance is wrapped so that bucket
+  and object metadata requests are served from (and coalesced through) it.
+
   Args:
     cls: Command class to be used for single-threaded case.
     thread_state: Per thread state from this thread containing a gsutil
@@ -43,7 +47,11 @@ def GetCloudApiInstance(cls, thread_state=None):
   Returns:
     gsutil Cloud API instance.
   """
-  return thread_state or cls.gsutil_api
+  gsutil_api = thread_state or cls.gsutil_api
+  metadata_cache = getattr(cls, 'metadata_cache', None)
+  if metadata_cache is not None:
+    return MetadataCachingCloudApi(gsutil_api, metadata_cache)
+  return gsutil_api
 
 
 def GetDownloadSerializationData(src_obj_metadata,
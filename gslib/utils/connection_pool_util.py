@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Per-process pool of keep-alive HTTP connections.
+
+httplib2 caches connections per Http object, but gsutil's JSON API
+implementation swaps in a new connection class for every media request so it
+can hook progress callbacks and digesters into the socket reads and writes.
+Without a pool, every upload and download therefore pays for a new DNS lookup,
+TCP handshake and TLS handshake. PooledHTTPSConnectionWithTimeout instead hands
+its socket back to a process-wide pool when it is released, and checks out an
+idle socket for the same host, if one is available, when it connects.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import collections
+import os
+import select
+import socket
+import threading
+import time
+
+import httplib2
+from six.moves import http_client
+
+from gslib.utils.boto_util import GetHttpConnectionPoolIdleTimeout
+from gslib.utils.boto_util import GetHttpConnectionPoolSize
+
+# Process-wide pool, created lazily. See GetHttpConnectionPool.
+_connection_pool = None
+_connection_pool_lock = threading.Lock()
+
+# Number of new connections opened by each thread, for performance summaries.
+_thread_connection_stats = threading.local()
+
+
+class HttpConnectionPool(object):
+  """Thread-safe pool of idle keep-alive sockets, keyed by host and port.
+
+  Sockets must only be released to the pool when no request is outstanding on
+  them, i.e. when the previous response has been completely read.
+  """
+
+  def __init__(self, max_size, idle_timeout):
+    """Instantiates an HttpConnectionPool.
+
+    Args:
+      max_size: Maximum number of idle sockets to keep. Sockets released while
+          the pool is full are closed. A non-positive value disables pooling.
+      idle_timeout: Number of seconds after which an idle socket is closed
+          rather than reused.
+    """
+    self.max_size = max_size
+    self.idle_timeout = idle_timeout
+    self.pid = os.getpid()
+    self._lock = threading.Lock()
+    # Maps (host, port) to a deque of (socket, release_time) tuples, with the
+    # most recently released socket on the right.
+    self._idle_sockets = collections.defaultdict(collections.deque)
+    self._num_idle_sockets = 0
+
+  def Checkout(self, key):
+    """Returns an idle socket for key, or None if there is no usable socket."""
+    cur_time = time.time()
+    with self._lock:
+      idle_sockets = self._idle_sockets.get(key)
+      while idle_sockets:
+        sock, release_time = idle_sockets.pop()
+        self._num_idle_sockets -= 1
+        if (cur_time - release_time < self.idle_timeout and
+            _IsSocketReusable(sock)):
+          return sock
+        _CloseSocket(sock)
+    return None
+
+  def Release(self, key, sock):
+    """Returns sock to the pool, or closes it if the pool is full."""
+    cur_time = time.time()
+    with self._lock:
+      idle_sockets = self._idle_sockets[key]
+      while (idle_sockets and
+             cur_time - idle_sockets[0][1] >= self.idle_timeout):
+        _CloseSocket(idle_sockets.popleft()[0])
+        self._num_idle_sockets -= 1
+      if self._num_idle_sockets < self.max_size:
+        idle_sockets.append((sock, cur_time))
+        self._num_idle_sockets += 1
+        return
+    _CloseSocket(sock)
+
+  def Clear(self, close_sockets=True):
+    """Removes all idle sockets from the pool.
+
+    Args:
+      close_sockets: If False, sockets are dropped without being closed. This
+          is used in a child process, where the sockets are still owned (and
+          possibly in use) by the parent process.
+    """
+    with self._lock:
+      if close_sockets:
+        for idle_sockets in self._idle_sockets.values():
+          for sock, _ in idle_sockets:
+            _CloseSocket(sock)
+      self._idle_sockets.clear()
+      self._num_idle_sockets = 0
+
+
+def _CloseSocket(sock):
+  try:
+    sock.close()
+  except (socket.error, OSError):
+    pass
+
+
+def _IsSocketReusable(sock):
+  """Returns True if sock has no pending data and has not been closed.
+
+  An idle keep-alive socket should never be readable; if it is, the server
+  has closed the connection (or sent something unexpected) and the socket
+  cannot be used for a new request.
+
+  Args:
+    sock: Socket to check.
+
+  Returns:
+    Whether the socket can be reused.
+  """
+  try:
+    readable, _, _ = select.select([sock], [], [], 0)
+  except (socket.error, OSError, ValueError):
+    return False
+  return not readable
+
+
+def GetHttpConnectionPool():
+  """Returns the HttpConnectionPool for the current process."""
+  global _connection_pool  # pylint: disable=global-statement
+  with _connection_pool_lock:
+    if _connection_pool is None or _connection_pool.pid != os.getpid():
+      # Sockets in a pool inherited from the parent process belong to the
+      # parent, so start over with a fresh pool.
+      _connection_pool = HttpConnectionPool(GetHttpConnectionPoolSize(),
+                                            GetHttpConnectionPoolIdleTimeout())
+    return _connection_pool
+
+
+def ResetHttpConnectionPool():
+  """Discards all pooled connections for the current process."""
+  global _connection_pool  # pylint: disable=global-statement
+  with _connection_pool_lock:
+    if _connection_pool is not None:
+      _connection_pool.Clear(
+          close_sockets=(_connection_pool.pid == os.getpid()))
+    _connection_pool = None
+
+
+def GetNumConnectionsOpened():
+  """Returns the number of new connections opened by the current thread."""
+  return getattr(_thread_connection_stats, 'num_connections_opened', 0)
+
+
+def _RecordConnectionOpened():
+  _thread_connection_stats.num_connections_opened = (
+      GetNumConnectionsOpened() + 1)
+
+
+class PooledHTTPSConnectionWithTimeout(httplib2.HTTPSConnectionWithTimeout):
+  """HTTPS connection that reuses idle sockets from the process's pool."""
+
+  def _GetPoolKey(self):
+    return (self.host, self.port)
+
+  def connect(self):
+    sock = GetHttpConnectionPool().Checkout(self._GetPoolKey())
+    if sock is not None:
+      self.sock = sock
+      return
+    super(PooledHTTPSConnectionWithTimeout, self).connect()
+    _RecordConnectionOpened()
+
+  def ReleaseToPool(self):
+    """Hands this connection's socket back to the pool if it is idle.
+
+    After this call the connection no longer owns a socket; using it again
+    checks out a socket from the pool or opens a new one.
+    """
+    if self.sock is None:
+      return
+    # pylint: disable=protected-access
+    response = self._HTTPConnection__response
+    is_idle = (self._HTTPConnection__state == http_client._CS_IDLE and
+               (response is None or response.isclosed()))
+    # pylint: enable=protected-access
+    if is_idle and GetHttpConnectionPool().max_size > 0:
+      sock = self.sock
+      self.sock = None
+      # pylint: disable=protected-access
+      self._HTTPConnection__response = None
+      # pylint: enable=protected-access
+      GetHttpConnectionPool().Release(self._GetPoolKey(), sock)
+    else:
+      self.close()
+
+
+def ReleaseHttpConnections(http):
+  """Releases the sockets of all pooled connections cached by http.
+
+  Args:
+    http: httplib2.Http instance whose cached connections should be released.
+  """
+  for conn in list(http.connections.values()):
+    if isinstance(conn, PooledHTTPSConnectionWithTimeout):
+      conn.ReleaseToPool()
@@ -42,12 +42,55 @@ from gslib.utils.unit_util import ONE_MIB
 DEBUGLEVEL_DUMP_REQUESTS = 3
 DEBUGLEVEL_DUMP_REQUESTS_AND_PAYLOADS = 4
 
+# Object deletes are sent as JSON API batch requests of up to this many
+# deletes each. The JSON API accepts at most 100 calls per batch request.
+DEFAULT_DELETE_BATCH_SIZE = 100
+MAX_DELETE_BATCH_SIZE = 100
+
 DEFAULT_FILE_BUFFER_SIZE = 8 * ONE_KIB
 
+# Recursive listings of local directories (e.g. "gsutil cp -r" and
+# "gsutil rsync -r" from a local directory) scan subdirectories and stat files
+# with this many threads.
+DEFAULT_FILE_LISTING_THREADS = 8
+
 DEFAULT_GCS_JSON_API_VERSION = 'v1'
 
 DEFAULT_GSUTIL_STATE_DIR = os.path.expanduser(os.path.join('~', '.gsutil'))
 
+# Idle keep-alive HTTP connections are shared by all threads of a process and
+# reused across requests. Connections idle for longer than the timeout are
+# closed rather than reused, since the server may have already dropped them.
+DEFAULT_HTTP_CONNECTION_POOL_IDLE_TIMEOUT_SEC = 30
+DEFAULT_HTTP_CONNECTION_POOL_SIZE = 32
+
+# Object metadata patches are sent as JSON API batch requests of up to this
+# many patches each.
+DEFAULT_PATCH_BATCH_SIZE = 100
+MAX_PATCH_BATCH_SIZE = 100
+
+# "gsutil rsync --subscription" falls back to a full synchronization, listing
+# the source and destination, once the last one is older than this. This
+# catches up with any changes whose notifications were lost or dropped.
+DEFAULT_RSYNC_RECONCILE_INTERVAL_SEC = 24 * 60 * 60
+
+# "gsutil -m cat" and streaming downloads to stdout prefetch objects and byte
+# ranges of objects with this many threads, buffering at most this much data
+# (a human-readable size) in memory.
+DEFAULT_STREAM_PREFETCH_BUFFER_SIZE = '64MiB'
+DEFAULT_STREAM_PREFETCH_THREADS = 8
+
+# Uploads of local files read this much data (a human-readable size) ahead of
+# what has been sent, in a separate thread. "0" disables reading ahead, which
+# is the default since every concurrent upload holds its own buffer.
+DEFAULT_UPLOAD_READ_AHEAD_BUFFER_SIZE = '0'
+
+# Access tokens are refreshed in the background once they are due to expire
+# within the refresh margin. Registered credentials are checked once per
+# check interval.
+DEFAULT_TOKEN_REFRESH_MARGIN_SEC = 300
+TOKEN_REFRESH_CHECK_INTERVAL_SEC = 10
+
 GSUTIL_PUB_TARBALL = 'gs://pub/gsutil.tar.gz'
 GSUTIL_PUB_TARBALL_PY2 = 'gs://pub/gsutil4.tar.gz'
 
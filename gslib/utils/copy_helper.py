@@ -35,16 +35,16 @@ import pickle
 import pyu2f
 import random
 import re
-import shutil
 import six
 import stat
-import subprocess
 import tempfile
 import textwrap
+import threading
 import time
 import traceback
 
 import six
+from six.moves import queue as Queue
 from six.moves import range
 from six.moves import range
 
@@ -79,7 +79,7 @@ from gslib.daisy_chain_wrapper import DaisyChainWrapper
 from gslib.exception import CommandException
 from gslib.exception import HashMismatchException
 from gslib.exception import InvalidUrlError
-from gslib.file_part import FilePart
+from gslib.file_part import OpenFilePart
 from gslib.parallel_tracker_file import GenerateComponentObjectPrefix
 from gslib.parallel_tracker_file import ReadParallelUploadTrackerFile
 from gslib.parallel_tracker_file import ValidateParallelCompositeTrackerData
@@ -102,12 +102,13 @@ from gslib.tracker_file import ENCRYPTION_UPLOAD_TRACKER_ENTRY
 from gslib.tracker_file import GetDownloadStartByte
 from gslib.tracker_file import GetTrackerFilePath
 from gslib.tracker_file import GetUploadTrackerData
-from gslib.tracker_file import RaiseUnwritableTrackerFileException
 from gslib.tracker_file import ReadOrCreateDownloadTrackerFile
+from gslib.tracker_file import ReadTrackerFile
 from gslib.tracker_file import SERIALIZATION_UPLOAD_TRACKER_ENTRY
 from gslib.tracker_file import TrackerFileType
 from gslib.tracker_file import WriteDownloadComponentTrackerFile
 from gslib.tracker_file import WriteJsonDataToTrackerFile
+from gslib.utils import manifest_index_util
 from gslib.utils import parallelism_framework_util
 from gslib.utils import stet_util
 from gslib.utils import temporary_file_util
@@ -115,6 +116,7 @@ from gslib.utils import text_util
 from gslib.utils.boto_util import GetJsonResumableChunkSize
 from gslib.utils.boto_util import GetMaxRetryDelay
 from gslib.utils.boto_util import GetNumRetries
+from gslib.utils.boto_util import GetUploadReadAheadBufferSize
 from gslib.utils.boto_util import ResumableThreshold
 from gslib.utils.boto_util import UsingCrcmodExtension
 from gslib.utils.cloud_api_helper import GetCloudApiInstance
@@ -126,6 +128,8 @@ from gslib.utils.encryption_helper import CryptoKeyType
 from gslib.utils.encryption_helper import CryptoKeyWrapperFromKey
 from gslib.utils.encryption_helper import FindMatchingCSEKInBotoConfig
 from gslib.utils.encryption_helper import GetEncryptionKeyWrapper
+from gslib.utils.file_hash_cache_util import CacheFileHashes
+from gslib.utils.file_hash_cache_util import UseFileHashCache
 from gslib.utils.hashing_helper import Base64EncodeHash
 from gslib.utils.hashing_helper import CalculateB64EncodedMd5FromContents
 from gslib.utils.hashing_helper import CalculateHashesFromContents
@@ -136,6 +140,10 @@ from gslib.utils.hashing_helper import GetDownloadHashAlgs
 from gslib.utils.hashing_helper import GetMd5
 from gslib.utils.hashing_helper import GetUploadHashAlgs
 from gslib.utils.hashing_helper import HashingFileUploadWrapper
+from gslib.utils.local_copy_util import CopyFileContents
+from gslib.utils.magicfile_util import GetMagicContentType
+from gslib.utils.manifest_index_util import ManifestIndex
+from gslib.utils.manifest_index_util import SUCCESSFUL_RESULTS
 from gslib.utils.metadata_util import ObjectIsGzipEncoded
 from gslib.utils.parallelism_framework_util import AtomicDict
 from gslib.utils.parallelism_framework_util import CheckMultiprocessingAvailableAndInit
@@ -147,6 +155,7 @@ from gslib.utils.posix_util import MODE_ATTR
 from gslib.utils.posix_util import MTIME_ATTR
 from gslib.utils.posix_util import ParseAndSetPOSIXAttributes
 from gslib.utils.posix_util import UID_ATTR
+from gslib.utils.read_ahead_util import ReadAheadFileWrapper
 from gslib.utils.system_util import CheckFreeSpace
 from gslib.utils.system_util import GetFileSize
 from gslib.utils.system_util import GetStreamFromFileUrl
@@ -324,7 +333,7 @@ def _PerformParallelUploadFileToObject(cls, args, thread_state=None):
   Returns:
     StorageUrl representing a successfully uploaded component.
   """
-  fp = FilePart(args.filename, args.file_start, args.file_length)
+  fp = OpenFilePart(args.filename, args.file_start, args.file_length)
   gsutil_api = GetCloudApiInstance(cls, thread_state=thread_state)
   with fp:
     # We take many precautions with the component names that make collisions
@@ -1564,6 +1573,48 @@ def FixWindowsNaming(src_url, dst_url):
   return dst_url
 
 
+def ConstructReplicaDstUrl(exp_dst_url, dst_url, replica_url):
+  """Constructs the URL that replicates a copied object under another URL.
+
+  The replica is named relative to replica_url the way dst_url is named
+  relative to the destination URL passed to cp, so for example copying to
+  gs://bucket1/dir with a replica URL of gs://bucket2 replicates
+  gs://bucket1/dir/a/b.txt to gs://bucket2/a/b.txt. An object named explicitly
+  in the destination URL is replicated to the object named by replica_url, or
+  under it if replica_url ends with a slash.
+
+  Args:
+    exp_dst_url: Wildcard-expanded destination StorageUrl passed to cp.
+    dst_url: The destination StorageUrl built by ConstructDstUrl().
+    replica_url: Cloud StorageUrl naming the replica bucket, bucket
+        subdirectory or (when copying a single object) object.
+
+  Returns:
+    StorageUrl to replicate dst_url to.
+  """
+  dst_prefix = exp_dst_url.object_name or ''
+  replica_prefix = replica_url.object_name or ''
+  if dst_url.object_name == dst_prefix:
+    # dst_url was named explicitly, e.g. "gsutil cp file gs://bucket/obj".
+    if replica_prefix.endswith('/'):
+      replica_object_name = (replica_prefix +
+                             dst_url.object_name.rsplit('/', 1)[-1])
+    else:
+      replica_object_name = replica_prefix or dst_url.object_name
+  else:
+    relative_name = dst_url.object_name
+    if relative_name.startswith(dst_prefix):
+      relative_name = relative_name[len(dst_prefix):].lstrip('/')
+    if replica_prefix:
+      replica_object_name = '%s/%s' % (replica_prefix.rstrip('/'),
+                                       relative_name)
+    else:
+      replica_object_name = relative_name
+  return StorageUrlFromString(
+      '%s://%s/%s' %
+      (replica_url.scheme, replica_url.bucket_name, replica_object_name))
+
+
 def SrcDstSame(src_url, dst_url):
   """Checks if src_url and dst_url represent the same object or file.
 
@@ -1698,24 +1749,7 @@ def _SetContentTypeFromFile(src_url, dst_obj_metadata):
     if object_name != '-':
       real_file_path = os.path.realpath(object_name)
       if config.getbool('GSUtil', 'use_magicfile', False) and not IS_WINDOWS:
-        try:
-          p = subprocess.Popen(['file', '-b', '--mime', real_file_path],
-                               stdout=subprocess.PIPE,
-                               stderr=subprocess.PIPE)
-          output, error = p.communicate()
-          p.stdout.close()
-          p.stderr.close()
-          if p.returncode != 0 or error:
-            raise CommandException(
-                'Encountered error running "file -b --mime %s" '
-                '(returncode=%d).\n%s' % (real_file_path, p.returncode, error))
-          # Parse output by removing line delimiter
-          content_type = output.rstrip()
-          content_type = six.ensure_str(content_type)
-        except OSError as e:  # 'file' executable may not always be present.
-          raise CommandException(
-              'Encountered OSError running "file -b --mime %s"\n%s' %
-              (real_file_path, e))
+        content_type = GetMagicContentType(real_file_path)
       else:
         _, _, extension = real_file_path.rpartition('.')
         if extension in COMMON_EXTENSION_RULES:
@@ -2222,6 +2256,12 @@ def _UploadFileToObject(src_url,
     upload_stream = ResumableStreamingJsonUploadWrapper(
         orig_stream, GetJsonResumableChunkSize())
 
+  read_ahead_buffer_size = GetUploadReadAheadBufferSize()
+  if (read_ahead_buffer_size and not parallel_composite_upload and
+      not src_url.IsStream() and not src_url.IsFifo()):
+    # Parallel composite uploads read ahead in each component's upload.
+    upload_stream = ReadAheadFileWrapper(upload_stream, read_ahead_buffer_size)
+
   if not parallel_composite_upload and len(hash_algs):
     # Parallel composite uploads calculate hashes per-component in subsequent
     # calls to this function, but the composition of the final object is a
@@ -2267,6 +2307,13 @@ def _UploadFileToObject(src_url,
                                         is_component=is_component,
                                         gzip_encoded=gzip_encoded_file)
 
+  # Stat the source before uploading it, so that its hashes are only cached if
+  # it didn't change during the upload.
+  src_stat_result = None
+  if (UseFileHashCache() and not is_component and not zipped_file and
+      not src_url.IsStream() and not src_url.IsFifo()):
+    src_stat_result = os.stat(src_url.object_name)
+
   if parallel_composite_upload:
     delegate = CallParallelCompositeUpload
   elif non_resumable_upload:
@@ -2287,6 +2334,10 @@ def _UploadFileToObject(src_url,
                    src_url.object_name,
                    digests,
                    is_upload=True)
+      if src_stat_result:
+        CacheFileHashes(src_url.object_name,
+                        digests,
+                        stat_result=src_stat_result)
     except HashMismatchException:
       if _RENAME_ON_HASH_MISMATCH:
         corrupted_obj_metadata = apitools_messages.Object(
@@ -2304,6 +2355,11 @@ def _UploadFileToObject(src_url,
                               generation=uploaded_object.generation,
                               provider=dst_url.scheme)
       raise
+  elif src_stat_result and uploaded_object.crc32c:
+    # The service computes the composite object's CRC32C from the components,
+    # each of which was validated when it was uploaded.
+    CacheFileHashes(src_url.object_name, {'crc32c': uploaded_object.crc32c},
+                    stat_result=src_stat_result)
 
   result_url = dst_url.Clone()
 
@@ -2383,6 +2439,27 @@ def _GetDownloadFile(dst_url, src_obj_metadata, logger):
   return download_file_name, need_to_unzip
 
 
+def GetSlicedStreamingDownloadThreshold():
+  """Gets the minimum size of objects to stream with concurrent ranges.
+
+  Streaming downloads of objects of at least this size fetch byte ranges
+  concurrently into a bounded buffer (see CatHelper), analogous to sliced
+  downloads to files.
+
+  Returns:
+    Size in bytes, or None if sliced downloads are disabled.
+  """
+  sliced_object_download_threshold = HumanReadableToBytes(
+      config.get('GSUtil', 'sliced_object_download_threshold',
+                 DEFAULT_SLICED_OBJECT_DOWNLOAD_THRESHOLD))
+  max_components = config.getint('GSUtil',
+                                 'sliced_object_download_max_components',
+                                 DEFAULT_SLICED_OBJECT_DOWNLOAD_MAX_COMPONENTS)
+  if sliced_object_download_threshold <= 0 or max_components <= 1:
+    return None
+  return sliced_object_download_threshold
+
+
 def _ShouldDoSlicedDownload(download_strategy, src_obj_metadata,
                             allow_splitting, logger):
   """Determines whether the sliced download strategy should be used.
@@ -2505,7 +2582,6 @@ def _MaintainSlicedDownloadTrackerFiles(src_obj_metadata, dst_url,
     num_components: The number of components to perform this download with.
   """
   assert src_obj_metadata.etag
-  tracker_file = None
 
   # Only can happen if the resumable threshold is set higher than the
   # parallel transfer threshold.
@@ -2524,14 +2600,12 @@ def _MaintainSlicedDownloadTrackerFiles(src_obj_metadata, dst_url,
     # A parallel resumption should be attempted only if the destination file
     # size is exactly the same as the source size and the tracker file matches.
     if existing_file_size == src_obj_metadata.size:
-      tracker_file = open(tracker_file_name, 'r')
-      tracker_file_data = json.load(tracker_file)
+      tracker_file_data = json.loads(ReadTrackerFile(tracker_file_name))
       if (tracker_file_data['etag'] == src_obj_metadata.etag and
           tracker_file_data['generation'] == src_obj_metadata.generation and
           tracker_file_data['num_components'] == num_components):
         return
       else:
-        tracker_file.close()
         logger.warn('Sliced download tracker file doesn\'t match for '
                     'download of %s. Restarting download from scratch.' %
                     dst_url.object_name)
@@ -2546,23 +2620,17 @@ def _MaintainSlicedDownloadTrackerFiles(src_obj_metadata, dst_url,
   finally:
     if fp:
       fp.close()
-    if tracker_file:
-      tracker_file.close()
 
   # Delete component tracker files to guarantee download starts from scratch.
   DeleteDownloadTrackerFiles(dst_url, api_selector)
 
   # Create a new sliced download tracker file to represent this download.
-  try:
-    with open(tracker_file_name, 'w') as tracker_file:
-      tracker_file_data = {
-          'etag': src_obj_metadata.etag,
-          'generation': src_obj_metadata.generation,
-          'num_components': num_components,
-      }
-      tracker_file.write(json.dumps(tracker_file_data))
-  except IOError as e:
-    RaiseUnwritableTrackerFileException(tracker_file_name, e.strerror)
+  tracker_file_data = {
+      'etag': src_obj_metadata.etag,
+      'generation': src_obj_metadata.generation,
+      'num_components': num_components,
+  }
+  WriteJsonDataToTrackerFile(tracker_file_name, tracker_file_data)
 
 
 class SlicedDownloadFileWrapper(object):
@@ -3351,6 +3419,10 @@ def _ValidateAndCompleteDownload(logger,
                              src_obj_metadata,
                              is_rsync=is_rsync,
                              preserve_posix=preserve_posix)
+  # The hashes describe the final file unless they were computed before
+  # decompressing or decrypting it.
+  if not use_stet and not (digest_verified and (need_to_unzip or server_gzip)):
+    CacheFileHashes(final_file_name, local_hashes)
 
   if 'md5' in local_hashes:
     return local_hashes['md5']
@@ -3381,9 +3453,18 @@ def _CopyFileToFile(src_url, dst_url, status_queue=None, src_obj_metadata=None):
       if e.errno != errno.EEXIST:
         raise
 
+  progress_callback = None
+  if src_obj_metadata and src_obj_metadata.size:
+    progress_callback = ProgressCallbackWithTimeout(
+        src_obj_metadata.size,
+        FileProgressCallbackHandler(status_queue,
+                                    src_url=src_url,
+                                    dst_url=dst_url,
+                                    operation_name='Copying').call).Progress
+
   with open(dst_url.object_name, 'wb') as dst_fp:
     start_time = time.time()
-    shutil.copyfileobj(src_fp, dst_fp)
+    CopyFileContents(src_fp, dst_fp, progress_callback=progress_callback)
   if not src_url.IsStream():
     src_fp.close()  # Explicitly close the src fp - necessary if it is a fifo.
   end_time = time.time()
@@ -4035,6 +4116,16 @@ def PerformCopy(logger,
       return result
 
 
+class _ManifestRowWrite(object):
+  """A manifest row waiting to be appended by the manifest writer thread."""
+
+  def __init__(self, row, successful_source):
+    self.row = row
+    self.successful_source = successful_source
+    self.done = threading.Event()
+    self.error = None
+
+
 class Manifest(object):
   """Stores the manifest items for the CpCommand class."""
 
@@ -4042,18 +4133,43 @@ class Manifest(object):
     # self.items contains a dictionary of rows
     self.items = {}
     self.manifest_filter = {}
+    self.index = None
+    # JobCheckpoint whose tasks are marked done as their rows are written.
+    self.job_checkpoint = None
     self.lock = parallelism_framework_util.CreateLock()
 
+    # Queue of rows for this process's writer thread, which is started by the
+    # first write in each process.
+    self._writer_lock = threading.Lock()
+    self._writer_pid = None
+    self._write_queue = None
+
     self.manifest_path = os.path.expanduser(path)
-    self._ParseManifest()
     self._CreateManifestFile()
+    self._ParseManifest()
+
+  def __getstate__(self):
+    # The writer thread and its queue belong to the process that started them.
+    state = self.__dict__.copy()
+    for name in ('_writer_lock', '_writer_pid', '_write_queue'):
+      del state[name]
+    return state
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    self._writer_lock = threading.Lock()
+    self._writer_pid = None
+    self._write_queue = None
 
   def _ParseManifest(self):
     """Load and parse a manifest file.
 
     This information will be used to skip any files that have a skip or OK
-    status.
+    status. Where possible, it's kept in a ManifestIndex rather than memory.
     """
+    self.index = self._GetManifestIndex()
+    if self.index:
+      return
     try:
       if os.path.exists(self.manifest_path):
         # Note: we can't use io.open here or CSV reader will become upset
@@ -4080,8 +4196,27 @@ class Manifest(object):
     except IOError:
       raise CommandException('Could not parse %s' % self.manifest_path)
 
+  def _GetManifestIndex(self):
+    """Returns an up to date index of the manifest file, or None."""
+    if manifest_index_util.sqlite3 is None:
+      return None
+    try:
+      index = ManifestIndex(self.manifest_path)
+      index.Update()
+      return index
+    except ValueError:
+      # No header and thus not a valid manifest file.
+      raise CommandException('Missing headers in manifest file: %s' %
+                             self.manifest_path)
+    except (EnvironmentError, manifest_index_util.sqlite3.Error) as e:
+      logging.debug('Could not index manifest file %s: %s', self.manifest_path,
+                    e)
+      return None
+
   def WasSuccessful(self, src):
     """Returns whether the specified src url was marked as successful."""
+    if self.index:
+      return self.index.WasSuccessful(src)
     return src in self.manifest_filter
 
   def _CreateManifestFile(self):
@@ -4166,16 +4301,74 @@ class Manifest(object):
 
     data = [six.ensure_str(value) for value in data]
 
-    # Aquire a lock to prevent multiple threads writing to the same file at
+    successful_source = None
+    if row_item['result'] in SUCCESSFUL_RESULTS:
+      successful_source = row_item['source_uri']
+    row_write = _ManifestRowWrite(data, successful_source)
+    # Rows are appended by a single thread per process, so that the rows of
+    # concurrent copies are written together rather than each waiting for the
+    # lock and reopening the file. The copy still isn't reported as done until
+    # its row has been written.
+    self._GetWriteQueue().put(row_write)
+    row_write.done.wait()
+    if row_write.error:
+      raise row_write.error
+
+  def _GetWriteQueue(self):
+    """Returns the queue of this process's manifest writer thread."""
+    with self._writer_lock:
+      if self._writer_pid != os.getpid():
+        self._writer_pid = os.getpid()
+        self._write_queue = Queue.Queue()
+        writer_thread = threading.Thread(target=self._WriteRows,
+                                         args=(self._write_queue,))
+        writer_thread.daemon = True
+        writer_thread.start()
+      return self._write_queue
+
+  def _WriteRows(self, write_queue):
+    """Appends queued rows to the manifest file until the process exits."""
+    while True:
+      row_writes = [write_queue.get()]
+      while True:
+        try:
+          row_writes.append(write_queue.get_nowait())
+        except Queue.Empty:
+          break
+      error = None
+      try:
+        self._AppendRows(row_writes)
+      except Exception as e:  # pylint: disable=broad-except
+        error = e
+      for row_write in row_writes:
+        row_write.error = error
+        row_write.done.set()
+
+  def _AppendRows(self, row_writes):
+    """Appends rows to the manifest file and adds them to the index."""
+    successful_sources = [
+        row_write.successful_source
+        for row_write in row_writes
+        if row_write.successful_source
+    ]
+    # Aquire a lock to prevent multiple processes writing to the same file at
     # the same time. This would cause a garbled mess in the manifest file.
     with self.lock:
       if IS_WINDOWS and six.PY3:
-        f = open(self.manifest_path, 'a', 1, newline='')
+        f = open(self.manifest_path, 'a', newline='')
       else:
-        f = open(self.manifest_path, 'a', 1)  # 1 == line buffered
-      writer = csv.writer(f)
-      writer.writerow(data)
-      f.close()
+        f = open(self.manifest_path, 'a')
+      with f:
+        start_offset = os.fstat(f.fileno()).st_size
+        writer = csv.writer(f)
+        writer.writerows(row_write.row for row_write in row_writes)
+        f.flush()
+        end_offset = os.fstat(f.fileno()).st_size
+      if self.index:
+        self.index.AddSuccessfulSources(successful_sources, start_offset,
+                                        end_offset)
+    if self.job_checkpoint and successful_sources:
+      self.job_checkpoint.MarkDone(successful_sources)
 
   def _RemoveItemFromManifest(self, url):
     # Remove the item from the dictionary since we're done with it and
@@ -4381,10 +4574,11 @@ def FilterExistingComponents(dst_args, existing_components, bucket_url,
       continue
 
     dst_arg = dst_args[tracker_object.object_name]
-    file_part = FilePart(dst_arg.filename, dst_arg.file_start,
-                         dst_arg.file_length)
+    file_part = OpenFilePart(dst_arg.filename, dst_arg.file_start,
+                             dst_arg.file_length)
     # TODO: calculate MD5's in parallel when possible.
-    content_md5 = CalculateB64EncodedMd5FromContents(file_part)
+    with file_part:
+      content_md5 = CalculateB64EncodedMd5FromContents(file_part)
 
     try:
       # Get the MD5 of the currently-existing component.
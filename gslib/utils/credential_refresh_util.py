@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Background refresh of OAuth2 access tokens ahead of their expiry.
+
+oauth2client only refreshes an access token when no token has been obtained
+yet or after a request using an expired token has been rejected, so requests
+issued around the expiry time of a token stall while a new one is minted (from
+the token endpoint, the GCE metadata server or the iamcredentials API). Each
+process instead runs a daemon thread that refreshes registered credentials
+shortly before their tokens expire.
+
+Background refreshes and the refreshes oauth2client performs when a request is
+rejected take the same per-credentials lock, so they never mint tokens
+concurrently. Credentials with a credential store (see
+SetUpJsonCredentialsAndCache) also refresh while holding the store's file
+lock, after checking whether another process has already stored a newer token,
+so processes sharing a credential store key only mint one token between them.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import datetime
+import logging
+import os
+import threading
+import time
+import weakref
+
+from oauth2client import client
+
+from gslib.thread_message import CredentialRefreshMessage
+from gslib.utils.boto_util import GetNewHttp
+from gslib.utils.boto_util import GetTokenRefreshMargin
+from gslib.utils.constants import TOKEN_REFRESH_CHECK_INTERVAL_SEC
+
+# Refresher thread for the current process, created lazily. See
+# RegisterCredentialsForRefresh.
+_credential_refresher = None
+_credential_refresher_lock = threading.Lock()
+
+
+def _SerializeRefreshes(credentials):
+  """Makes all refreshes of credentials take a single lock.
+
+  oauth2client refreshes rejected requests' credentials by calling their
+  _refresh method, so that method is wrapped for this instance.
+
+  Args:
+    credentials: oauth2client.client.OAuth2Credentials to refresh.
+  """
+  if '_refresh' in vars(credentials):
+    return
+  refresh_lock = threading.Lock()
+  # pylint: disable=protected-access
+  unlocked_refresh = type(credentials)._refresh
+  # pylint: enable=protected-access
+  # A weak reference, so that the credentials can still be garbage collected
+  # without waiting for a reference cycle to be found.
+  credentials_ref = weakref.ref(credentials)
+
+  def _LockedRefresh(http):
+    with refresh_lock:
+      unlocked_refresh(credentials_ref(), http)
+
+  credentials._refresh = _LockedRefresh  # pylint: disable=protected-access
+  # Neither member can be stored in a credential store.
+  credentials.NON_SERIALIZED_MEMBERS = frozenset(
+      ['_refresh',
+       'NON_SERIALIZED_MEMBERS']).union(credentials.NON_SERIALIZED_MEMBERS)
+
+
+class CredentialRefresherThread(threading.Thread):
+  """Daemon thread that refreshes access tokens before they expire."""
+
+  def __init__(self, refresh_margin,
+               check_interval=TOKEN_REFRESH_CHECK_INTERVAL_SEC):
+    """Instantiates a CredentialRefresherThread.
+
+    Args:
+      refresh_margin: Number of seconds before expiry at which a token is
+          refreshed.
+      check_interval: Number of seconds between checks of the registered
+          credentials.
+    """
+    super(CredentialRefresherThread, self).__init__()
+    self.daemon = True
+    self.pid = os.getpid()
+    self.refresh_margin = datetime.timedelta(seconds=refresh_margin)
+    self.check_interval = check_interval
+    self._lock = threading.Lock()
+    # List of (weak reference to credentials, status queue) tuples. Weak
+    # references let credentials be garbage collected along with the API
+    # instances that own them.
+    self._registered_credentials = []
+
+  def Register(self, credentials, status_queue=None):
+    """Registers credentials for background refreshes.
+
+    Args:
+      credentials: oauth2client.client.OAuth2Credentials to keep fresh.
+      status_queue: Queue for reporting refreshes to the UI and analytics, or
+          None.
+    """
+    with self._lock:
+      for credentials_ref, _ in self._registered_credentials:
+        if credentials_ref() is credentials:
+          return
+      _SerializeRefreshes(credentials)
+      self._registered_credentials.append(
+          (weakref.ref(credentials), status_queue))
+
+  def NeedsRefresh(self, credentials, now=None):
+    """Returns True if credentials' access token expires within the margin."""
+    if credentials.invalid or not credentials.access_token:
+      # Credentials that do not have a token yet get one on their first use.
+      return False
+    token_expiry = credentials.token_expiry
+    if not token_expiry:
+      return False
+    now = now or datetime.datetime.utcnow()
+    return token_expiry - self.refresh_margin <= now
+
+  def RefreshExpiringCredentials(self, now=None):
+    """Refreshes the registered credentials whose tokens are about to expire.
+
+    Args:
+      now: Current UTC time as a naive datetime (overridable for testing).
+    """
+    with self._lock:
+      self._registered_credentials = [
+          (credentials_ref, status_queue)
+          for credentials_ref, status_queue in self._registered_credentials
+          if credentials_ref() is not None
+      ]
+      registered_credentials = list(self._registered_credentials)
+
+    for credentials_ref, status_queue in registered_credentials:
+      credentials = credentials_ref()
+      if credentials is None or not self.NeedsRefresh(credentials, now=now):
+        continue
+      start_time = time.time()
+      try:
+        credentials.refresh(GetNewHttp())
+      except Exception as e:  # pylint: disable=broad-except
+        # The token will be refreshed on demand once it has expired.
+        logging.debug('Background access token refresh failed: %s', e)
+        continue
+      end_time = time.time()
+      if status_queue is not None:
+        try:
+          status_queue.put(
+              CredentialRefreshMessage(end_time - start_time, end_time))
+        except Exception as e:  # pylint: disable=broad-except
+          # The status queue is shut down once the command has finished.
+          logging.debug('Could not report access token refresh: %s', e)
+
+  def run(self):
+    while True:
+      time.sleep(self.check_interval)
+      self.RefreshExpiringCredentials()
+
+
+def RegisterCredentialsForRefresh(credentials, status_queue=None):
+  """Keeps credentials' access token fresh from a background thread.
+
+  Args:
+    credentials: Credentials used by a Cloud API instance. Credentials that
+        don't carry an expiring oauth2client access token are ignored.
+    status_queue: Queue for reporting refreshes to the UI and analytics, or
+        None.
+  """
+  global _credential_refresher  # pylint: disable=global-statement
+  if not isinstance(credentials, client.OAuth2Credentials):
+    return
+  refresh_margin = GetTokenRefreshMargin()
+  if refresh_margin <= 0:
+    return
+  with _credential_refresher_lock:
+    # Threads don't survive a fork, so child processes start their own.
+    if (_credential_refresher is None or
+        _credential_refresher.pid != os.getpid()):
+      _credential_refresher = CredentialRefresherThread(refresh_margin)
+      _credential_refresher.start()
+    _credential_refresher.Register(credentials, status_queue=status_queue)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cache of local file checksums for the use_file_hash_cache option.
+
+Checksums that gsutil computes or validates for a local file are saved in an
+SQLite database in the gsutil state directory, along with a fingerprint of the
+file's stat metadata (size, modification time, change time and inode number),
+so that later commands can reuse them instead of reading the file again as
+long as the fingerprint still matches.
+
+Unlike the modification time, the change time can't be set by users, so a file
+modified in place can only go unnoticed if it keeps its size and is modified
+within the resolution of the file system's timestamps after its checksums were
+saved, or on file systems that don't maintain change times.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import json
+import logging
+import os
+
+from boto import config
+import crcmod
+import six
+
+from gslib.utils.boto_util import GetFileHashCacheFilename
+from gslib.utils.constants import UTF8
+from gslib.utils.hashing_helper import Base64EncodeHash
+from gslib.utils.hashing_helper import CalculateHashesFromContents
+from gslib.utils.hashing_helper import GetMd5
+from gslib.utils.sqlite_util import sqlite3
+from gslib.utils.sqlite_util import ThreadLocalConnection
+
+_CREATE_TABLE_STATEMENT = ('CREATE TABLE IF NOT EXISTS file_hashes '
+                           '(path TEXT PRIMARY KEY, entry TEXT NOT NULL)')
+
+_connections = ThreadLocalConnection([_CREATE_TABLE_STATEMENT])
+
+
+def UseFileHashCache():
+  return config.getbool('GSUtil', 'use_file_hash_cache', False)
+
+
+def _GetFingerprint(stat_result):
+  return [
+      stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ctime_ns,
+      stat_result.st_ino
+  ]
+
+
+def _GetDatabase():
+  """Returns this thread's connection to the database, or None."""
+  if sqlite3 is None:
+    return None
+  try:
+    return _connections.Get(GetFileHashCacheFilename())
+  except sqlite3.Error as e:
+    logging.debug('Could not open the file hash cache database: %s', e)
+    return None
+
+
+def _ReadEntry(file_name):
+  """Returns the raw cache entry for file_name, or None."""
+  database = _GetDatabase()
+  if database is None:
+    return None
+  try:
+    row = database.execute('SELECT entry FROM file_hashes WHERE path = ?',
+                           (file_name,)).fetchone()
+  except sqlite3.Error as e:
+    logging.debug('Could not read from the file hash cache database: %s', e)
+    return None
+  return row[0] if row else None
+
+
+def _WriteEntry(file_name, entry):
+  """Stores the raw cache entry for file_name."""
+  database = _GetDatabase()
+  if database is None:
+    return
+  try:
+    with database:
+      database.execute(
+          'INSERT OR REPLACE INTO file_hashes (path, entry) VALUES (?, ?)',
+          (file_name, six.ensure_text(entry, UTF8)))
+  except sqlite3.Error as e:
+    logging.debug('Could not write to the file hash cache database: %s', e)
+
+
+def _GetCachedDigests(file_name, stat_result):
+  """Returns the cached digests dict for file_name if it's still current."""
+  entry = _ReadEntry(file_name)
+  if not entry:
+    return {}
+  try:
+    entry = json.loads(six.ensure_text(entry, UTF8))
+  except ValueError:
+    return {}
+  if entry.get('fingerprint') != _GetFingerprint(stat_result):
+    return {}
+  return entry.get('digests', {})
+
+
+def GetCachedFileHashes(file_name, algs):
+  """Returns cached digests of a local file.
+
+  Args:
+    file_name: Path of the file.
+    algs: Iterable of algorithm names ('crc32c' and/or 'md5').
+
+  Returns:
+    Dict of algorithm name : base64 encoded digest, or None if the cache is
+    disabled or the digests for some of algs aren't cached.
+  """
+  if not UseFileHashCache():
+    return None
+  file_name = os.path.abspath(file_name)
+  digests = _GetCachedDigests(file_name, os.stat(file_name))
+  if not all(alg in digests for alg in algs):
+    return None
+  return dict((alg, digests[alg]) for alg in algs)
+
+
+def CacheFileHashes(file_name, digests, stat_result=None):
+  """Saves known digests of a local file in the cache, if it's enabled.
+
+  Args:
+    file_name: Path of the file.
+    digests: Dict of algorithm name : base64 encoded digest.
+    stat_result: os.stat_result of the file when the digests were computed.
+        Nothing is saved if the file has changed since then.
+  """
+  if not digests or not UseFileHashCache():
+    return
+  file_name = os.path.abspath(file_name)
+  try:
+    current_stat_result = os.stat(file_name)
+    fingerprint = _GetFingerprint(current_stat_result)
+    if stat_result and _GetFingerprint(stat_result) != fingerprint:
+      return
+    cached_digests = _GetCachedDigests(file_name, current_stat_result)
+    cached_digests.update(digests)
+    _WriteEntry(
+        file_name,
+        json.dumps({
+            'fingerprint': fingerprint,
+            'digests': cached_digests
+        }).encode(UTF8))
+  except (IOError, OSError) as e:
+    # The cache is only an optimization, so failing to update it shouldn't fail
+    # the operation that computed the digests.
+    logging.debug('Could not cache the hashes of %s: %s', file_name, e)
+
+
+def CalculateFileHashes(file_name, algs, callback_processor=None):
+  """Calculates digests of a local file, saving them in the cache.
+
+  Args:
+    file_name: Path of the file.
+    algs: Iterable of algorithm names ('crc32c' and/or 'md5').
+    callback_processor: Optional callback processing class that implements
+        Progress(integer amount of bytes processed).
+
+  Returns:
+    Dict of algorithm name : base64 encoded digest.
+  """
+  hash_dict = {}
+  for alg in algs:
+    if alg == 'md5':
+      hash_dict[alg] = GetMd5()
+    elif alg == 'crc32c':
+      hash_dict[alg] = crcmod.predefined.Crc('crc-32c')
+  with open(file_name, 'rb') as fp:
+    stat_result = os.fstat(fp.fileno())
+    CalculateHashesFromContents(fp,
+                                hash_dict,
+                                callback_processor=callback_processor)
+  digests = dict((alg, Base64EncodeHash(digester.hexdigest()))
+                 for alg, digester in six.iteritems(hash_dict))
+  CacheFileHashes(file_name, digests, stat_result=stat_result)
+  return digests
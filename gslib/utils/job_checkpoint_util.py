@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Checkpoints of cp -L jobs for the use_job_checkpoints option.
+
+Restarting a large copy that uses a manifest would otherwise list all of its
+sources again, only to skip most of them because the manifest says they were
+already copied. Instead, a JobCheckpoint journals the job's tasks in an SQLite
+database in the gsutil state directory: a separate thread lists the sources
+ahead of the copies and appends each task to the journal, and tasks are marked
+done as their successful manifest rows are written. A restarted job replays
+the tasks that aren't done, and only lists the sources again if the listing
+hadn't finished, in which case tasks that were already journaled aren't
+repeated.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import collections
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+
+from boto import config
+import six
+
+from gslib.exception import CommandException
+from gslib.utils.boto_util import GetGsutilStateDir
+from gslib.utils.constants import UTF8
+from gslib.utils.sqlite_util import sqlite3
+from gslib.utils.sqlite_util import ThreadLocalConnection
+from gslib.utils.system_util import CreateDirIfNeeded
+
+# Tasks are journaled in order. The messages of exceptions raised by the task
+# iterator are journaled with a NULL key, so that they're raised again in the
+# same position, and are never marked done.
+_CREATE_STATEMENTS = (
+    'CREATE TABLE IF NOT EXISTS tasks (seq INTEGER PRIMARY KEY, '
+    'key TEXT UNIQUE, task BLOB NOT NULL, done INTEGER NOT NULL DEFAULT 0)',
+    'CREATE INDEX IF NOT EXISTS pending_tasks ON tasks (seq) WHERE done = 0',
+    'CREATE TABLE IF NOT EXISTS job_state '
+    '(key TEXT PRIMARY KEY, value INTEGER NOT NULL)',
+)
+
+# Maximum number of listed tasks journaled per transaction.
+_JOURNAL_BATCH_SIZE = 1000
+
+# Number of pending tasks read from the journal at a time.
+_READ_BATCH_SIZE = 1000
+
+
+def UseJobCheckpoints():
+  return (sqlite3 is not None and
+          config.getbool('GSUtil', 'use_job_checkpoints', False))
+
+
+def GetJobCheckpointFilename(job_description):
+  """Returns the path of the checkpoint database for a job.
+
+  Args:
+    job_description: JSON-serializable description of the job, which must be
+        the same when the job is restarted (e.g. its command line arguments and
+        working directory).
+
+  Returns:
+    Path of the database.
+  """
+  checkpoint_dir = os.path.join(GetGsutilStateDir(), 'job-checkpoints')
+  CreateDirIfNeeded(checkpoint_dir)
+  job_hash = hashlib.sha1(
+      json.dumps(job_description, sort_keys=True).encode(UTF8)).hexdigest()
+  return os.path.join(checkpoint_dir, '%s.sqlite3' % job_hash)
+
+
+class JobCheckpoint(object):
+  """Journal of the tasks of a job that records which ones are done."""
+
+  def __init__(self, checkpoint_path, manifest_path, get_task_key):
+    """Initializes the checkpoint.
+
+    Args:
+      checkpoint_path: Path of the checkpoint database, from
+          GetJobCheckpointFilename.
+      manifest_path: Path of the job's manifest file. The checkpoint is
+          discarded if the manifest file is replaced, since the job is then
+          started over.
+      get_task_key: Function that returns a unique string key for a task, by
+          which the task is marked done.
+    """
+    self.checkpoint_path = checkpoint_path
+    self.manifest_path = manifest_path
+    self.get_task_key = get_task_key
+    self._connections = ThreadLocalConnection(_CREATE_STATEMENTS)
+    # Signals new journaled tasks to the thread iterating pending tasks.
+    self._condition = threading.Condition()
+    self._num_journal_commits = 0
+    self._journaling_done = False
+    self._journaling_error = None
+    self._reader_waiting = False
+    # Exceptions raised by the task iterator in this process, in order. Many
+    # exceptions can't be unpickled, so only their messages are journaled.
+    self._listing_exceptions = collections.deque()
+
+  def __getstate__(self):
+    # Other processes only mark tasks done, through their own connections.
+    return {
+        'checkpoint_path': self.checkpoint_path,
+        'manifest_path': self.manifest_path,
+        'get_task_key': self.get_task_key,
+    }
+
+  def __setstate__(self, state):
+    self.__init__(**state)
+
+  def _GetDatabase(self):
+    """Returns this thread's connection to the checkpoint database."""
+    return self._connections.Get(self.checkpoint_path)
+
+  def _GetState(self, database):
+    return dict(database.execute('SELECT key, value FROM job_state'))
+
+  def Open(self):
+    """Opens the checkpoint, discarding it if the manifest file was replaced.
+
+    Returns:
+      True if the checkpoint can be used.
+    """
+    try:
+      manifest_inode = os.stat(self.manifest_path).st_ino
+      database = self._GetDatabase()
+      with database:
+        if self._GetState(database).get('manifest_inode') != manifest_inode:
+          database.execute('DELETE FROM tasks')
+          database.execute('DELETE FROM job_state')
+          database.execute(
+              'INSERT INTO job_state (key, value) '
+              'VALUES (\'manifest_inode\', ?)', (manifest_inode,))
+    except (OSError, sqlite3.Error) as e:
+      logging.debug('Could not open the job checkpoint: %s', e)
+      return False
+    return True
+
+  def IterTasks(self, make_task_iterator):
+    """Returns an iterator over the tasks of the job that aren't done yet.
+
+    Args:
+      make_task_iterator: Function that returns an iterator over all of the
+          job's tasks. It's only called if the tasks weren't all journaled
+          before, and the iterator is then consumed by a separate thread.
+
+    Returns:
+      Iterator over the pending tasks, in the order they were listed.
+    """
+    database = self._GetDatabase()
+    if self._GetState(database).get('listing_complete'):
+      self._journaling_done = True
+    else:
+      task_iterator = make_task_iterator()
+      with database:
+        # Exceptions are journaled again as the tasks are listed.
+        database.execute('DELETE FROM tasks WHERE key IS NULL')
+      journal_thread = threading.Thread(target=self._JournalTasks,
+                                        args=(task_iterator,))
+      journal_thread.daemon = True
+      journal_thread.start()
+    return _PendingTaskIterator(self)
+
+  def _JournalTasks(self, task_iterator):
+    """Appends the tasks listed by task_iterator to the journal."""
+    error = None
+    try:
+      database = self._GetDatabase()
+      rows = []
+      while True:
+        try:
+          task = next(task_iterator)
+          rows.append((self.get_task_key(task),
+                       pickle.dumps(task, pickle.HIGHEST_PROTOCOL)))
+        except StopIteration:
+          break
+        except Exception as e:  # pylint: disable=broad-except
+          self._listing_exceptions.append(e)
+          message = e.reason if isinstance(e, CommandException) else str(e)
+          rows.append((None, six.ensure_binary(message, UTF8)))
+        # Commit in batches, but don't keep the reader waiting.
+        if len(rows) >= _JOURNAL_BATCH_SIZE or self._reader_waiting:
+          self._AppendTasks(database, rows)
+          rows = []
+      self._AppendTasks(database, rows, listing_complete=True)
+    except Exception as e:  # pylint: disable=broad-except
+      error = e
+    finally:
+      with self._condition:
+        self._journaling_done = True
+        self._journaling_error = error
+        self._condition.notify_all()
+
+  def _AppendTasks(self, database, rows, listing_complete=False):
+    with database:
+      # Tasks journaled before the job was restarted are ignored.
+      database.executemany(
+          'INSERT OR IGNORE INTO tasks (key, task) VALUES (?, ?)', rows)
+      if listing_complete:
+        database.execute('INSERT OR REPLACE INTO job_state (key, value) '
+                         'VALUES (\'listing_complete\', 1)')
+    with self._condition:
+      self._num_journal_commits += 1
+      self._condition.notify_all()
+
+  def _ReadPendingTasks(self, after_seq):
+    """Returns journaled tasks after after_seq, waiting for them if needed.
+
+    Args:
+      after_seq: Sequence number of the last task that was read.
+
+    Returns:
+      List of (seq, key, pickled task) tuples, which is empty once all tasks
+      have been read.
+    """
+    database = self._GetDatabase()
+    while True:
+      with self._condition:
+        num_journal_commits = self._num_journal_commits
+        journaling_done = self._journaling_done
+      rows = database.execute(
+          'SELECT seq, key, task FROM tasks WHERE done = 0 AND seq > ? '
+          'ORDER BY seq LIMIT ?', (after_seq, _READ_BATCH_SIZE)).fetchall()
+      if rows:
+        return rows
+      if journaling_done:
+        if self._journaling_error:
+          raise CommandException('Could not checkpoint the copy job: %s' %
+                                 self._journaling_error)
+        return rows
+      with self._condition:
+        self._reader_waiting = True
+        while (self._num_journal_commits == num_journal_commits and
+               not self._journaling_done):
+          self._condition.wait()
+        self._reader_waiting = False
+
+  def MarkDone(self, keys):
+    """Marks the tasks with the given keys as done.
+
+    Args:
+      keys: Iterable of task keys.
+    """
+    try:
+      database = self._GetDatabase()
+      with database:
+        database.executemany('UPDATE tasks SET done = 1 WHERE key = ?',
+                             ((key,) for key in keys))
+    except sqlite3.Error as e:
+      # The tasks are checked against the manifest when they're replayed.
+      logging.debug('Could not update the job checkpoint: %s', e)
+
+  def Delete(self):
+    """Discards the checkpoint once the job has completed."""
+    try:
+      database = self._GetDatabase()
+      with database:
+        # Even if the file can't be removed, the next job starts over.
+        database.execute('DELETE FROM tasks')
+        database.execute('DELETE FROM job_state')
+      self._connections.Close()
+    except sqlite3.Error as e:
+      logging.debug('Could not clear the job checkpoint: %s', e)
+    for suffix in ('', '-wal', '-shm'):
+      try:
+        os.unlink(self.checkpoint_path + suffix)
+      except OSError:
+        pass
+
+
+class _PendingTaskIterator(six.Iterator):
+  """Iterates over the pending tasks of a JobCheckpoint."""
+
+  def __init__(self, checkpoint):
+    self._checkpoint = checkpoint
+    self._last_seq = 0
+    self._rows = collections.deque()
+
+  def __iter__(self):
+    return self
+
+  def __next__(self):
+    if not self._rows:
+      self._rows.extend(self._checkpoint._ReadPendingTasks(self._last_seq))  # pylint: disable=protected-access
+      if not self._rows:
+        raise StopIteration
+    self._last_seq, key, task = self._rows.popleft()
+    if key is None:
+      # Exceptions journaled by a previous run are raised by their messages.
+      if self._checkpoint._listing_exceptions:  # pylint: disable=protected-access
+        raise self._checkpoint._listing_exceptions.popleft()  # pylint: disable=protected-access
+      raise CommandException(six.ensure_text(task, UTF8))
+    return pickle.loads(task)
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Copying of local files without passing their data through gsutil.
+
+Copies between regular files are delegated to the kernel, trying in order:
+  - Cloning the source's extents into the destination (FICLONE on Linux), so
+    that file systems that support reflinks (e.g. Btrfs and XFS) don't copy
+    any data at all.
+  - os.copy_file_range, which lets the kernel (or a network file system's
+    server) copy the data, possibly sharing extents.
+  - os.sendfile, which at least avoids copying the data through user space.
+Each step falls back to the next one if the platform or file systems don't
+support it, and any data that is left (e.g. for pipes, or files whose size
+isn't known, like those in /proc) is copied through user space.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import errno
+import os
+import stat
+
+from gslib.utils.constants import DEFAULT_FILE_BUFFER_SIZE
+from gslib.utils.system_util import IS_LINUX
+from gslib.utils.unit_util import ONE_MIB
+
+# pylint: disable=g-import-not-at-top
+try:
+  import fcntl
+except ImportError:
+  # Not available on Windows.
+  fcntl = None
+# pylint: enable=g-import-not-at-top
+
+# ioctl request that clones all extents of a file into another one, see
+# ioctl_ficlone(2).
+_FICLONE = 0x40049409
+
+# Bytes copied per copy_file_range/sendfile call, bounding the time between
+# progress callbacks.
+_KERNEL_COPY_CHUNK_SIZE = 64 * ONE_MIB
+
+# Errors meaning that a kernel copy method isn't supported for the given
+# files, rather than that the copy failed.
+_UNSUPPORTED_ERRNOS = frozenset(
+    getattr(errno, name) for name in ('EBADF', 'EINVAL', 'ENOSYS', 'ENOTSOCK',
+                                      'ENOTSUP', 'ENOTTY', 'EOPNOTSUPP',
+                                      'EPERM', 'EXDEV') if hasattr(errno, name))
+
+
+def _CloneFile(src_fd, dst_fd):
+  """Clones src_fd's extents into dst_fd, returning False if unsupported."""
+  if not IS_LINUX or fcntl is None:
+    return False
+  try:
+    fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+  except (IOError, OSError) as e:
+    if e.errno in _UNSUPPORTED_ERRNOS:
+      return False
+    raise
+  return True
+
+
+def _KernelCopy(copy_func, src_fd, dst_fd, progress_callback):
+  """Copies from src_fd to dst_fd with copy_func until src_fd's end.
+
+  Args:
+    copy_func: os.copy_file_range or os.sendfile-like function of (src_fd,
+        dst_fd, count) returning the number of bytes copied.
+    src_fd: Source file descriptor.
+    dst_fd: Destination file descriptor.
+    progress_callback: Function of (bytes_copied) or None.
+
+  Returns:
+    (bytes_copied, supported) tuple, where supported is False if copy_func
+    failed before copying any data because it isn't supported.
+  """
+  bytes_copied = 0
+  while True:
+    try:
+      num_bytes = copy_func(src_fd, dst_fd, _KERNEL_COPY_CHUNK_SIZE)
+    except OSError as e:
+      if not bytes_copied and e.errno in _UNSUPPORTED_ERRNOS:
+        return 0, False
+      raise
+    if not num_bytes:
+      return bytes_copied, True
+    bytes_copied += num_bytes
+    if progress_callback:
+      progress_callback(num_bytes)
+
+
+def _CopyFileRange(src_fd, dst_fd, count):
+  return os.copy_file_range(src_fd, dst_fd, count)
+
+
+def _SendFile(src_fd, dst_fd, count):
+  return os.sendfile(dst_fd, src_fd, None, count)
+
+
+def CopyFileContents(src_fp, dst_fp, progress_callback=None):
+  """Copies the contents of src_fp to dst_fp, in the kernel if possible.
+
+  Args:
+    src_fp: Source file object, positioned at its start.
+    dst_fp: Empty destination file object opened for writing.
+    progress_callback: Function of (bytes_copied) called as data is copied, or
+        None.
+
+  Returns:
+    Number of bytes copied.
+  """
+  bytes_copied = 0
+  try:
+    src_fd = src_fp.fileno()
+    dst_fd = dst_fp.fileno()
+    src_stat = os.fstat(src_fd)
+    dst_stat = os.fstat(dst_fd)
+  except (AttributeError, IOError, OSError, ValueError):
+    # E.g. in-memory streams have no file descriptor.
+    src_fd = None
+
+  if (src_fd is not None and stat.S_ISREG(src_stat.st_mode) and
+      stat.S_ISREG(dst_stat.st_mode) and src_stat.st_size):
+    dst_fp.flush()
+    if _CloneFile(src_fd, dst_fd):
+      # The clone doesn't move the file offsets.
+      bytes_copied = src_stat.st_size
+      if progress_callback:
+        progress_callback(bytes_copied)
+      os.lseek(src_fd, bytes_copied, os.SEEK_SET)
+      os.lseek(dst_fd, bytes_copied, os.SEEK_SET)
+    else:
+      for copy_func, available in ((_CopyFileRange,
+                                    hasattr(os, 'copy_file_range')),
+                                   (_SendFile, hasattr(os, 'sendfile'))):
+        if not available:
+          continue
+        bytes_copied, supported = _KernelCopy(copy_func, src_fd, dst_fd,
+                                              progress_callback)
+        if supported:
+          break
+    # Resume any remaining copy from where the kernel left off.
+    src_fp.seek(os.lseek(src_fd, 0, os.SEEK_CUR))
+    dst_fp.seek(os.lseek(dst_fd, 0, os.SEEK_CUR))
+
+  while True:
+    buf = src_fp.read(DEFAULT_FILE_BUFFER_SIZE * 8)
+    if not buf:
+      return bytes_copied
+    dst_fp.write(buf)
+    bytes_copied += len(buf)
+    if progress_callback:
+      progress_callback(len(buf))
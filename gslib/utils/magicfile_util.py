@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Content type detection for the use_magicfile option.
+
+The content types reported by "file -b --mime" come from libmagic, which the
+file command is a thin wrapper around. Rather than forking a file process for
+every uploaded file, which costs about as much as uploading a small file,
+libmagic is called in-process through ctypes. Each thread loads the magic
+database once and reuses it, since libmagic handles aren't thread-safe. The
+file command is still run where libmagic can't be loaded.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import subprocess
+import threading
+
+import six
+
+from gslib.exception import CommandException
+
+# libmagic flags equivalent to "file --mime".
+_MAGIC_MIME_TYPE = 0x10
+_MAGIC_MIME_ENCODING = 0x400
+_MAGIC_MIME = _MAGIC_MIME_TYPE | _MAGIC_MIME_ENCODING
+
+# The libmagic library, False if it hasn't been loaded yet, or None if it
+# couldn't be loaded.
+_libmagic = False
+_libmagic_lock = threading.Lock()
+# Per-thread libmagic handle with the magic database loaded.
+_thread_state = threading.local()
+
+
+def _LoadLibmagic():
+  """Loads libmagic, returning None if it isn't available."""
+  library_name = ctypes.util.find_library('magic')
+  if not library_name:
+    return None
+  try:
+    libmagic = ctypes.CDLL(library_name)
+  except OSError as e:
+    logging.debug('Could not load %s: %s', library_name, e)
+    return None
+  libmagic.magic_open.argtypes = [ctypes.c_int]
+  libmagic.magic_open.restype = ctypes.c_void_p
+  libmagic.magic_load.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+  libmagic.magic_load.restype = ctypes.c_int
+  libmagic.magic_file.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+  libmagic.magic_file.restype = ctypes.c_char_p
+  libmagic.magic_error.argtypes = [ctypes.c_void_p]
+  libmagic.magic_error.restype = ctypes.c_char_p
+  libmagic.magic_close.argtypes = [ctypes.c_void_p]
+  libmagic.magic_close.restype = None
+  return libmagic
+
+
+def _GetLibmagic():
+  global _libmagic  # pylint: disable=global-statement
+  with _libmagic_lock:
+    if _libmagic is False:
+      _libmagic = _LoadLibmagic()
+    return _libmagic
+
+
+def _GetMagicCookie(libmagic):
+  """Returns this thread's libmagic handle, or None if it can't be opened."""
+  cookie = getattr(_thread_state, 'cookie', None)
+  if cookie is None:
+    cookie = libmagic.magic_open(_MAGIC_MIME)
+    if not cookie:
+      return None
+    if libmagic.magic_load(cookie, None) != 0:
+      logging.debug('Could not load the magic database: %s',
+                    libmagic.magic_error(cookie))
+      libmagic.magic_close(cookie)
+      return None
+    _thread_state.cookie = cookie
+  return cookie
+
+
+def _RunFileCommand(file_path):
+  """Returns the output of "file -b --mime file_path"."""
+  try:
+    p = subprocess.Popen(['file', '-b', '--mime', file_path],
+                         stdout=subprocess.PIPE,
+                         stderr=subprocess.PIPE)
+    output, error = p.communicate()
+    p.stdout.close()
+    p.stderr.close()
+    if p.returncode != 0 or error:
+      raise CommandException(
+          'Encountered error running "file -b --mime %s" '
+          '(returncode=%d).\n%s' % (file_path, p.returncode, error))
+    # Parse output by removing line delimiter
+    return six.ensure_str(output.rstrip())
+  except OSError as e:  # 'file' executable may not always be present.
+    raise CommandException('Encountered OSError running "file -b --mime %s"\n%s'
+                           % (file_path, e))
+
+
+def GetMagicContentType(file_path):
+  """Detects a file's content type the way "file -b --mime" does.
+
+  Args:
+    file_path: Path of the file, with any symlinks resolved.
+
+  Returns:
+    Content type string, e.g. "text/html; charset=us-ascii".
+
+  Raises:
+    CommandException if the content type couldn't be detected.
+  """
+  libmagic = _GetLibmagic()
+  cookie = _GetMagicCookie(libmagic) if libmagic else None
+  if cookie is None:
+    return _RunFileCommand(file_path)
+  content_type = libmagic.magic_file(cookie, os.fsencode(file_path))
+  if content_type is None:
+    raise CommandException(
+        'Encountered error detecting the content type of %s.\n%s' %
+        (file_path, six.ensure_str(libmagic.magic_error(cookie) or b'')))
+  return six.ensure_str(content_type)
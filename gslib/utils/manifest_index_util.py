@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Index of the successfully copied sources in a cp -L manifest file.
+
+Resuming a copy with a manifest needs to know which sources were already
+copied or skipped. Rather than parsing the whole CSV file on every run, the
+sources are kept in an SQLite database in the gsutil state directory, along
+with the manifest file offset up to which it has been indexed and a checksum
+of the bytes just before that offset. Rows that are
+appended to the manifest are added to the index as they're written, and any
+rows the index missed (e.g. if gsutil was killed between writing the row and
+updating the index) are indexed when the manifest is next opened.
+
+The CSV manifest file stays the authoritative record, so an index that's
+deleted or out of date is rebuilt from it. That includes a manifest file that
+was rewritten in place (e.g. by an editor that doesn't replace the file) so
+that it's at least as long as the indexed prefix, which the checksum detects.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import csv
+import hashlib
+import io
+import logging
+import os
+import zlib
+
+from gslib.utils.boto_util import GetGsutilStateDir
+from gslib.utils.constants import UTF8
+from gslib.utils.sqlite_util import sqlite3
+from gslib.utils.sqlite_util import ThreadLocalConnection
+from gslib.utils.system_util import CreateDirIfNeeded
+
+MANIFEST_SOURCE_COLUMN = 'Source'
+MANIFEST_RESULT_COLUMN = 'Result'
+
+# Results of manifest rows whose sources shouldn't be copied again.
+SUCCESSFUL_RESULTS = frozenset(['OK', 'skip'])
+
+_CREATE_TABLE_STATEMENTS = (
+    'CREATE TABLE IF NOT EXISTS successful_sources '
+    '(source TEXT PRIMARY KEY) WITHOUT ROWID',
+    'CREATE TABLE IF NOT EXISTS manifest_state '
+    '(key TEXT PRIMARY KEY, value INTEGER NOT NULL)',
+)
+
+# Number of sources inserted per statement when indexing a manifest file.
+_INDEX_BATCH_SIZE = 10000
+
+# Number of bytes before the indexed offset covered by the prefix checksum.
+_PREFIX_CHECKSUM_SIZE = 4096
+
+
+def GetManifestIndexFilename(manifest_path):
+  """Returns the path of the index database for a manifest file."""
+  index_dir = os.path.join(GetGsutilStateDir(), 'manifest-indexes')
+  CreateDirIfNeeded(index_dir)
+  manifest_path_hash = hashlib.sha1(
+      os.path.realpath(manifest_path).encode(UTF8)).hexdigest()
+  return os.path.join(index_dir, '%s.sqlite3' % manifest_path_hash)
+
+
+def GetResultColumns(header_row):
+  """Returns the indexes of the source and result columns of a manifest.
+
+  Args:
+    header_row: List of column names in the first row of the manifest file.
+
+  Returns:
+    (source column index, result column index).
+
+  Raises:
+    ValueError: If the row doesn't name the columns.
+  """
+  return (header_row.index(MANIFEST_SOURCE_COLUMN),
+          header_row.index(MANIFEST_RESULT_COLUMN))
+
+
+def _GetPrefixChecksum(fp, offset):
+  """Returns a checksum of the bytes of a manifest file before an offset.
+
+  Args:
+    fp: Manifest file object opened in binary mode.
+    offset: Offset up to which the manifest file is indexed.
+
+  Returns:
+    CRC32 of the last _PREFIX_CHECKSUM_SIZE bytes before the offset.
+  """
+  start = max(0, offset - _PREFIX_CHECKSUM_SIZE)
+  fp.seek(start)
+  return zlib.crc32(fp.read(offset - start)) & 0xffffffff
+
+
+class ManifestIndex(object):
+  """Index of the successfully copied sources in a manifest file."""
+
+  def __init__(self, manifest_path):
+    """Initializes the index.
+
+    Args:
+      manifest_path: Path of the CSV manifest file.
+    """
+    self.manifest_path = manifest_path
+    self.index_path = GetManifestIndexFilename(manifest_path)
+    self._connections = ThreadLocalConnection(_CREATE_TABLE_STATEMENTS)
+
+  def __getstate__(self):
+    # Connections aren't sent to other processes, which open their own.
+    return {'manifest_path': self.manifest_path, 'index_path': self.index_path}
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    self._connections = ThreadLocalConnection(_CREATE_TABLE_STATEMENTS)
+
+  def _GetDatabase(self):
+    """Returns this thread's connection to the index database."""
+    return self._connections.Get(self.index_path)
+
+  def Update(self):
+    """Indexes the rows added to the manifest file since it was last indexed.
+
+    The whole file is indexed again if it was replaced, truncated or rewritten
+    since.
+
+    Raises:
+      IOError: If the manifest file can't be read.
+      ValueError: If the manifest file doesn't start with a header row.
+      sqlite3.Error: If the index database can't be used.
+    """
+    database = self._GetDatabase()
+    with open(self.manifest_path, 'rb') as fp:
+      stat_result = os.fstat(fp.fileno())
+      state = dict(database.execute('SELECT key, value FROM manifest_state'))
+      if (state.get('inode') != stat_result.st_ino or
+          state.get('offset', 0) > stat_result.st_size or
+          'source_column' not in state or
+          state.get('prefix_checksum') != _GetPrefixChecksum(
+              fp, state['offset'])):
+        state = {'inode': stat_result.st_ino, 'offset': 0}
+      fp.seek(state['offset'])
+      # Like the manifest file's writer, use the default encoding.
+      text_fp = io.TextIOWrapper(fp, newline='')
+      reader = csv.reader(text_fp)
+      with database:
+        if not state['offset']:
+          database.execute('DELETE FROM successful_sources')
+          try:
+            header_row = next(reader)
+          except StopIteration:
+            return
+          state['source_column'], state['result_column'] = (
+              GetResultColumns(header_row))
+        source_column = state['source_column']
+        result_column = state['result_column']
+        sources = []
+        for row in reader:
+          if (len(row) > max(source_column, result_column) and
+              row[result_column] in SUCCESSFUL_RESULTS):
+            sources.append(row[source_column])
+          if len(sources) >= _INDEX_BATCH_SIZE:
+            self._InsertSources(database, sources)
+            sources = []
+        self._InsertSources(database, sources)
+        state['offset'] = text_fp.buffer.tell()
+        state['prefix_checksum'] = _GetPrefixChecksum(text_fp.buffer,
+                                                      state['offset'])
+        database.executemany(
+            'INSERT OR REPLACE INTO manifest_state (key, value) VALUES (?, ?)',
+            state.items())
+      text_fp.detach()
+
+  def _InsertSources(self, database, sources):
+    database.executemany(
+        'INSERT OR IGNORE INTO successful_sources (source) VALUES (?)',
+        ((source,) for source in sources))
+
+  def AddSuccessfulSources(self, sources, start_offset, end_offset):
+    """Adds the sources of rows that were appended to the manifest file.
+
+    Args:
+      sources: Iterable of source URL strings to add.
+      start_offset: Size of the manifest file before the rows were appended.
+      end_offset: Size of the manifest file after the rows were appended.
+    """
+    try:
+      with open(self.manifest_path, 'rb') as fp:
+        prefix_checksum = _GetPrefixChecksum(fp, end_offset)
+      database = self._GetDatabase()
+      with database:
+        self._InsertSources(database, sources)
+        # If rows before start_offset weren't indexed, leave them to the next
+        # Update call.
+        if database.execute(
+            'UPDATE manifest_state SET value = ? '
+            'WHERE key = \'offset\' AND value = ?',
+            (end_offset, start_offset)).rowcount:
+          database.execute(
+              'UPDATE manifest_state SET value = ? '
+              'WHERE key = \'prefix_checksum\'', (prefix_checksum,))
+    except (EnvironmentError, sqlite3.Error) as e:
+      # The rows are indexed from the manifest file the next time it's opened.
+      logging.debug('Could not update the manifest index: %s', e)
+
+  def WasSuccessful(self, source):
+    """Returns whether the index has a successful row for the source."""
+    try:
+      return self._GetDatabase().execute(
+          'SELECT 1 FROM successful_sources WHERE source = ?',
+          (source,)).fetchone() is not None
+    except sqlite3.Error as e:
+      logging.debug('Could not read the manifest index: %s', e)
+      return False
@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Bucket and object metadata cache shared by a command's worker threads.
+
+Commands that operate on many objects in the same buckets tend to fetch the
+same bucket (and sometimes object) metadata over and over, often from many
+threads at once. A MetadataCache remembers metadata fetched during a single
+command invocation and lets concurrent identical requests share one HTTP
+call. Commands opt in by setting their metadata_cache attribute, after which
+GetCloudApiInstance wraps their Cloud API instances in a MetadataCachingCloudApi.
+
+Entries are dropped when the command mutates the resource through a wrapped
+API instance. Writes that create a new object generation only invalidate
+metadata of the live object; metadata of a specific generation is retained
+unless that generation is patched or deleted.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import copy
+import threading
+
+# Number of metadata requests each thread avoided, for performance summaries.
+_thread_cache_stats = threading.local()
+
+
+class _PendingRequest(object):
+  """A metadata request that is in flight on behalf of one or more threads."""
+
+  def __init__(self):
+    self.done = threading.Event()
+    self.result = None
+    self.exception = None
+    # Set if the resource was modified while the request was in flight, in
+    # which case the result must not be cached.
+    self.invalidated = False
+
+
+class MetadataCache(object):
+  """Thread-safe cache of bucket and object metadata.
+
+  A cached entry fetched with an explicit list of fields also serves requests
+  for any subset of those fields. Callers always receive their own copy of the
+  metadata, so they are free to modify it.
+
+  Caches are not shared across processes; pickling a cache (e.g. when the
+  command that owns it is sent to a child process) yields an empty cache.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    # Maps resource keys to dicts of {fields key: metadata}.
+    self._entries = {}
+    # Maps (resource key, fields key) to _PendingRequest.
+    self._pending_requests = {}
+
+  def __getstate__(self):
+    return {}
+
+  def __setstate__(self, state):
+    self.__init__()
+
+  @staticmethod
+  def BucketKey(provider, bucket_name):
+    return ('bucket', provider, bucket_name)
+
+  @staticmethod
+  def ObjectKey(provider, bucket_name, object_name, generation=None):
+    return ('object', provider, bucket_name, object_name,
+            str(generation) if generation else None)
+
+  @staticmethod
+  def _GetFieldsKey(fields):
+    return frozenset(fields) if fields is not None else None
+
+  def _LookUp(self, resource_key, fields_key):
+    """Returns cached metadata covering fields_key, or None. Requires _lock."""
+    entries = self._entries.get(resource_key)
+    if not entries:
+      return None
+    if fields_key in entries:
+      return entries[fields_key]
+    if fields_key is not None:
+      for cached_fields_key, metadata in entries.items():
+        if cached_fields_key is not None and fields_key <= cached_fields_key:
+          return metadata
+    return None
+
+  def Get(self, resource_key, fields, fetch_func):
+    """Returns metadata for a resource, fetching it if it is not cached.
+
+    If another thread is already fetching the same metadata, this waits for
+    and shares its result (or exception) rather than issuing another request.
+    Exceptions are never cached.
+
+    Args:
+      resource_key: Key from BucketKey or ObjectKey.
+      fields: Fields requested from the API, or None for all fields.
+      fetch_func: Function taking no arguments that fetches the metadata.
+
+    Returns:
+      A copy of the metadata.
+    """
+    fields_key = self._GetFieldsKey(fields)
+    request_key = (resource_key, fields_key)
+    with self._lock:
+      metadata = self._LookUp(resource_key, fields_key)
+      if metadata is not None:
+        _RecordMetadataRequestSaved()
+        return copy.deepcopy(metadata)
+      pending_request = self._pending_requests.get(request_key)
+      is_owner = pending_request is None
+      if is_owner:
+        pending_request = _PendingRequest()
+        self._pending_requests[request_key] = pending_request
+
+    if not is_owner:
+      pending_request.done.wait()
+      _RecordMetadataRequestSaved()
+      if pending_request.exception is not None:
+        raise pending_request.exception
+      return copy.deepcopy(pending_request.result)
+
+    try:
+      metadata = fetch_func()
+    except Exception as e:
+      pending_request.exception = e
+      raise
+    else:
+      pending_request.result = metadata
+      with self._lock:
+        if not pending_request.invalidated:
+          self._entries.setdefault(resource_key, {})[fields_key] = metadata
+      return copy.deepcopy(metadata)
+    finally:
+      with self._lock:
+        if self._pending_requests.get(request_key) is pending_request:
+          del self._pending_requests[request_key]
+      pending_request.done.set()
+
+  def Add(self, resource_key, fields, metadata):
+    """Caches metadata obtained by other means, e.g. from a listing.
+
+    Args:
+      resource_key: Key from BucketKey or ObjectKey.
+      fields: Fields that were requested when obtaining metadata, or None if
+          all fields were requested.
+      metadata: Metadata to cache. The cache stores a copy.
+    """
+    metadata = copy.deepcopy(metadata)
+    with self._lock:
+      self._entries.setdefault(resource_key,
+                               {})[self._GetFieldsKey(fields)] = metadata
+
+  def _InvalidateMatching(self, matches):
+    """Drops cached and in-flight metadata for resource keys matching."""
+    with self._lock:
+      for resource_key in [key for key in self._entries if matches(key)]:
+        del self._entries[resource_key]
+      # Later requests must not join requests that may return stale metadata.
+      for request_key in [
+          key for key in self._pending_requests if matches(key[0])
+      ]:
+        self._pending_requests.pop(request_key).invalidated = True
+
+  def Invalidate(self, resource_key):
+    """Drops cached and in-flight metadata for a resource."""
+    self._InvalidateMatching(lambda key: key == resource_key)
+
+  def InvalidateObject(self,
+                       provider,
+                       bucket_name,
+                       object_name,
+                       generation=None,
+                       all_generations=False):
+    """Drops cached metadata for an object.
+
+    Args:
+      provider: Cloud storage provider of the object.
+      bucket_name: Bucket containing the object.
+      object_name: Name of the object.
+      generation: Generation that was modified, if any. Metadata of the live
+          object is always dropped.
+      all_generations: If True, drop metadata of every generation.
+    """
+    live_key = self.ObjectKey(provider, bucket_name, object_name)
+    if all_generations:
+      self._InvalidateMatching(lambda key: key[:4] == live_key[:4])
+    else:
+      generation_key = self.ObjectKey(provider, bucket_name, object_name,
+                                      generation)
+      self._InvalidateMatching(lambda key: key in (live_key, generation_key))
+
+
+class MetadataCachingCloudApi(object):
+  """Wraps a Cloud API instance, serving metadata GETs from a MetadataCache.
+
+  Calls other than GetBucket and GetObjectMetadata are forwarded to the
+  wrapped instance, invalidating cached metadata of the resources they modify.
+  Like the wrapped instance, a wrapper must only be used by one thread at a
+  time, but wrappers in different threads may share a cache.
+  """
+
+  def __init__(self, gsutil_api, metadata_cache):
+    """Instantiates a MetadataCachingCloudApi.
+
+    Args:
+      gsutil_api: Cloud API instance (usually a CloudApiDelegator) to wrap.
+      metadata_cache: MetadataCache to use.
+    """
+    self.gsutil_api = gsutil_api
+    self.metadata_cache = metadata_cache
+
+  def __getattr__(self, name):
+    return getattr(self.gsutil_api, name)
+
+  def _GetProvider(self, provider):
+    return str(provider or getattr(self.gsutil_api, 'provider', None))
+
+  def GetBucket(self, bucket_name, provider=None, fields=None):
+    return self.metadata_cache.Get(
+        MetadataCache.BucketKey(self._GetProvider(provider), bucket_name),
+        fields,
+        lambda: self.gsutil_api.GetBucket(
+            bucket_name, provider=provider, fields=fields))
+
+  def GetObjectMetadata(self,
+                        bucket_name,
+                        object_name,
+                        generation=None,
+                        provider=None,
+                        fields=None):
+    return self.metadata_cache.Get(
+        MetadataCache.ObjectKey(self._GetProvider(provider), bucket_name,
+                                object_name, generation),
+        fields,
+        lambda: self.gsutil_api.GetObjectMetadata(
+            bucket_name, object_name, generation=generation,
+            provider=provider, fields=fields))
+
+  def _InvalidateBucket(self, bucket_name, provider):
+    self.metadata_cache.Invalidate(
+        MetadataCache.BucketKey(self._GetProvider(provider), bucket_name))
+
+  def PatchBucket(self, bucket_name, metadata, provider=None, **kwargs):
+    try:
+      return self.gsutil_api.PatchBucket(bucket_name, metadata,
+                                         provider=provider, **kwargs)
+    finally:
+      self._InvalidateBucket(bucket_name, provider)
+
+  def LockRetentionPolicy(self, bucket_name, metageneration, provider=None):
+    try:
+      return self.gsutil_api.LockRetentionPolicy(bucket_name, metageneration,
+                                                 provider=provider)
+    finally:
+      self._InvalidateBucket(bucket_name, provider)
+
+  def CreateBucket(self, bucket_name, provider=None, **kwargs):
+    try:
+      return self.gsutil_api.CreateBucket(bucket_name, provider=provider,
+                                          **kwargs)
+    finally:
+      self._InvalidateBucket(bucket_name, provider)
+
+  def DeleteBucket(self, bucket_name, provider=None, **kwargs):
+    try:
+      return self.gsutil_api.DeleteBucket(bucket_name, provider=provider,
+                                          **kwargs)
+    finally:
+      self._InvalidateBucket(bucket_name, provider)
+
+  def PatchObjectMetadata(self,
+                          bucket_name,
+                          object_name,
+                          metadata,
+                          generation=None,
+                          provider=None,
+                          **kwargs):
+    try:
+      return self.gsutil_api.PatchObjectMetadata(bucket_name,
+                                                 object_name,
+                                                 metadata,
+                                                 generation=generation,
+                                                 provider=provider,
+                                                 **kwargs)
+    finally:
+      # Without a generation, the patch may have applied to any generation
+      # that is cached under its own generation number.
+      self.metadata_cache.InvalidateObject(self._GetProvider(provider),
+                                           bucket_name,
+                                           object_name,
+                                           generation=generation,
+                                           all_generations=not generation)
+
+  def PatchObjectsMetadata(self, objects_to_patch, provider=None, **kwargs):
+    objects_to_patch = list(objects_to_patch)
+    try:
+      return self.gsutil_api.PatchObjectsMetadata(objects_to_patch,
+                                                  provider=provider,
+                                                  **kwargs)
+    finally:
+      for bucket_name, object_name, _, generation, _ in objects_to_patch:
+        self.metadata_cache.InvalidateObject(self._GetProvider(provider),
+                                             bucket_name,
+                                             object_name,
+                                             generation=generation,
+                                             all_generations=not generation)
+
+  def DeleteObject(self,
+                   bucket_name,
+                   object_name,
+                   generation=None,
+                   provider=None,
+                   **kwargs):
+    try:
+      return self.gsutil_api.DeleteObject(bucket_name,
+                                          object_name,
+                                          generation=generation,
+                                          provider=provider,
+                                          **kwargs)
+    finally:
+      self.metadata_cache.InvalidateObject(self._GetProvider(provider),
+                                           bucket_name,
+                                           object_name,
+                                           generation=generation,
+                                           all_generations=not generation)
+
+  def DeleteObjects(self, objects_to_delete, provider=None, **kwargs):
+    objects_to_delete = list(objects_to_delete)
+    try:
+      return self.gsutil_api.DeleteObjects(objects_to_delete,
+                                           provider=provider,
+                                           **kwargs)
+    finally:
+      for bucket_name, object_name, generation in objects_to_delete:
+        self.metadata_cache.InvalidateObject(self._GetProvider(provider),
+                                             bucket_name,
+                                             object_name,
+                                             generation=generation,
+                                             all_generations=not generation)
+
+  def _InvalidateLiveObject(self, object_metadata, provider):
+    self.metadata_cache.InvalidateObject(self._GetProvider(provider),
+                                         object_metadata.bucket,
+                                         object_metadata.name)
+
+  def UploadObject(self, upload_stream, object_metadata, provider=None,
+                   **kwargs):
+    try:
+      return self.gsutil_api.UploadObject(upload_stream, object_metadata,
+                                          provider=provider, **kwargs)
+    finally:
+      self._InvalidateLiveObject(object_metadata, provider)
+
+  def UploadObjectStreaming(self, upload_stream, object_metadata,
+                            provider=None, **kwargs):
+    try:
+      return self.gsutil_api.UploadObjectStreaming(upload_stream,
+                                                   object_metadata,
+                                                   provider=provider,
+                                                   **kwargs)
+    finally:
+      self._InvalidateLiveObject(object_metadata, provider)
+
+  def UploadObjectResumable(self, upload_stream, object_metadata,
+                            provider=None, **kwargs):
+    try:
+      return self.gsutil_api.UploadObjectResumable(upload_stream,
+                                                   object_metadata,
+                                                   provider=provider,
+                                                   **kwargs)
+    finally:
+      self._InvalidateLiveObject(object_metadata, provider)
+
+  def CopyObject(self, src_obj_metadata, dst_obj_metadata, provider=None,
+                 **kwargs):
+    try:
+      return self.gsutil_api.CopyObject(src_obj_metadata, dst_obj_metadata,
+                                        provider=provider, **kwargs)
+    finally:
+      self._InvalidateLiveObject(dst_obj_metadata, provider)
+
+  def ComposeObject(self, src_objs_metadata, dst_obj_metadata, provider=None,
+                    **kwargs):
+    try:
+      return self.gsutil_api.ComposeObject(src_objs_metadata,
+                                           dst_obj_metadata,
+                                           provider=provider,
+                                           **kwargs)
+    finally:
+      self._InvalidateLiveObject(dst_obj_metadata, provider)
+
+  def XmlPassThroughSetAcl(self, acl_text, storage_url, provider=None,
+                           **kwargs):
+    try:
+      return self.gsutil_api.XmlPassThroughSetAcl(acl_text, storage_url,
+                                                  provider=provider, **kwargs)
+    finally:
+      if storage_url.IsObject():
+        self.metadata_cache.InvalidateObject(self._GetProvider(provider),
+                                             storage_url.bucket_name,
+                                             storage_url.object_name,
+                                             all_generations=True)
+      else:
+        self._InvalidateBucket(storage_url.bucket_name, provider)
+
+  def XmlPassThroughSetCors(self, cors_text, storage_url, provider=None):
+    try:
+      return self.gsutil_api.XmlPassThroughSetCors(cors_text, storage_url,
+                                                   provider=provider)
+    finally:
+      self._InvalidateBucket(storage_url.bucket_name, provider)
+
+  def XmlPassThroughSetLifecycle(self, lifecycle_text, storage_url,
+                                 provider=None):
+    try:
+      return self.gsutil_api.XmlPassThroughSetLifecycle(lifecycle_text,
+                                                        storage_url,
+                                                        provider=provider)
+    finally:
+      self._InvalidateBucket(storage_url.bucket_name, provider)
+
+  def XmlPassThroughSetTagging(self, tags_text, storage_url, provider=None):
+    try:
+      return self.gsutil_api.XmlPassThroughSetTagging(tags_text, storage_url,
+                                                      provider=provider)
+    finally:
+      self._InvalidateBucket(storage_url.bucket_name, provider)
+
+
+def GetNumMetadataRequestsSaved():
+  """Returns the number of metadata requests the current thread avoided."""
+  return getattr(_thread_cache_stats, 'num_metadata_requests_saved', 0)
+
+
+def _RecordMetadataRequestSaved():
+  _thread_cache_stats.num_metadata_requests_saved = (
+      GetNumMetadataRequestsSaved() + 1)
@@ -24,10 +24,14 @@ import errno
 import logging
 import multiprocessing
 import threading
+import time
 import traceback
 
+from gslib.thread_message import MetadataMessage
+from gslib.thread_message import ProgressMessage
 from gslib.utils import constants
 from gslib.utils import system_util
+import six
 from six.moves import queue as Queue
 
 # pylint: disable=g-import-not-at-top
@@ -45,6 +49,10 @@ SEEK_AHEAD_JOIN_TIMEOUT = 60
 # Timeout for puts/gets to the global status queue, in seconds.
 STATUS_QUEUE_OP_TIMEOUT = 5
 
+# Minimum period between publishing coalesced status updates from a worker
+# pool to the global status queue, in seconds.
+STATUS_QUEUE_COALESCE_PERIOD = 0.5
+
 # Maximum time to wait (join) on the UIThread after the Apply
 # completes, in seconds.
 UI_THREAD_JOIN_TIMEOUT = 60
@@ -452,3 +460,174 @@ def PutToQueueWithTimeout(queue, msg, timeout=STATUS_QUEUE_OP_TIMEOUT):
 
 
 # pylint: enable=invalid-name
+
+
+class CoalescingStatusQueue(object):
+  """Wraps a status queue, coalescing high-rate status messages locally.
+
+  Worker threads report progress far more often than the UIThread can display
+  it, and with multiple processes every message posted to the global status
+  queue must be pickled and sent to the manager process. This class is shared
+  by all threads of a WorkerPool and keeps only the latest ProgressMessage for
+  each file or component and a count of finished metadata operations, which
+  are published as a single snapshot at most once every flush_period seconds.
+
+  All other messages are passed through immediately, after publishing any
+  pending snapshot so that the order in which messages reach the UIThread is
+  preserved (e.g., progress for a file is never seen after the file finished).
+  """
+
+  def __init__(self, status_queue, flush_period=STATUS_QUEUE_COALESCE_PERIOD):
+    """Instantiates a CoalescingStatusQueue.
+
+    Args:
+      status_queue: Queue that coalesced messages are published to.
+      flush_period: Minimum period between publishing coalesced snapshots, in
+          seconds. A non-positive value disables coalescing.
+    """
+    self.status_queue = status_queue
+    self.flush_period = flush_period
+    self.lock = threading.Lock()
+    self.last_flush_time = time.time()
+    # Latest ProgressMessage for each (src_url, component_num, dst_url) key.
+    # Processed byte counts are absolute for a file or component, so newer
+    # messages supersede older ones without losing information.
+    self.pending_progress = collections.OrderedDict()
+    self.pending_metadata_count = 0
+    self.pending_metadata_time = None
+
+  # pylint: disable=invalid-name, unused-argument
+  def put(self, status_message, timeout=None):
+    with self.lock:
+      if isinstance(status_message, ProgressMessage):
+        key = (status_message.src_url.url_string, status_message.component_num,
+               (status_message.dst_url.url_string
+                if status_message.dst_url else None))
+        self.pending_progress.pop(key, None)
+        self.pending_progress[key] = status_message
+      elif isinstance(status_message, MetadataMessage):
+        self.pending_metadata_count += status_message.num_objects
+        self.pending_metadata_time = status_message.time
+      else:
+        self._Flush()
+        PutToQueueWithTimeout(self.status_queue, status_message)
+        return
+      if time.time() - self.last_flush_time >= self.flush_period:
+        self._Flush()
+
+  # pylint: enable=invalid-name, unused-argument
+
+  def Flush(self, include_metadata=True):
+    """Publishes all pending coalesced messages to the status queue.
+
+    Args:
+      include_metadata: If False, pending metadata operation counts are kept
+          until the next flush. Unlike progress, these counts cannot be
+          reordered with respect to other messages in a harmful way.
+    """
+    with self.lock:
+      self._Flush(include_metadata=include_metadata)
+
+  def _Flush(self, include_metadata=True):
+    """Publishes pending messages; the caller must hold self.lock."""
+    for status_message in self.pending_progress.values():
+      PutToQueueWithTimeout(self.status_queue, status_message)
+    self.pending_progress.clear()
+    if include_metadata and self.pending_metadata_count:
+      PutToQueueWithTimeout(
+          self.status_queue,
+          MetadataMessage(self.pending_metadata_time,
+                          num_objects=self.pending_metadata_count))
+      self.pending_metadata_count = 0
+    self.last_flush_time = time.time()
+
+
+class TaskArgsBatch(object):
+  """Arguments for several operations that are performed by a single task.
+
+  Apply passes a TaskArgsBatch to the task function like any other argument,
+  but counts each of its arguments (rather than the batch) as a separate
+  operation when reporting the total amount of work.
+  """
+
+  def __init__(self, args_list):
+    """Instantiates a TaskArgsBatch.
+
+    Args:
+      args_list: List of task arguments, e.g. NameExpansionResults.
+    """
+    self.args_list = args_list
+
+  def __len__(self):
+    return len(self.args_list)
+
+  def __iter__(self):
+    return iter(self.args_list)
+
+
+class TaskArgsBatchingIterator(six.Iterator):
+  """Iterator that groups consecutive task arguments into TaskArgsBatches.
+
+  Exceptions raised by the wrapped iterator are re-raised after the batch
+  collected so far has been returned, so callers that continue iterating after
+  an exception (such as the ProducerThread) see every argument and exception
+  in order.
+  """
+
+  def __init__(self, args_iterator, batch_size, get_batch_key):
+    """Instantiates a TaskArgsBatchingIterator.
+
+    Args:
+      args_iterator: Iterator of task arguments.
+      batch_size: Maximum number of arguments per batch, or a function taking
+          a batch key and returning the maximum for batches with that key.
+      get_batch_key: Function taking a task argument and returning a hashable
+          key, or None if the argument can't be batched. Only consecutive
+          arguments with equal keys are batched together.
+    """
+    self.args_iterator = iter(args_iterator)
+    if callable(batch_size):
+      self.get_batch_size = batch_size
+    else:
+      self.get_batch_size = lambda _: batch_size
+    self.get_batch_key = get_batch_key
+    # Argument or exception that ended the previous batch.
+    self._next_item = None
+    self._next_exception = None
+
+  def __iter__(self):
+    return self
+
+  def __next__(self):
+    batch = []
+    batch_key = None
+    batch_size = None
+    while batch_size is None or len(batch) < batch_size:
+      if self._next_exception is not None:
+        if batch:
+          break
+        e, self._next_exception = self._next_exception, None
+        raise e
+      if self._next_item is not None:
+        args, self._next_item = self._next_item, None
+      else:
+        try:
+          args = next(self.args_iterator)
+        except StopIteration:
+          break
+        except Exception as e:  # pylint: disable=broad-except
+          self._next_exception = e
+          continue
+      key = self.get_batch_key(args)
+      if batch and key != batch_key:
+        self._next_item = args
+        break
+      if key is None:
+        return args
+      if not batch:
+        batch_key = key
+        batch_size = self.get_batch_size(key)
+      batch.append(args)
+    if not batch:
+      raise StopIteration
+    return TaskArgsBatch(batch)
@@ -78,6 +78,14 @@ O_X = 0o001
 SYSTEM_POSIX_MODE = None
 # A list of group IDs that the current user is a member of.
 USER_GROUPS = set()
+# Whether USER_GROUPS has been looked up since InitializeUserGroups was called.
+_USER_GROUPS_RESOLVED = False
+
+# Maps (uid, gid, mode) to None if a file with those attributes would be
+# accessible, or else to an error message template with a {url} field. Looking
+# up users and groups can be slow (e.g. with LDAP), and copies usually share a
+# few combinations of attributes.
+_PERMISSION_ACCESS_ERRORS = {}
 
 
 class POSIXAttributes(object):
@@ -308,10 +316,36 @@ def ValidateFilePermissionAccess(url_str, uid=NA_ID, gid=NA_ID, mode=NA_MODE):
   if os.geteuid() == 0:
     return True, ''
 
+  key = (uid, gid, mode)
+  if key not in _PERMISSION_ACCESS_ERRORS:
+    _PERMISSION_ACCESS_ERRORS[key] = _GetPermissionAccessError(
+        uid_present, gid_present, mode_present, uid, gid, mode)
+  error = _PERMISSION_ACCESS_ERRORS[key]
+  if error is None:
+    return True, ''
+  return False, error.format(url=url_str)
+
+
+def _GetPermissionAccessError(uid_present, gid_present, mode_present, uid, gid,
+                              mode):
+  """Returns why a file with the given attributes wouldn't be accessible.
+
+  Args:
+    uid_present: Whether uid is set.
+    gid_present: Whether gid is set.
+    mode_present: Whether mode is set.
+    uid: A POSIX user ID.
+    gid: A POSIX group ID.
+    mode: A 3-digit, number representing POSIX permissions, must be in base-8.
+
+  Returns:
+    None if the file would be accessible, or else an error message template
+    with a {url} field for the path of the file.
+  """
   mode_valid = ValidatePOSIXMode(int(str(mode), 8))
   if mode_present:
     if not mode_valid:
-      return False, 'Mode for %s won\'t allow read access.' % url_str
+      return 'Mode for {url} won\'t allow read access.'
   else:
     # Calculate the default mode if the mode doesn't exist.
     # Convert mode to a 3-digit, base-8 integer.
@@ -321,14 +355,12 @@ def ValidateFilePermissionAccess(url_str, uid=NA_ID, gid=NA_ID, mode=NA_MODE):
     try:
       pwd.getpwuid(uid)
     except (KeyError, OverflowError):
-      return (False, 'UID for %s doesn\'t exist on current system. uid: %d' %
-              (url_str, uid))
+      return 'UID for {url} doesn\'t exist on current system. uid: %d' % uid
   if gid_present:
     try:
       grp.getgrgid(gid)
     except (KeyError, OverflowError):
-      return (False, 'GID for %s doesn\'t exist on current system. gid: %d' %
-              (url_str, gid))
+      return 'GID for {url} doesn\'t exist on current system. gid: %d' % gid
 
   # uid at this point must exist, but isn't necessarily the current user.
   # Likewise, gid must also exist at this point.
@@ -345,23 +377,23 @@ def ValidateFilePermissionAccess(url_str, uid=NA_ID, gid=NA_ID, mode=NA_MODE):
   # current user wouldn't have read access or better, the file will be orphaned
   # even though they might otherwise have access through the gid or other bytes.
   if not uid_present and gid_present and mode_present and not bool(mode & U_R):
-    return (False, 'Insufficient access with uid/gid/mode for %s, gid: %d, '
-            'mode: %s' % (url_str, gid, oct(mode)[-3:]))
+    return ('Insufficient access with uid/gid/mode for {url}, gid: %d, '
+            'mode: %s' % (gid, oct(mode)[-3:]))
   if uid_is_current_user:
-    valid = bool(mode & U_R)
-    return (valid, '' if valid else
-            'Insufficient access with uid/gid/mode for %s, uid: %d, '
-            'mode: %s' % (url_str, uid, oct(mode)[-3:]))
-  elif int(gid) in USER_GROUPS:
-    valid = bool(mode & G_R)
-    return (valid, '' if valid else
-            'Insufficient access with uid/gid/mode for %s, gid: %d, '
-            'mode: %s' % (url_str, gid, oct(mode)[-3:]))
+    if mode & U_R:
+      return None
+    return ('Insufficient access with uid/gid/mode for {url}, uid: %d, '
+            'mode: %s' % (uid, oct(mode)[-3:]))
+  elif int(gid) in _GetUserGroups():
+    if mode & G_R:
+      return None
+    return ('Insufficient access with uid/gid/mode for {url}, gid: %d, '
+            'mode: %s' % (gid, oct(mode)[-3:]))
   elif mode & O_R:
-    return True, ''
+    return None
   elif not uid_present and not gid_present and mode_valid:
-    return True, ''
-  return False, 'There was a problem validating %s.' % url_str
+    return None
+  return 'There was a problem validating {url}.'
 
 
 def ParseAndSetPOSIXAttributes(path,
@@ -524,23 +556,38 @@ def InitializeDefaultMode():
   # Files are not given execute privileges by default. Therefore we need to
   # subtract one from every odd permissions value. This is done via a bitmask.
   SYSTEM_POSIX_MODE = oct(mode & 0o666)[-3:]
+  _PERMISSION_ACCESS_ERRORS.clear()
 
 
 def InitializeUserGroups():
   """Initializes the set of groups that the user is in.
 
-  Should only be called if the flag for preserving POSIX attributes is set.
+  Should only be called if the flag for preserving POSIX attributes is set. The
+  groups are only looked up once they're needed to validate a file's
+  permissions, since that can be slow (e.g. with LDAP).
   """
-  global USER_GROUPS
-  if IS_WINDOWS:
-    return
-  user_id = os.getuid()
-  user_name = pwd.getpwuid(user_id).pw_name
-  USER_GROUPS = set(
-      # Primary group
-      [pwd.getpwuid(user_id).pw_gid] +
-      # Secondary groups
-      [g.gr_gid for g in grp.getgrall() if user_name in g.gr_mem])
+  global _USER_GROUPS_RESOLVED
+  _USER_GROUPS_RESOLVED = False
+  _PERMISSION_ACCESS_ERRORS.clear()
+
+
+def _GetUserGroups():
+  """Returns USER_GROUPS, looking up the user's groups if needed."""
+  global USER_GROUPS, _USER_GROUPS_RESOLVED
+  if IS_WINDOWS or _USER_GROUPS_RESOLVED:
+    return USER_GROUPS
+  user_info = pwd.getpwuid(os.getuid())
+  if hasattr(os, 'getgrouplist'):
+    # Asks only for the user's groups, rather than listing every group.
+    USER_GROUPS = set(os.getgrouplist(user_info.pw_name, user_info.pw_gid))
+  else:
+    USER_GROUPS = set(
+        # Primary group
+        [user_info.pw_gid] +
+        # Secondary groups
+        [g.gr_gid for g in grp.getgrall() if user_info.pw_name in g.gr_mem])
+  _USER_GROUPS_RESOLVED = True
+  return USER_GROUPS
 
 
 def InitializePreservePosixData():
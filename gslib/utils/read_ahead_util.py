@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Read-ahead of local files that are being uploaded.
+
+Uploads read their source files as the HTTP layer sends the data, so on slow
+or high-latency storage (e.g. NFS) the connection sits idle while the file is
+read, and the file sits idle while the data is sent. A ReadAheadFileWrapper
+reads the file in a separate thread into a bounded buffer, starting as soon as
+the file is opened, so that reads overlap with the requests that set up the
+upload and with sending the data that was already read.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import os
+import threading
+
+from six.moves import queue as Queue
+
+from gslib.utils.unit_util import ONE_MIB
+
+# Size of each read from the wrapped file.
+_READ_AHEAD_CHUNK_SIZE = ONE_MIB
+
+
+class ReadAheadFileWrapper(object):
+  """Wraps a seekable file, reading ahead of the caller in another thread.
+
+  Reads proceed sequentially from the wrapped file's position. Seeking to any
+  position other than the current one discards the data read so far, and
+  reading ahead restarts from the new position on the next read.
+  """
+
+  def __init__(self, fp, buffer_size):
+    """Initializes the wrapper and starts reading ahead.
+
+    Args:
+      fp: Seekable file object (or FilePart) opened for reading in binary mode.
+          It's owned by the wrapper from now on.
+      buffer_size: Maximum number of bytes read ahead of the caller.
+    """
+    self._fp = fp
+    self._chunk_size = min(_READ_AHEAD_CHUNK_SIZE, buffer_size)
+    self._max_chunks = max(1, buffer_size // self._chunk_size)
+    self._position = fp.tell()
+    self._thread = None
+    self._stop_event = None
+    self._chunks = None
+    self._buffer = b''
+    self._buffer_offset = 0
+    self._eof = False
+    if hasattr(os, 'posix_fadvise'):
+      try:
+        os.posix_fadvise(fp.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+      except (AttributeError, IOError, NotImplementedError, OSError,
+              ValueError):
+        # The advice is just a hint for the kernel's own read-ahead.
+        pass
+    self._StartReadAhead()
+
+  def __getattr__(self, name):
+    return getattr(self._fp, name)
+
+  def _StartReadAhead(self):
+    self._stop_event = threading.Event()
+    self._chunks = Queue.Queue(maxsize=self._max_chunks)
+    self._thread = threading.Thread(target=self._ReadAheadThread,
+                                    args=(self._chunks, self._stop_event))
+    self._thread.daemon = True
+    self._thread.start()
+
+  def _ReadAheadThread(self, chunks, stop_event):
+    """Reads the file into chunks until its end or until stop_event is set."""
+    try:
+      while not stop_event.is_set():
+        data = self._fp.read(self._chunk_size)
+        chunks.put(data)
+        if not data:
+          return
+    except Exception as e:  # pylint: disable=broad-except
+      # Raised to the caller by the read that needs this data.
+      chunks.put(e)
+
+  def _StopReadAhead(self):
+    if not self._thread:
+      return
+    self._stop_event.set()
+    # Make room in the queue in case the thread is waiting to add a chunk.
+    while self._thread.is_alive():
+      try:
+        self._chunks.get_nowait()
+      except Queue.Empty:
+        self._thread.join(0.01)
+    self._thread = None
+
+  def read(self, size=-1):  # pylint: disable=invalid-name
+    """Reads up to size bytes, or until the end of the file if size < 0."""
+    if not self._thread and not self._eof:
+      self._StartReadAhead()
+    data = []
+    bytes_remaining = size
+    while bytes_remaining:
+      if self._buffer_offset >= len(self._buffer):
+        if self._eof:
+          break
+        chunk = self._chunks.get()
+        if isinstance(chunk, Exception):
+          # Seek back so that the read can be retried.
+          self._thread = None
+          self._buffer = b''
+          self._buffer_offset = 0
+          self._fp.seek(self._position)
+          raise chunk
+        if not chunk:
+          self._eof = True
+          break
+        self._buffer = chunk
+        self._buffer_offset = 0
+      end = len(self._buffer)
+      if bytes_remaining > 0:
+        end = min(end, self._buffer_offset + bytes_remaining)
+        bytes_remaining -= end - self._buffer_offset
+      data.append(self._buffer[self._buffer_offset:end])
+      self._buffer_offset = end
+    data = b''.join(data)
+    self._position += len(data)
+    return data
+
+  def tell(self):  # pylint: disable=invalid-name
+    return self._position
+
+  def seekable(self):  # pylint: disable=invalid-name
+    return True
+
+  def seek(self, offset, whence=os.SEEK_SET):  # pylint: disable=invalid-name
+    """Seeks to a position, restarting reading ahead if it changes."""
+    if whence == os.SEEK_CUR:
+      offset += self._position
+      whence = os.SEEK_SET
+    if whence == os.SEEK_SET and offset == self._position:
+      return self._position
+    self._StopReadAhead()
+    self._fp.seek(offset, whence)
+    self._position = self._fp.tell()
+    self._buffer = b''
+    self._buffer_offset = 0
+    self._eof = False
+    return self._position
+
+  def close(self):  # pylint: disable=invalid-name
+    self._StopReadAhead()
+    self._fp.close()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Connections to the SQLite databases that gsutil keeps its state in.
+
+SQLite connections can't be shared between threads or forked processes, so
+each thread of each process opens its own connection to a database and keeps
+it in a ThreadLocalConnection. The databases use write-ahead logging with
+synchronous=NORMAL, so that lookups from other threads and processes don't
+wait for writes, and commits only append to the log, the syncing of which to
+disk is batched at checkpoints. A committed transaction can be lost if the
+machine crashes, but the database can't be corrupted.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+import os
+import threading
+
+# pylint: disable=g-import-not-at-top
+try:
+  import sqlite3
+except ImportError:
+  # Python may be built without SQLite support.
+  sqlite3 = None
+# pylint: enable=g-import-not-at-top
+
+# How long to wait for another process to release a database, in seconds.
+DATABASE_TIMEOUT = 30
+
+
+def Connect(database_path, create_statements=(), isolation_level='',
+            file_mode=None):
+  """Opens a connection to a database, creating its tables if needed.
+
+  Args:
+    database_path: Path of the database file.
+    create_statements: Iterable of CREATE ... IF NOT EXISTS statements to run.
+    isolation_level: isolation_level for sqlite3.connect. None puts the
+        connection in autocommit mode.
+    file_mode: If not None, permissions of the database file if it doesn't
+        exist yet.
+
+  Returns:
+    sqlite3.Connection.
+
+  Raises:
+    OSError: If the database file can't be created.
+    sqlite3.Error: If the database can't be opened.
+  """
+  if file_mode is not None and not os.path.exists(database_path):
+    os.close(os.open(database_path, os.O_WRONLY | os.O_CREAT, file_mode))
+  connection = sqlite3.connect(database_path,
+                               timeout=DATABASE_TIMEOUT,
+                               isolation_level=isolation_level)
+  connection.execute('PRAGMA journal_mode=WAL')
+  connection.execute('PRAGMA synchronous=NORMAL')
+  for statement in create_statements:
+    connection.execute(statement)
+  return connection
+
+
+class ThreadLocalConnection(object):
+  """Per-thread connection to a database, opened on first use."""
+
+  def __init__(self, create_statements=(), isolation_level='',
+               file_mode=None):
+    """Initializes the connection holder.
+
+    Args:
+      create_statements: Iterable of CREATE ... IF NOT EXISTS statements to run
+          when a connection is opened.
+      isolation_level: isolation_level for sqlite3.connect.
+      file_mode: If not None, permissions of the database file if it doesn't
+          exist yet.
+    """
+    self._create_statements = tuple(create_statements)
+    self._isolation_level = isolation_level
+    self._file_mode = file_mode
+    self._thread_state = threading.local()
+
+  def Get(self, database_path):
+    """Returns this thread's connection to the database at database_path.
+
+    A new connection is opened in a forked process, or if the database path
+    changed since the thread's connection was opened.
+
+    Args:
+      database_path: Path of the database file.
+
+    Returns:
+      sqlite3.Connection.
+
+    Raises:
+      OSError: If the database file can't be created.
+      sqlite3.Error: If the database can't be opened.
+    """
+    thread_state = self._thread_state
+    if (getattr(thread_state, 'pid', None) != os.getpid() or
+        thread_state.database_path != database_path):
+      thread_state.pid = os.getpid()
+      thread_state.database_path = database_path
+      thread_state.connection = None
+    if thread_state.connection is None:
+      thread_state.connection = Connect(database_path,
+                                        self._create_statements,
+                                        isolation_level=self._isolation_level,
+                                        file_mode=self._file_mode)
+    return thread_state.connection
+
+  def Close(self):
+    """Closes this thread's connection, if it has one open."""
+    connection = getattr(self._thread_state, 'connection', None)
+    if (connection is not None and
+        getattr(self._thread_state, 'pid', None) == os.getpid()):
+      connection.close()
+    self._thread_state.connection = None
@@ -19,6 +19,8 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import unicode_literals
 
+import collections
+import concurrent.futures
 import fnmatch
 import glob
 import logging
@@ -41,6 +43,7 @@ from gslib.storage_url import StorageUrlFromString
 from gslib.storage_url import StripOneSlash
 from gslib.storage_url import WILDCARD_REGEX
 from gslib.third_party.storage_apitools import storage_v1_messages as apitools_messages
+from gslib.utils.boto_util import GetFileListingThreads
 from gslib.utils.constants import UTF8
 from gslib.utils.text_util import FixWindowsEncodingIfNeeded
 from gslib.utils.text_util import PrintableStr
@@ -555,21 +558,57 @@ class CloudWildcardIterator(WildcardIterator):
         yield blr
 
 
-def _GetFileObject(filepath):
-  """Returns an apitools Object class with supported file attributes.
+# A file found by FileWildcardIterator. is_symlink is None if it isn't known
+# yet, and stat_result is None if the file hasn't been stat'ed.
+_FoundFile = collections.namedtuple('_FoundFile',
+                                    ['path', 'is_symlink', 'stat_result'])
 
-  To provide size estimates for local to cloud file copies, we need to retrieve
-  expose the local file's size.
+
+def _ScanDir(dirpath, wildcard, stat_files):
+  """Scans a directory with os.scandir.
+
+  Listing a directory and stat'ing its files are separate round trips on
+  network file systems, so a recursive listing walking one directory at a time
+  is bound by their latency. Directories are instead scanned concurrently by
+  FileWildcardIterator, and the DirEntry objects returned by os.scandir supply
+  file types without further calls in most cases.
 
   Args:
-    filepath: Path to the file.
+    dirpath: Path of the directory to scan.
+    wildcard: fnmatch pattern for the names of files to return.
+    stat_files: If True, files are stat'ed as they are scanned.
 
   Returns:
-    apitools Object that with file name and size attributes filled-in.
+    (dirnames, files) tuple, where dirnames is a list of (name, is_symlink)
+    tuples and files is a list of (name, is_symlink, stat_result) tuples.
   """
-  # TODO: If we are preserving POSIX attributes, we could instead call
-  # os.stat() here.
-  return apitools_messages.Object(size=os.path.getsize(filepath))
+  try:
+    with os.scandir(dirpath) as entries:
+      entries = list(entries)
+  except OSError:
+    # As with os.walk, directories that can't be listed are skipped.
+    entries = []
+  dirnames = []
+  files = []
+  for entry in entries:
+    try:
+      is_dir = entry.is_dir()
+    except OSError:
+      is_dir = False
+    if is_dir:
+      dirnames.append((entry.name, entry.is_symlink()))
+      continue
+    if not fnmatch.fnmatch(entry.name, wildcard):
+      continue
+    stat_result = None
+    if stat_files:
+      try:
+        stat_result = entry.stat()
+      except OSError:
+        # E.g. a broken symlink; the error is raised when the file is used.
+        pass
+    files.append((entry.name, entry.is_symlink(), stat_result))
+  return dirnames, files
 
 
 class FileWildcardIterator(WildcardIterator):
@@ -643,37 +682,58 @@ class FileWildcardIterator(WildcardIterator):
         remaining_wildcard = '*'
       # Skip slash(es).
       remaining_wildcard = remaining_wildcard.lstrip(os.sep)
-      filepaths = self._IterDir(base_dir, remaining_wildcard)
+      found_files = self._IterDir(base_dir,
+                                  remaining_wildcard,
+                                  stat_files=include_size)
     else:
       # Not a recursive wildcarding request.
-      filepaths = glob.iglob(wildcard)
-    for filepath in filepaths:
+      found_files = (_FoundFile(filepath, None, None)
+                     for filepath in glob.iglob(wildcard))
+    for found_file in found_files:
+      filepath = found_file.path
       expanded_url = StorageUrlFromString(filepath)
       try:
-        if self.ignore_symlinks and os.path.islink(filepath):
+        is_symlink = found_file.is_symlink
+        if self.ignore_symlinks and (os.path.islink(filepath)
+                                     if is_symlink is None else is_symlink):
           if self.logger:
             self.logger.info('Skipping symbolic link %s...', filepath)
           continue
-        if os.path.isdir(filepath):
+        # _IterDir only yields files, so only glob matches can be directories.
+        if is_symlink is None and os.path.isdir(filepath):
           yield BucketListingPrefix(expanded_url)
         else:
-          blr_object = _GetFileObject(filepath) if include_size else None
-          yield BucketListingObject(expanded_url, root_object=blr_object)
+          # To provide size estimates for local to cloud file copies, we need
+          # to expose the local file's size. The stat result is kept so that
+          # e.g. rsync doesn't need to stat the file again.
+          stat_result = found_file.stat_result
+          blr_object = None
+          if include_size:
+            stat_result = stat_result or os.stat(filepath)
+            blr_object = apitools_messages.Object(size=stat_result.st_size)
+          yield BucketListingObject(expanded_url,
+                                    root_object=blr_object,
+                                    stat_result=stat_result)
       except UnicodeEncodeError:
         raise CommandException('\n'.join(
             textwrap.wrap(_UNICODE_EXCEPTION_TEXT % repr(filepath))))
 
-  def _IterDir(self, directory, wildcard):
+  def _IterDir(self, directory, wildcard, stat_files=False):
     """An iterator over the specified dir and wildcard.
 
+    Files are yielded in the same order as with os.walk (top-down), while
+    the next few subdirectories to be walked are scanned ahead of time by a
+    pool of threads.
+
     Args:
       directory (unicode): The path of the directory to iterate over.
       wildcard (str): The wildcard characters used for filename pattern
           matching.
+      stat_files (bool): If True, the yielded files carry their stat results.
 
     Yields:
-      (str) A string containing the path to a file somewhere under the directory
-      hierarchy of `directory`.
+      (_FoundFile) A file somewhere under the directory hierarchy of
+      `directory`.
 
     Raises:
       ComandException: If this method encounters a file path that it cannot
@@ -688,64 +748,90 @@ class FileWildcardIterator(WildcardIterator):
       # the resulting joined path looks like 'c:\\foo'.
       directory += '\\'
 
-    # UTF8-encode directory before passing it to os.walk() so if there are
-    # non-valid UTF8 chars in the file name (e.g., that can happen if the file
-    # originated on Windows) os.walk() will not attempt to decode and then die
-    # with a "codec can't decode byte" error, and instead we can catch the error
-    # at yield time and print a more informative error message.
-    for dirpath, dirnames, filenames in os.walk(six.ensure_text(directory),
-                                                topdown=True):
-      filtered_dirnames = []
-
-      for dirname in dirnames:
-        full_dir_path = os.path.join(dirpath, dirname)
-        # Removes directories in place to prevent them and their children from
-        # being iterated. See https://docs.python.org/3/library/os.html#os.walk
-        if not self._ExcludeDir(full_dir_path):
-          filtered_dirnames.append(dirname)
-        else:
-          # If a symlink is excluded above we don't want to print 2 messages.
-          continue
-        # This only prints a log message as os.walk() will not, by default,
-        # walk down into symbolic links that resolve to directories.
-        if self.logger and os.path.islink(full_dir_path):
-          self.logger.info('Skipping symlink directory "%s"', full_dir_path)
-
-      dirnames[:] = filtered_dirnames
-
-      for f in fnmatch.filter(filenames, wildcard):
-        try:
-          yield os.path.join(dirpath, FixWindowsEncodingIfNeeded(f))
-        except UnicodeDecodeError:
-          # Note: We considered several ways to deal with this, but each had
-          # problems:
-          # 1. Raise an exception and try to catch in a higher layer (the
-          #    gsutil cp command), so we can properly support the gsutil cp -c
-          #    option. That doesn't work because raising an exception during
-          #    iteration terminates the generator.
-          # 2. Accumulate a list of bad filenames and skip processing each
-          #    during iteration, then raise at the end, with exception text
-          #    printing the bad paths. That doesn't work because iteration is
-          #    wrapped in PluralityCheckableIterator, so it's possible there
-          #    are not-yet-performed copy operations at the time we reach the
-          #    end of the iteration and raise the exception - which would cause
-          #    us to skip copying validly named files. Moreover, the gsutil
-          #    cp command loops over argv, so if you run the command gsutil cp
-          #    -rc dir1 dir2 gs://bucket, an invalid unicode name inside dir1
-          #    would cause dir2 never to be visited.
-          # 3. Print the invalid pathname and skip it during iteration. That
-          #    would work but would mean gsutil cp could exit with status 0
-          #    even though some files weren't copied.
-          # 4. Change the WildcardIterator to include an error status along with
-          #    the result. That would solve the problem but would be a
-          #    substantial change (WildcardIterator is used in many parts of
-          #    gsutil), and we didn't feel that magnitude of change was
-          #    warranted by this relatively uncommon corner case.
-          # Instead we chose to abort when one such file is encountered, and
-          # require the user to remove or rename the files and try again.
-          raise CommandException('\n'.join(
-              textwrap.wrap(_UNICODE_EXCEPTION_TEXT %
-                            repr(os.path.join(dirpath, f)))))
+    # Pass the directory as text so that, as with os.walk(), non-valid UTF8
+    # chars in file names (e.g., that can happen if the file originated on
+    # Windows) don't cause a "codec can't decode byte" error while scanning,
+    # and instead we can catch the error at yield time and print a more
+    # informative error message.
+    num_threads = GetFileListingThreads()
+    # Scans that finish ahead of the consumer are held in memory, so only the
+    # directories that are walked next are scanned ahead.
+    max_scans_ahead = num_threads * 2
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_threads)
+
+    try:
+      # Stack of [path, future] entries for the directories still to be
+      # walked, with the next one on top. The future is None until the
+      # directory's scan is submitted.
+      pending_dirs = [[six.ensure_text(directory), None]]
+      num_scans = 0
+      while pending_dirs:
+        for pending_dir in reversed(pending_dirs):
+          if num_scans >= max_scans_ahead:
+            break
+          if pending_dir[1] is None:
+            pending_dir[1] = executor.submit(_ScanDir, pending_dir[0],
+                                             wildcard, stat_files)
+            num_scans += 1
+        dirpath, scan_future = pending_dirs.pop()
+        num_scans -= 1
+        dirnames, files = scan_future.result()
+
+        for f, is_symlink, stat_result in files:
+          try:
+            filepath = os.path.join(dirpath, FixWindowsEncodingIfNeeded(f))
+            yield _FoundFile(filepath, is_symlink, stat_result)
+          except UnicodeDecodeError:
+            # Note: We considered several ways to deal with this, but each had
+            # problems:
+            # 1. Raise an exception and try to catch in a higher layer (the
+            #    gsutil cp command), so we can properly support the gsutil cp
+            #    -c option. That doesn't work because raising an exception
+            #    during iteration terminates the generator.
+            # 2. Accumulate a list of bad filenames and skip processing each
+            #    during iteration, then raise at the end, with exception text
+            #    printing the bad paths. That doesn't work because iteration is
+            #    wrapped in PluralityCheckableIterator, so it's possible there
+            #    are not-yet-performed copy operations at the time we reach the
+            #    end of the iteration and raise the exception - which would
+            #    cause us to skip copying validly named files. Moreover, the
+            #    gsutil cp command loops over argv, so if you run the command
+            #    gsutil cp -rc dir1 dir2 gs://bucket, an invalid unicode name
+            #    inside dir1 would cause dir2 never to be visited.
+            # 3. Print the invalid pathname and skip it during iteration. That
+            #    would work but would mean gsutil cp could exit with status 0
+            #    even though some files weren't copied.
+            # 4. Change the WildcardIterator to include an error status along
+            #    with the result. That would solve the problem but would be a
+            #    substantial change (WildcardIterator is used in many parts of
+            #    gsutil), and we didn't feel that magnitude of change was
+            #    warranted by this relatively uncommon corner case.
+            # Instead we chose to abort when one such file is encountered, and
+            # require the user to remove or rename the files and try again.
+            raise CommandException('\n'.join(
+                textwrap.wrap(_UNICODE_EXCEPTION_TEXT %
+                              repr(os.path.join(dirpath, f)))))
+
+        subdir_paths = []
+        for dirname, is_symlink in dirnames:
+          full_dir_path = os.path.join(dirpath, dirname)
+          # Excluded directories and their children aren't walked.
+          if self._ExcludeDir(full_dir_path):
+            # If a symlink is excluded here we don't want to print 2 messages.
+            continue
+          if is_symlink:
+            # As with os.walk(), we don't walk down into symbolic links that
+            # resolve to directories.
+            if self.logger:
+              self.logger.info('Skipping symlink directory "%s"',
+                               full_dir_path)
+            continue
+          subdir_paths.append(full_dir_path)
+        # Subdirectories are walked in order, so the first one goes on top.
+        pending_dirs.extend([path, None] for path in reversed(subdir_paths))
+    finally:
+      # Scans that haven't started are abandoned if iteration stops early.
+      executor.shutdown(wait=False, cancel_futures=True)
 
   def _ExcludeDir(self, dir):
     """Check a directory to see if it should be excluded from os.walk.